@@ -17,7 +17,8 @@ from a2a.models import (
 from a2a.task_manager import TaskManager
 from runner import run_agent, run_modification_agent, control_flow_agent
 from config import settings
-from tools.cad_tools import task_id_var, prompt_var
+from tools.cad_tools import task_id_var, prompt_var, model_size_var
+from tools.job_scheduler import JobTicket, QueueFullError, ResourceClass, get_job_scheduler, job_priority_var, task_priority
 from models.generation_options import MODEL_SIZE_SPECS, ModelSize
 
 logger = logging.getLogger(__name__)
@@ -68,26 +69,52 @@ def _find_generated_files(task_id: str, output_dir: str) -> list[Part]:
     # OBJ first (colored), then STL (fallback), then others
     return obj_parts + stl_parts + parts
 
+def _admit_task(priority: int) -> JobTicket:
+    """Reserve an agent-run slot for a new task, rejecting it if the queue is full.
+
+    Args:
+        priority (int): The task's scheduling priority (see task_priority).
+
+    Returns:
+        JobTicket: The task's place in the LLM queue, handed to its background task.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header if too many tasks are queued.
+    """
+    try:
+        return get_job_scheduler().reserve(ResourceClass.LLM, priority)
+    except QueueFullError as e:
+        logger.warning(f"Rejecting A2A task: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 async def process_a2a_task(
     task_id: str,
     prompt: str,
     context_id: str,
-    generation_options: GenerateOptions | None = None
+    generation_options: GenerateOptions | None = None,
+    ticket: JobTicket | None = None
 ) -> None:
     """Process an A2A generation task in the background.
 
+    The task stays SUBMITTED until the job scheduler grants it an agent-run slot.
+
     Args:
         task_id (str): The unique identifier for the task.
         prompt (str): The input prompt from the user/agent.
         context_id (str): The context or session ID.
         generation_options (GenerateOptions | None): Optional generation options (model size, etc.)
+        ticket (JobTicket | None): The LLM slot reserved when the task was admitted.
+            If None, one is reserved here.
     """
     logger.info(f"Processing A2A generation task {task_id} with prompt: {prompt}")
     if generation_options:
         logger.info(f"Generation options: model_size={generation_options.model_size}, "
                    f"complexity={generation_options.complexity}")
 
-    task_manager.update_task_status(task_id, TaskState.WORKING)
+    model_size = generation_options.model_size.value if generation_options and generation_options.model_size else None
+    priority = task_priority(model_size)
+    if ticket is None:
+        ticket = get_job_scheduler().reserve(ResourceClass.LLM, priority)
 
     # Set the task ID in the context variable so tools can use it
     task_token = task_id_var.set(task_id)
@@ -95,7 +122,17 @@ async def process_a2a_task(
     # Set the prompt in context variable for colored OBJ generation
     prompt_token = prompt_var.set(prompt)
 
+    # Set the model size so CAD jobs get that size's wall-clock limit
+    model_size_token = model_size_var.set(model_size)
+
+    # CAD and render jobs of this task queue with its priority
+    priority_token = job_priority_var.set(priority)
+
     try:
+        # Inside the try, so the finally releases the slot whatever happens from here
+        await ticket.wait_async()
+        task_manager.update_task_status(task_id, TaskState.WORKING)
+
         final_response = ""
 
         # Add model size info to prompt if specified
@@ -145,7 +182,7 @@ Target layer count: {cs.min_layers}-{cs.max_layers} layers
                 issues=buildability_result.issues,
                 recommendations=buildability_result.recommendations,
                 estimated_build_time_minutes=buildability_result.estimated_build_time_minutes,
-                build_sequence=[b.to_dict() for b in buildability_result.build_sequence]
+                build_sequence=buildability_result.build_sequence.to_dicts()
             )
 
             # Add buildability metadata as a data part
@@ -196,21 +233,30 @@ Target layer count: {cs.min_layers}-{cs.max_layers} layers
         logger.error(f"A2A generation task {task_id} exception: {e}")
 
     finally:
-        # Reset the context variable
-        task_id_var.reset(token)
+        # Reset the context variables
+        task_id_var.reset(task_token)
+        prompt_var.reset(prompt_token)
+        model_size_var.reset(model_size_token)
+        job_priority_var.reset(priority_token)
+        ticket.release()
 
 
 async def process_modification_task(
     task_id: str,
     modification_data: ModificationData,
-    context_id: str
+    context_id: str,
+    ticket: JobTicket | None = None
 ) -> None:
     """Process an A2A modification task in the background.
 
+    The task stays SUBMITTED until the job scheduler grants it an agent-run slot.
+
     Args:
         task_id (str): The unique identifier for the task.
         modification_data (ModificationData): The modification request data.
         context_id (str): The context or session ID.
+        ticket (JobTicket | None): The LLM slot reserved when the task was admitted.
+            If None, one is reserved here.
     """
     # Log modification request details (truncate potentially sensitive code)
     logger.info(
@@ -222,12 +268,21 @@ async def process_modification_task(
         f"base_code_length={len(modification_data.base_code)} chars"
     )
 
-    task_manager.update_task_status(task_id, TaskState.WORKING)
+    priority = task_priority(modification=True)
+    if ticket is None:
+        ticket = get_job_scheduler().reserve(ResourceClass.LLM, priority)
 
     # Set the task ID in the context variable so tools can use it
     token = task_id_var.set(task_id)
 
+    # CAD and render jobs of this task queue with its priority
+    priority_token = job_priority_var.set(priority)
+
     try:
+        # Inside the try, so the finally releases the slot whatever happens from here
+        await ticket.wait_async()
+        task_manager.update_task_status(task_id, TaskState.WORKING)
+
         final_response = ""
         # Convert inventory to list of dicts if present
         inventory_list = None
@@ -276,8 +331,10 @@ async def process_modification_task(
         logger.error(f"A2A modification task {task_id} exception: {e}")
 
     finally:
-        # Reset the context variable
+        # Reset the context variables
         task_id_var.reset(token)
+        job_priority_var.reset(priority_token)
+        ticket.release()
 
 @router.post("/v1/message:send")
 async def a2a_send_message(request: SendMessageRequest, background_tasks: BackgroundTasks) -> Dict[str, Task]:
@@ -294,7 +351,8 @@ async def a2a_send_message(request: SendMessageRequest, background_tasks: Backgr
         Dict[str, Task]: A dictionary containing the created task.
 
     Raises:
-        HTTPException: If the message content is empty or modification data is missing.
+        HTTPException: If the message content is empty or modification data is missing (400),
+            or too many tasks are queued already (429).
     """
     # Handle modification requests
     if request.message_type == MessageType.MODIFY_LEGO_MODEL:
@@ -316,6 +374,9 @@ async def a2a_send_message(request: SendMessageRequest, background_tasks: Backgr
                 detail="modification_prompt is required for modification requests"
             )
 
+        # Reserve an agent-run slot; modifications are scheduled before generations
+        ticket = _admit_task(task_priority(modification=True))
+
         # Create Task
         task = task_manager.create_task(context_id=request.message.context_id)
 
@@ -335,7 +396,8 @@ async def a2a_send_message(request: SendMessageRequest, background_tasks: Backgr
             process_modification_task,
             task.id,
             request.modification_data,
-            request.message.context_id
+            request.message.context_id,
+            ticket=ticket
         )
 
         return {"task": task}
@@ -350,6 +412,10 @@ async def a2a_send_message(request: SendMessageRequest, background_tasks: Backgr
     if not prompt.strip():
         raise HTTPException(status_code=400, detail="No text content found in message")
 
+    # Reserve an agent-run slot; smaller models are scheduled first
+    options = request.generation_options
+    ticket = _admit_task(task_priority(options.model_size.value if options and options.model_size else None))
+
     # Create Task
     task = task_manager.create_task(context_id=request.message.context_id)
 
@@ -369,7 +435,8 @@ async def a2a_send_message(request: SendMessageRequest, background_tasks: Backgr
         task.id,
         prompt.strip(),
         request.message.context_id,
-        request.generation_options
+        request.generation_options,
+        ticket=ticket
     )
 
     return {"task": task}
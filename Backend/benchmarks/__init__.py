@@ -0,0 +1 @@
+"""Performance benchmarks for FormaAI backend components."""
@@ -0,0 +1,220 @@
+"""Benchmark for the buildability validator on a large, valid model.
+
+The model is a solid running-bond wall: every brick rests fully on the
+layer below and no joint lines up over three layers, so it scores 100 and
+every check does its full amount of work. Reports validate_buildability,
+the shared-grid checks on the vectorized and scalar paths, and optionally
+validate_buildability from another git revision for comparison.
+
+Usage:
+    python -m benchmarks.bench_buildability [--bricks 2280] [--repeat 5] [--baseline REV] [--checks]
+    python -m benchmarks.bench_buildability --crossover
+"""
+
+import argparse
+import gc
+import subprocess
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from validation.buildability import (
+    BrickGrid,
+    LEGO_BRICK_HEIGHT,
+    LEGO_GRID_SIZE,
+    _check_assembly_order,
+    _check_brick_sizes,
+    _check_connectivity,
+    _check_grid_alignment,
+    _check_staggered_joints,
+    _check_structural_stability,
+    _parse_build_sequence,
+    validate_buildability,
+)
+
+CHECKS = [
+    _check_grid_alignment,
+    _check_brick_sizes,
+    _check_connectivity,
+    _check_staggered_joints,
+    _check_assembly_order,
+    _check_structural_stability,
+]
+
+# Wall length in studs; a multiple of 4 so the 2x4 courses close flush
+WALL_LENGTH = 40
+
+# Wall depth in studs: two 2x4 rows on even courses, four 1x4 rows on odd ones
+WALL_DEPTH = 4
+
+# Model sizes timed by --crossover (rounded up to whole courses)
+CROSSOVER_SIZES = (64, 128, 256, 512, 1024, 2280, 4560)
+
+
+def _course(layer: int) -> List[Any]:
+    """Get (brick, grid_x, grid_y) for every brick of one wall course."""
+    if layer % 2 == 0:
+        return [("2x4", x, y) for x in range(0, WALL_DEPTH, 2) for y in range(0, WALL_LENGTH, 4)]
+    # Half-brick offset along the wall, with 1x2 ends to close it flush
+    course = []
+    for x in range(WALL_DEPTH):
+        course.append(("1x2", x, 0))
+        course.extend(("1x4", x, y) for y in range(2, WALL_LENGTH - 2, 4))
+        course.append(("1x2", x, WALL_LENGTH - 2))
+    return course
+
+
+def make_wall(brick_count: int) -> List[Dict[str, Any]]:
+    """Build a running-bond wall build_sequence of about brick_count bricks.
+
+    Whole courses are generated, so the model may overshoot brick_count by
+    less than one course.
+
+    Args:
+        brick_count: Minimum number of bricks to generate.
+
+    Returns:
+        List of raw build_sequence entries, course by course.
+    """
+    sequence: List[Dict[str, Any]] = []
+    layer = 0
+    while len(sequence) < brick_count:
+        for brick, grid_x, grid_y in _course(layer):
+            sequence.append({
+                "step": len(sequence) + 1,
+                "brick": brick,
+                "color": "red" if layer % 2 else "white",
+                "position": {
+                    "x": grid_x * LEGO_GRID_SIZE,
+                    "y": grid_y * LEGO_GRID_SIZE,
+                    "z": round(layer * LEGO_BRICK_HEIGHT, 1),
+                },
+            })
+        layer += 1
+    return sequence
+
+
+def load_revision(revision: str) -> types.ModuleType:
+    """Load validation/buildability.py as it was at a git revision.
+
+    Args:
+        revision: Any git revision, e.g. a commit hash or "HEAD~3".
+
+    Returns:
+        The module, executed in isolation from the installed package.
+    """
+    backend = Path(__file__).resolve().parent.parent
+    source = subprocess.run(
+        ["git", "show", f"{revision}:./validation/buildability.py"],
+        cwd=backend, check=True, capture_output=True, text=True,
+    ).stdout
+    module = types.ModuleType(f"buildability_{revision}")
+    module.__file__ = f"{revision}:validation/buildability.py"
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def _run_checks(bricks: Any, vectorize: bool) -> None:
+    """Run every check against one shared index."""
+    grid = BrickGrid.from_bricks(bricks, vectorize=vectorize)
+    for check in CHECKS:
+        check(grid)
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest wall-clock time of several runs, in seconds.
+
+    Garbage from the previous run is collected first so it is not charged
+    to the next one.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _best_check(check: Callable[[BrickGrid], Any], bricks: Any, vectorize: bool, repeat: int) -> float:
+    """Time one check on a fresh grid per run, so cached indexes are rebuilt."""
+    best = float("inf")
+    for _ in range(repeat):
+        grid = BrickGrid.from_bricks(bricks, vectorize=vectorize)
+        gc.collect()
+        start = time.perf_counter()
+        check(grid)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_check(sequence: List[Dict[str, Any]], repeat: int, baseline: Optional[types.ModuleType]) -> None:
+    """Time each check on its own, against the same check at a baseline revision."""
+    bricks, _, _ = _parse_build_sequence(sequence)
+    base_bricks = [baseline.BrickPlacement(**item) for item in sequence] if baseline else None
+    print(f"{'check':<28}  {'vectorized':>10}  {'scalar':>10}  {'baseline':>10}")
+    for check in CHECKS:
+        vectorized = _best_check(check, bricks, True, repeat)
+        scalar = _best_check(check, bricks, False, repeat)
+        line = f"{check.__name__:<28}  {vectorized * 1000:8.2f}ms  {scalar * 1000:8.2f}ms"
+        if base_bricks is not None:
+            base_check = getattr(baseline, check.__name__)
+            line += f"  {_best_of(lambda: base_check(base_bricks), repeat) * 1000:8.2f}ms"
+        print(line)
+
+
+def crossover(repeat: int) -> None:
+    """Time the vectorized and scalar checks over a range of model sizes.
+
+    VECTORIZE_MIN_BRICKS should sit where the vectorized path starts to win.
+    """
+    print(f"{'bricks':>6}  {'vectorized':>10}  {'scalar':>10}  speedup   (repeat={repeat})")
+    for size in CROSSOVER_SIZES:
+        bricks, _, _ = _parse_build_sequence(make_wall(size))
+        vectorized = _best_of(lambda: _run_checks(bricks, vectorize=True), repeat)
+        scalar = _best_of(lambda: _run_checks(bricks, vectorize=False), repeat)
+        print(f"{len(bricks):>6}  {vectorized * 1000:8.2f}ms  {scalar * 1000:8.2f}ms  {scalar / vectorized:6.2f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bricks", type=int, default=2280, help="Bricks in the wall")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    parser.add_argument("--baseline", metavar="REV", help="Also time validate_buildability at this git revision")
+    parser.add_argument("--checks", action="store_true", help="Also time each check on its own")
+    parser.add_argument("--crossover", action="store_true",
+                        help="Compare the vectorized and scalar checks across model sizes and exit")
+    args = parser.parse_args(argv)
+
+    if args.crossover:
+        crossover(args.repeat)
+        return
+
+    sequence = make_wall(args.bricks)
+    model = {"build_sequence": sequence}
+    result = validate_buildability(model)
+    bricks, _, _ = _parse_build_sequence(sequence)
+
+    full = _best_of(lambda: validate_buildability(model), args.repeat)
+    vectorized = _best_of(lambda: _run_checks(bricks, vectorize=True), args.repeat)
+    scalar = _best_of(lambda: _run_checks(bricks, vectorize=False), args.repeat)
+
+    print(f"bricks={len(sequence)} layers={result.layer_count} score={result.score} "
+          f"valid={result.valid} repeat={args.repeat}")
+    print(f"validate_buildability: {full * 1000:8.2f} ms")
+    print(f"checks, vectorized   : {vectorized * 1000:8.2f} ms")
+    print(f"checks, scalar       : {scalar * 1000:8.2f} ms  ({scalar / vectorized:.2f}x vectorized)")
+
+    baseline = load_revision(args.baseline) if args.baseline else None
+    if baseline:
+        base_result = baseline.validate_buildability(model)
+        base = _best_of(lambda: baseline.validate_buildability(model), args.repeat)
+        print(f"{args.baseline} (score={base_result.score} valid={base_result.valid}): "
+              f"{base * 1000:8.2f} ms  ({base / full:.2f}x HEAD)")
+    if args.checks:
+        per_check(sequence, args.repeat, baseline)
+
+
+if __name__ == "__main__":
+    main()
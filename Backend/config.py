@@ -11,6 +11,48 @@ class Settings:
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")
     RAG_PERSIST_DIRECTORY: str = os.getenv("RAG_PERSIST_DIRECTORY", "rag_db")
     MODEL_NAME: str = "all-mpnet-base-v2"
+
+    # Persistent CAD worker pool
+    CAD_WORKERS: int = int(os.getenv("CAD_WORKERS", "1"))
+    CAD_WORKER_MAX_JOBS: int = int(os.getenv("CAD_WORKER_MAX_JOBS", "50"))
+    CAD_WORKER_MAX_RSS_MB: int = int(os.getenv("CAD_WORKER_MAX_RSS_MB", "2048"))
+
+    # Sandbox limits for CAD and render workers (0 disables a limit)
+    CAD_TIMEOUT_SECONDS: int = int(os.getenv("CAD_TIMEOUT_SECONDS", "600"))  # Ceiling for the per-size wall clock
+    CAD_WORKER_MAX_MEMORY_MB: int = int(os.getenv("CAD_WORKER_MAX_MEMORY_MB", "4096"))  # RLIMIT_AS headroom
+    CAD_WORKER_MAX_CPU_SECONDS: int = int(os.getenv("CAD_WORKER_MAX_CPU_SECONDS", "0"))  # 0: the job's timeout
+    RENDER_TIMEOUT_SECONDS: int = int(os.getenv("RENDER_TIMEOUT_SECONDS", "30"))
+
+    # Persistent render workers, each with a warm off-screen plotter
+    RENDER_WORKERS: int = int(os.getenv("RENDER_WORKERS", "1"))
+    RENDER_WORKER_MAX_JOBS: int = int(os.getenv("RENDER_WORKER_MAX_JOBS", "200"))
+    # "vtk", "numpy" (software rasterizer, no display needed) or "auto" (VTK where it can render)
+    RENDER_BACKEND: str = os.getenv("RENDER_BACKEND", "auto")
+
+    # Disk cache of rendered images keyed by mesh hash and view parameters (0 entries disables it)
+    RENDER_CACHE_DIR: str = os.getenv("RENDER_CACHE_DIR", "render_cache")
+    RENDER_CACHE_MAX_ENTRIES: int = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "2000"))
+
+    # Show the designer a contact sheet of the labelled iso/top/front/right views instead of the iso view
+    VERIFY_CONTACT_SHEET: bool = os.getenv("VERIFY_CONTACT_SHEET", "true").lower() == "true"
+
+    # Job scheduler: concurrent jobs and queued jobs per resource class (a queue of 0 is unbounded)
+    SCHEDULER_LLM_CONCURRENCY: int = int(os.getenv("SCHEDULER_LLM_CONCURRENCY", "4"))  # Agent runs
+    SCHEDULER_LLM_QUEUE: int = int(os.getenv("SCHEDULER_LLM_QUEUE", "16"))  # Requests past this get a 429
+    SCHEDULER_CAD_CONCURRENCY: int = int(os.getenv("SCHEDULER_CAD_CONCURRENCY", str(CAD_WORKERS)))
+    SCHEDULER_CAD_QUEUE: int = int(os.getenv("SCHEDULER_CAD_QUEUE", "64"))
+    SCHEDULER_RENDER_CONCURRENCY: int = int(os.getenv("SCHEDULER_RENDER_CONCURRENCY", str(RENDER_WORKERS)))
+    SCHEDULER_RENDER_QUEUE: int = int(os.getenv("SCHEDULER_RENDER_QUEUE", "64"))
+
+    # Add step timings, peak memory and sampled hot operations to CAD results
+    CAD_PROFILE: bool = os.getenv("CAD_PROFILE", "false").lower() == "true"
+
+    # Disk cache of CAD outputs keyed by script hash (0 entries disables it)
+    CAD_CACHE_DIR: str = os.getenv("CAD_CACHE_DIR", "cad_cache")
+    CAD_CACHE_MAX_ENTRIES: int = int(os.getenv("CAD_CACHE_MAX_ENTRIES", "500"))
+
+    # Export models that are exactly their build_sequence's bricks from pre-tessellated brick templates
+    CAD_INSTANCED_BRICKS: bool = os.getenv("CAD_INSTANCED_BRICKS", "true").lower() == "true"
     
     # Build123d Documentation URLs
     BUILD123D_DOCS_URLS: list[str] = [
@@ -13,12 +13,17 @@ import logging
 logging.getLogger("tornado.access").setLevel(logging.ERROR)
 logging.getLogger("google.generativeai").setLevel(logging.ERROR)
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from contextlib import asynccontextmanager
 from tools.rag_tool import RAGTool
+from tools.cad_tools import EXPORT_FORMATS, ensure_cad_exports_async, get_cad_pool, shutdown_cad_pool
+from tools.job_scheduler import get_job_scheduler
+from tools.renderer import get_render_pool, shutdown_render_pool
+from validation.cache import get_buildability_cache
 from a2a.api import router as a2a_router
 from config import settings
 
@@ -40,8 +45,14 @@ async def lifespan(app: FastAPI):
     logger.info("Startup: Checking RAG database...")
     rag = RAGTool()
     await rag.ingest_docs()
+    # Pre-fork the CAD workers so the first generation does not pay the start-up cost
+    get_cad_pool().start()
+    # Likewise the render workers, which set up their plotter once
+    get_render_pool().start()
     yield
-    # Shutdown: Clean up if needed (optional)
+    # Shutdown: Stop the CAD and render workers
+    shutdown_cad_pool()
+    shutdown_render_pool()
 
 app = FastAPI(title="FormaAI API", lifespan=lifespan)
 
@@ -55,7 +66,40 @@ app.add_middleware(
 
 # Serve the outputs directory so files can be downloaded
 os.makedirs("outputs", exist_ok=True)
+
+
+@app.get("/download/{filename}")
+async def download_output(filename: str):
+    """Serve a generated file, exporting it first if its build deferred that format.
+
+    Args:
+        filename (str): Name of the file in the outputs directory.
+    """
+    if filename != os.path.basename(filename) or filename.startswith("."):
+        raise HTTPException(status_code=404, detail="Not Found")
+    path = os.path.join("outputs", filename)
+    base_name, ext = os.path.splitext(filename)
+    fmt = ext.lstrip(".")
+    if not os.path.isfile(path) and fmt in EXPORT_FORMATS:
+        await ensure_cad_exports_async("outputs", base_name, (fmt,))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return FileResponse(path)
+
+
 app.mount("/download", StaticFiles(directory="outputs"), name="outputs")
 
+
+@app.get("/metrics/scheduler")
+async def scheduler_metrics() -> dict:
+    """Report running and queued jobs, wait times and rejections per resource class."""
+    return get_job_scheduler().stats()
+
+
+@app.get("/metrics/buildability-cache")
+async def buildability_cache_metrics() -> dict:
+    """Report size, hits, misses, evictions and hit rate of the buildability cache."""
+    return get_buildability_cache().stats()
+
 # --- A2A Protocol Implementation ---
 app.include_router(a2a_router)
@@ -28,41 +28,48 @@ class ModelSize(str, Enum):
     CUSTOM = "custom"   # User-defined
 
 
+# cad_timeout_seconds is the wall-clock limit for running one CAD script of
+# the size (never more than settings.CAD_TIMEOUT_SECONDS)
 MODEL_SIZE_SPECS: Dict[ModelSize, Dict[str, int]] = {
     ModelSize.TINY: {
         "min_bricks": 15,
         "max_bricks": 30,
         "min_layers": 1,
         "max_layers": 8,
-        "display_name": "Quick Build"
+        "display_name": "Quick Build",
+        "cad_timeout_seconds": 90
     },
     ModelSize.SMALL: {
         "min_bricks": 30,
         "max_bricks": 60,
         "min_layers": 2,
         "max_layers": 10,
-        "display_name": "Standard"
+        "display_name": "Standard",
+        "cad_timeout_seconds": 180
     },
     ModelSize.MEDIUM: {
         "min_bricks": 60,
         "max_bricks": 120,
         "min_layers": 4,
         "max_layers": 13,
-        "display_name": "Detailed"
+        "display_name": "Detailed",
+        "cad_timeout_seconds": 300
     },
     ModelSize.LARGE: {
         "min_bricks": 120,
         "max_bricks": 200,
         "min_layers": 6,
         "max_layers": 17,
-        "display_name": "Grand"
+        "display_name": "Grand",
+        "cad_timeout_seconds": 450
     },
     ModelSize.EPIC: {
         "min_bricks": 200,
         "max_bricks": 350,
         "min_layers": 10,
         "max_layers": 23,
-        "display_name": "Epic"
+        "display_name": "Epic",
+        "cad_timeout_seconds": 600
     },
 }
 
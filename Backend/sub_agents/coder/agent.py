@@ -9,7 +9,7 @@ import re
 from typing import Optional
 from google.adk.agents import LlmAgent
 from tools.rag_tool import RAGTool
-from tools.cad_tools import create_cad_model
+from tools.cad_tools import create_cad_model_async
 from .prompt import SYSTEM_PROMPT, MODIFICATION_PROMPT
 
 logger = logging.getLogger(__name__)
@@ -22,6 +22,15 @@ VALID_BRICK_SIZES = {
 }
 
 
+async def create_cad_model(script_code: str, prompt: str = "") -> dict:
+    """Executes build123d code and exports STEP/STL/OBJ.
+
+    See tools.cad_tools.create_cad_model for the arguments and result.
+    """
+    # Tool wrapper keeping the name the prompts use, while the build runs off the event loop
+    return await create_cad_model_async(script_code, prompt)
+
+
 def get_coder_agent(model_name: str = "gemini-3-pro-preview") -> LlmAgent:
     """Initialize and return the Coder Agent for generation mode.
 
@@ -114,6 +114,9 @@ Your code MUST generate these variables alongside the 3D model:
 - `build_sequence`: List[Dict] with ordered brick placements - **INCLUDE COLOR FOR EACH BRICK**
   Example: [{"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}}, 
             {"step": 2, "brick": "2x2", "color": "white", "position": {"x": 16, "y": 0, "z": 0}}, ...]
+  Give each brick's minimum corner as its position, build every brick as in the example above and keep the bricks
+  as separate solids (`result = Compound(bricks)`, no fuse between bricks): models made of exactly their
+  build_sequence's bricks are exported from pre-built brick templates, which is much faster.
 - `layers`: List[Dict] grouping bricks by Z-height
 - `brick_count`: Total number of bricks
 - `layer_count`: Total number of layers
@@ -4,10 +4,12 @@ This module defines the ControlFlowAgent, which orchestrates the interaction
 between the Designer and Coder agents to generate and modify 3D models.
 """
 
+import os
 import re
 import json
 import asyncio
 from typing import AsyncGenerator, Optional, Dict, Any, List
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.memory import InMemoryMemoryService
@@ -16,11 +18,21 @@ from google.genai.types import Content, Part
 import logging
 from sub_agents.designer.agent import get_designer_agent, get_designer_verification_agent
 from sub_agents.coder.agent import get_coder_agent, CodeModifier
-from tools.renderer import render_stl, render_stl_async
-from tools.cad_tools import create_cad_model
-from validation.buildability import validate_buildability, BuildabilityResult, BrickPlacement
+from tools.renderer import VIEWS, render_png_async
+from tools.cad_tools import (
+    EXPORT_FORMATS,
+    create_cad_model_async,
+    ensure_cad_exports_async,
+    export_formats_var,
+    take_cad_mesh,
+)
+from validation.buildability import BuildabilityResult, BrickPlacement
+from validation.cache import validate_buildability_cached
+from validation.incremental import IncrementalBuildabilityValidator
+from validation.streaming import StreamingBuildabilityCheck
 from a2a.models import GenerateOptions
 from utils.timing import TimingCollector, get_timing_collector, reset_timing_collector
+from config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -57,8 +69,12 @@ class ControlFlowAgent:
         self.designer_agent = get_designer_agent()
         self.designer_verification_agent = get_designer_verification_agent()  # Lighter Flash model
         self.coder_agent = get_coder_agent()
+        self.coder_agent.before_tool_callback = self._skip_hopeless_cad_call
         self.code_modifier = CodeModifier()
 
+        # Streaming buildability checks of running coder steps, by session id
+        self._early_checks: Dict[str, StreamingBuildabilityCheck] = {}
+
         # Store latest buildability result for response inclusion
         self._last_buildability_result: Optional[BuildabilityResult] = None
         
@@ -110,7 +126,14 @@ class ControlFlowAgent:
         
         return designer_output
 
-    async def _run_coder_step(self, spec: str, user_id: str, session_id: str, result_container: dict[str, str]) -> AsyncGenerator[str, None]:
+    async def _run_coder_step(
+        self,
+        spec: str,
+        user_id: str,
+        session_id: str,
+        result_container: dict[str, str],
+        early_check: Optional[StreamingBuildabilityCheck] = None
+    ) -> AsyncGenerator[str, None]:
         """Runs the Coder Agent to generate code.
 
         Args:
@@ -118,6 +141,9 @@ class ControlFlowAgent:
             user_id (str): The unique identifier for the user.
             session_id (str): The unique identifier for the session.
             result_container (dict[str, str]): A dictionary to store the full output string.
+            early_check (Optional[StreamingBuildabilityCheck]): Fed the coder text and tool
+                call code as events arrive. Once it reports a hopeless layout, CAD tool
+                calls are skipped and the run stops.
 
         Yields:
             str: Chunks of the generated text output.
@@ -131,23 +157,84 @@ class ControlFlowAgent:
         
         coder_input = Content(parts=[Part(text=f"Specification:\n{spec}")], role="user")
         coder_output = ""
+        streamed_text = False  # Final events repeat text already sent as partial events
+        run_config = None
+        if early_check is not None:
+            self._early_checks[session_id] = early_check
+            # Stream the model output, so the check sees the build_sequence as it is written
+            run_config = RunConfig(streaming_mode=StreamingMode.SSE)
         
-        async for event in coder_runner.run_async(user_id=user_id, session_id=session_id, new_message=coder_input):
-            if event.content:
-                 tool_output = self._parse_tool_output(event.content)
-                 if tool_output:
-                     coder_output += f"\nTool Output: {tool_output}"
-            
-            if event.is_final_response() and event.content and event.content.parts:
-                text_parts = [p.text for p in event.content.parts if p.text]
-                if text_parts:
-                    chunk = "\n" + "\n".join(text_parts)
-                    coder_output += chunk
-                    yield "\n".join(text_parts)
+        try:
+            async for event in coder_runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=coder_input, run_config=run_config
+            ):
+                if event.content:
+                     tool_output = self._parse_tool_output(event.content)
+                     if tool_output:
+                         coder_output += f"\nTool Output: {tool_output}"
+                
+                if event.is_final_response() and event.content and event.content.parts:
+                    text_parts = [p.text for p in event.content.parts if p.text]
+                    if text_parts:
+                        chunk = "\n" + "\n".join(text_parts)
+                        coder_output += chunk
+                        yield "\n".join(text_parts)
+
+                if early_check is not None and event.content and event.content.parts:
+                    streamed_text = streamed_text or bool(event.partial)
+                    hopeless = self._feed_early_check(
+                        early_check, event.content, include_text=event.partial or not streamed_text
+                    )
+                    # Stop once the skipped CAD call is answered, so no call is left without a response
+                    if hopeless and not any(p.function_call for p in event.content.parts):
+                        logger.info("ControlFlow: Hopeless build_sequence detected while streaming, stopping coder")
+                        break
+        finally:
+            if early_check is not None:
+                self._early_checks.pop(session_id, None)
         
         result_container["output"] = coder_output
         logger.info(f"ControlFlow: Coder Output Raw: {coder_output}")
 
+    def _feed_early_check(self, early_check: StreamingBuildabilityCheck, content: Content, include_text: bool) -> bool:
+        """Feeds text and CAD tool call code from an event to the streaming check.
+
+        Args:
+            early_check (StreamingBuildabilityCheck): The check to feed.
+            content (Content): The event content.
+            include_text (bool): Whether to feed text parts.
+
+        Returns:
+            bool: True if the build_sequence seen so far is hopeless.
+        """
+        for part in content.parts:
+            if part.text:
+                if include_text:
+                    early_check.feed(part.text)
+            elif part.function_call and part.function_call.args:
+                code = part.function_call.args.get("script_code")
+                if isinstance(code, str):
+                    early_check.feed(code)
+        return early_check.hopeless
+
+    def _skip_hopeless_cad_call(self, tool: Any, args: Dict[str, Any], tool_context: Any) -> Optional[Dict[str, Any]]:
+        """Coder before-tool callback that skips CAD execution for hopeless layouts.
+
+        Returns:
+            Optional[Dict[str, Any]]: A failed create_cad_model result to use instead of
+                running the tool, or None to run it.
+        """
+        if tool.name != "create_cad_model":
+            return None
+        early_check = self._early_checks.get(tool_context.session.id)
+        if early_check is None or not early_check.hopeless:
+            return None
+        logger.info("ControlFlow: Skipping CAD execution for hopeless build_sequence")
+        return {
+            "success": False,
+            "error": f"Skipped: build_sequence cannot reach buildability score {early_check.threshold}",
+        }
+
     def _parse_tool_output(self, content: Content) -> str | None:
         """Parses tool output from the content."""
         for part in content.parts:
@@ -300,7 +387,7 @@ class ControlFlowAgent:
         Returns:
             Tuple of (BuildabilityResult, needs_correction: bool)
         """
-        result = validate_buildability(model_data)
+        result = validate_buildability_cached(model_data)
         self._last_buildability_result = result
 
         logger.info(f"Buildability validation: score={result.score}, valid={result.valid}, "
@@ -354,7 +441,7 @@ Ensure all bricks are:
         """
         return self._last_buildability_result
 
-    def _extract_or_generate_stl(self, coder_output: str) -> tuple[str | None, str | None]:
+    async def _extract_or_generate_stl(self, coder_output: str) -> tuple[str | None, str | None]:
         """Extracts STL path from output or attempts fallback generation.
 
         Args:
@@ -377,7 +464,7 @@ Ensure all bricks are:
         if code_match:
             logger.info("ControlFlow: Found code block. Executing fallback generation...")
             code = code_match.group(1).strip()
-            result = create_cad_model(code)
+            result = await create_cad_model_async(code)
             if result["success"]:
                 logger.info(f"ControlFlow: Fallback generation successful. Files: {result['files']}")
                 return result['files']['stl'], None
@@ -387,16 +474,24 @@ Ensure all bricks are:
 
         return None, "No code block or STL file found."
 
-    async def _get_designer_feedback(self, png_path: str, original_spec: str, user_id: str, session_id: str) -> str:
+    async def _get_designer_feedback(
+        self,
+        image_data: bytes,
+        original_spec: str,
+        user_id: str,
+        session_id: str,
+        views: Optional[List[str]] = None
+    ) -> str:
         """Requests feedback from the Designer Verification Agent on the rendered image.
 
         Uses the Flash model for faster verification feedback loops.
 
         Args:
-            png_path (str): Path to the rendered PNG image.
+            image_data (bytes): The rendered PNG.
             original_spec (str): The original design specification.
             user_id (str): The unique identifier for the user.
             session_id (str): The unique identifier for the session.
+            views (Optional[List[str]]): Labels of the views tiled in the image, if it is a contact sheet.
 
         Returns:
             str: The feedback text from the Designer Verification Agent.
@@ -409,14 +504,15 @@ Ensure all bricks are:
             session_service=self.session_service,
             memory_service=self.memory_service
         )
-        
-        with open(png_path, "rb") as f:
-            image_data = f.read()
-            
+
+        if views:
+            image_description = f"this rendered image (labelled {', '.join(views)} views of the model)"
+        else:
+            image_description = "this rendered image"
         feedback_prompt = f"""Original Specification:
 {original_spec[:1000]}...
 
-Compare this rendered image against the specification above."""
+Compare {image_description} against the specification above."""
         
         feedback_input = Content(parts=[
             Part(text=feedback_prompt),
@@ -439,9 +535,13 @@ Compare this rendered image against the specification above."""
         user_id: str,
         session_id: str,
         skip_verification: bool = False
-    ) -> tuple[bool, str, str | None]:
+    ) -> tuple[bool, str, bytes | None]:
         """Renders the model and optionally gets feedback from the Designer.
 
+        Renders the mesh arrays the CAD worker tessellated for the STL, or
+        the STL itself for builds served from the CAD cache. The image stays
+        in memory; nothing is written next to the model.
+
         Args:
             stl_path: Path to the STL file.
             original_spec: The original specification.
@@ -450,28 +550,32 @@ Compare this rendered image against the specification above."""
             skip_verification: If True, skip Designer feedback (for high buildability scores).
 
         Returns:
-            tuple: (is_approved, feedback_text, png_path)
+            tuple: (is_approved, feedback_text, png_bytes), png_bytes None if rendering failed
         """
         logger.info(f"ControlFlow: Found STL at {stl_path}")
-        
-        # Use async rendering for better performance
-        png_path = await render_stl_async(stl_path)
-        if not png_path:
+        mesh = take_cad_mesh(stl_path) or stl_path
+
+        # A contact sheet shows every view in one image, rendered in one job
+        views = list(VIEWS) if settings.VERIFY_CONTACT_SHEET else None
+        image_data = await render_png_async(mesh, views or ("iso",))
+        if not image_data:
             logger.error("ControlFlow: Failed to render STL.")
             return False, "Failed to render STL.", None
-            
-        logger.info(f"ControlFlow: Rendered image at {png_path}")
-        
+
+        logger.info(f"ControlFlow: Rendered {len(image_data)} byte image of {stl_path}")
+
         # Skip Designer verification if buildability score is high
         if skip_verification:
             logger.info("ControlFlow: Skipping Designer verification (high buildability score)")
-            return True, "APPROVED: Model passed buildability validation with high score.", png_path
-        
+            return True, "APPROVED: Model passed buildability validation with high score.", image_data
+
         # Ask Designer for Feedback (using Flash model)
-        feedback_output = await self._get_designer_feedback(png_path, original_spec, user_id, session_id)
-        
+        feedback_output = await self._get_designer_feedback(
+            image_data, original_spec, user_id, session_id, views
+        )
+
         is_approved = "APPROVED" in feedback_output
-        return is_approved, feedback_output, png_path
+        return is_approved, feedback_output, image_data
 
     async def _execute_loop_iteration(
         self,
@@ -499,11 +603,28 @@ Compare this rendered image against the specification above."""
         # To preserve streaming, we'll keep the generator call here but use the helper logic for the rest.
 
         coder_result = {}
-        async for chunk in self._run_coder_step(current_spec, user_id, session_id, coder_result):
+        early_check = None if skip_buildability_correction else StreamingBuildabilityCheck(BUILDABILITY_THRESHOLD)
+        async for chunk in self._run_coder_step(current_spec, user_id, session_id, coder_result, early_check=early_check):
             yield chunk
 
         coder_output = coder_result.get("output", "")
-        stl_path, generation_error = self._extract_or_generate_stl(coder_output)
+        corrected_early = False
+        if early_check is not None and early_check.hopeless:
+            # The layout cannot reach the threshold - correct it before spending time on CAD
+            early_result = early_check.result()
+            self._last_buildability_result = early_result
+            logger.info(f"ControlFlow: Buildability score at most {early_check.best_score} after "
+                        f"{len(early_check.entries)} bricks, correcting before CAD execution")
+            yield f"Buildability check: score {early_result.score}/100 while generating - attempting correction...\n"
+
+            correction_spec = self._build_correction_prompt(original_spec, early_result)
+            correction_result = {}
+            async for chunk in self._run_coder_step(correction_spec, user_id, session_id, correction_result):
+                pass  # Don't yield correction output to avoid confusion
+            coder_output = correction_result.get("output", "")
+            corrected_early = True
+
+        stl_path, generation_error = await self._extract_or_generate_stl(coder_output)
 
         if not stl_path:
             logger.error(f"ControlFlow: Generation failed. Error: {generation_error}")
@@ -521,7 +642,13 @@ Compare this rendered image against the specification above."""
                 model_metadata, coder_output, original_spec
             )
 
-            if needs_correction:
+            if corrected_early:
+                # Already used this iteration's self-correction while the coder was streaming
+                logger.info(f"ControlFlow: Corrected buildability score: {validation_result.score}")
+                yield f"Corrected buildability score: {validation_result.score}/100\n"
+                if validation_result.score >= HIGH_BUILDABILITY_SKIP_THRESHOLD:
+                    skip_designer_verification = True
+            elif needs_correction:
                 logger.info(f"ControlFlow: Buildability score {validation_result.score} < {BUILDABILITY_THRESHOLD}, "
                            f"attempting self-correction")
                 yield f"Buildability check: score {validation_result.score}/100 - attempting correction...\n"
@@ -535,7 +662,7 @@ Compare this rendered image against the specification above."""
                     pass  # Don't yield correction output to avoid confusion
 
                 corrected_output = correction_result.get("output", "")
-                corrected_stl, corrected_error = self._extract_or_generate_stl(corrected_output)
+                corrected_stl, corrected_error = await self._extract_or_generate_stl(corrected_output)
 
                 if corrected_stl:
                     stl_path = corrected_stl
@@ -544,7 +671,7 @@ Compare this rendered image against the specification above."""
                     # Re-validate corrected model
                     corrected_metadata = self._extract_model_metadata(corrected_output)
                     if corrected_metadata.get("build_sequence"):
-                        corrected_validation = validate_buildability(corrected_metadata)
+                        corrected_validation = validate_buildability_cached(corrected_metadata)
                         self._last_buildability_result = corrected_validation
                         logger.info(f"ControlFlow: Corrected buildability score: {corrected_validation.score}")
                         yield f"Corrected buildability score: {corrected_validation.score}/100\n"
@@ -568,13 +695,13 @@ Compare this rendered image against the specification above."""
             self._last_buildability_result = None
 
         # 3. Verify Model with Designer (may be skipped for high buildability scores)
-        is_approved, feedback_output, png_path = await self._verify_model(
+        is_approved, feedback_output, image_data = await self._verify_model(
             stl_path, original_spec, user_id, session_id, 
             skip_verification=skip_designer_verification
         )
 
-        if png_path:
-            yield f"Generated Image: {png_path}\n"
+        if image_data:
+            yield f"Rendered model: {stl_path}\n"
         else:
             yield "\nFailed to render STL.\n"
             yield (False, current_spec)
@@ -582,6 +709,7 @@ Compare this rendered image against the specification above."""
 
         if is_approved:
             logger.info("ControlFlow: Design Approved.")
+            await self._export_approved_model(stl_path)
             friendly_msg = feedback_output.replace("APPROVED", "").strip()
             if not friendly_msg:
                     friendly_msg = "Here is your 3D model."
@@ -593,6 +721,22 @@ Compare this rendered image against the specification above."""
             next_spec = f"Original Specification:\n{original_spec}\n\nFeedback on previous attempt:\n{feedback_output}\n\nPlease fix the code based on this feedback."
             yield (False, next_spec)
 
+    async def _export_approved_model(self, stl_path: str) -> None:
+        """Exports the formats that loop iterations skip for the approved model.
+
+        Iterations only export the STL needed for rendering; the STEP, GLB
+        and OBJ are made from the build's BREP once a design is approved.
+
+        Args:
+            stl_path (str): Path to the approved model's STL file.
+        """
+        output_dir, filename = os.path.split(stl_path)
+        base_name = os.path.splitext(filename)[0]
+        result = await ensure_cad_exports_async(output_dir, base_name, EXPORT_FORMATS)
+        if not result["success"]:
+            # The STL is still there to deliver
+            logger.warning(f"ControlFlow: Could not export approved model {base_name}: {result['error']}")
+
     async def run(
         self, 
         prompt: str, 
@@ -635,21 +779,26 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
         # After design specification is generated, run the loops of coder -> renderer -> designer -> coder until approved or max loops reached.
         max_loops = 3
         current_spec = designer_output
-        
-        for loop in range(max_loops):
-            logger.info(f"--- Running Coder Agent (Loop {loop+1}) ---")
-            
-            async for chunk in self._execute_loop_iteration(current_spec, designer_output, user_id, session_id):
-                if isinstance(chunk, tuple):
-                    # Final result of the iteration
-                    is_approved, next_spec = chunk
-                    if is_approved:
-                        return
-                    current_spec = next_spec
-                else:
-                    # Streaming output
-                    yield chunk
-        
+
+        # Iterations only need the STL for rendering; the rest is exported on approval
+        formats_token = export_formats_var.set(("stl",))
+        try:
+            for loop in range(max_loops):
+                logger.info(f"--- Running Coder Agent (Loop {loop+1}) ---")
+
+                async for chunk in self._execute_loop_iteration(current_spec, designer_output, user_id, session_id):
+                    if isinstance(chunk, tuple):
+                        # Final result of the iteration
+                        is_approved, next_spec = chunk
+                        if is_approved:
+                            return
+                        current_spec = next_spec
+                    else:
+                        # Streaming output
+                        yield chunk
+        finally:
+            export_formats_var.reset(formats_token)
+
         # If loop finishes without approval
         yield "I'm sorry, I was unable to generate the model correctly after multiple attempts.\n"
 
@@ -722,7 +871,8 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
         existing_code: str,
         modification_prompt: str,
         user_id: str,
-        session_id: str
+        session_id: str,
+        validator: Optional[IncrementalBuildabilityValidator] = None
     ) -> AsyncGenerator[str | tuple[bool, str], None]:
         """Executes one iteration of the modification workflow.
 
@@ -731,6 +881,9 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
             modification_prompt (str): The user's modification request.
             user_id (str): The unique identifier for the user.
             session_id (str): The unique identifier for the session.
+            validator (IncrementalBuildabilityValidator | None): Validator indexed
+                with the previous version of the model. When given, only the
+                bricks that changed are re-validated.
 
         Yields:
             Union[str, tuple[bool, str]]: Chunks of text output, and finally a tuple (success, message).
@@ -743,7 +896,7 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
             yield chunk
 
         modifier_output = modifier_result.get("output", "")
-        stl_path, generation_error = self._extract_or_generate_stl(modifier_output)
+        stl_path, generation_error = await self._extract_or_generate_stl(modifier_output)
 
         if not stl_path:
             logger.error(f"ControlFlow: Modification failed. Error: {generation_error}")
@@ -755,7 +908,10 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
         skip_designer_verification = False
 
         if model_metadata.get("build_sequence"):
-            validation_result = validate_buildability(model_metadata)
+            if validator is not None:
+                validation_result = validator.apply_sequence(model_metadata["build_sequence"])
+            else:
+                validation_result = validate_buildability_cached(model_metadata)
             self._last_buildability_result = validation_result
             logger.info(f"ControlFlow: Modification buildability score: {validation_result.score}")
             
@@ -769,14 +925,14 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
             self._last_buildability_result = None
 
         # 3. Verify Modified Model (may be skipped for high buildability)
-        is_approved, feedback_output, png_path = await self._verify_model(
+        is_approved, feedback_output, image_data = await self._verify_model(
             stl_path, f"Modified version of existing model: {modification_prompt}",
             user_id, session_id,
             skip_verification=skip_designer_verification
         )
 
-        if png_path:
-            yield f"Modified Model Image: {png_path}\n"
+        if image_data:
+            yield f"Rendered modified model: {stl_path}\n"
         else:
             yield "\nFailed to render modified STL.\n"
             yield (False, "Render failed")
@@ -835,11 +991,15 @@ Advanced mode means MORE LEGO detail and precision, NOT smooth CAD surfaces.
         max_loops = 2
         current_code = existing_code
 
+        # Index the base model once so each iteration only re-validates the bricks it changed
+        base_sequence = self._extract_model_metadata(existing_code).get("build_sequence")
+        validator = IncrementalBuildabilityValidator.from_sequence(base_sequence) if base_sequence else None
+
         for loop in range(max_loops):
             logger.info(f"--- Running Modification Loop {loop+1} ---")
 
             async for chunk in self._execute_modification_iteration(
-                current_code, modification_prompt, user_id, session_id
+                current_code, modification_prompt, user_id, session_id, validator
             ):
                 if isinstance(chunk, tuple):
                     # Final result of the iteration
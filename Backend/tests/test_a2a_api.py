@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 from fastapi.testclient import TestClient
@@ -32,6 +33,25 @@ class TestA2AAPI(unittest.TestCase):
         mock_task_manager.create_task.assert_called()
         mock_add_task.assert_called()
 
+    @patch('a2a.api.task_manager')
+    @patch('a2a.api.get_job_scheduler')
+    def test_send_message_queue_full(self, mock_get_scheduler, mock_task_manager):
+        """Test that a message past the task queue bound gets a 429 without creating a task."""
+        from tools.job_scheduler import QueueFullError, ResourceClass
+        mock_get_scheduler.return_value.reserve.side_effect = QueueFullError(ResourceClass.LLM, 16, 30)
+
+        response = self.client.post("/v1/message:send", json={
+            "message": {
+                "role": "ROLE_USER",
+                "parts": [{"text": "Create a cube"}],
+                "context_id": "ctx_1"
+            }
+        })
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "30")
+        mock_task_manager.create_task.assert_not_called()
+
     def test_send_message_empty(self):
         """Test sending an empty message."""
         response = self.client.post("/v1/message:send", json={
@@ -116,5 +136,19 @@ class TestA2AAPI(unittest.TestCase):
         self.assertEqual(args[1], TaskState.FAILED)
         self.assertIn("Agent Error", args[2]) # Error message should be passed
 
+    @patch('a2a.api.task_manager')
+    def test_process_a2a_task_releases_slot(self, mock_task_manager):
+        """Test that the LLM slot is released when the task fails before its agent runs."""
+        ticket = MagicMock()
+        ticket.wait_async = AsyncMock()
+        mock_task_manager.update_task_status.side_effect = [RuntimeError("task store down"), None]
+
+        asyncio.run(process_a2a_task("task_1", "prompt", "ctx_1", ticket=ticket))
+
+        ticket.wait_async.assert_awaited_once()
+        ticket.release.assert_called_once()
+        args, _ = mock_task_manager.update_task_status.call_args_list[-1]
+        self.assertEqual(args[1], TaskState.FAILED)
+
 if __name__ == '__main__':
     unittest.main()
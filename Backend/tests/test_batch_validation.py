@@ -0,0 +1,125 @@
+"""Unit tests for batch buildability validation."""
+
+import io
+import json
+
+import pytest
+
+from validation import buildability
+from validation.batch import main, read_jsonl, validate_buildability_batch, write_jsonl
+from validation.buildability import validate_buildability
+
+
+def _model(offset: float) -> dict:
+    return {
+        "id": f"model-{offset}",
+        "build_sequence": [
+            {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+            {"step": 2, "brick": "2x4", "color": "red", "position": {"x": offset, "y": 0, "z": 9.6}},
+            {"step": 3, "brick": "2x2", "color": "blue", "position": {"x": 40, "y": 40, "z": 19.2}},
+        ],
+    }
+
+
+MODELS = [_model(offset) for offset in (0, 8, 12.5, 16)]
+
+
+class TestValidateBuildabilityBatch:
+    """Tests for validate_buildability_batch."""
+
+    def test_matches_online_validation(self):
+        """Test that batch rows carry the same scores and issues as validate_buildability."""
+        rows = list(validate_buildability_batch(MODELS, workers=1, chunk_size=3))
+
+        assert [row["id"] for row in rows] == [model["id"] for model in MODELS]
+        for row, model in zip(rows, MODELS):
+            expected = validate_buildability(model)
+            assert row["score"] == expected.score
+            assert row["valid"] == expected.valid
+            assert row["issues"] == expected.issues
+            assert row["brick_count"] == 3
+
+    def test_process_pool_preserves_order(self):
+        """Test that results from worker processes come back in input order."""
+        records = MODELS * 5
+        serial = list(validate_buildability_batch(records, workers=1))
+        parallel = list(validate_buildability_batch(records, workers=2, chunk_size=2))
+        assert parallel == serial
+
+    def test_bare_sequence_and_bad_records(self):
+        """Test that bare lists are accepted and unusable records become error rows."""
+        rows = list(validate_buildability_batch([MODELS[0]["build_sequence"], 42], workers=1))
+        assert rows[0]["id"] == 0
+        assert rows[0]["score"] == validate_buildability(MODELS[0]).score
+        assert rows[1] == {"id": 1, "error": "Expected an object or list, got int"}
+
+    def test_threshold_override_is_scoped(self):
+        """Test that threshold overrides apply to the batch and are restored afterwards."""
+        original = buildability.COM_OFFSET_THRESHOLD
+        lenient = list(validate_buildability_batch(MODELS, workers=1, thresholds={"COM_OFFSET_THRESHOLD": 10.0}))
+        default = list(validate_buildability_batch(MODELS, workers=1))
+
+        assert buildability.COM_OFFSET_THRESHOLD == original
+        assert all(l["score"] == d["score"] + 3 for l, d in zip(lenient, default))
+
+    def test_threshold_override_in_workers(self):
+        """Test that worker processes see the threshold overrides."""
+        thresholds = {"COM_OFFSET_THRESHOLD": 10.0}
+        serial = list(validate_buildability_batch(MODELS, workers=1, thresholds=thresholds))
+        parallel = list(validate_buildability_batch(MODELS, workers=2, chunk_size=1, thresholds=thresholds))
+        assert parallel == serial
+
+    def test_overhang_ratio_tunable(self):
+        """Test that the overhang ratio can be overridden without changing scores."""
+        rows = list(validate_buildability_batch(MODELS, workers=1, thresholds={"OVERHANG_SUPPORT_RATIO": 0.9}))
+        default = list(validate_buildability_batch(MODELS, workers=1))
+        assert all(isinstance(row["score"], int) for row in rows)
+        # Load-path findings are recommendations only
+        assert [r["score"] for r in rows] == [d["score"] for d in default]
+
+    def test_unknown_threshold_rejected(self):
+        """Test that only tunable thresholds can be overridden."""
+        with pytest.raises(ValueError):
+            list(validate_buildability_batch(MODELS, workers=1, thresholds={"LEGO_GRID_SIZE": 10}))
+
+
+class TestBatchIO:
+    """Tests for the JSONL readers/writers and the CLI."""
+
+    def test_read_jsonl_reports_invalid_lines(self):
+        """Test that malformed lines become error rows instead of stopping the batch."""
+        stream = io.StringIO(json.dumps(MODELS[0]) + "\n\n{not json\n")
+        rows = list(validate_buildability_batch(read_jsonl(stream), workers=1))
+        assert len(rows) == 2
+        assert "score" in rows[0]
+        assert rows[1]["error"].startswith("Invalid JSON on line 3")
+
+    def test_write_jsonl(self):
+        """Test that rows are written one JSON object per line."""
+        stream = io.StringIO()
+        assert write_jsonl([{"id": 1}, {"id": 2}], stream) == 2
+        assert stream.getvalue() == '{"id": 1}\n{"id": 2}\n'
+
+    def test_cli_jsonl(self, tmp_path):
+        """Test the CLI end to end with JSONL output."""
+        input_path = tmp_path / "models.jsonl"
+        output_path = tmp_path / "scores.jsonl"
+        input_path.write_text("\n".join(json.dumps(model) for model in MODELS))
+
+        assert main([str(input_path), "-o", str(output_path), "--workers", "1"]) == 0
+
+        rows = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert [row["score"] for row in rows] == [validate_buildability(model).score for model in MODELS]
+
+    def test_cli_parquet(self, tmp_path):
+        """Test the CLI end to end with Parquet output."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        input_path = tmp_path / "models.jsonl"
+        output_path = tmp_path / "scores.parquet"
+        input_path.write_text("\n".join(json.dumps(model) for model in MODELS))
+
+        assert main([str(input_path), "-o", str(output_path), "--format", "parquet", "--workers", "1"]) == 0
+
+        table = pq.read_table(output_path)
+        assert table.column("id").to_pylist() == [model["id"] for model in MODELS]
+        assert table.column("score").to_pylist() == [validate_buildability(model).score for model in MODELS]
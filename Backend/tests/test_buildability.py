@@ -1,17 +1,42 @@
 """Unit tests for the buildability validator."""
 
+import random
+from unittest.mock import patch
+
 import pytest
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 from validation.buildability import (
     validate_buildability,
     BuildabilityResult,
     BrickPlacement,
+    BuildSequence,
+    BrickGrid,
     STANDARD_BRICK_SIZES,
     LEGO_GRID_SIZE,
     LEGO_BRICK_HEIGHT,
     _is_grid_aligned,
     _get_brick_footprint,
     _get_layer_index,
+    _check_connectivity,
+    _check_grid_alignment,
+    _check_structural_stability,
+    _parse_build_sequence,
 )
+from validation.connectivity import (
+    DisjointSet,
+    brick_contacts,
+    build_cell_index,
+    find_floating_components,
+    stud_contacts,
+)
+from validation.stability import analyze_grid_loads, analyze_load_paths, support_polygon
+from validation import incremental
+from validation.incremental import IncrementalBuildabilityValidator
 
 
 class TestGridAlignment:
@@ -137,6 +162,37 @@ class TestConnectivity:
         # All bricks should be connected - no floating
         assert not any("Floating" in issue for issue in result.issues)
 
+    def test_floating_island_fails(self):
+        """Test that bricks only attached to each other, not the ground, fail."""
+        model_data = {
+            "build_sequence": [
+                {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+                {"step": 2, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 9.6}},
+                # Island: two stacked bricks hovering away from the tower
+                {"step": 3, "brick": "2x4", "color": "blue", "position": {"x": 80, "y": 0, "z": 19.2}},
+                {"step": 4, "brick": "2x4", "color": "blue", "position": {"x": 80, "y": 0, "z": 28.8}},
+            ]
+        }
+        result = validate_buildability(model_data)
+        floating = [issue for issue in result.issues if "Floating" in issue]
+        assert floating == [
+            "Floating brick at step 3 (layer 2) - group of 2 bricks (steps 3, 4) is not connected to the ground"
+        ]
+        assert not result.valid
+
+    def test_cantilever_connected_through_structure_passes(self):
+        """Test that bricks reaching the ground through several layers are connected."""
+        model_data = {
+            "build_sequence": [
+                {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+                {"step": 2, "brick": "2x4", "color": "red", "position": {"x": 8, "y": 0, "z": 9.6}},
+                {"step": 3, "brick": "2x4", "color": "red", "position": {"x": 16, "y": 0, "z": 19.2}},
+                {"step": 4, "brick": "2x4", "color": "red", "position": {"x": 24, "y": 0, "z": 28.8}},
+            ]
+        }
+        result = validate_buildability(model_data)
+        assert not any("Floating" in issue for issue in result.issues)
+
 
 class TestStaggeredJoints:
     """Tests for staggered joints validation."""
@@ -158,6 +214,30 @@ class TestStaggeredJoints:
         # Staggered joints should not cause major issues
         assert result.score >= 70
 
+    def test_long_seam_reported(self):
+        """Test that a seam running through more than 3 layers is reported once."""
+        model_data = {
+            "build_sequence": [
+                {"step": layer + 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": layer * 9.6}}
+                for layer in range(5)
+            ]
+        }
+        result = validate_buildability(model_data)
+        assert "4 vertical seams run through layers 0-4 without staggering" in result.issues
+        assert sum("Multiple vertical seams" in issue for issue in result.issues) == 3
+
+    def test_three_layer_seam_not_reported_as_long(self):
+        """Test that a seam through exactly 3 layers only costs the window penalty."""
+        model_data = {
+            "build_sequence": [
+                {"step": layer + 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": layer * 9.6}}
+                for layer in range(3)
+            ]
+        }
+        result = validate_buildability(model_data)
+        assert not any("without staggering" in issue for issue in result.issues)
+        assert result.score == 98
+
 
 class TestAssemblyOrder:
     """Tests for assembly order validation."""
@@ -204,6 +284,122 @@ class TestStructuralStability:
         assert not any("top-heavy" in rec.lower() for rec in result.recommendations)
 
 
+class TestLoadPathStability:
+    """Tests for the per-sub-assembly load-path check."""
+
+    @staticmethod
+    def _brick(step, brick, x, y, layer):
+        return {"step": step, "brick": brick, "color": "red", "position": {"x": x, "y": y, "z": layer * LEGO_BRICK_HEIGHT}}
+
+    def test_stacked_column_is_stable(self):
+        """Test that bricks stacked squarely carry their load without tipping."""
+        model_data = {"build_sequence": [self._brick(i + 1, "2x4", 0, 0, i) for i in range(2)]}
+        result = validate_buildability(model_data)
+        assert not any("may tip with the load center" in rec for rec in result.recommendations)
+
+    def test_cantilever_sub_assembly_tips(self):
+        """Test that a brick held by one stud column with its load beyond it is flagged."""
+        model_data = {
+            "build_sequence": [
+                self._brick(1, "2x4", 0, 0, 0),
+                # Only the x=8 stud column rests on the base brick
+                self._brick(2, "2x4", 8, 0, 1),
+                self._brick(3, "2x4", 16, 0, 2),
+            ]
+        }
+        result = validate_buildability(model_data)
+        tipping = [rec for rec in result.recommendations if "may tip with the load center" in rec]
+        assert len(tipping) == 1
+        assert "1 sub-assembly" in tipping[0] and "steps 2" in tipping[0]
+        # Only the whole-model center of mass check costs points
+        assert result.issues == []
+        assert result.score == 97
+
+    def test_support_is_convex_hull_of_studs(self):
+        """Test that a load over the missing corner of an L-shaped support tips."""
+        model_data = {
+            "build_sequence": [
+                self._brick(1, "1x4", 0, 8, 0),
+                self._brick(2, "1x2", 8, 0, 0),
+                # Rests on the 1x4's four studs and one stud of the 1x2
+                self._brick(3, "2x4", 0, 8, 1),
+            ] + [self._brick(4 + i, "2x2", 8, 32, 2 + i) for i in range(5)]
+        }
+        result = validate_buildability(model_data)
+        # The load center is inside the bounding rectangle of the support
+        # but outside its hull
+        assert any("may tip with the load center" in rec and "steps 3)" in rec for rec in result.recommendations)
+
+    def test_support_polygon(self):
+        """Test hull corners for a full rectangle and an L of stud cells."""
+        assert support_polygon([(1, 0), (1, 1), (2, 0), (2, 1)]) == ((8.0, 0.0), (24.0, 0.0), (24.0, 16.0), (8.0, 16.0))
+        assert support_polygon([(0, 1), (0, 2), (0, 3), (1, 1)]) == (
+            (0.0, 8.0), (16.0, 8.0), (16.0, 16.0), (8.0, 32.0), (0.0, 32.0)
+        )
+
+    def test_load_accumulates_down_the_support_graph(self):
+        """Test that each brick carries its own studs plus everything stacked on it."""
+        grid = BrickGrid.from_bricks([
+            BrickPlacement(step=1, brick="2x4", color="red", position={"x": 0, "y": 0, "z": 0}),
+            BrickPlacement(step=2, brick="2x4", color="red", position={"x": 16, "y": 0, "z": 0}),
+            # Bridges both base bricks with 4 studs on each
+            BrickPlacement(step=3, brick="2x4", color="red", position={"x": 8, "y": 0, "z": 9.6}),
+            BrickPlacement(step=4, brick="2x2", color="red", position={"x": 8, "y": 0, "z": 19.2}),
+        ])
+        loads = analyze_load_paths(
+            range(4), grid.brick_layers, grid.brick_footprints, build_cell_index(grid), ground_layer=0
+        )
+        assert loads[3].mass == 4
+        assert loads[2].mass == 12
+        assert loads[2].center == pytest.approx((16.0, (8 * 16 + 4 * 8) / 12))
+        assert loads[2].support == ((8.0, 0.0), (24.0, 0.0), (24.0, 32.0), (8.0, 32.0))
+        assert loads[0].mass == loads[1].mass == 14
+        assert loads[0].support is None
+
+    def test_arch_is_stable(self):
+        """Test that a load bridging two pillars is not off-centre on either of them."""
+        pillars = [self._brick(layer * 2 + side + 1, "2x2", 0, y, layer)
+                   for layer in range(3) for side, y in enumerate((0, 32))]
+        model_data = {"build_sequence": pillars + [self._brick(7, "2x6", 0, 0, 3)]}
+
+        result = validate_buildability(model_data)
+
+        assert not any("may tip with the load center" in rec for rec in result.recommendations)
+
+    def test_overhang_recommendation(self):
+        """Test that bricks resting on less than half of their studs get a recommendation."""
+        model_data = {
+            "build_sequence": [
+                self._brick(1, "2x4", 0, 0, 0),
+                self._brick(2, "2x4", 16, 0, 0),
+                # Only one of its four studs sits on the base
+                self._brick(3, "2x2", 24, 24, 1),
+            ]
+        }
+        result = validate_buildability(model_data)
+        assert any("1 bricks overhang" in rec and "steps 3" in rec for rec in result.recommendations)
+
+    def test_running_bond_wall_is_stable(self):
+        """Test that no brick of a solid running-bond wall is flagged on either path."""
+        sequence = []
+        for layer in range(6):
+            if layer % 2:
+                # Half-brick offset, with 1x2 ends to close the course flush
+                course = [("1x2", 0)] + [("1x4", y) for y in range(2, 14, 4)] + [("1x2", 14)]
+            else:
+                course = [("1x4", y) for y in range(0, 16, 4)]
+            for x in range(2):
+                for brick, y in course:
+                    sequence.append(self._brick(len(sequence) + 1, brick, x * 8, y * 8, layer))
+
+        result = validate_buildability({"build_sequence": sequence})
+        assert not any("may tip" in rec or "overhang" in rec for rec in result.recommendations)
+
+        if numpy is not None:
+            bricks = [BrickPlacement(**entry) for entry in sequence]
+            assert analyze_grid_loads(BrickGrid.from_bricks(bricks, vectorize=True), 0, flagged_only=True) == {}
+
+
 class TestBuildTime:
     """Tests for build time estimation."""
 
@@ -307,6 +503,386 @@ class TestHelperFunctions:
         assert (1, 3) in footprint
 
 
+class TestBrickGrid:
+    """Tests for the shared layer/footprint index."""
+
+    def test_grid_groups_bricks_by_layer(self):
+        """Test that bricks are indexed by layer in build order."""
+        bricks = [
+            BrickPlacement(step=1, brick="2x4", color="red", position={"x": 0, "y": 0, "z": 0}),
+            BrickPlacement(step=2, brick="2x2", color="red", position={"x": 16, "y": 0, "z": 0}),
+            BrickPlacement(step=3, brick="2x4", color="blue", position={"x": 8, "y": 0, "z": 9.6}),
+        ]
+        grid = BrickGrid.from_bricks(bricks)
+
+        assert grid.sorted_layers == [0, 1]
+        assert grid.layer_count == 2
+        assert grid.layers[0] == [0, 1]
+        assert grid.brick_layers == [0, 0, 1]
+        assert [b.step for b in grid.layer_bricks(1)] == [3]
+
+    def test_grid_layer_footprints_and_bounds(self):
+        """Test that per-layer footprints, edges and bounds are precomputed."""
+        bricks = [
+            BrickPlacement(step=1, brick="2x4", color="red", position={"x": 0, "y": 0, "z": 0}),
+            BrickPlacement(step=2, brick="2x2", color="red", position={"x": 16, "y": 0, "z": 0}),
+        ]
+        grid = BrickGrid.from_bricks(bricks)
+
+        assert len(grid.layer_footprints[0]) == 12
+        assert grid.layer_bounds[0] == (0, 32.0, 0, 32.0)
+        assert (0, 0, 16.0, 0) in grid.layer_edges[0]
+
+    def test_grid_skips_unknown_brick_geometry(self):
+        """Test that unknown brick types are indexed without footprint or edges."""
+        bricks = [
+            BrickPlacement(step=1, brick="3x3", color="red", position={"x": 0, "y": 0, "z": 0}),
+        ]
+        grid = BrickGrid.from_bricks(bricks)
+
+        assert grid.layers[0] == [0]
+        assert grid.brick_footprints[0] == set()
+        assert grid.layer_edges[0] == set()
+
+
+class TestDisjointSet:
+    """Tests for the union-find connectivity engine."""
+
+    def test_union_and_find(self):
+        """Test that unions merge sets and report whether they merged."""
+        components = DisjointSet(4)
+        assert components.union(0, 1)
+        assert components.union(2, 3)
+        assert not components.union(1, 0)
+        assert components.find(0) == components.find(1)
+        assert components.find(0) != components.find(2)
+
+    def test_add_creates_singleton(self):
+        """Test that added elements start in their own set."""
+        components = DisjointSet(1)
+        index = components.add()
+        assert index == 1
+        assert components.find(index) == index
+
+    def test_find_floating_components(self):
+        """Test that components are grouped and returned in build order."""
+        bricks = [
+            BrickPlacement(step=1, brick="2x2", color="red", position={"x": 0, "y": 0, "z": 0}),
+            BrickPlacement(step=2, brick="2x2", color="red", position={"x": 40, "y": 0, "z": 9.6}),
+            BrickPlacement(step=3, brick="2x2", color="red", position={"x": 8, "y": 0, "z": 9.6}),
+            BrickPlacement(step=4, brick="2x2", color="red", position={"x": 40, "y": 8, "z": 19.2}),
+        ]
+        assert find_floating_components(BrickGrid.from_bricks(bricks)) == [[1, 3]]
+        if numpy is not None:
+            assert find_floating_components(BrickGrid.from_bricks(bricks, vectorize=True)) == [[1, 3]]
+
+
+class TestVectorizedChecks:
+    """Tests that the NumPy path matches the scalar path exactly."""
+
+    @staticmethod
+    def _bricks():
+        bricks = []
+        for i in range(80):
+            layer, slot = divmod(i, 20)
+            x = slot * 8.0 + (3.3 if i % 7 == 0 else 0)
+            y = (slot % 4) * 16.0 - (0.5 if i % 11 == 0 else 0)
+            z = layer * 9.6 + (2 if i % 13 == 0 else 0)
+            brick = ["2x4", "1x2", "2x6", "3x3"][i % 4]
+            bricks.append(BrickPlacement(step=i + 1, brick=brick, color="red", position={"x": x, "y": y, "z": z}))
+        return bricks
+
+    def test_grid_alignment_matches_scalar(self):
+        """Test that issue strings and penalties are identical on both paths."""
+        pytest.importorskip("numpy")
+        bricks = self._bricks()
+        scalar = _check_grid_alignment(BrickGrid.from_bricks(bricks, vectorize=False))
+        vectorized = _check_grid_alignment(BrickGrid.from_bricks(bricks, vectorize=True))
+        assert scalar[0]
+        assert vectorized == scalar
+
+    def test_stability_matches_scalar(self):
+        """Test that layer bounds and center of mass agree on both paths."""
+        pytest.importorskip("numpy")
+        bricks = self._bricks()
+        scalar_grid = BrickGrid.from_bricks(bricks, vectorize=False)
+        vector_grid = BrickGrid.from_bricks(bricks, vectorize=True)
+        assert vector_grid.brick_layers == scalar_grid.brick_layers
+        assert vector_grid.layer_bounds == scalar_grid.layer_bounds
+        assert _check_structural_stability(vector_grid) == _check_structural_stability(scalar_grid)
+
+    def test_connectivity_matches_scalar(self):
+        """Test that the stud join finds the same contacts and islands as the cell index."""
+        pytest.importorskip("numpy")
+        bricks = self._bricks()
+        scalar_grid = BrickGrid.from_bricks(bricks, vectorize=False)
+        vector_grid = BrickGrid.from_bricks(bricks, vectorize=True)
+        assert stud_contacts(vector_grid) is not None
+        assert sorted(brick_contacts(vector_grid)) == sorted(brick_contacts(scalar_grid))
+        assert find_floating_components(vector_grid) == find_floating_components(scalar_grid)
+        assert _check_connectivity(vector_grid) == _check_connectivity(scalar_grid)
+
+    def test_load_paths_match_scalar(self):
+        """Test that the vectorized sweep gives the same loads as sweep_layer."""
+        pytest.importorskip("numpy")
+        # A cantilever on top, so some loads tip
+        bricks = self._bricks() + [
+            BrickPlacement(step=81 + i, brick="2x4", color="red", position={"x": 8.0 * (i + 1), "y": 0, "z": 38.4 + 9.6 * i})
+            for i in range(2)
+        ]
+        scalar_grid = BrickGrid.from_bricks(bricks, vectorize=False)
+        vector_grid = BrickGrid.from_bricks(bricks, vectorize=True)
+        scalar = analyze_load_paths(
+            range(len(bricks)), scalar_grid.brick_layers, scalar_grid.brick_footprints,
+            build_cell_index(scalar_grid), ground_layer=0,
+        )
+        assert analyze_grid_loads(vector_grid, 0) == scalar
+        flagged = {
+            brick: load for brick, load in scalar.items()
+            if load.support is not None and (load.tips or load.supported_studs < load.studs)
+        }
+        assert flagged
+        assert analyze_grid_loads(vector_grid, 0, flagged_only=True) == flagged
+
+
+class TestIncrementalValidator:
+    """Tests that incremental validation matches a full validation."""
+
+    @staticmethod
+    def _tower():
+        sequence = []
+        for layer in range(4):
+            for slot in range(3):
+                x = slot * 16.0 + (8.0 if layer % 2 else 0.0)
+                sequence.append({"brick": "2x4", "color": "red", "position": {"x": x, "y": 0, "z": layer * 9.6}})
+        for step, item in enumerate(sequence, start=1):
+            item["step"] = step
+        return sequence
+
+    @staticmethod
+    def _assert_matches_full(validator, sequence):
+        expected = validate_buildability({"build_sequence": sequence}).to_dict()
+        assert validator.result().to_dict() == expected
+        assert validator.score == expected["score"]
+
+    def test_from_sequence_matches_full(self):
+        """Test that a freshly indexed model matches validate_buildability."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        self._assert_matches_full(validator, sequence)
+
+    def test_apply_sequence_add_and_remove(self):
+        """Test adding a floating brick, then removing a supporting one."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+
+        sequence.append({"step": 13, "brick": "2x2", "color": "blue", "position": {"x": 200, "y": 200, "z": 9.6}})
+        result = validator.apply_sequence(sequence)
+        assert any("Floating brick" in issue for issue in result.issues)
+        self._assert_matches_full(validator, sequence)
+
+        del sequence[3:6]
+        validator.apply_sequence(sequence)
+        self._assert_matches_full(validator, sequence)
+
+    def test_apply_sequence_middle_insert(self):
+        """Test that inserting early in the sequence rechecks assembly order."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+
+        sequence.insert(1, {"step": 2, "brick": "1x2", "color": "red", "position": {"x": 0, "y": 16, "z": 4 * 9.6}})
+        validator.apply_sequence(sequence)
+        self._assert_matches_full(validator, sequence)
+
+    def test_add_and_remove_brick(self):
+        """Test the single-brick delta API."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        score = validator.score
+
+        brick = BrickPlacement(step=13, brick="2x4", color="red", position={"x": 0, "y": 0, "z": 6 * 9.6})
+        brick_id = validator.add_brick(brick)
+        assert validator.score < score
+
+        validator.remove_brick(brick_id)
+        assert validator.score == score
+        self._assert_matches_full(validator, sequence)
+
+    def test_top_edit_redoes_only_affected_layers(self):
+        """Test that adding a brick on top re-sweeps loads down from it and seams from it up."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        validator.result()
+
+        brick = BrickPlacement(step=13, brick="2x4", color="red", position={"x": 0, "y": 0, "z": 4 * 9.6})
+        validator.add_brick(brick)
+        with patch.object(incremental, "sweep_layer", wraps=incremental.sweep_layer) as sweep, \
+                patch.object(incremental, "_extend_seam_runs", wraps=incremental._extend_seam_runs) as seams:
+            validator.score
+
+        assert [call.args[0] for call in sweep.call_args_list] == [4, 3, 2, 1, 0]
+        assert [call.args[1] for call in seams.call_args_list] == [4]
+
+        validator.remove_brick(validator._order[0])
+        with patch.object(incremental, "sweep_layer", wraps=incremental.sweep_layer) as sweep:
+            validator.score
+        assert [call.args[0] for call in sweep.call_args_list] == [1, 0]
+        self._assert_matches_full(validator, sequence[1:] + [brick.to_dict()])
+
+    def test_apply_sequence_parses_only_changed_entries(self):
+        """Test that only the entries between the common start and end are parsed."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+
+        sequence = [dict(item) for item in sequence]
+        sequence.insert(6, {"step": 13, "brick": "2x2", "color": "blue", "position": {"x": 0, "y": 0, "z": 4 * 9.6}})
+        with patch.object(incremental, "_parse_build_sequence", wraps=incremental._parse_build_sequence) as parse:
+            validator.apply_sequence(sequence)
+        assert [(len(call.args[0]), call.args[1]) for call in parse.call_args_list] == [(1, 6)]
+        self._assert_matches_full(validator, sequence)
+
+    def test_shifted_entries_keep_their_index(self):
+        """Test that entries without a step and invalid entries follow an insert."""
+        sequence = self._tower()
+        for item in sequence[6:]:
+            del item["step"]
+        sequence.insert(8, {"brick": "2x4", "color": "red", "position": {"x": 0}})
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        self._assert_matches_full(validator, sequence)
+
+        sequence = [{"step": 0, "brick": "2x2", "color": "red", "position": {"x": 64, "y": 0, "z": 0}}] + sequence
+        result = validator.apply_sequence(sequence)
+        assert "Invalid brick data at index 9" in result.issues[0]
+        self._assert_matches_full(validator, sequence)
+
+    def test_removal_splits_component_locally(self):
+        """Test that removing a bridging brick splits its component without a rebuild."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        validator.result()
+
+        # Layer 1 holds layers 2 and 3 up
+        del sequence[3:6]
+        with patch.object(validator, "_add_component", wraps=validator._add_component) as rebuild:
+            result = validator.apply_sequence(sequence)
+        rebuild.assert_not_called()
+        assert any("group of 6 bricks" in issue for issue in result.issues)
+        self._assert_matches_full(validator, sequence)
+
+    def test_result_does_not_share_build_sequence(self):
+        """Test that mutating a result leaves the validator's sequence intact."""
+        sequence = self._tower()
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        validator.result().build_sequence.xs[0] = 500.0
+        self._assert_matches_full(validator, sequence)
+
+    def test_random_edits_match_full(self):
+        """Test random inserts, deletes, swaps and direct brick edits against full validation."""
+        rng = random.Random(7)
+
+        def random_entry():
+            return {
+                "step": rng.randrange(1, 100),
+                "brick": rng.choice(["2x4", "2x2", "1x4", "3x3"]),
+                "color": "red",
+                "position": {"x": rng.randrange(6) * 8, "y": rng.randrange(4) * 8, "z": round(rng.randrange(5) * 9.6, 1)},
+            }
+
+        for _ in range(30):
+            sequence = [random_entry() for _ in range(20)]
+            validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+            for _ in range(10):
+                sequence = list(sequence)
+                edit = rng.randrange(4)
+                if edit == 0 and sequence:
+                    del sequence[rng.randrange(len(sequence))]
+                elif edit == 1:
+                    sequence.insert(rng.randrange(len(sequence) + 1), random_entry())
+                elif edit == 2 and sequence:
+                    i, j = rng.randrange(len(sequence)), rng.randrange(len(sequence))
+                    sequence[i], sequence[j] = sequence[j], sequence[i]
+                elif validator._order:
+                    validator.remove_brick(rng.choice(validator._order))
+                validator.apply_sequence(sequence)
+                self._assert_matches_full(validator, sequence)
+
+    def test_empty_sequence(self):
+        """Test that an empty model reports missing data like the full validator."""
+        validator = IncrementalBuildabilityValidator.from_sequence([])
+        assert validator.result().issues == ["No build_sequence data provided"]
+        assert validator.score == 0
+
+
+class TestBuildSequence:
+    """Tests for the columnar BuildSequence container."""
+
+    RAW = [
+        {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 8, "z": 0}},
+        {"step": 2, "brick": "2x2", "color": "blue", "position": {"x": 16.5, "y": 0.0, "z": 9.6}},
+        {"step": 3, "brick": "2x4", "color": "red", "position": {"x": 8, "y": 0, "z": 9.6}},
+    ]
+
+    def _sequence(self):
+        sequence = BuildSequence()
+        for item in self.RAW:
+            sequence.append(item["step"], item["brick"], item["color"], item["position"])
+        return sequence
+
+    def test_to_dicts_round_trips(self):
+        """Test that bulk conversion returns the original entries, int/float preserved."""
+        dicts = self._sequence().to_dicts()
+        assert dicts == self.RAW
+        assert isinstance(dicts[0]["position"]["x"], int)
+        assert isinstance(dicts[1]["position"]["x"], float)
+
+    def test_views(self):
+        """Test that indexing and iteration return BrickPlacement views."""
+        sequence = self._sequence()
+        assert len(sequence) == 3
+        assert sequence[-1] == BrickPlacement(step=3, brick="2x4", color="red", position={"x": 8, "y": 0, "z": 9.6})
+        assert [brick.to_dict() for brick in sequence] == self.RAW
+        assert sequence.brick_types == ["2x4", "2x2"]
+        with pytest.raises(IndexError):
+            sequence[3]
+
+    def test_invalid_entry_leaves_columns_aligned(self):
+        """Test that a rejected entry does not leave partial columns behind."""
+        sequence = self._sequence()
+        with pytest.raises(KeyError):
+            sequence.append(4, "2x4", "red", {"x": 0, "y": 0})
+        with pytest.raises(ValueError):
+            sequence.append(4, "2x4", "red", {"x": "left", "y": 0, "z": 0})
+        assert len(sequence) == 3
+        assert sequence.to_dicts() == self.RAW
+
+    def test_unstorable_entry_is_reported(self):
+        """Test that a step too large for its column is reported, not raised."""
+        raw = self.RAW + [{"step": 2 ** 70, "brick": "2x2", "color": "red", "position": {"x": 0, "y": 0, "z": 0}}]
+        sequence, issues, penalty = _parse_build_sequence(raw)
+        assert sequence.to_dicts() == self.RAW
+        assert len(issues) == 1
+        assert issues[0].startswith("Invalid brick data at index 3:")
+        assert penalty == 5
+
+    def test_result_stores_sequence(self):
+        """Test that results keep their bricks in a BuildSequence."""
+        result = validate_buildability({"build_sequence": self.RAW})
+        assert isinstance(result.build_sequence, BuildSequence)
+        assert result.to_dict()["build_sequence"] == self.RAW
+
+    def test_grid_from_sequence_matches_list(self):
+        """Test that indexing columns directly matches indexing placements."""
+        sequence = self._sequence()
+        for vectorize in (False, True):
+            if vectorize:
+                pytest.importorskip("numpy")
+            from_columns = BrickGrid.from_bricks(sequence, vectorize=vectorize)
+            from_list = BrickGrid.from_bricks(list(sequence), vectorize=vectorize)
+            assert from_columns.layer_edges == from_list.layer_edges
+            assert from_columns.layer_bounds == from_list.layer_bounds
+            assert from_columns.brick_footprints == from_list.brick_footprints
+
+
 class TestResultSerialization:
     """Tests for result serialization."""
 
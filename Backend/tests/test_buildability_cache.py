@@ -0,0 +1,106 @@
+"""Unit tests for the buildability result cache."""
+
+from unittest.mock import patch
+
+from validation import buildability
+from validation.cache import BuildabilityCache, canonical_sequence_key, validate_buildability_cached
+from validation.buildability import validate_buildability
+
+SEQUENCE = [
+    {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+    {"step": 2, "brick": "2x4", "color": "blue", "position": {"x": 8, "y": 0, "z": 9.6}},
+]
+
+
+class TestCanonicalKey:
+    """Tests for canonical_sequence_key."""
+
+    def test_key_ignores_dict_order(self):
+        """Test that key order inside entries does not change the key."""
+        reordered = [
+            {"position": {"z": 0, "y": 0, "x": 0}, "color": "red", "brick": "2x4", "step": 1},
+            {"position": {"z": 9.6, "y": 0, "x": 8}, "color": "blue", "brick": "2x4", "step": 2},
+        ]
+        assert canonical_sequence_key(reordered) == canonical_sequence_key(SEQUENCE)
+
+    def test_key_depends_on_build_order(self):
+        """Test that reordering bricks changes the key (order affects the result)."""
+        assert canonical_sequence_key(SEQUENCE[::-1]) != canonical_sequence_key(SEQUENCE)
+
+    def test_key_depends_on_thresholds(self):
+        """Test that overriding a threshold changes the key."""
+        key = canonical_sequence_key(SEQUENCE)
+        with patch.object(buildability, "COM_OFFSET_THRESHOLD", 0.1):
+            assert canonical_sequence_key(SEQUENCE) != key
+
+    def test_key_depends_on_overhang_ratio(self):
+        """Test that the load-path overhang threshold is part of the key."""
+        key = canonical_sequence_key(SEQUENCE)
+        with patch.object(buildability, "OVERHANG_SUPPORT_RATIO", 0.9):
+            assert canonical_sequence_key(SEQUENCE) != key
+
+
+class TestBuildabilityCache:
+    """Tests for BuildabilityCache and validate_buildability_cached."""
+
+    def test_repeat_validation_hits_cache(self):
+        """Test that a repeated sequence is served from the cache with the same result."""
+        cache = BuildabilityCache()
+        first = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+        with patch("validation.cache.validate_buildability") as mock_validate:
+            second = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+            mock_validate.assert_not_called()
+
+        assert second.to_dict() == first.to_dict() == validate_buildability({"build_sequence": SEQUENCE}).to_dict()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_cached_result_is_not_shared(self):
+        """Test that mutating a returned result does not corrupt the cache."""
+        cache = BuildabilityCache()
+        first = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+        first.issues.append("mutated")
+        second = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+        assert "mutated" not in second.issues
+
+    def test_cached_build_sequence_is_not_shared(self):
+        """Test that mutating a returned build sequence leaves the cache intact."""
+        cache = BuildabilityCache()
+        first = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+        first.build_sequence.append(9, "3001", "red", {"x": 0, "y": 0, "z": 96})
+        first.build_sequence.xs[0] = 500.0
+        second = validate_buildability_cached({"build_sequence": SEQUENCE}, cache)
+        assert len(second.build_sequence) == len(SEQUENCE)
+        assert second.build_sequence.to_dicts() == SEQUENCE
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = BuildabilityCache(max_size=2)
+        result = validate_buildability({"build_sequence": SEQUENCE})
+        cache.put("a", result)
+        cache.put("b", result)
+        cache.get("a")
+        cache.put("c", result)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is result
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are treated as misses."""
+        cache = BuildabilityCache(ttl_seconds=10)
+        result = validate_buildability({"build_sequence": SEQUENCE})
+        with patch("validation.cache.time.monotonic", return_value=100.0):
+            cache.put("a", result)
+        with patch("validation.cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") is result
+        with patch("validation.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_empty_sequence_not_cached(self):
+        """Test that missing build_sequence data bypasses the cache."""
+        cache = BuildabilityCache()
+        result = validate_buildability_cached({}, cache)
+        assert result.issues == ["No build_sequence data provided"]
+        assert cache.stats()["misses"] == 0
@@ -0,0 +1,92 @@
+"""Unit tests for the CAD output cache."""
+
+import os
+
+import pytest
+
+from tools.cad_cache import CadOutputCache, cad_cache_key, normalize_script
+
+
+def _write_build(directory, name: str, formats=("step", "stl", "glb", "obj")) -> dict:
+    files = {}
+    for fmt in formats:
+        path = os.path.join(directory, f"{name}.{fmt}")
+        with open(path, "w") as f:
+            f.write(f"{name} {fmt}")
+        files[fmt] = path
+    return files
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CadOutputCache(str(tmp_path / "cache"), max_entries=2)
+
+
+class TestCacheKey:
+    """Tests for script normalization and keys."""
+
+    def test_formatting_and_comments_ignored(self):
+        """Test that comments and whitespace do not change the key."""
+        assert cad_cache_key("result = Box(1, 2, 3)") == cad_cache_key("# box\nresult = Box(1,2,3)  \n")
+
+    def test_code_and_variant_change_key(self):
+        """Test that different scripts or variants get different keys."""
+        assert cad_cache_key("result = Box(1, 2, 3)") != cad_cache_key("result = Box(1, 2, 4)")
+        assert cad_cache_key("result = Box(1, 2, 3)", "red") != cad_cache_key("result = Box(1, 2, 3)", "blue")
+
+    def test_unparsable_script(self):
+        """Test that scripts with syntax errors fall back to text normalization."""
+        assert normalize_script("result = (\r\n  ") == "result = ("
+
+
+class TestCadOutputCache:
+    """Tests for CadOutputCache."""
+
+    def test_round_trip_links_files(self, cache, tmp_path):
+        """Test that a hit materializes every stored format under the new base name."""
+        files = _write_build(tmp_path, "task1_aaaa")
+        cache.put("key", files)
+
+        hit = cache.get("key", str(tmp_path), "task2_bbbb")
+
+        assert hit == {fmt: str(tmp_path / f"task2_bbbb.{fmt}") for fmt in files}
+        for fmt, path in hit.items():
+            with open(path) as f:
+                assert f.read() == f"task1_aaaa {fmt}"
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_missing_formats_skipped(self, cache, tmp_path):
+        """Test that formats that were not exported are not cached."""
+        files = _write_build(tmp_path, "task1", formats=("step", "stl"))
+        cache.put("key", {**files, "obj": None})
+        assert set(cache.get("key", str(tmp_path), "task2")) == {"step", "stl"}
+
+    def test_later_formats_added(self, cache, tmp_path):
+        """Test that formats exported after the first store join the existing entry."""
+        files = _write_build(tmp_path, "task1", formats=("brep", "stl"))
+        cache.put("key", files)
+        cache.put("key", {**files, **_write_build(tmp_path, "task1", formats=("step",))})
+        assert set(cache.get("key", str(tmp_path), "task2")) == {"brep", "step", "stl"}
+
+    def test_miss(self, cache, tmp_path):
+        """Test that unknown keys miss."""
+        assert cache.get("unknown", str(tmp_path), "task") is None
+        assert cache.misses == 1
+
+    def test_least_recently_used_evicted(self, cache, tmp_path):
+        """Test that the cache keeps at most max_entries builds, dropping the oldest."""
+        for index, key in enumerate(("a", "b")):
+            cache.put(key, _write_build(tmp_path, f"build{index}"))
+            os.utime(os.path.join(cache.cache_dir, key), (index, index))
+        cache.put("c", _write_build(tmp_path, "build2"))
+
+        assert cache.get("a", str(tmp_path), "out_a") is None
+        assert cache.get("b", str(tmp_path), "out_b") is not None
+        assert cache.get("c", str(tmp_path), "out_c") is not None
+
+    def test_disabled(self, tmp_path):
+        """Test that max_entries=0 disables the cache."""
+        cache = CadOutputCache(str(tmp_path / "cache"), max_entries=0)
+        cache.put("key", _write_build(tmp_path, "task1"))
+        assert cache.get("key", str(tmp_path), "task2") is None
+        assert not os.path.exists(cache.cache_dir)
@@ -0,0 +1,179 @@
+"""Unit tests for mesh exports from a single tessellation."""
+
+import numpy as np
+import pytest
+import trimesh
+from build123d import Box, Compound, Location, Part
+
+from tools.cad_mesh import (
+    BRICK_COLOR_MAP,
+    brick_face_colors,
+    brick_instances,
+    brick_template,
+    instanced_brick_mesh,
+    instanced_brick_scene,
+    shape_matches_bricks,
+    tessellate,
+    write_brick_exports,
+    write_mesh_exports,
+)
+from validation.buildability import LEGO_BRICK_HEIGHT
+
+DEFAULT = [30, 144, 255, 255]
+
+
+def _brick(x: float, y: float, z: float, width: int, length: int) -> Part:
+    """A plain box with the footprint of a brick placed with its corner at (x, y, z)."""
+    return Box(width * 8, length * 8, LEGO_BRICK_HEIGHT).move(
+        Location((x + width * 4, y + length * 4, z + LEGO_BRICK_HEIGHT / 2))
+    )
+
+
+@pytest.fixture
+def two_bricks():
+    shape = _brick(0, 0, 0, 2, 4) + _brick(0, 0, LEGO_BRICK_HEIGHT, 2, 2)
+    sequence = [
+        {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+        {"step": 2, "brick": "2x2", "color": "White", "position": {"x": 0, "y": 0, "z": LEGO_BRICK_HEIGHT}},
+    ]
+    return shape, sequence
+
+
+class TestBrickFaceColors:
+    """Tests for per-brick face colors."""
+
+    def test_faces_take_their_brick_color(self, two_bricks):
+        """Test that faces are colored by the brick they lie on."""
+        shape, sequence = two_bricks
+        mesh = tessellate(shape)
+
+        colors = brick_face_colors(mesh, sequence, DEFAULT)
+
+        assert colors.shape == (len(mesh.faces), 4)
+        top = mesh.triangles_center[:, 2] > LEGO_BRICK_HEIGHT * 1.5
+        assert (colors[top] == BRICK_COLOR_MAP["white"]).all()
+        assert (colors[mesh.triangles_center[:, 2] < 1e-6] == BRICK_COLOR_MAP["red"]).all()
+
+    def test_unknown_color_uses_default(self, two_bricks):
+        """Test that unknown color names fall back to the model color."""
+        shape, sequence = two_bricks
+        sequence[0]["color"] = "chartreuse"
+
+        colors = brick_face_colors(tessellate(shape), sequence, DEFAULT)
+
+        assert (colors == DEFAULT).all(axis=1).any()
+
+    def test_mismatched_sequence_ignored(self, two_bricks):
+        """Test that a build_sequence placed away from the geometry gives no colors."""
+        shape, sequence = two_bricks
+        for brick in sequence:
+            brick["position"]["x"] += 200
+
+        assert brick_face_colors(tessellate(shape), sequence, DEFAULT) is None
+        assert brick_face_colors(tessellate(shape), None, DEFAULT) is None
+
+
+class TestWriteMeshExports:
+    """Tests for writing every mesh format from one tessellation."""
+
+    def test_formats_written(self, two_bricks, tmp_path):
+        """Test that STL, OBJ and GLB describe the same mesh."""
+        shape, sequence = two_bricks
+        paths = {fmt: str(tmp_path / f"model.{fmt}") for fmt in ("stl", "obj", "glb")}
+
+        files, mesh = write_mesh_exports(shape, paths, DEFAULT, sequence)
+
+        assert files == paths
+        stl = trimesh.load(paths["stl"])
+        # The tessellation handed back is the one written
+        np.testing.assert_allclose(mesh.bounds, stl.bounds)
+        np.testing.assert_allclose(stl.bounds, [[0, 0, 0], [16, 32, 2 * LEGO_BRICK_HEIGHT]], atol=1e-6)
+        obj = trimesh.load(paths["obj"], process=False)
+        assert len(obj.faces) == len(stl.faces)
+        # glTF is Y-up and in meters
+        glb = trimesh.load(paths["glb"], force="mesh")
+        np.testing.assert_allclose(glb.bounds, [[0, 0, -0.032], [0.016, 2 * LEGO_BRICK_HEIGHT / 1000, 0]], atol=1e-6)
+
+    def test_only_requested_formats(self, tmp_path):
+        """Test that formats left out are not written."""
+        files, _ = write_mesh_exports(Box(1, 1, 1), {"stl": str(tmp_path / "model.stl")}, DEFAULT)
+
+        assert files == {"stl": str(tmp_path / "model.stl")}
+        assert [p.name for p in tmp_path.iterdir()] == ["model.stl"]
+
+
+class TestInstancedBricks:
+    """Tests for brick models assembled from templates."""
+
+    SEQUENCE = [
+        {"step": 1, "brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},
+        {"step": 2, "brick": "2x4", "color": "red", "position": {"x": 16, "y": 0, "z": 0}},
+        {"step": 3, "brick": "2x2", "color": "white", "position": {"x": 8, "y": 8, "z": LEGO_BRICK_HEIGHT}},
+    ]
+
+    def test_instances_grouped_by_type(self):
+        """Test that placements are grouped per brick type with their colors."""
+        instances = {group.brick: group for group in brick_instances(self.SEQUENCE, DEFAULT)}
+
+        np.testing.assert_array_equal(instances["2x4"].offsets, [[0, 0, 0], [16, 0, 0]])
+        np.testing.assert_array_equal(instances["2x2"].colors, [BRICK_COLOR_MAP["white"]])
+
+    def test_invalid_sequence_rejected(self):
+        """Test that sequences with unknown bricks or positions cannot be instanced."""
+        assert brick_instances([], DEFAULT) is None
+        assert brick_instances([{"brick": "3x3", "position": {"x": 0, "y": 0, "z": 0}}], DEFAULT) is None
+        assert brick_instances([{"brick": "2x2", "position": {"x": "left"}}], DEFAULT) is None
+
+    def test_mesh_translates_templates(self):
+        """Test that the mesh holds one translated, colored template copy per brick."""
+        instances = brick_instances(self.SEQUENCE, DEFAULT)
+        _, template_2x4 = brick_template("2x4")
+        _, template_2x2 = brick_template("2x2")
+
+        mesh = instanced_brick_mesh(instances)
+
+        assert len(mesh.faces) == 2 * len(template_2x4.faces) + len(template_2x2.faces)
+        np.testing.assert_allclose(mesh.bounds, [[0, 0, 0], [32, 32, 2 * LEGO_BRICK_HEIGHT + 1.8]], atol=1e-6)
+        white = (mesh.visual.face_colors == BRICK_COLOR_MAP["white"]).all(axis=1)
+        assert np.count_nonzero(white) == len(template_2x2.faces)
+
+    @staticmethod
+    def _solids(sequence):
+        """Each brick of a sequence as a placed copy of its template shape."""
+        return [
+            brick_template(entry["brick"])[0].moved(Location(tuple(entry["position"][axis] for axis in "xyz")))
+            for entry in sequence
+        ]
+
+    def test_shape_matches_bricks(self):
+        """Test that only shapes with one solid per brick, placed as in the sequence, match."""
+        instances = brick_instances(self.SEQUENCE, DEFAULT)
+        solids = self._solids(self.SEQUENCE)
+
+        assert shape_matches_bricks(Compound(solids), instances)
+        assert shape_matches_bricks(Compound(solids[::-1]), instances)
+        # Fused bricks lose their covered studs, so the templates are not their mesh
+        assert not shape_matches_bricks(solids[0].fuse(*solids[1:]), instances)
+        assert not shape_matches_bricks(_brick(0, 0, 0, 4, 4), instances)
+        assert not shape_matches_bricks(Compound(solids + [Box(2, 2, 2).move(Location((4, 4, 4)))]), instances)
+
+    def test_moved_brick_does_not_match(self):
+        """Test that a brick placed elsewhere fails even with the same bounding box and volume."""
+        instances = brick_instances(self.SEQUENCE, DEFAULT)
+        moved = [dict(entry, position=dict(entry["position"])) for entry in self.SEQUENCE]
+        moved[2]["position"]["x"] = 16
+
+        assert not shape_matches_bricks(Compound(self._solids(moved)), instances)
+
+    def test_scene_shares_geometry(self, tmp_path):
+        """Test that the glTF scene stores each brick type and color once."""
+        instances = brick_instances(self.SEQUENCE, DEFAULT)
+
+        scene = instanced_brick_scene(instances)
+        files, mesh = write_brick_exports(instances, {"glb": str(tmp_path / "model.glb")})
+
+        assert mesh is None
+        assert len(scene.geometry) == 2
+        assert len(scene.graph.nodes_geometry) == 3
+        glb = trimesh.load(files["glb"], force="mesh")
+        np.testing.assert_allclose(glb.bounds[1, 1], (2 * LEGO_BRICK_HEIGHT + 1.8) / 1000, atol=1e-6)
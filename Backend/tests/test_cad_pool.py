@@ -0,0 +1,182 @@
+"""Unit tests for the persistent CAD worker pool."""
+
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from tools.cad_pool import CadWorkerError, CadWorkerPool
+
+_warm_value = None
+
+
+def _warm_up() -> None:
+    global _warm_value
+    _warm_value = "warm"
+
+
+def _worker_state() -> tuple:
+    return os.getpid(), _warm_value
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _fail() -> None:
+    raise ValueError("bad script")
+
+
+def _crash() -> None:
+    os._exit(3)
+
+
+def _spin() -> None:
+    while True:
+        pass
+
+
+def _allocate(megabytes: int) -> int:
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+@pytest.fixture
+def pool():
+    pool = CadWorkerPool(processes=1, max_jobs_per_worker=3, max_rss_mb=0, initializer=_warm_up)
+    yield pool
+    pool.shutdown()
+
+
+class TestCadWorkerPool:
+    """Tests for CadWorkerPool."""
+
+    def test_workers_are_reused_and_initialized_once(self, pool):
+        """Test that jobs run on the same warm worker."""
+        first = pool.run(_worker_state)
+        second = pool.run(_worker_state)
+        assert first == second
+        assert first[0] != os.getpid()
+        assert first[1] == "warm"
+
+    def test_worker_recycled_after_max_jobs(self, pool):
+        """Test that a worker is replaced after serving max_jobs_per_worker jobs."""
+        pids = [pool.run(_worker_state)[0] for _ in range(4)]
+        assert len(set(pids[:3])) == 1
+        assert pids[3] != pids[0]
+
+    def test_worker_recycled_over_rss_limit(self):
+        """Test that a worker over the memory limit is replaced."""
+        pool = CadWorkerPool(processes=1, max_rss_mb=1)
+        try:
+            first = pool.run(_worker_state)[0]
+            assert pool.run(_worker_state)[0] != first
+        finally:
+            pool.shutdown()
+
+    def test_timeout_replaces_worker(self, pool):
+        """Test that a job past its timeout is killed and the pool keeps working."""
+        first = pool.run(_worker_state)[0]
+        with pytest.raises(multiprocessing.TimeoutError):
+            pool.run(_sleep, (10,), timeout=0.2)
+        pid, warm = pool.run(_worker_state)
+        assert pid != first
+        assert warm == "warm"
+
+    def test_job_error_keeps_worker(self, pool):
+        """Test that an exception in a job is reported without losing the worker."""
+        first = pool.run(_worker_state)[0]
+        with pytest.raises(CadWorkerError, match="ValueError: bad script"):
+            pool.run(_fail)
+        assert pool.run(_worker_state)[0] == first
+
+    def test_crash_replaces_worker(self, pool):
+        """Test that a worker dying mid-job is reported and replaced."""
+        with pytest.raises(CadWorkerError, match="died"):
+            pool.run(_crash)
+        assert pool.run(_sleep, (0,)) == 0
+
+    def test_shutdown_stops_workers(self):
+        """Test that shutdown stops the workers and rejects new jobs."""
+        pool = CadWorkerPool(processes=2)
+        pool.start()
+        processes = [worker.process for worker in pool._workers]
+        pool.shutdown()
+        assert not any(process.is_alive() for process in processes)
+        with pytest.raises(RuntimeError):
+            pool.run(_worker_state)
+
+    def test_run_async_does_not_block_loop(self):
+        """Test that async jobs run concurrently while the event loop keeps ticking."""
+        pool = CadWorkerPool(processes=2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async def main():
+            tick_task = asyncio.create_task(ticker())
+            results = await asyncio.gather(pool.run_async(_sleep, (0.3,)), pool.run_async(_sleep, (0.3,)))
+            tick_task.cancel()
+            return results
+
+        try:
+            pool.start()
+            start = time.monotonic()
+            assert asyncio.run(main()) == [0.3, 0.3]
+            assert time.monotonic() - start < 0.55
+            assert ticks >= 10
+        finally:
+            pool.shutdown()
+
+
+class TestWorkerLimits:
+    """Tests for the setrlimit sandbox of pool workers."""
+
+    def test_cpu_budget_aborts_job(self):
+        """Test that a job over its CPU budget is aborted and its worker replaced."""
+        pool = CadWorkerPool(processes=1, max_rss_mb=0, max_cpu_seconds=1)
+        try:
+            first = pool.run(_worker_state)[0]
+            start = time.monotonic()
+            with pytest.raises(CadWorkerError, match="CPU time limit of 1s exceeded"):
+                pool.run(_spin, timeout=30)
+            assert time.monotonic() - start < 5
+            assert pool.run(_worker_state)[0] != first
+        finally:
+            pool.shutdown()
+
+    def test_cpu_budget_is_per_job(self):
+        """Test that CPU time used by earlier jobs does not count against later ones."""
+        pool = CadWorkerPool(processes=1, max_rss_mb=0, max_cpu_seconds=1)
+        try:
+            first = pool.run(_worker_state)[0]
+            for _ in range(3):
+                pool.run(_allocate, (200,))
+            assert pool.run(_worker_state)[0] == first
+        finally:
+            pool.shutdown()
+
+    def test_memory_cap_fails_job(self):
+        """Test that allocations past the address-space cap fail and the worker is replaced."""
+        pool = CadWorkerPool(processes=1, max_rss_mb=0, max_memory_mb=256)
+        try:
+            first = pool.run(_worker_state)[0]
+            assert pool.run(_allocate, (64,)) == 64 * 1024 * 1024
+            with pytest.raises(CadWorkerError, match="Memory limit of 256 MB exceeded"):
+                pool.run(_allocate, (1024,))
+            assert pool.run(_worker_state)[0] != first
+        finally:
+            pool.shutdown()
+
+    def test_cpu_budget_capped_by_timeout(self):
+        """Test that a job's CPU budget never exceeds its wall-clock timeout."""
+        assert CadWorkerPool(max_cpu_seconds=0)._cpu_budget(None) is None
+        assert CadWorkerPool(max_cpu_seconds=0)._cpu_budget(90) == 90
+        assert CadWorkerPool(max_cpu_seconds=60)._cpu_budget(90) == 60
+        assert CadWorkerPool(max_cpu_seconds=60)._cpu_budget(None) == 60
@@ -0,0 +1,69 @@
+"""Unit tests for CAD job profiling."""
+
+import json
+import signal
+
+from tools.cad_profile import CadProfiler, profile_step
+from tools.cad_tools import _compile_script, _execute_and_export
+
+BUSY_SCRIPT = "total = 0\nfor i in range(3000000):\n    total += i * i\n"
+
+
+class TestCadProfiler:
+    """Tests for CadProfiler."""
+
+    def test_steps_recorded(self):
+        """Test that steps are timed and repeated steps added up."""
+        with CadProfiler() as profiler:
+            for _ in range(2):
+                with profile_step("exec"):
+                    sum(range(100000))
+            with profile_step("stl"):
+                pass
+
+        steps = profiler.report()["steps"]
+        assert list(steps) == ["exec", "stl"]
+        assert steps["exec"]["seconds"] > 0
+        assert steps["exec"]["peak_rss_mb"] > 0
+
+    def test_step_without_profiler(self):
+        """Test that profile_step does nothing when no profiler is active."""
+        with profile_step("exec"):
+            pass
+
+    def test_script_lines_sampled(self):
+        """Test that CPU time is charged to the script lines that used it."""
+        code = _compile_script(BUSY_SCRIPT)
+
+        with CadProfiler(interval=0.001) as profiler:
+            exec(code, {}, None)
+
+        report = profiler.report()
+        assert report["samples"] > 10
+        lines = {entry["code"] for entry in report["hot_script_lines"]}
+        assert lines & {"for i in range(3000000):", "total += i * i"}
+        assert signal.getsignal(signal.SIGPROF) == signal.SIG_DFL
+        assert signal.getitimer(signal.ITIMER_PROF) == (0.0, 0.0)
+
+
+class TestProfiledExecution:
+    """Tests for _execute_and_export with profiling on."""
+
+    def test_profile_in_result(self, tmp_path):
+        """Test that a profiled build reports each step and the operations it ran."""
+        script = "result = Box(10, 10, 10)\nfor i in range(20):\n    result += Cylinder(1, 12).move(Location((i - 10, 0, 0)))\n"
+
+        result = _execute_and_export(script, str(tmp_path), "model", "", ("step", "stl", "obj"), profile=True)
+
+        assert result["success"], result.get("error")
+        profile = result["profile"]
+        assert {"validate", "exec", "brep", "step", "tessellate", "stl", "colors", "obj"} <= set(profile["steps"])
+        assert any(entry["operation"].startswith("build123d") for entry in profile["hot_operations"])
+        json.dumps(profile)
+
+    def test_no_profile_by_default(self, tmp_path):
+        """Test that builds are not profiled unless asked to."""
+        result = _execute_and_export("result = Box(1, 1, 1)", str(tmp_path), "model", "", ("stl",))
+
+        assert result["success"]
+        assert "profile" not in result
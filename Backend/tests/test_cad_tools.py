@@ -1,48 +1,376 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import os
-from tools.cad_tools import create_cad_model, render_cad_model, _execute_and_export, _render_worker
+import tempfile
+import threading
+import trimesh
+from tools import cad_tools
+from tools.cad_cache import CadOutputCache
+from tools.render_cache import RenderCache
+from tools.cad_tools import (
+    create_cad_model,
+    create_cad_model_async,
+    ensure_cad_exports,
+    export_formats_var,
+    model_size_var,
+    render_cad_model,
+    take_cad_mesh,
+    _compile_script,
+    _execute_and_export,
+)
 
 class TestCadTools(unittest.TestCase):
 
-    @patch('tools.cad_tools.multiprocessing.Pool')
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = CadOutputCache(os.path.join(self.temp_dir.name, "cache"))
+        cache_patcher = patch('tools.cad_tools.get_cad_cache', return_value=self.cache)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.render_cache = RenderCache(os.path.join(self.temp_dir.name, "render_cache"))
+        render_cache_patcher = patch('tools.cad_tools.get_render_cache', return_value=self.render_cache)
+        render_cache_patcher.start()
+        self.addCleanup(render_cache_patcher.stop)
+        backend_patcher = patch('tools.renderer._worker_backend', None)
+        backend_patcher.start()
+        self.addCleanup(backend_patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    @patch('tools.cad_tools.get_cad_pool')
     @patch('tools.cad_tools.task_id_var')
     @patch('tools.cad_tools.uuid')
-    def test_create_cad_model_success(self, mock_uuid, mock_task_id_var, mock_pool):
+    def test_create_cad_model_success(self, mock_uuid, mock_task_id_var, mock_get_pool):
         """Test successful CAD model creation."""
         mock_task_id_var.get.return_value = "task_123"
         mock_uuid.uuid4.return_value.hex = "abcdef12"
         
-        mock_pool_instance = mock_pool.return_value.__enter__.return_value
-        mock_async_result = MagicMock()
-        mock_async_result.get.return_value = {"success": True, "files": {"stl": "path/to/stl"}}
-        mock_pool_instance.apply_async.return_value = mock_async_result
+        mock_pool_instance = mock_get_pool.return_value
+        mock_pool_instance.run.return_value = {"success": True, "files": {"stl": "path/to/stl"}}
 
         result = create_cad_model("print('hello')")
         
         self.assertTrue(result["success"])
         self.assertEqual(result["files"]["stl"], "path/to/stl")
-        mock_pool_instance.apply_async.assert_called()
+        mock_pool_instance.run.assert_called()
+        self.assertEqual(mock_pool_instance.run.call_args.args[1][2], "task_123_abcdef12")
 
-    @patch('tools.cad_tools.multiprocessing.Pool')
-    def test_create_cad_model_timeout(self, mock_pool):
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_timeout(self, mock_get_pool):
         """Test CAD model creation timeout."""
         import multiprocessing
-        mock_pool_instance = mock_pool.return_value.__enter__.return_value
-        mock_async_result = MagicMock()
-        mock_async_result.get.side_effect = multiprocessing.TimeoutError
-        mock_pool_instance.apply_async.return_value = mock_async_result
+        mock_get_pool.return_value.run.side_effect = multiprocessing.TimeoutError
 
         result = create_cad_model("print('hello')")
         
         self.assertFalse(result["success"])
         self.assertIn("timed out", result["error"])
 
+    @patch('tools.cad_tools.CAD_TIMEOUT_SECONDS', 400)
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_timeout_per_model_size(self, mock_get_pool):
+        """Test that the wall-clock limit follows the model size, capped by the setting."""
+        import multiprocessing
+        mock_run = mock_get_pool.return_value.run
+        mock_run.side_effect = multiprocessing.TimeoutError
+
+        for size, expected in (("tiny", 90), ("epic", 400), (None, 400), ("huge", 400)):
+            token = model_size_var.set(size)
+            try:
+                result = create_cad_model(f"result = {size!r}")
+            finally:
+                model_size_var.reset(token)
+            self.assertEqual(mock_run.call_args.kwargs["timeout"], expected)
+            self.assertIn(f"({expected}s limit)", result["error"])
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_worker_error(self, mock_get_pool):
+        """Test that a crashed worker is reported as a process error."""
+        from tools.cad_pool import CadWorkerError
+        mock_get_pool.return_value.run.side_effect = CadWorkerError("CAD worker died (exit code -9)")
+
+        result = create_cad_model("print('hello')")
+
+        self.assertFalse(result["success"])
+        self.assertIn("Process error", result["error"])
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_async(self, mock_get_pool):
+        """Test that the async API awaits the pool with the task's file name."""
+        from tools.cad_tools import task_id_var
+        mock_pool_instance = mock_get_pool.return_value
+        mock_pool_instance.run_async = AsyncMock(return_value={"success": True, "files": {"stl": "path/to/stl"}})
+
+        async def run():
+            task_id_var.set("task_456")
+            return await create_cad_model_async("print('hello')")
+
+        result = asyncio.run(run())
+
+        self.assertTrue(result["success"])
+        self.assertTrue(mock_pool_instance.run_async.call_args.args[1][2].startswith("task_456_"))
+        mock_pool_instance.run.assert_not_called()
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_keeps_mesh(self, mock_get_pool):
+        """Test that the worker's mesh arrays are held for rendering, not returned."""
+        mesh = ("vertices", "faces")
+        mock_get_pool.return_value.run_async = AsyncMock(
+            return_value={"success": True, "files": {"stl": "outputs/model.stl"}, "mesh": mesh}
+        )
+
+        result = asyncio.run(create_cad_model_async("result = Box(1, 1, 1)"))
+
+        self.assertNotIn("mesh", result)
+        self.assertIs(take_cad_mesh("./outputs/model.stl"), mesh)
+        # Handed over once
+        self.assertIsNone(take_cad_mesh("outputs/model.stl"))
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_async_timeout(self, mock_get_pool):
+        """Test async CAD model creation timeout."""
+        import multiprocessing
+        mock_get_pool.return_value.run_async = AsyncMock(side_effect=multiprocessing.TimeoutError)
+
+        result = asyncio.run(create_cad_model_async("print('hello')"))
+
+        self.assertFalse(result["success"])
+        self.assertIn("timed out", result["error"])
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_cache_hit(self, mock_get_pool):
+        """Test that a repeated script is served from the cache without running a worker."""
+        output_dir = self.temp_dir.name
+        source_files = {}
+        for fmt in ("step", "stl", "glb", "obj"):
+            source_files[fmt] = os.path.join(output_dir, f"first.{fmt}")
+            with open(source_files[fmt], "w") as f:
+                f.write(fmt)
+        mock_get_pool.return_value.run.return_value = {"success": True, "files": source_files}
+
+        with patch('tools.cad_tools.OUTPUT_DIR', output_dir):
+            first = create_cad_model("result = Box(1, 1, 1)")
+            second = create_cad_model("# same model\nresult = Box(1,  1, 1)\n")
+
+        self.assertEqual(first["files"], source_files)
+        self.assertEqual(mock_get_pool.return_value.run.call_count, 1)
+        self.assertTrue(second["success"])
+        self.assertEqual(set(second["files"]), {"step", "stl", "glb", "obj"})
+        for fmt, path in second["files"].items():
+            self.assertNotEqual(path, source_files[fmt])
+            with open(path) as f:
+                self.assertEqual(f.read(), fmt)
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_async_cache_hit_off_loop(self, mock_get_pool):
+        """Test that the async API serves cache hits with the file copies off the event loop."""
+        output_dir = self.temp_dir.name
+        stl_path = os.path.join(output_dir, "first.stl")
+        with open(stl_path, "w") as f:
+            f.write("stl")
+        mock_get_pool.return_value.run_async = AsyncMock(return_value={"success": True, "files": {"stl": stl_path}})
+        threads = []
+        lookup = cad_tools._cached_cad_model
+
+        def record_lookup(job_args):
+            threads.append(threading.get_ident())
+            return lookup(job_args)
+
+        async def run():
+            loop_thread = threading.get_ident()
+            first = await create_cad_model_async("result = Box(1, 1, 1)")
+            second = await create_cad_model_async("result = Box(1, 1, 1)")
+            return loop_thread, first, second
+
+        with patch('tools.cad_tools.OUTPUT_DIR', output_dir), \
+                patch('tools.cad_tools._cached_cad_model', side_effect=record_lookup), \
+                patch('tools.cad_tools.export_formats_var') as mock_formats:
+            mock_formats.get.return_value = ("stl",)
+            loop_thread, first, second = asyncio.run(run())
+
+        self.assertEqual(mock_get_pool.return_value.run_async.call_count, 1)
+        self.assertTrue(second["success"])
+        self.assertNotEqual(second["files"]["stl"], stl_path)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_failure_not_cached(self, mock_get_pool):
+        """Test that failed builds are run again."""
+        mock_get_pool.return_value.run.return_value = {"success": False, "error": "Execution failed"}
+
+        create_cad_model("result = Box(1, 1, 1)")
+        create_cad_model("result = Box(1, 1, 1)")
+
+        self.assertEqual(mock_get_pool.return_value.run.call_count, 2)
+
+    @patch('tools.cad_tools.get_cad_pool')
+    def test_create_cad_model_cache_adds_formats(self, mock_get_pool):
+        """Test that a cache hit exports formats the cached build deferred."""
+        mock_get_pool.return_value.run.side_effect = lambda func, args, timeout: func(*args)
+        output_dir = self.temp_dir.name
+
+        with patch('tools.cad_tools.OUTPUT_DIR', output_dir):
+            token = export_formats_var.set(("stl",))
+            try:
+                first = create_cad_model("result = Box(10, 10, 10)")
+            finally:
+                export_formats_var.reset(token)
+            second = create_cad_model("result = Box(10, 10, 10)")
+
+        self.assertEqual(set(first["files"]), {"brep", "stl"})
+        self.assertTrue(second["success"])
+        self.assertEqual(set(second["files"]), {"brep", "step", "stl", "glb", "obj"})
+        for path in second["files"].values():
+            self.assertTrue(os.path.exists(path))
+        entry = os.path.join(self.cache.cache_dir, os.listdir(self.cache.cache_dir)[0])
+        self.assertEqual(sorted(os.listdir(entry)), [
+            "model.brep", "model.export.json", "model.glb", "model.obj", "model.step", "model.stl"
+        ])
+
+    def test_execute_and_export_selected_formats(self):
+        """Test that only the requested formats are exported and the rest can follow from the BREP."""
+        output_dir = self.temp_dir.name
+
+        result = _execute_and_export("result = Box(10, 10, 10)", output_dir, "model", "a red car", ("stl",))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(set(result["files"]), {"brep", "stl"})
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "model.step")))
+        # The STL's arrays come back for rendering without reading it again
+        vertices, faces = result["mesh"]
+        self.assertEqual(len(faces), len(trimesh.load(result["files"]["stl"]).faces))
+
+        with patch('tools.cad_tools.get_cad_pool') as mock_get_pool, \
+                patch('tools.cad_tools.write_mesh_exports', wraps=cad_tools.write_mesh_exports) as mock_mesh:
+            mock_get_pool.return_value.run.side_effect = lambda func, args, timeout: func(*args)
+            exported = ensure_cad_exports(output_dir, "model", ("stl", "obj"))
+            again = ensure_cad_exports(output_dir, "model", ("stl", "obj"))
+
+        self.assertTrue(exported["success"])
+        self.assertTrue(os.path.exists(exported["files"]["obj"]))
+        self.assertEqual(mock_get_pool.return_value.run.call_args.args[1], (output_dir, "model", ("obj",)))
+        self.assertEqual(mock_get_pool.return_value.run.call_count, 1)
+        self.assertEqual(again["files"], exported["files"])
+        # The OBJ keeps the color of the original prompt
+        self.assertEqual(mock_mesh.call_args.args[2], cad_tools.PROMPT_COLOR_MAP["car"])
+
+    def test_execute_and_export_script_helpers(self):
+        """Test that functions defined in a script can use the script's top-level names."""
+        script = (
+            "SIZE = 10\n"
+            "def make_box(scale):\n"
+            "    return Box(SIZE * scale, SIZE, SIZE)\n"
+            "result = make_box(2)\n"
+        )
+
+        result = _execute_and_export(script, self.temp_dir.name, "model", "", ("stl",))
+
+        self.assertTrue(result["success"], result.get("error"))
+
+    def test_execute_and_export_error_shows_script_line(self):
+        """Test that a failing script's traceback quotes the failing line."""
+        result = _execute_and_export("size = 10\nresult = Box(size, size, missing)\n", self.temp_dir.name, "model")
+
+        self.assertFalse(result["success"])
+        self.assertIn("result = Box(size, size, missing)", result["error"])
+
+    def test_compile_script_cached(self):
+        """Test that scripts are compiled once per worker and evicted least recently used first."""
+        self.assertIs(_compile_script("result = Box(1, 2, 3)"), _compile_script("result = Box(1, 2, 3)"))
+        self.assertIsNot(_compile_script("result = Box(1, 2, 3)"), _compile_script("result = Box(1, 2, 4)"))
+
+        with patch('tools.cad_tools.SCRIPT_CODE_CACHE_SIZE', 1):
+            first = _compile_script("result = Box(1, 1, 1)")
+            second = _compile_script("result = Box(2, 2, 2)")
+            self.assertNotIn(first.co_filename, cad_tools.linecache.cache)
+            self.assertIn(second.co_filename, cad_tools.linecache.cache)
+            self.assertIsNot(_compile_script("result = Box(1, 1, 1)"), first)
+
+    # Two bricks built as the brick templates are and kept as separate solids
+    BRICK_SCRIPT = (
+        'build_sequence = [{"brick": "2x4", "color": "red", "position": {"x": 0, "y": 0, "z": 0}},\n'
+        '                  {"brick": "2x2", "color": "white", "position": {"x": 0, "y": 0, "z": 9.6}}]\n'
+        'bricks = []\n'
+        'for entry in build_sequence:\n'
+        '    width, length = (2, 4) if entry["brick"] == "2x4" else (2, 2)\n'
+        '    brick = Box(width * 8, length * 8, 9.6, align=(Align.MIN, Align.MIN, Align.MIN))\n'
+        '    for i in range(width):\n'
+        '        for j in range(length):\n'
+        '            brick = brick + Pos((i + 0.5) * 8, (j + 0.5) * 8, 9.6) * Cylinder(\n'
+        '                2.4, 1.8, align=(Align.CENTER, Align.CENTER, Align.MIN))\n'
+        '    position = entry["position"]\n'
+        '    bricks.append(Pos(position["x"], position["y"], position["z"]) * brick)\n'
+        'result = Compound(bricks)\n'
+    )
+
+    def test_execute_and_export_instanced_bricks(self):
+        """Test that models made of exactly their bricks are exported from the brick templates."""
+        output_dir = self.temp_dir.name
+
+        with patch('tools.cad_tools.write_brick_exports', wraps=cad_tools.write_brick_exports) as mock_bricks, \
+                patch('tools.cad_tools.write_mesh_exports') as mock_mesh:
+            result = _execute_and_export(self.BRICK_SCRIPT, output_dir, "model", "", ("stl",))
+
+        self.assertTrue(result["success"], result.get("error"))
+        mock_bricks.assert_called_once()
+        mock_mesh.assert_not_called()
+        self.assertEqual(set(result["files"]), {"brep", "stl"})
+
+        with patch('tools.cad_tools.get_cad_pool') as mock_get_pool, \
+                patch('tools.cad_tools.write_brick_exports', wraps=cad_tools.write_brick_exports) as mock_bricks:
+            mock_get_pool.return_value.run.side_effect = lambda func, args, timeout: func(*args)
+            exported = ensure_cad_exports(output_dir, "model", ("obj", "step"))
+
+        self.assertTrue(exported["success"])
+        mock_bricks.assert_called_once()
+        self.assertTrue(os.path.exists(exported["files"]["step"]))
+
+    def test_execute_and_export_fused_bricks(self):
+        """Test that fused bricks are tessellated, since their mesh is not the templates'."""
+        script = self.BRICK_SCRIPT.replace('Compound(bricks)', 'bricks[0].fuse(*bricks[1:])')
+
+        with patch('tools.cad_tools.write_brick_exports') as mock_bricks:
+            result = _execute_and_export(script, self.temp_dir.name, "model", "", ("stl",))
+
+        self.assertTrue(result["success"], result.get("error"))
+        mock_bricks.assert_not_called()
+        self.assertTrue(os.path.exists(result["files"]["stl"]))
+
+    def test_execute_and_export_bricks_with_extra_geometry(self):
+        """Test that a script building more than its build_sequence is run and exported in full."""
+        script = self.BRICK_SCRIPT + "result = Compound([result, Pos(100, 0, 0) * Box(10, 10, 10)])\n"
+
+        with patch('tools.cad_tools.write_brick_exports') as mock_bricks:
+            result = _execute_and_export(script, self.temp_dir.name, "model", "", ("stl",))
+
+        self.assertTrue(result["success"], result.get("error"))
+        mock_bricks.assert_not_called()
+        # The extra box is in the STL
+        self.assertGreater(trimesh.load(result["files"]["stl"]).bounds[1][0], 100)
+
+    def test_execute_and_export_bricks_script_error(self):
+        """Test that errors in a script with a literal build_sequence are reported."""
+        script = self.BRICK_SCRIPT + "result = missing_helper(result)\n"
+
+        result = _execute_and_export(script, self.temp_dir.name, "model", "", ("stl",))
+
+        self.assertFalse(result["success"])
+        self.assertIn("missing_helper", result["error"])
+
+    def test_ensure_cad_exports_without_build(self):
+        """Test that formats cannot be exported for an unknown build."""
+        result = ensure_cad_exports(self.temp_dir.name, "missing", ("step",))
+
+        self.assertFalse(result["success"])
+        self.assertIn("No CAD build found", result["error"])
+
+    @patch('tools.cad_tools.export_brep')
     @patch('tools.cad_tools.validate_code')
     @patch('tools.cad_tools.export_step')
-    @patch('tools.cad_tools.export_stl')
+    @patch('tools.cad_tools.write_mesh_exports', return_value=({}, None))
     @patch('builtins.exec')
-    def test_execute_and_export_success(self, mock_exec, mock_export_stl, mock_export_step, mock_validate):
+    def test_execute_and_export_success(self, mock_exec, mock_mesh_exports, mock_export_step, mock_validate, mock_export_brep):
         """Test _execute_and_export logic."""
         # We need to mock the local_scope population and result extraction
         # Since exec modifies the dict in place, we can't easily mock the side effect of exec adding 'result' to the dict
@@ -68,28 +396,67 @@ class TestCadTools(unittest.TestCase):
             
         mock_exec.side_effect = exec_side_effect
         
-        result = _execute_and_export("code", "output_dir", "base_name")
+        result = _execute_and_export("code", self.temp_dir.name, "base_name")
         
         self.assertTrue(result["success"])
         mock_validate.assert_called_with("code")
         mock_export_step.assert_called()
-        mock_export_stl.assert_called()
+        self.assertEqual(set(mock_mesh_exports.call_args.args[1]), {"stl", "obj", "glb"})
 
-    @patch('tools.cad_tools.multiprocessing.Pool')
+    @patch('tools.cad_tools.get_render_pool')
     @patch('os.path.exists')
-    def test_render_cad_model_success(self, mock_exists, mock_pool):
+    def test_render_cad_model_success(self, mock_exists, mock_get_render_pool):
         """Test successful rendering."""
         mock_exists.return_value = True
-        
-        mock_pool_instance = mock_pool.return_value.__enter__.return_value
-        mock_async_result = MagicMock()
-        mock_async_result.get.return_value = {"success": True, "images": ["img1.png"]}
-        mock_pool_instance.apply_async.return_value = mock_async_result
+        mock_get_render_pool.return_value.run.return_value = {"success": True, "images": ["img1.png"], "backend": "vtk"}
 
         result = render_cad_model("test.stl")
         
         self.assertTrue(result["success"])
         self.assertEqual(result["images"], ["img1.png"])
+        self.assertEqual(mock_get_render_pool.return_value.run.call_args.args[1][0], "test.stl")
+
+    @patch('tools.cad_tools.get_render_pool')
+    @patch('os.path.exists')
+    def test_render_cad_model_timeout(self, mock_exists, mock_get_render_pool):
+        """Test that a render past its timeout is reported."""
+        import multiprocessing
+        mock_exists.return_value = True
+        mock_get_render_pool.return_value.run.side_effect = multiprocessing.TimeoutError
+
+        result = render_cad_model("test.stl")
+
+        self.assertFalse(result["success"])
+        self.assertIn("timed out", result["error"])
+
+    @patch('tools.cad_tools.get_render_pool')
+    def test_render_cad_model_cached_views(self, mock_get_render_pool):
+        """Test that views rendered before from the same mesh are not rendered again."""
+        first = os.path.join(self.temp_dir.name, "first.stl")
+        second = os.path.join(self.temp_dir.name, "second.stl")
+        for path in (first, second):
+            with open(path, "w") as f:
+                f.write("solid model\nendsolid model\n")
+
+        def render(func, args, timeout):
+            stl_path, output_dir, base_name, views = args
+            images = []
+            for name in views:
+                images.append(os.path.join(output_dir, f"{base_name}_{name}.png"))
+                with open(images[-1], "wb") as f:
+                    f.write(name.encode())
+            return {"success": True, "images": images, "backend": "numpy"}
+
+        mock_get_render_pool.return_value.run.side_effect = render
+        with patch('tools.cad_tools.OUTPUT_DIR', self.temp_dir.name):
+            render_cad_model(first)
+            result = render_cad_model(second)
+
+        self.assertEqual(mock_get_render_pool.return_value.run.call_count, 1)
+        self.assertTrue(result["success"])
+        self.assertEqual(len(result["images"]), 4)
+        with open(os.path.join(self.temp_dir.name, "second_top.png"), "rb") as f:
+            self.assertEqual(f.read(), b"top")
 
     def test_render_cad_model_file_not_found(self):
         """Test rendering when file does not exist."""
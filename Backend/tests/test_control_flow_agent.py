@@ -2,9 +2,13 @@ import unittest
 from unittest.mock import MagicMock, patch, AsyncMock, create_autospec
 from google.adk.sessions import InMemorySessionService
 from google.adk.memory import InMemoryMemoryService
+from google.adk.agents.run_config import StreamingMode
 from google.adk.runners import Event
 from google.genai.types import Content, Part, FunctionResponse
+import json
+import numpy as np
 from sub_agents.control_flow.agent import ControlFlowAgent
+from validation.streaming import StreamingBuildabilityCheck
 
 # Define a subclass of Event that includes 'content' for autospec
 class EventWithContent(Event):
@@ -44,47 +48,47 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
             app_name="forma-ai-service", user_id="user_1", session_id="session_1"
         )
 
-    def test_extract_or_generate_stl_success(self):
+    async def test_extract_or_generate_stl_success(self):
         """Test extraction of STL path from output."""
         output = "Here is the file: outputs/test.stl"
-        stl_path, error = self.agent._extract_or_generate_stl(output)
+        stl_path, error = await self.agent._extract_or_generate_stl(output)
         self.assertEqual(stl_path, "outputs/test.stl")
         self.assertIsNone(error)
 
-    @patch('sub_agents.control_flow.agent.create_cad_model', autospec=True)
-    def test_extract_or_generate_stl_fallback_success(self, mock_create_cad):
+    @patch('sub_agents.control_flow.agent.create_cad_model_async', autospec=True)
+    async def test_extract_or_generate_stl_fallback_success(self, mock_create_cad):
         """Test fallback generation when no STL path is found but code block exists."""
         output = "```python\nprint('hello')\n```"
         mock_create_cad.return_value = {"success": True, "files": {"stl": "outputs/fallback.stl"}}
         
-        stl_path, error = self.agent._extract_or_generate_stl(output)
+        stl_path, error = await self.agent._extract_or_generate_stl(output)
         
         self.assertEqual(stl_path, "outputs/fallback.stl")
         self.assertIsNone(error)
         mock_create_cad.assert_called_with("print('hello')")
 
-    @patch('sub_agents.control_flow.agent.create_cad_model', autospec=True)
-    def test_extract_or_generate_stl_fallback_failure(self, mock_create_cad):
+    @patch('sub_agents.control_flow.agent.create_cad_model_async', autospec=True)
+    async def test_extract_or_generate_stl_fallback_failure(self, mock_create_cad):
         """Test fallback generation failure."""
         output = "```python\nprint('hello')\n```"
         mock_create_cad.return_value = {"success": False, "error": "Syntax Error"}
         
-        stl_path, error = self.agent._extract_or_generate_stl(output)
+        stl_path, error = await self.agent._extract_or_generate_stl(output)
         
         self.assertIsNone(stl_path)
         self.assertEqual(error, "Syntax Error")
 
-    def test_extract_or_generate_stl_no_code(self):
+    async def test_extract_or_generate_stl_no_code(self):
         """Test failure when neither STL path nor code block is found."""
         output = "Just some text."
-        stl_path, error = self.agent._extract_or_generate_stl(output)
+        stl_path, error = await self.agent._extract_or_generate_stl(output)
         self.assertIsNone(stl_path)
         self.assertEqual(error, "No code block or STL file found.")
 
     async def test_execute_loop_iteration_retry_on_failure(self):
         """Test retry logic when code generation fails."""
         # Mock _run_coder_step to yield some output
-        async def mock_run_coder_step_impl(spec, user_id, session_id, result_container):
+        async def mock_run_coder_step_impl(spec, user_id, session_id, result_container, early_check=None):
             yield "Generating code..."
             result_container["output"] = "Some code output"
 
@@ -140,30 +144,39 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
 
     async def test_verify_model_approved(self):
         """Test _verify_model when designer approves."""
-        with patch('sub_agents.control_flow.agent.render_stl', autospec=True) as mock_render, \
+        mesh = (np.zeros((3, 3)), np.array([[0, 1, 2]]))
+        with patch('sub_agents.control_flow.agent.render_png_async', autospec=True) as mock_render, \
+             patch('sub_agents.control_flow.agent.take_cad_mesh', return_value=mesh) as mock_take, \
              patch.object(self.agent, '_get_designer_feedback', autospec=True) as mock_feedback:
             
-            mock_render.return_value = "path/to/image.png"
+            mock_render.return_value = b"png"
             mock_feedback.return_value = "APPROVED: Great job!"
             
-            is_approved, feedback, png_path = await self.agent._verify_model("model.stl", "spec", "user", "session")
+            is_approved, feedback, image_data = await self.agent._verify_model("model.stl", "spec", "user", "session")
             
             self.assertTrue(is_approved)
             self.assertEqual(feedback, "APPROVED: Great job!")
-            self.assertEqual(png_path, "path/to/image.png")
+            self.assertEqual(image_data, b"png")
+            # The CAD worker's arrays are rendered, to bytes only
+            mock_take.assert_called_once_with("model.stl")
+            self.assertIs(mock_render.call_args.args[0], mesh)
+            self.assertEqual(len(mock_render.call_args.args), 2)
+            self.assertEqual(mock_feedback.call_args.args[0], b"png")
 
     async def test_verify_model_rejected(self):
         """Test _verify_model when designer rejects."""
-        with patch('sub_agents.control_flow.agent.render_stl', autospec=True) as mock_render, \
+        with patch('sub_agents.control_flow.agent.render_png_async', autospec=True) as mock_render, \
              patch.object(self.agent, '_get_designer_feedback', autospec=True) as mock_feedback:
             
-            mock_render.return_value = "path/to/image.png"
+            mock_render.return_value = b"png"
             mock_feedback.return_value = "The model is too small."
             
-            is_approved, feedback, png_path = await self.agent._verify_model("model.stl", "spec", "user", "session")
+            is_approved, feedback, _ = await self.agent._verify_model("model.stl", "spec", "user", "session")
             
             self.assertFalse(is_approved)
             self.assertEqual(feedback, "The model is too small.")
+            # Cached builds have no worker arrays; the STL is rendered instead
+            self.assertEqual(mock_render.call_args.args[0], "model.stl")
 
     async def test_execute_loop_iteration_rejection_retry(self):
         """Test loop iteration when model is rejected by designer."""
@@ -172,7 +185,7 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
              patch.object(self.agent, '_verify_model', autospec=True) as mock_verify:
             
             # Mock coder output
-            async def mock_run_coder_impl(spec, user_id, session_id, result_container):
+            async def mock_run_coder_impl(spec, user_id, session_id, result_container, early_check=None):
                 yield "Generating..."
                 result_container["output"] = "Code"
             mock_run_coder.side_effect = mock_run_coder_impl
@@ -181,7 +194,7 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
             mock_extract.return_value = ("model.stl", None)
             
             # Mock verification rejection
-            mock_verify.return_value = (False, "Too small", "image.png")
+            mock_verify.return_value = (False, "Too small", b"png")
             
             iterator = self.agent._execute_loop_iteration("spec", "orig_spec", "user", "session")
             results = []
@@ -189,7 +202,7 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
                 results.append(item)
             
             # Should have image output
-            self.assertIn("Generated Image: image.png\n", results)
+            self.assertIn("Rendered model: model.stl\n", results)
             
             # Should have feedback output
             self.assertIn("Designer Feedback: Too small\n", results)
@@ -223,6 +236,37 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
             # Should only run once
             self.assertEqual(mock_loop.call_count, 1)
 
+    async def test_run_exports_stl_only_while_iterating(self):
+        """Test that loop iterations only export the STL and the approved model gets every format."""
+        from tools.cad_tools import EXPORT_FORMATS, export_formats_var
+        seen_formats = []
+        with patch.object(self.agent, '_ensure_session', autospec=True), \
+             patch.object(self.agent, '_run_designer_step', autospec=True) as mock_designer, \
+             patch.object(self.agent, '_execute_loop_iteration', autospec=True) as mock_loop:
+
+            mock_designer.return_value = "Spec"
+
+            async def mock_loop_impl(current_spec, original_spec, user_id, session_id):
+                seen_formats.append(export_formats_var.get())
+                yield (True, "")
+            mock_loop.side_effect = mock_loop_impl
+
+            async for _ in self.agent.run("prompt", "session"):
+                pass
+
+        self.assertEqual(seen_formats, [("stl",)])
+        self.assertEqual(export_formats_var.get(), EXPORT_FORMATS)
+
+    @patch('sub_agents.control_flow.agent.ensure_cad_exports_async', autospec=True)
+    async def test_export_approved_model(self, mock_ensure):
+        """Test that the approved model's deferred formats are exported next to its STL."""
+        from tools.cad_tools import EXPORT_FORMATS
+        mock_ensure.return_value = {"success": True, "files": {}}
+
+        await self.agent._export_approved_model("outputs/task_abc.stl")
+
+        mock_ensure.assert_called_once_with("outputs", "task_abc", EXPORT_FORMATS)
+
     async def test_run_coder_step_tool_output(self):
         """Test that tool output is included in coder output."""
         # We need to mock the Runner and its run_async method
@@ -259,5 +303,38 @@ class TestControlFlowAgent(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(result_container["output"], "\nTool Output: Tool Result\nFinal Code")
             self.assertIn("Final Code", output_chunks)
 
+    async def test_run_coder_step_stops_on_hopeless_partial_events(self):
+        """Test that streamed partial events feed the early check and stop the run mid-stream."""
+        bricks = [
+            {"step": i + 1, "brick": "2x4", "color": "red", "position": {"x": 3 + 16 * i, "y": 5, "z": 0}}
+            for i in range(10)
+        ]
+        chunks = ["build_sequence = ["] + [json.dumps(brick) + "," for brick in bricks] + ["]"]
+        consumed = []
+
+        with patch('sub_agents.control_flow.agent.Runner', autospec=True) as MockRunner:
+            async def mock_run_async(*args, **kwargs):
+                for chunk in chunks:
+                    consumed.append(chunk)
+                    yield Event(author="coder", partial=True, content=Content(role="model", parts=[Part(text=chunk)]))
+                yield Event(author="coder", content=Content(role="model", parts=[Part(text="".join(chunks))]))
+
+            MockRunner.return_value.run_async.side_effect = mock_run_async
+
+            early_check = StreamingBuildabilityCheck(threshold=70)
+            result_container = {}
+            output_chunks = [
+                chunk async for chunk in self.agent._run_coder_step(
+                    "spec", "user", "session", result_container, early_check=early_check
+                )
+            ]
+
+        run_config = MockRunner.return_value.run_async.call_args.kwargs["run_config"]
+        self.assertEqual(run_config.streaming_mode, StreamingMode.SSE)
+        self.assertTrue(early_check.hopeless)
+        self.assertLess(len(consumed), len(chunks))
+        self.assertEqual(output_chunks, [])
+        self.assertNotIn("session", self.agent._early_checks)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,152 @@
+"""Unit tests for the bounded job scheduler."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tools.job_scheduler import (
+    MODIFICATION_PRIORITY,
+    JobScheduler,
+    QueueFullError,
+    ResourceClass,
+    job_priority_var,
+    task_priority,
+)
+
+
+@pytest.fixture
+def scheduler():
+    return JobScheduler({ResourceClass.CAD: (1, 2), ResourceClass.RENDER: (2, 0)})
+
+
+class TestTaskPriority:
+    """Tests for task priorities."""
+
+    def test_modifications_before_generations(self):
+        """Test that modifications outrank every generation."""
+        assert task_priority(modification=True) == MODIFICATION_PRIORITY
+        assert task_priority(modification=True) < task_priority("tiny")
+
+    def test_small_sizes_first(self):
+        """Test that smaller models are scheduled before larger ones."""
+        sizes = ["tiny", "small", "medium", "large", "epic"]
+        assert [task_priority(size) for size in sizes] == sorted(task_priority(size) for size in sizes)
+        assert task_priority(None) == task_priority("custom") == task_priority("small")
+
+
+class TestJobScheduler:
+    """Tests for JobScheduler."""
+
+    def test_free_slot_granted_immediately(self, scheduler):
+        """Test that jobs under the concurrency limit do not queue."""
+        ticket = scheduler.reserve(ResourceClass.RENDER)
+        assert ticket.granted
+        assert scheduler.reserve(ResourceClass.RENDER).granted
+        assert not scheduler.reserve(ResourceClass.RENDER).granted
+        assert scheduler.stats()["render"]["queued"] == 1
+
+    def test_queue_full_rejected(self, scheduler):
+        """Test that jobs past the queue bound are rejected without waiting."""
+        tickets = [scheduler.reserve(ResourceClass.CAD) for _ in range(3)]
+        with pytest.raises(QueueFullError, match="cad queue is full") as excinfo:
+            scheduler.reserve(ResourceClass.CAD)
+        assert excinfo.value.retry_after >= 1
+
+        tickets[0].release()
+        assert tickets[1].granted
+        scheduler.reserve(ResourceClass.CAD).release()
+        stats = scheduler.stats()["cad"]
+        assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+
+    def test_priority_order(self, scheduler):
+        """Test that queued jobs are granted by priority, then in arrival order."""
+        running = scheduler.reserve(ResourceClass.CAD, priority=3)
+        large = scheduler.reserve(ResourceClass.CAD, priority=4)
+        modification = scheduler.reserve(ResourceClass.CAD, priority=MODIFICATION_PRIORITY)
+
+        running.release()
+        assert modification.granted and not large.granted
+        modification.release()
+        assert large.granted
+
+    def test_priority_from_context(self, scheduler):
+        """Test that jobs without an explicit priority take the task's priority."""
+        token = job_priority_var.set(MODIFICATION_PRIORITY)
+        try:
+            assert scheduler.reserve(ResourceClass.CAD).priority == MODIFICATION_PRIORITY
+        finally:
+            job_priority_var.reset(token)
+
+    def test_leaving_queue_frees_place(self, scheduler):
+        """Test that releasing a queued ticket removes it without taking a slot."""
+        running = scheduler.reserve(ResourceClass.CAD)
+        queued = scheduler.reserve(ResourceClass.CAD)
+        queued.release()
+        queued.release()
+
+        running.release()
+        stats = scheduler.stats()["cad"]
+        assert (stats["running"], stats["queued"], stats["cancelled"]) == (0, 0, 1)
+
+    def test_slot_limits_threads(self, scheduler):
+        """Test that slot() never lets more jobs run at once than the limit."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def job():
+            nonlocal active, peak
+            with scheduler.slot(ResourceClass.RENDER):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.05)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=job) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak == 2
+        stats = scheduler.stats()["render"]
+        assert stats["completed"] == 6
+        assert stats["max_wait_seconds"] > 0.05
+
+    def test_slot_async_waits_without_blocking(self, scheduler):
+        """Test that async jobs queue for a slot while the event loop keeps running."""
+        order = []
+
+        async def job(name, priority):
+            async with scheduler.slot_async(ResourceClass.CAD, priority):
+                order.append(name)
+                await asyncio.sleep(0.02)
+
+        async def main():
+            first = asyncio.create_task(job("first", 5))
+            await asyncio.sleep(0)
+            await asyncio.gather(first, job("epic", 5), job("tiny", 1))
+
+        asyncio.run(main())
+        assert order == ["first", "tiny", "epic"]
+        assert scheduler.stats()["cad"]["running"] == 0
+
+    def test_cancelled_wait_leaves_queue(self, scheduler):
+        """Test that cancelling a queued async job gives up its place."""
+        running = scheduler.reserve(ResourceClass.CAD)
+
+        async def main():
+            waiter = asyncio.create_task(scheduler.slot_async(ResourceClass.CAD).__aenter__())
+            await asyncio.sleep(0.01)
+            assert scheduler.stats()["cad"]["queued"] == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        asyncio.run(main())
+        running.release()
+        assert scheduler.stats()["cad"]["running"] == 0
@@ -0,0 +1,119 @@
+"""Unit tests for the render cache."""
+
+import os
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from tools.render_cache import RenderCache, mesh_digest, render_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "cache"), max_entries=2)
+
+
+class TestCacheKey:
+    """Tests for mesh digests and keys."""
+
+    def test_stl_hashed_by_content(self, tmp_path):
+        """Test that STL files are keyed by their bytes, not their names."""
+        paths = [tmp_path / name for name in ("a.stl", "b.stl", "c.stl")]
+        paths[0].write_bytes(b"solid a")
+        paths[1].write_bytes(b"solid a")
+        paths[2].write_bytes(b"solid c")
+
+        digests = [mesh_digest(str(path)) for path in paths]
+        assert digests[0] == digests[1] != digests[2]
+
+    def test_arrays_hashed_with_shape(self):
+        """Test that array meshes with the same bytes but another layout differ."""
+        vertices = np.zeros((4, 3))
+        faces = np.array([[0, 1, 2], [0, 2, 3]])
+
+        assert mesh_digest((vertices, faces)) == mesh_digest((vertices.copy(), faces.copy()))
+        assert mesh_digest((vertices, faces)) != mesh_digest((vertices.reshape(3, 4), faces))
+
+    def test_params_change_key(self):
+        """Test that the view parameters are part of the key."""
+        assert render_cache_key("digest", "iso") != render_cache_key("digest", "top")
+
+
+class TestRenderCache:
+    """Tests for RenderCache."""
+
+    def test_roundtrip(self, cache, tmp_path):
+        """Test that a stored image is returned and written to the output path."""
+        output_path = str(tmp_path / "out.png")
+        assert cache.get("key", output_path) is None
+
+        cache.put("key", b"png")
+
+        assert cache.get("key", output_path) == b"png"
+        with open(output_path, "rb") as f:
+            assert f.read() == b"png"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_put_file(self, cache, tmp_path):
+        """Test that images written by a render job can be stored from their files."""
+        path = tmp_path / "view.png"
+        path.write_bytes(b"view")
+
+        cache.put_file("key", str(path))
+        path.write_bytes(b"overwritten")
+
+        assert cache.get("key") == b"view"
+
+    def test_lru_eviction(self, cache):
+        """Test that the least recently used image is evicted first."""
+        cache.put("a", b"a")
+        cache.put("b", b"b")
+        past = time.time() - 60
+        os.utime(os.path.join(cache.cache_dir, "b.png"), (past, past))
+        os.utime(os.path.join(cache.cache_dir, "a.png"), (past - 60, past - 60))
+        cache.get("a")
+
+        cache.put("c", b"c")
+
+        assert cache.get("a") == b"a"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"c"
+
+    def test_order_loaded_from_disk_once(self, tmp_path):
+        """Test that a new cache takes the use order from the files and does not rescan per store."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        for age, key in enumerate(("new", "old")):
+            path = cache_dir / f"{key}.png"
+            path.write_bytes(key.encode())
+            past = time.time() - 60 * (age + 1)
+            os.utime(path, (past, past))
+        cache = RenderCache(str(cache_dir), max_entries=2)
+
+        with patch("tools.render_cache.os.scandir", wraps=os.scandir) as mock_scandir:
+            cache.put("a", b"a")
+            cache.put("b", b"b")
+
+        assert mock_scandir.call_count == 1
+        assert sorted(os.listdir(cache_dir)) == ["a.png", "b.png"]
+
+    def test_eviction_tolerates_missing_files(self, cache):
+        """Test that entries removed behind the cache's back do not break eviction."""
+        cache.put("a", b"a")
+        cache.put("b", b"b")
+        os.remove(os.path.join(cache.cache_dir, "a.png"))
+
+        cache.put("c", b"c")
+
+        assert cache.get("b") == b"b"
+        assert cache.get("c") == b"c"
+
+    def test_disabled(self, tmp_path):
+        """Test that max_entries=0 turns the cache off."""
+        cache = RenderCache(str(tmp_path / "off"), max_entries=0)
+        cache.put("key", b"png")
+
+        assert cache.get("key") is None
+        assert not os.path.exists(tmp_path / "off")
@@ -0,0 +1,327 @@
+"""Unit tests for rendering on persistent render workers."""
+
+import asyncio
+import io
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+import trimesh
+from PIL import Image
+
+from tools import renderer
+from tools.cad_pool import CadWorkerError, CadWorkerPool
+from tools.render_cache import RenderCache
+from tools.renderer import (
+    encode_png,
+    render_contact_sheet,
+    render_png,
+    render_png_async,
+    render_stl,
+    render_stl_async,
+    render_views,
+    tile_images,
+)
+
+
+@pytest.fixture(autouse=True)
+def render_cache(tmp_path_factory, monkeypatch):
+    cache = RenderCache(str(tmp_path_factory.mktemp("render_cache")))
+    monkeypatch.setattr(renderer, "_worker_backend", None)
+    with patch('tools.renderer.get_render_cache', return_value=cache):
+        yield cache
+
+
+@pytest.fixture
+def stl_path(tmp_path):
+    path = tmp_path / "model.stl"
+    path.write_text("solid model\nendsolid model\n")
+    return str(path)
+
+
+class TestRenderStl:
+    """Tests for render_stl and render_stl_async."""
+
+    def test_job_runs_on_render_pool(self, stl_path):
+        """Test that renders are sent to the render workers with the default image path."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+
+            assert render_stl(stl_path) == stl_path.replace(".stl", ".png")
+            func, args = mock_get_pool.return_value.run.call_args.args
+            assert func is renderer._png_job
+            assert args == (stl_path, ("iso",), stl_path.replace(".stl", ".png"))
+
+    def test_sync_render_takes_render_slot(self, stl_path):
+        """Test that blocking renders wait for a render slot like async ones."""
+        from tools.job_scheduler import QueueFullError, ResourceClass
+        with patch('tools.renderer.get_render_pool') as mock_get_pool, \
+                patch('tools.renderer.get_job_scheduler') as mock_get_scheduler:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+
+            assert render_png(stl_path) == b"png"
+            mock_get_scheduler.return_value.slot.assert_called_once_with(ResourceClass.RENDER)
+
+            mock_get_scheduler.return_value.slot.side_effect = QueueFullError(ResourceClass.RENDER, 1, 1)
+            assert render_png(stl_path, ("top",)) is None
+            assert mock_get_pool.return_value.run.call_count == 1
+
+    def test_async_render(self, stl_path):
+        """Test that async renders await the render pool."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run_async = AsyncMock(return_value=(b"png", "vtk"))
+
+            assert asyncio.run(render_stl_async(stl_path, "image.png")) == "image.png"
+            mock_get_pool.return_value.run_async.assert_awaited_once()
+
+    def test_worker_failure_returns_none(self, stl_path):
+        """Test that a failed or crashed render worker gives no image instead of raising."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.side_effect = CadWorkerError("render worker died (exit code -11)")
+            mock_get_pool.return_value.run_async = AsyncMock(side_effect=CadWorkerError("render worker died"))
+
+            assert render_stl(stl_path) is None
+            assert asyncio.run(render_stl_async(stl_path)) is None
+
+    def test_missing_stl(self, tmp_path):
+        """Test that a missing STL is not sent to the workers."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            assert render_stl(str(tmp_path / "missing.stl")) is None
+            assert asyncio.run(render_stl_async(str(tmp_path / "missing.stl"))) is None
+            mock_get_pool.assert_not_called()
+
+    def test_render_pool_is_persistent(self):
+        """Test that the render pool is created once, named for its logs, and can be restarted."""
+        try:
+            pool = renderer.get_render_pool()
+            assert isinstance(pool, CadWorkerPool)
+            assert pool.name == "render"
+            assert renderer.get_render_pool() is pool
+        finally:
+            renderer.shutdown_render_pool()
+        assert renderer.get_render_pool() is not pool
+        renderer.shutdown_render_pool()
+
+
+class TestContactSheet:
+    """Tests for multi-view rendering and contact sheets."""
+
+    def test_tile_images(self):
+        """Test that views are tiled row by row and the last row padded with white."""
+        images = [np.full((2, 3, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+
+        sheet = tile_images(images, columns=2)
+
+        assert sheet.shape == (4, 6, 3)
+        assert sheet[0, 0, 0] == 10 and sheet[0, 3, 0] == 20
+        assert sheet[2, 0, 0] == 30 and sheet[2, 3, 0] == 255
+
+    def test_views_rendered_from_one_read(self, stl_path, tmp_path):
+        """Test that a contact sheet reads the mesh once and renders each view at tile size."""
+        plotter = MagicMock()
+        plotter.screenshot.return_value = np.zeros((384, 512, 3), dtype=np.uint8)
+        sheet_path = str(tmp_path / "sheet.png")
+
+        with patch('tools.renderer._get_plotter', return_value=plotter), \
+             patch('tools.renderer.pv.read') as mock_read, \
+             patch('tools.renderer.settings.RENDER_BACKEND', "vtk"):
+            result = render_views(stl_path, str(tmp_path), "model", contact_sheet=sheet_path)
+
+        assert result == {"success": True, "contact_sheet": sheet_path, "backend": "vtk"}
+        mock_read.assert_called_once_with(stl_path)
+        plotter.add_mesh.assert_called_once()
+        assert plotter.window_size == (512, 384)
+        labels = [call.args[0] for call in plotter.add_text.call_args_list]
+        assert labels == list(renderer.VIEWS)
+        assert Image.open(sheet_path).size == (1024, 768)
+
+    def test_unknown_view(self, stl_path, tmp_path):
+        """Test that unknown view names are reported, not rendered."""
+        result = render_views(stl_path, str(tmp_path), "model", views=["iso", "bottom"])
+
+        assert not result["success"]
+        assert "bottom" in result["error"]
+
+    def test_contact_sheet_runs_on_render_pool(self, stl_path):
+        """Test that contact sheets are rendered in one render worker job."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+
+            assert render_contact_sheet(stl_path, views=["iso", "top"]) == stl_path.replace(".stl", "_views.png")
+            func, args = mock_get_pool.return_value.run.call_args.args
+            assert func is renderer._png_job
+            assert args == (stl_path, ("iso", "top"), stl_path.replace(".stl", "_views.png"))
+
+
+@pytest.fixture
+def plotter():
+    plotter = MagicMock()
+    plotter.screenshot.return_value = np.zeros((8, 12, 3), dtype=np.uint8)
+    with patch('tools.renderer._get_plotter', return_value=plotter), \
+         patch('tools.renderer.settings.RENDER_BACKEND', "vtk"):
+        yield plotter
+
+
+class TestRenderPng:
+    """Tests for in-memory PNG renders."""
+
+    def test_encode_png(self):
+        """Test that images are encoded as PNG without touching the disk."""
+        data = encode_png(np.zeros((4, 5, 3), dtype=np.uint8))
+
+        assert data.startswith(b"\x89PNG")
+        assert Image.open(io.BytesIO(data)).size == (5, 4)
+
+    def test_mesh_from_arrays(self):
+        """Test that (vertices, faces) arrays become a triangle mesh."""
+        vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+        faces = np.array([[0, 1, 2], [0, 1, 3]])
+
+        mesh = renderer._load_mesh((vertices, faces))
+
+        assert (mesh.n_points, mesh.n_cells) == (4, 2)
+
+    def test_png_job_returns_bytes(self, plotter, tmp_path):
+        """Test that the worker job returns the PNG and only writes it when asked to."""
+        vertices = np.zeros((3, 3))
+        faces = np.array([[0, 1, 2]])
+
+        data, backend = renderer._png_job((vertices, faces), ("iso",), None)
+        assert backend == "vtk"
+        assert Image.open(io.BytesIO(data)).size == (12, 8)
+        assert list(tmp_path.iterdir()) == []
+
+        output_path = tmp_path / "sheet.png"
+        data, _ = renderer._png_job((vertices, faces), ("iso", "top", "front"), str(output_path))
+        assert Image.open(io.BytesIO(data)).size == (24, 16)
+        assert output_path.read_bytes() == data
+
+    def test_arrays_sent_to_render_pool(self):
+        """Test that in-memory meshes go to the render workers as arrays."""
+        vertices = np.zeros((3, 3))
+        faces = np.array([[0, 1, 2]])
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+            mock_get_pool.return_value.run_async = AsyncMock(return_value=(b"png", "vtk"))
+
+            assert render_png((vertices, faces)) == b"png"
+            assert asyncio.run(render_png_async((vertices, faces), ["iso", "top"])) == b"png"
+            func, args = mock_get_pool.return_value.run_async.call_args.args
+            assert func is renderer._png_job
+            assert args[1:] == (("iso", "top"), None)
+
+    def test_missing_stl(self, tmp_path):
+        """Test that a missing STL is not sent to the workers."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            assert render_png(str(tmp_path / "missing.stl")) is None
+            mock_get_pool.assert_not_called()
+
+
+class TestRenderBackends:
+    """Tests for choosing between VTK and the NumPy rasterizer."""
+
+    @pytest.fixture
+    def box_stl(self, tmp_path):
+        path = str(tmp_path / "box.stl")
+        trimesh.creation.box((20, 10, 5)).export(path)
+        return path
+
+    def test_numpy_backend(self, box_stl, tmp_path):
+        """Test that the NumPy backend renders an STL without touching VTK."""
+        output_path = str(tmp_path / "box.png")
+        with patch('tools.renderer.settings.RENDER_BACKEND', "numpy"), \
+             patch('tools.renderer._get_plotter') as mock_get_plotter:
+            data, backend = renderer._png_job(box_stl, tuple(renderer.VIEWS), output_path)
+
+        mock_get_plotter.assert_not_called()
+        assert backend == "numpy"
+        image = np.asarray(Image.open(io.BytesIO(data)))
+        assert image.shape[:2] == (768, 1024)
+        assert (image < 255).any() and (image == 255).any()
+
+    def test_auto_without_display(self, box_stl, monkeypatch):
+        """Test that "auto" uses the rasterizer where VTK has no display to render on."""
+        monkeypatch.setattr(renderer, "_vtk_usable", None)
+        plotter = MagicMock()
+        plotter.ren_win.GetClassName.return_value = "vtkXOpenGLRenderWindow"
+        monkeypatch.delenv("DISPLAY", raising=False)
+        with patch('tools.renderer.settings.RENDER_BACKEND', "auto"), \
+             patch('tools.renderer._get_plotter', return_value=plotter):
+            renderer._start_render_worker()
+            images = renderer._render_images(box_stl, ["iso"], tiled=False)
+
+        plotter.screenshot.assert_not_called()
+        assert images[0].shape == (768, 1024, 3)
+
+    def test_auto_falls_back_after_vtk_error(self, box_stl, monkeypatch):
+        """Test that "auto" switches to the rasterizer when a VTK render raises."""
+        monkeypatch.setattr(renderer, "_vtk_usable", True)
+        plotter = MagicMock()
+        plotter.screenshot.side_effect = RuntimeError("no OpenGL context")
+        with patch('tools.renderer.settings.RENDER_BACKEND', "auto"), \
+             patch('tools.renderer._get_plotter', return_value=plotter):
+            images = renderer._render_images(box_stl, ["iso", "top"], tiled=True)
+
+        assert [image.shape for image in images] == [(768, 512, 3)] * 2
+        assert renderer._vtk_usable is False
+
+
+class TestRenderCaching:
+    """Tests for serving repeated renders from the render cache."""
+
+    def test_repeat_served_from_cache(self, stl_path, tmp_path, render_cache):
+        """Test that the same mesh and views are rendered once, whatever the file name."""
+        copy_path = str(tmp_path / "copy.stl")
+        with open(stl_path, "rb") as src, open(copy_path, "wb") as dst:
+            dst.write(src.read())
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+            mock_get_pool.return_value.run_async = AsyncMock(return_value=(b"png", "vtk"))
+
+            assert render_stl(stl_path) == stl_path.replace(".stl", ".png")
+            assert asyncio.run(render_stl_async(copy_path)) == copy_path.replace(".stl", ".png")
+            assert render_png(stl_path) == b"png"
+
+            assert mock_get_pool.return_value.run.call_count == 1
+            mock_get_pool.return_value.run_async.assert_not_awaited()
+        with open(copy_path.replace(".stl", ".png"), "rb") as f:
+            assert f.read() == b"png"
+        assert render_cache.hits == 2
+
+    def test_view_parameters_in_key(self, stl_path):
+        """Test that other views or another backend are rendered, not served from the cache."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.return_value = (b"png", "vtk")
+
+            render_png(stl_path, ["iso"])
+            render_png(stl_path, ["iso", "top"])
+            with patch('tools.renderer.settings.RENDER_BACKEND', "numpy"):
+                render_png(stl_path, ["iso"])
+
+            assert mock_get_pool.return_value.run.call_count == 3
+
+    def test_auto_keyed_by_worker_backend(self, stl_path, tmp_path):
+        """Test that under "auto" images are cached per backend the workers report drawing with."""
+        other_path = str(tmp_path / "other.stl")
+        with open(other_path, "w") as f:
+            f.write("solid other\nendsolid other\n")
+        with patch('tools.renderer.get_render_pool') as mock_get_pool, \
+             patch('tools.renderer.settings.RENDER_BACKEND', "auto"):
+            mock_get_pool.return_value.run.side_effect = [(b"numpy png", "numpy"), (b"vtk png", "vtk"), (b"vtk png", "vtk")]
+
+            assert render_png(stl_path) == b"numpy png"
+            assert render_png(stl_path) == b"numpy png"
+            # The workers now draw with VTK, so the rasterized image is not served
+            render_png(other_path)
+            assert render_png(stl_path) == b"vtk png"
+
+            assert mock_get_pool.return_value.run.call_count == 3
+
+    def test_failed_render_not_cached(self, stl_path, render_cache):
+        """Test that failed renders are retried rather than cached."""
+        with patch('tools.renderer.get_render_pool') as mock_get_pool:
+            mock_get_pool.return_value.run.side_effect = [CadWorkerError("render worker died"), (b"png", "vtk")]
+
+            assert render_png(stl_path) is None
+            assert render_png(stl_path) == b"png"
+        assert render_cache.hits == 0
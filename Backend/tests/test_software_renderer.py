@@ -0,0 +1,65 @@
+"""Unit tests for the NumPy software rasterizer."""
+
+import numpy as np
+import pytest
+import trimesh
+
+from tools.software_renderer import BACKGROUND, CAMERAS, rasterize
+
+
+def _drawn(image):
+    """Mask of the pixels the mesh covers."""
+    return (image != BACKGROUND).any(axis=2)
+
+
+class TestRasterize:
+    """Tests for rasterize."""
+
+    def test_box_views(self):
+        """Test that each view of a box fills a region of its projected aspect ratio."""
+        box = trimesh.creation.box((20, 10, 5))
+
+        for view, aspect in (("top", 2.0), ("front", 4.0), ("right", 2.0)):
+            image = rasterize(box.vertices, box.faces, view, size=(400, 300))
+            rows, cols = np.nonzero(_drawn(image))
+            width = cols.max() - cols.min() + 1
+            height = rows.max() - rows.min() + 1
+            assert image.shape == (300, 400, 3)
+            assert width / height == pytest.approx(aspect, rel=0.05)
+
+    def test_nearest_surface_drawn(self):
+        """Test that the z-buffer keeps the surface nearest the camera, whatever the face order."""
+        base = trimesh.creation.box((10, 10, 1))
+        block = trimesh.creation.box((2, 2, 4))
+        block.apply_translation((0, 0, 2.5))
+        base_only = rasterize(base.vertices, base.faces, "iso", size=(200, 200))
+
+        first = trimesh.util.concatenate([base, block])
+        last = trimesh.util.concatenate([block, base])
+        image = rasterize(first.vertices, first.faces, "iso", size=(200, 200))
+
+        np.testing.assert_array_equal(image, rasterize(last.vertices, last.faces, "iso", size=(200, 200)))
+        # The block's sides hide part of the base's top
+        assert len({tuple(pixel) for pixel in image[_drawn(image)]}) == 3
+        assert (image != base_only).any()
+
+    def test_shading_differs_by_face(self):
+        """Test that faces at different angles to the light get different shades."""
+        box = trimesh.creation.box((10, 10, 10))
+
+        image = rasterize(box.vertices, box.faces, "iso", size=(200, 200))
+        shades = {tuple(pixel) for pixel in image[_drawn(image)]}
+        assert len(shades) == 3
+
+    def test_empty_mesh(self):
+        """Test that a mesh without faces gives a blank image."""
+        image = rasterize(np.zeros((0, 3)), np.zeros((0, 3), dtype=int), "iso", size=(40, 30))
+
+        assert not _drawn(image).any()
+
+    def test_unknown_view(self):
+        """Test that only the fixed cameras are accepted."""
+        box = trimesh.creation.box((1, 1, 1))
+        assert "bottom" not in CAMERAS
+        with pytest.raises(ValueError, match="bottom"):
+            rasterize(box.vertices, box.faces, "bottom")
@@ -0,0 +1,148 @@
+"""Unit tests for streaming build_sequence validation."""
+
+import json
+
+from validation.buildability import validate_buildability
+from validation.incremental import IncrementalBuildabilityValidator
+from validation.streaming import StreamingBuildabilityCheck, StreamingBuildSequenceParser
+
+
+def _brick(step: int, brick: str, x: float, y: float, z: float) -> dict:
+    return {"step": step, "brick": brick, "color": "red", "position": {"x": x, "y": y, "z": z}}
+
+
+GOOD_SEQUENCE = [
+    _brick(1, "2x4", 0, 0, 0),
+    _brick(2, "2x4", 16, 0, 0),
+    _brick(3, "2x4", 8, 0, 9.6),
+    _brick(4, "2x2", 8, 8, 19.2),
+]
+
+PYTHON_SCRIPT = """import cadquery as cq
+
+# Bricks {in} build order
+build_sequence = [
+    {'step': 1, 'brick': '2x4', 'color': 'red', 'position': {'x': 0, 'y': 0, 'z': 0}},  # base
+    {'step': 2, 'brick': '2x4', 'color': 'red', 'position': {'x': 16, 'y': 0, 'z': 0}},
+    {'step': 3, 'brick': '2x4', 'color': 'blue', 'position': {'x': 8, 'y': 0, 'z': 9.6}},
+]
+result = cq.Workplane("XY").box(1, 1, 1)
+"""
+
+
+def _feed_in_chunks(parser: StreamingBuildSequenceParser, text: str, size: int) -> list:
+    entries = []
+    for start in range(0, len(text), size):
+        entries.extend(parser.feed(text[start:start + size]))
+    return entries
+
+
+class TestStreamingBuildSequenceParser:
+    """Tests for StreamingBuildSequenceParser."""
+
+    def test_python_literal_any_chunk_size(self):
+        """Test that entries are the same however the text is split."""
+        expected = [
+            _brick(1, "2x4", 0, 0, 0),
+            _brick(2, "2x4", 16, 0, 0),
+            dict(_brick(3, "2x4", 8, 0, 9.6), color="blue"),
+        ]
+        for size in (1, 2, 3, 7, 16, len(PYTHON_SCRIPT)):
+            parser = StreamingBuildSequenceParser()
+            assert _feed_in_chunks(parser, PYTHON_SCRIPT, size) == expected
+            assert parser.done
+
+    def test_entries_arrive_as_completed(self):
+        """Test that each entry is returned by the chunk that closes it."""
+        parser = StreamingBuildSequenceParser()
+        assert parser.feed("build_seq") == []
+        assert parser.feed('uence = [{"step": 1, "brick": "2x4", "position": {"x": 0,') == []
+        assert not parser.done
+        entries = parser.feed(' "y": 0, "z": 0}}, {"step": 2')
+        assert entries == [{"step": 1, "brick": "2x4", "position": {"x": 0, "y": 0, "z": 0}}]
+        assert parser.feed(', "brick": "2x2"}]') == [{"step": 2, "brick": "2x2"}]
+        assert parser.done
+        assert parser.feed('build_sequence = [{"step": 3}]') == []
+
+    def test_json_metadata(self):
+        """Test the JSON form of the key."""
+        text = "Metadata: " + json.dumps({"build_sequence": GOOD_SEQUENCE})
+        assert _feed_in_chunks(StreamingBuildSequenceParser(), text, 5) == GOOD_SEQUENCE
+
+    def test_braces_in_strings_and_comments(self):
+        """Test that braces inside strings and comments do not end an entry."""
+        text = 'build_sequence = [{"brick": "2x4", "color": "r}e{d"},  # {not an entry}\n{"brick": "2x2"}]'
+        entries = _feed_in_chunks(StreamingBuildSequenceParser(), text, 4)
+        assert entries == [{"brick": "2x4", "color": "r}e{d"}, {"brick": "2x2"}]
+
+    def test_unparsable_entry_skipped(self):
+        """Test that a malformed entry is dropped without stopping the stream."""
+        text = 'build_sequence = [{"brick": 2x4}, {"brick": "2x2"}]'
+        assert StreamingBuildSequenceParser().feed(text) == [{"brick": "2x2"}]
+
+
+class TestStreamingBuildabilityCheck:
+    """Tests for StreamingBuildabilityCheck."""
+
+    def test_good_sequence_matches_full_validation(self):
+        """Test that a buildable sequence is never hopeless and validates like the full checker."""
+        check = StreamingBuildabilityCheck(threshold=70)
+        text = "build_sequence = " + json.dumps(GOOD_SEQUENCE)
+        for start in range(0, len(text), 9):
+            assert not check.feed(text[start:start + 9])
+
+        assert check.done
+        assert check.entries == GOOD_SEQUENCE
+        expected = validate_buildability({"build_sequence": GOOD_SEQUENCE})
+        result = check.result()
+        assert result.score == expected.score
+        assert result.issues == expected.issues
+
+    def test_off_grid_layout_hopeless_before_end(self):
+        """Test that off-grid bricks stop the check before the sequence is complete."""
+        bricks = [_brick(i + 1, "2x4", 3 + 16 * i, 5, 0) for i in range(10)]
+        entries = ["build_sequence = ["] + [json.dumps(brick) + "," for brick in bricks] + ["]"]
+
+        check = StreamingBuildabilityCheck(threshold=70)
+        fed = 0
+        for entry in entries:
+            fed += 1
+            if check.feed(entry):
+                break
+
+        assert check.hopeless
+        assert fed < len(entries)
+        assert check.best_score < 70
+        assert check.result().score < 70
+
+    def test_skipped_layers_hopeless(self):
+        """Test that bricks jumping layers ahead of the build count as committed."""
+        sequence = [_brick(1, "2x4", 0, 0, 0)] + [_brick(i + 2, "2x4", 0, 0, 9.6 * 3 * (i + 1)) for i in range(4)]
+        check = StreamingBuildabilityCheck(threshold=70)
+        assert check.feed("build_sequence = " + json.dumps(sequence))
+        assert check.hopeless
+
+
+class TestCommittedPenalty:
+    """Tests for IncrementalBuildabilityValidator.committed_penalty."""
+
+    def test_floating_counted_once_settled(self):
+        """Test that a floating brick is only committed once the build is two layers past it."""
+        validator = IncrementalBuildabilityValidator()
+        validator.apply_sequence([_brick(1, "2x4", 0, 0, 0), _brick(2, "2x2", 80, 80, 9.6)])
+        assert validator.committed_penalty() == 0
+
+        validator.apply_sequence([
+            _brick(1, "2x4", 0, 0, 0),
+            _brick(2, "2x2", 80, 80, 9.6),
+            _brick(3, "2x4", 0, 0, 9.6),
+            _brick(4, "2x4", 0, 0, 19.2),
+            _brick(5, "2x4", 0, 0, 28.8),
+        ])
+        assert validator.committed_penalty() == 15
+
+    def test_bounded_by_full_penalty(self):
+        """Test that the committed penalty never exceeds the full penalty."""
+        sequence = [_brick(1, "2x4", 0.5, 0, 0), _brick(2, "3x3", 0, 0, 9.6), _brick(3, "2x4", 0, 0, 38.4)]
+        validator = IncrementalBuildabilityValidator.from_sequence(sequence)
+        assert 0 < validator.committed_penalty() <= 100 - validator.score
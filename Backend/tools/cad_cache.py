@@ -0,0 +1,197 @@
+"""Content-addressed disk cache of CAD outputs.
+
+The coder and modifier agents often submit the same build123d script again
+(retries, no-op modifications). CadOutputCache stores the exported files of
+each successful build under a hash of the normalized script, and serves
+repeats by hard-linking (or copying) the files to the new task's names
+instead of re-running OCCT and the exporters.
+"""
+
+import ast
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+import build123d
+
+logger = logging.getLogger(__name__)
+
+# Default number of cached builds kept on disk
+DEFAULT_MAX_ENTRIES = 500
+
+CadFiles = Dict[str, Optional[str]]  # format ("step", "stl", ...) -> path, None if not exported
+
+
+def normalize_script(script_code: str) -> str:
+    """Reduce a script to a form that ignores comments and formatting.
+
+    Scripts that parse are compared by their syntax tree; others by their
+    text with line endings and trailing whitespace normalized.
+    """
+    try:
+        return ast.dump(ast.parse(script_code))
+    except (SyntaxError, ValueError):
+        lines = script_code.replace("\r\n", "\n").split("\n")
+        return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def cad_cache_key(script_code: str, variant: str = "") -> str:
+    """Hash a script for the cache.
+
+    Args:
+        script_code: The build123d script.
+        variant: Anything else that changes the outputs (for example the OBJ color).
+
+    Returns:
+        Hex digest, also used as the entry directory name.
+    """
+    payload = "\0".join((build123d.__version__, variant, normalize_script(script_code)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hard-link a file, copying it when linking is not possible."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+class CadOutputCache:
+    """Disk cache of exported CAD files, keyed by cad_cache_key.
+
+    Each entry is a directory holding one file per exported format. Entries
+    are written to a temporary directory and renamed into place, so readers
+    never see a partial entry. The least recently used entries are removed
+    once there are more than max_entries.
+
+    Attributes:
+        cache_dir: Directory holding the entries.
+        max_entries: Maximum number of cached builds. 0 disables the cache.
+        hits: Lookups served from the cache.
+        misses: Lookups that found no usable entry.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize the cache, creating the directory if needed."""
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if max_entries > 0:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups and stores do anything."""
+        return self.max_entries > 0
+
+    def get(self, key: str, output_dir: str, base_name: str) -> Optional[CadFiles]:
+        """Materialize a cached build under a new base name.
+
+        Args:
+            key: Cache key of the script.
+            output_dir: Directory to place the files in.
+            base_name: Base name for the files (usually task-prefixed).
+
+        Returns:
+            Format -> new path, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            names = sorted(os.listdir(entry_dir))
+        except OSError:
+            names = []
+        if not names:
+            self.misses += 1
+            return None
+
+        files: CadFiles = {}
+        try:
+            for name in names:
+                fmt = name.split(".", 1)[1]
+                path = os.path.join(output_dir, f"{base_name}.{fmt}")
+                _link_or_copy(os.path.join(entry_dir, name), path)
+                files[fmt] = path
+            os.utime(entry_dir)
+        except OSError as e:
+            # Evicted while reading, or the output directory is unwritable
+            logger.warning(f"CAD cache entry {key[:12]} unusable: {e}")
+            for path in files.values():
+                if path and os.path.exists(path):
+                    os.remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"CAD cache hit {key[:12]} -> {base_name}")
+        return files
+
+    def put(self, key: str, files: CadFiles) -> None:
+        """Store the files of a successful build.
+
+        Formats exported after the build was first stored are added to its
+        existing entry.
+
+        Args:
+            key: Cache key of the script.
+            files: Format -> path of the exported files. None paths are skipped.
+        """
+        if not self.enabled:
+            return
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry_dir):
+            self._add_formats(key, entry_dir, files)
+            return
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.cache_dir)
+        try:
+            for fmt, path in files.items():
+                if path:
+                    _link_or_copy(path, os.path.join(staging, f"model.{fmt}"))
+            os.rename(staging, entry_dir)
+        except OSError as e:
+            # Another worker stored the same key first, or the files are gone
+            logger.debug(f"Not caching CAD build {key[:12]}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self._evict()
+
+    def _add_formats(self, key: str, entry_dir: str, files: CadFiles) -> None:
+        """Add formats an existing entry lacks, one atomic rename per file."""
+        for fmt, path in files.items():
+            cached = os.path.join(entry_dir, f"model.{fmt}")
+            if not path or os.path.exists(cached):
+                continue
+            staging = os.path.join(self.cache_dir, f".staging-{key}.{fmt}")
+            try:
+                _link_or_copy(path, staging)
+                os.rename(staging, cached)
+            except OSError as e:
+                # Evicted meanwhile, or the file is gone
+                logger.debug(f"Not caching {fmt} of CAD build {key[:12]}: {e}")
+                if os.path.exists(staging):
+                    os.remove(staging)
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries above max_entries."""
+        with self._lock:
+            try:
+                entries = [
+                    entry for entry in os.scandir(self.cache_dir)
+                    if entry.is_dir() and not entry.name.startswith(".")
+                ]
+            except OSError:
+                return
+            excess = len(entries) - self.max_entries
+            if excess <= 0:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:excess]:
+                shutil.rmtree(entry.path, ignore_errors=True)
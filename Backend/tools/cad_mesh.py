@@ -0,0 +1,479 @@
+"""Mesh exports of CAD results from a single tessellation.
+
+Exporting the STL with OCCT, reading it back with trimesh to color it and
+writing the OBJ costs a full file write and parse per model, and only gives
+the model one color. write_mesh_exports tessellates the build123d shape
+once, keeps the vertex and face arrays in memory and writes STL, OBJ and
+GLB from that buffer. Face colors are a NumPy array, so each brick of the
+build_sequence can carry its own color.
+
+Brick models can skip tessellation altogether: each brick type in
+BRICK_DIMENSIONS is built and tessellated once per process, and the mesh of
+a model whose solids are exactly its build_sequence's bricks is their templates
+translated to every placement with NumPy.
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import trimesh
+from build123d import Align, Box, Cylinder, Location, Part
+from OCP.BRep import BRep_Tool
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+from OCP.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+from OCP.TopExp import TopExp_Explorer
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopoDS import TopoDS
+
+from tools.cad_profile import profile_step
+from validation.buildability import BRICK_DIMENSIONS, LEGO_BRICK_HEIGHT, LEGO_GRID_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Tessellation tolerances, the defaults of build123d's export_stl
+MESH_TOLERANCE = 1e-3
+MESH_ANGULAR_TOLERANCE = 0.1
+
+# Stud size (mm), as in the coder prompt's brick example
+LEGO_STUD_RADIUS = 2.4
+LEGO_STUD_HEIGHT = 1.8
+
+# Faces further than this from every brick (mm) do not belong to the build_sequence
+BRICK_MATCH_TOLERANCE = LEGO_GRID_SIZE / 2
+
+# Share of faces that must lie on a brick before per-brick colors are used
+MIN_BRICK_COVERAGE = 0.9
+
+# Tolerances for a shape to count as exactly the bricks of its build_sequence:
+# relative volume per brick, and the unit (mm) brick bounding boxes are matched in
+BRICK_VOLUME_TOLERANCE = 1e-4
+BRICK_BOUNDS_TOLERANCE = 1e-2
+
+# Faces matched against all bricks at a time, bounding the distance array's size
+FACE_CHUNK_SIZE = 4096
+
+# glTF is Y-up and in meters; CAD results are Z-up and in millimeters
+GLTF_TRANSFORM = np.array([
+    [0.001, 0.0, 0.0, 0.0],
+    [0.0, 0.0, 0.001, 0.0],
+    [0.0, -0.001, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 1.0],
+])
+
+# Named brick colors used in build_sequence entries (RGBA, 0-255)
+BRICK_COLOR_MAP = {
+    "red": [201, 26, 9, 255],
+    "blue": [0, 85, 191, 255],
+    "green": [35, 120, 65, 255],
+    "yellow": [242, 205, 55, 255],
+    "white": [255, 255, 255, 255],
+    "black": [27, 42, 52, 255],
+    "gray": [160, 165, 169, 255],
+    "grey": [160, 165, 169, 255],
+    "light gray": [160, 165, 169, 255],
+    "dark gray": [108, 110, 104, 255],
+    "orange": [254, 138, 24, 255],
+    "brown": [88, 57, 39, 255],
+    "tan": [228, 205, 158, 255],
+    "pink": [252, 151, 172, 255],
+    "purple": [129, 0, 123, 255],
+    "lime": [187, 233, 11, 255],
+    "dark green": [24, 70, 50, 255],
+    "dark blue": [10, 52, 99, 255],
+    "dark red": [114, 14, 15, 255],
+    "light blue": [180, 210, 228, 255],
+}
+
+
+def _location_matrix(location: TopLoc_Location) -> np.ndarray:
+    """3x4 affine matrix of a face location."""
+    transformation = location.Transformation()
+    return np.array([[transformation.Value(row, col) for col in range(1, 5)] for row in range(1, 4)])
+
+
+def tessellate(shape: Any) -> trimesh.Trimesh:
+    """Tessellate a build123d shape into a mesh.
+
+    Meshes like build123d's export_stl, then reads each face's triangulation
+    straight into arrays (Shape.tessellate wraps every vertex in a Vector,
+    which is several times slower on models with many studs).
+
+    Args:
+        shape: The build123d shape.
+
+    Returns:
+        The mesh, with duplicate vertices merged.
+    """
+    BRepMesh_IncrementalMesh(shape.wrapped, MESH_TOLERANCE, True, MESH_ANGULAR_TOLERANCE, True)
+
+    vertex_blocks: List[np.ndarray] = []
+    face_blocks: List[np.ndarray] = []
+    offset = 0
+    explorer = TopExp_Explorer(shape.wrapped, TopAbs_FACE)
+    while explorer.More():
+        face = TopoDS.Face_s(explorer.Current())
+        explorer.Next()
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation_s(face, location)
+        if triangulation is None:
+            continue
+
+        node_count = triangulation.NbNodes()
+        nodes = np.array([triangulation.Node(i).Coord() for i in range(1, node_count + 1)], dtype=np.float64)
+        if not location.IsIdentity():
+            matrix = _location_matrix(location)
+            nodes = nodes @ matrix[:, :3].T + matrix[:, 3]
+        triangles = np.array(
+            [triangulation.Triangle(i).Get() for i in range(1, triangulation.NbTriangles() + 1)], dtype=np.int64
+        ) - 1 + offset
+        if face.Orientation() == TopAbs_REVERSED:
+            triangles = triangles[:, [0, 2, 1]]
+
+        vertex_blocks.append(nodes.reshape(-1, 3))
+        face_blocks.append(triangles.reshape(-1, 3))
+        offset += node_count
+
+    if not face_blocks:
+        return trimesh.Trimesh()
+    return trimesh.Trimesh(np.concatenate(vertex_blocks), np.concatenate(face_blocks))
+
+
+def _brick_color(name: Any, default_color: Sequence[int]) -> Sequence[int]:
+    """RGBA of a build_sequence color name, or the default for unknown names."""
+    if not isinstance(name, str):
+        return default_color
+    return BRICK_COLOR_MAP.get(name.strip().lower().replace("_", " ").replace("grey", "gray"), default_color)
+
+
+def _brick_position(brick: Any) -> Optional[Tuple[float, float, float]]:
+    """(x, y, z) corner of a build_sequence entry in mm, or None if it is not a known brick."""
+    if not isinstance(brick, dict) or brick.get("brick") not in BRICK_DIMENSIONS:
+        return None
+    position = brick.get("position") or {}
+    try:
+        return tuple(float(position.get(axis, 0)) for axis in ("x", "y", "z"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _brick_boxes(build_sequence: List[Dict[str, Any]], default_color: Sequence[int]):
+    """Bounding boxes (mm, studs included) and colors of the known bricks."""
+    lows, highs, colors = [], [], []
+    for brick in build_sequence:
+        corner = _brick_position(brick)
+        if corner is None:
+            continue
+        x, y, z = corner
+        width, length = BRICK_DIMENSIONS[brick["brick"]]
+        lows.append((x, y, z))
+        highs.append((
+            x + width * LEGO_GRID_SIZE,
+            y + length * LEGO_GRID_SIZE,
+            z + LEGO_BRICK_HEIGHT + LEGO_STUD_HEIGHT,
+        ))
+        colors.append(_brick_color(brick.get("color"), default_color))
+    return (
+        np.array(lows, dtype=np.float64).reshape(-1, 3),
+        np.array(highs, dtype=np.float64).reshape(-1, 3),
+        np.array(colors, dtype=np.uint8).reshape(-1, 4),
+    )
+
+
+def brick_face_colors(
+    mesh: trimesh.Trimesh,
+    build_sequence: Optional[List[Dict[str, Any]]],
+    default_color: Sequence[int]
+) -> Optional[np.ndarray]:
+    """Color each face with the color of the brick it belongs to.
+
+    A face belongs to the brick whose box is nearest its center. Scripts
+    do not always place bricks where their build_sequence says, so colors
+    are only assigned when most faces lie on some brick.
+
+    Args:
+        mesh: The tessellated model.
+        build_sequence: Brick placements with "brick", "color" and "position".
+        default_color: RGBA for bricks with unknown color names.
+
+    Returns:
+        (F, 4) uint8 face colors, or None if the bricks do not match the mesh.
+    """
+    if not build_sequence or len(mesh.faces) == 0:
+        return None
+    lows, highs, colors = _brick_boxes(build_sequence, default_color)
+    if len(lows) == 0:
+        return None
+
+    centers = mesh.triangles_center
+    nearest = np.empty(len(centers), dtype=np.int64)
+    squared_distances = np.empty(len(centers), dtype=np.float64)
+    for start in range(0, len(centers), FACE_CHUNK_SIZE):
+        chunk = centers[start:start + FACE_CHUNK_SIZE, None, :]
+        # Offset from each face center to the closest point of each box; 0 inside the box
+        gaps = chunk - np.clip(chunk, lows[None], highs[None])
+        chunk_distances = np.einsum("fbk,fbk->fb", gaps, gaps)
+        closest = chunk_distances.argmin(axis=1)
+        nearest[start:start + FACE_CHUNK_SIZE] = closest
+        squared_distances[start:start + FACE_CHUNK_SIZE] = chunk_distances[np.arange(len(closest)), closest]
+
+    coverage = np.count_nonzero(squared_distances <= BRICK_MATCH_TOLERANCE ** 2) / len(centers)
+    if coverage < MIN_BRICK_COVERAGE:
+        logger.info(f"build_sequence covers {coverage:.0%} of the mesh, using a single color")
+        return None
+    return colors[nearest]
+
+
+def write_mesh_exports(
+    shape: Any,
+    paths: Dict[str, str],
+    color: Sequence[int],
+    build_sequence: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[Dict[str, Optional[str]], trimesh.Trimesh]:
+    """Write STL, OBJ and GLB files from one tessellation of a shape.
+
+    Args:
+        shape: The build123d shape.
+        paths: Format ("stl", "obj", "glb") to output path.
+        color: RGBA used when the build_sequence gives no per-brick colors.
+        build_sequence: Brick placements to color the OBJ and GLB by.
+
+    Returns:
+        Tuple of (format to path for each requested format, None where the
+        export failed; the tessellation, for callers that render it).
+    """
+    with profile_step("tessellate"):
+        mesh = tessellate(shape)
+    files: Dict[str, Optional[str]] = {}
+    if "stl" in paths:
+        with profile_step("stl"):
+            mesh.export(paths["stl"], file_type="stl")
+        files["stl"] = paths["stl"]
+
+    if "obj" not in paths and "glb" not in paths:
+        return files, mesh
+    with profile_step("colors"):
+        face_colors = brick_face_colors(mesh, build_sequence, color)
+        mesh.visual.face_colors = face_colors if face_colors is not None else color
+
+    if "obj" in paths:
+        try:
+            with profile_step("obj"):
+                mesh.export(paths["obj"], file_type="obj")
+            files["obj"] = paths["obj"]
+        except Exception as e:
+            logger.error(f"Failed to export colored OBJ: {e}")
+            files["obj"] = None
+
+    if "glb" in paths:
+        with profile_step("glb"):
+            gltf_mesh = mesh.copy()
+            gltf_mesh.apply_transform(GLTF_TRANSFORM)
+            gltf_mesh.export(paths["glb"], file_type="glb")
+        files["glb"] = paths["glb"]
+    return files, mesh
+
+
+class BrickInstances(NamedTuple):
+    """Placements of one brick type, for instanced geometry.
+
+    Attributes:
+        brick: Brick type, a key of BRICK_DIMENSIONS.
+        offsets: (N, 3) corner positions in mm.
+        colors: (N, 4) uint8 RGBA colors.
+    """
+
+    brick: str
+    offsets: np.ndarray
+    colors: np.ndarray
+
+
+# Template shape and mesh of each brick type, built once per process
+_brick_templates: Dict[str, Tuple[Part, trimesh.Trimesh]] = {}
+_brick_templates_lock = threading.Lock()
+
+
+def brick_instances(
+    build_sequence: Any,
+    default_color: Sequence[int]
+) -> Optional[List[BrickInstances]]:
+    """Group a build_sequence by brick type.
+
+    Args:
+        build_sequence: Brick placements with "brick", "color" and "position".
+        default_color: RGBA for bricks with unknown color names.
+
+    Returns:
+        One BrickInstances per brick type used, or None unless every entry
+        is a brick of a known type with a numeric position.
+    """
+    if not isinstance(build_sequence, list) or not build_sequence:
+        return None
+    offsets: Dict[str, List[Tuple[float, float, float]]] = {}
+    colors: Dict[str, List[Sequence[int]]] = {}
+    for brick in build_sequence:
+        corner = _brick_position(brick)
+        if corner is None:
+            return None
+        offsets.setdefault(brick["brick"], []).append(corner)
+        colors.setdefault(brick["brick"], []).append(_brick_color(brick.get("color"), default_color))
+    return [
+        BrickInstances(
+            brick_type,
+            np.array(offsets[brick_type], dtype=np.float64),
+            np.array(colors[brick_type], dtype=np.uint8),
+        )
+        for brick_type in offsets
+    ]
+
+
+def _build_brick_template(brick_type: str) -> Part:
+    """A brick with its studs, its minimum corner at the origin."""
+    width, length = BRICK_DIMENSIONS[brick_type]
+    brick = Box(
+        width * LEGO_GRID_SIZE, length * LEGO_GRID_SIZE, LEGO_BRICK_HEIGHT,
+        align=(Align.MIN, Align.MIN, Align.MIN),
+    )
+    studs = [
+        Cylinder(LEGO_STUD_RADIUS, LEGO_STUD_HEIGHT, align=(Align.CENTER, Align.CENTER, Align.MIN)).moved(
+            Location(((i + 0.5) * LEGO_GRID_SIZE, (j + 0.5) * LEGO_GRID_SIZE, LEGO_BRICK_HEIGHT))
+        )
+        for i in range(width)
+        for j in range(length)
+    ]
+    return brick.fuse(*studs)
+
+
+def brick_template(brick_type: str) -> Tuple[Part, trimesh.Trimesh]:
+    """Get the template shape and mesh of a brick type, building them on first use."""
+    template = _brick_templates.get(brick_type)
+    if template is None:
+        with _brick_templates_lock:
+            template = _brick_templates.get(brick_type)
+            if template is None:
+                shape = _build_brick_template(brick_type)
+                template = (shape, tessellate(shape))
+                _brick_templates[brick_type] = template
+    return template
+
+
+def shape_matches_bricks(shape: Any, instances: List[BrickInstances]) -> bool:
+    """Whether a shape is exactly the bricks, so their templates can stand in for it.
+
+    Every brick must be a solid of its own with the brick's bounding box
+    (studs included) and volume, so each placement is checked rather than
+    the model's totals. Fused bricks lose their covered studs and shared
+    faces, so their mesh is not the templates' and they do not match.
+    """
+    stud_volume = np.pi * LEGO_STUD_RADIUS ** 2 * LEGO_STUD_HEIGHT
+    expected: Counter = Counter()
+    volumes: Dict[Tuple[int, ...], float] = {}
+    for group in instances:
+        width, length = BRICK_DIMENSIONS[group.brick]
+        size = np.array([width * LEGO_GRID_SIZE, length * LEGO_GRID_SIZE, LEGO_BRICK_HEIGHT + LEGO_STUD_HEIGHT])
+        volume = width * length * (LEGO_GRID_SIZE ** 2 * LEGO_BRICK_HEIGHT + stud_volume)
+        for offset in group.offsets:
+            key = _placement_key(offset, offset + size)
+            expected[key] += 1
+            volumes[key] = volume
+
+    try:
+        solids = shape.solids()
+        if len(solids) != sum(expected.values()):
+            return False
+        actual: Counter = Counter()
+        for solid in solids:
+            box = solid.bounding_box(optimal=True)
+            key = _placement_key(tuple(box.min), tuple(box.max))
+            volume = volumes.get(key)
+            if volume is None or abs(solid.volume - volume) > BRICK_VOLUME_TOLERANCE * volume:
+                return False
+            actual[key] += 1
+    except Exception as e:
+        logger.debug(f"Cannot measure shape against its bricks: {e}")
+        return False
+    return actual == expected
+
+
+def _placement_key(low: Sequence[float], high: Sequence[float]) -> Tuple[int, ...]:
+    """A brick's bounding box in units of BRICK_BOUNDS_TOLERANCE, for matching placements."""
+    return tuple(int(round(value / BRICK_BOUNDS_TOLERANCE)) for value in (*low, *high))
+
+
+def instanced_brick_mesh(instances: List[BrickInstances]) -> trimesh.Trimesh:
+    """One mesh of all bricks, translating template arrays with NumPy.
+
+    Faces are colored with their brick's color.
+    """
+    vertex_blocks, face_blocks, color_blocks = [], [], []
+    vertex_count = 0
+    for group in instances:
+        _, template = brick_template(group.brick)
+        count = len(group.offsets)
+        template_vertices = len(template.vertices)
+        vertex_blocks.append((template.vertices[None, :, :] + group.offsets[:, None, :]).reshape(-1, 3))
+        starts = vertex_count + np.arange(count) * template_vertices
+        face_blocks.append((template.faces[None, :, :] + starts[:, None, None]).reshape(-1, 3))
+        color_blocks.append(np.repeat(group.colors, len(template.faces), axis=0))
+        vertex_count += count * template_vertices
+    return trimesh.Trimesh(
+        np.concatenate(vertex_blocks),
+        np.concatenate(face_blocks),
+        face_colors=np.concatenate(color_blocks),
+        process=False,
+    )
+
+
+def instanced_brick_scene(instances: List[BrickInstances]) -> trimesh.Scene:
+    """A glTF-ready scene with one mesh per brick type and color, and one node per brick."""
+    scene = trimesh.Scene()
+    for group in instances:
+        _, template = brick_template(group.brick)
+        for index, (offset, color) in enumerate(zip(group.offsets, group.colors)):
+            translation = np.eye(4)
+            translation[:3, 3] = offset
+            transform = GLTF_TRANSFORM @ translation
+            geom_name = f"{group.brick}_{'_'.join(map(str, color))}"
+            node_name = f"{group.brick}_{index}"
+            if geom_name in scene.geometry:
+                scene.graph.update(
+                    frame_to=node_name, frame_from=scene.graph.base_frame, matrix=transform, geometry=geom_name
+                )
+            else:
+                geometry = template.copy()
+                geometry.visual.face_colors = color
+                scene.add_geometry(geometry, node_name=node_name, geom_name=geom_name, transform=transform)
+    return scene
+
+
+def write_brick_exports(
+    instances: List[BrickInstances],
+    paths: Dict[str, str]
+) -> Tuple[Dict[str, Optional[str]], Optional[trimesh.Trimesh]]:
+    """Write STL, OBJ and GLB files of a brick model from the brick templates.
+
+    Args:
+        instances: The model's bricks, from brick_instances.
+        paths: Format ("stl", "obj", "glb") to output path.
+
+    Returns:
+        Tuple of (format to path for each requested format; the model's
+        mesh, or None if only the GLB scene was written).
+    """
+    files: Dict[str, Optional[str]] = {}
+    mesh = None
+    if "stl" in paths or "obj" in paths:
+        with profile_step("tessellate"):
+            mesh = instanced_brick_mesh(instances)
+        for fmt in ("stl", "obj"):
+            if fmt in paths:
+                with profile_step(fmt):
+                    mesh.export(paths[fmt], file_type=fmt)
+                files[fmt] = paths[fmt]
+    if "glb" in paths:
+        with profile_step("glb"):
+            instanced_brick_scene(instances).export(paths["glb"], file_type="glb")
+        files["glb"] = paths["glb"]
+    return files, mesh
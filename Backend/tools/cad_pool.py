@@ -0,0 +1,372 @@
+"""Persistent pool of warm CAD worker processes.
+
+Starting a process and importing build123d/OCCT for every CAD job is a
+large fixed cost on each coder iteration. CadWorkerPool keeps a few worker
+processes alive between jobs instead. Each worker runs its initializer once
+(for example to build the build123d execution scope), then serves jobs one
+at a time over a pipe.
+
+Jobs keep the isolation of the one-shot process: a job that runs past its
+timeout or crashes its worker only takes that worker down, and it is
+SIGKILLed and replaced. Workers retire after a number of jobs or once their
+resident memory passes a limit, so OCCT leaks and state left behind by
+scripts do not accumulate.
+
+Workers also run under setrlimit caps, so one runaway script cannot hold
+a core and gigabytes of memory for the whole wall-clock timeout: the
+address space a worker may grow by is capped, and each job gets a CPU-time
+budget after which it is aborted.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default worker limits
+DEFAULT_MAX_JOBS_PER_WORKER = 50
+DEFAULT_MAX_RSS_MB = 2048
+DEFAULT_MAX_MEMORY_MB = 4096
+
+# Seconds to wait for a worker to exit before killing it
+SHUTDOWN_GRACE_SECONDS = 5.0
+
+# Threads waiting on worker results for run_async callers
+MAX_ASYNC_WAITERS = 64
+
+
+class CadWorkerError(RuntimeError):
+    """A worker process died or its job raised."""
+
+
+class CpuTimeExceeded(BaseException):
+    """Raised inside a worker when a job uses up its CPU-time budget.
+
+    A BaseException, so the job's own `except Exception` handlers do not
+    swallow it.
+    """
+
+
+def _statm_bytes(field: int) -> int:
+    """A /proc/self/statm field (0: address space, 1: resident set) in bytes."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[field]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        return _statm_bytes(1)
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def limit_address_space(max_growth_mb: int) -> None:
+    """Cap how far this process's address space may grow past its current size.
+
+    The cap is relative because a forked worker inherits the parent's
+    mappings (ML libraries reserve gigabytes of address space they never use).
+    Allocations past it fail with MemoryError / Standard_OutOfMemory.
+
+    Args:
+        max_growth_mb: Megabytes of address space allowed on top of the current size. 0 disables the cap.
+    """
+    if max_growth_mb <= 0:
+        return
+    try:
+        limit = _statm_bytes(0) + max_growth_mb * 1024 * 1024
+    except (OSError, ValueError, IndexError):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _cpu_seconds_used() -> float:
+    """CPU time used by this process so far, all threads included."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _raise_cpu_time_exceeded(signum: int, frame: Any) -> None:
+    """SIGXCPU handler aborting the running job."""
+    raise CpuTimeExceeded("CPU time limit exceeded")
+
+
+def set_cpu_budget(seconds: Optional[float]) -> None:
+    """Send SIGXCPU once this process has used `seconds` more CPU time.
+
+    Only the soft limit moves, so it can be raised again for the next job.
+
+    Args:
+        seconds: CPU seconds from now, or None to remove the budget.
+    """
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        soft = math.ceil(_cpu_seconds_used() + seconds)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(
+    conn: Connection,
+    initializer: Optional[Callable[[], None]],
+    max_jobs: int,
+    max_rss_bytes: int,
+    max_memory_mb: int = 0
+) -> None:
+    """Serve jobs from the pipe until retired or told to stop.
+
+    Each job is (func, args, cpu_seconds). Each reply is ((ok, value), retire):
+    the job's return value or error message, and whether the worker exits
+    after sending it. Workers retire after a job hits a resource limit, as
+    OCCT may be left in a broken state.
+    """
+    if initializer is not None:
+        initializer()
+    signal.signal(signal.SIGXCPU, _raise_cpu_time_exceeded)
+    limit_address_space(max_memory_mb)
+    jobs = 0
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        func, args, cpu_seconds = job
+        limit_hit = False
+        try:
+            set_cpu_budget(cpu_seconds)
+            outcome: Tuple[bool, Any] = (True, func(*args))
+        except CpuTimeExceeded:
+            limit_hit = True
+            outcome = (False, f"CPU time limit of {cpu_seconds:.0f}s exceeded")
+        except MemoryError:
+            limit_hit = True
+            outcome = (False, f"Memory limit of {max_memory_mb} MB exceeded")
+        except Exception as e:
+            outcome = (False, f"{type(e).__name__}: {e}")
+        finally:
+            try:
+                set_cpu_budget(None)
+            except CpuTimeExceeded:
+                # SIGXCPU arrived just as the job finished
+                limit_hit = True
+
+        jobs += 1
+        retire = limit_hit or jobs >= max_jobs or (max_rss_bytes > 0 and rss_bytes() > max_rss_bytes)
+        conn.send((outcome, retire))
+        if retire:
+            return
+
+
+class _Worker:
+    """Parent-side handle for one worker process."""
+
+    def __init__(
+        self,
+        context: Any,
+        initializer: Optional[Callable[[], None]],
+        max_jobs: int,
+        max_rss_bytes: int,
+        max_memory_mb: int
+    ):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, initializer, max_jobs, max_rss_bytes, max_memory_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(SHUTDOWN_GRACE_SECONDS)
+        self.kill()
+
+    def kill(self) -> None:
+        """Terminate the worker immediately."""
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class CadWorkerPool:
+    """Fixed-size pool of long-lived worker processes with per-job timeouts.
+
+    Example:
+        pool = CadWorkerPool(processes=2, initializer=warm_up)
+        result = pool.run(_execute_and_export, (code, OUTPUT_DIR, base_name), timeout=600)
+
+    Attributes:
+        processes: Number of worker processes.
+        max_jobs_per_worker: Jobs a worker serves before it is replaced.
+        max_rss_mb: Resident memory (MB) after which a worker is replaced. 0 disables the check.
+        max_memory_mb: Address space (MB) a worker may grow by (RLIMIT_AS). 0 disables the cap.
+        max_cpu_seconds: CPU-time budget per job (RLIMIT_CPU). 0 uses the job's timeout.
+        name: What the workers do, for log and error messages.
+    """
+
+    def __init__(
+        self,
+        processes: int = 1,
+        max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER,
+        max_rss_mb: int = DEFAULT_MAX_RSS_MB,
+        initializer: Optional[Callable[[], None]] = None,
+        max_memory_mb: int = DEFAULT_MAX_MEMORY_MB,
+        max_cpu_seconds: float = 0,
+        name: str = "CAD"
+    ):
+        """Initialize the pool. Workers are started by start() or the first job."""
+        self.processes = max(1, processes)
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self.max_rss_mb = max_rss_mb
+        self.max_memory_mb = max_memory_mb
+        self.max_cpu_seconds = max_cpu_seconds
+        self.name = name
+        self._initializer = initializer
+        self._context = multiprocessing.get_context()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._waiters: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """Pre-fork the workers so the first job does not pay the start-up cost."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} worker pool is shut down")
+            if self._started:
+                return
+            for _ in range(self.processes):
+                self._idle.put(self._spawn())
+            self._started = True
+        logger.info(f"Started {self.processes} {self.name} worker(s)")
+
+    def run(self, func: Callable[..., Any], args: Tuple[Any, ...] = (), timeout: Optional[float] = None) -> Any:
+        """Run a job on the next free worker, waiting for one if all are busy.
+
+        Args:
+            func: Module-level function to call in the worker.
+            args: Positional arguments (must be picklable).
+            timeout: Seconds the job may run. None waits forever.
+
+        Returns:
+            The job's return value.
+
+        Raises:
+            multiprocessing.TimeoutError: If the job ran past the timeout. Its worker is killed and replaced.
+            CadWorkerError: If the job raised, hit a resource limit or its worker died.
+        """
+        self.start()
+        worker = self._idle.get()
+        try:
+            worker.conn.send((func, args, self._cpu_budget(timeout)))
+            if not worker.conn.poll(timeout):
+                logger.warning(f"{self.name} job timed out after {timeout}s, replacing worker {worker.process.pid}")
+                worker = self._replace(worker)
+                raise multiprocessing.TimeoutError(f"Job exceeded {timeout}s")
+            (ok, value), retire = worker.conn.recv()
+            if retire:
+                logger.info(f"Recycling {self.name} worker {worker.process.pid}")
+                worker.process.join(SHUTDOWN_GRACE_SECONDS)
+                worker = self._replace(worker)
+        except (EOFError, OSError) as e:
+            dead = worker
+            worker = self._replace(worker)
+            raise CadWorkerError(f"{self.name} worker died (exit code {dead.process.exitcode}): {e}") from e
+        finally:
+            self._release(worker)
+
+        if not ok:
+            raise CadWorkerError(value)
+        return value
+
+    async def run_async(
+        self,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...] = (),
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run a job without blocking the event loop.
+
+        Waiting for a free worker and for the result happens on the pool's
+        own threads, so CAD jobs never tie up the loop's default executor.
+        Takes the same arguments and raises the same errors as run().
+        """
+        with self._lock:
+            if self._waiters is None:
+                self._waiters = ThreadPoolExecutor(max_workers=MAX_ASYNC_WAITERS, thread_name_prefix="cad-wait")
+            waiters = self._waiters
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(waiters, self.run, func, args, timeout)
+
+    def shutdown(self) -> None:
+        """Stop every worker. Jobs still running are killed."""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+            waiters, self._waiters = self._waiters, None
+        for worker in workers:
+            worker.stop()
+        if waiters is not None:
+            waiters.shutdown(wait=False)
+
+    def _cpu_budget(self, timeout: Optional[float]) -> Optional[float]:
+        """CPU seconds a job may use: max_cpu_seconds, capped by its wall-clock timeout."""
+        budgets = [limit for limit in (self.max_cpu_seconds, timeout) if limit]
+        return min(budgets) if budgets else None
+
+    def _spawn(self) -> _Worker:
+        """Start a worker and track it."""
+        worker = _Worker(
+            self._context,
+            self._initializer,
+            self.max_jobs_per_worker,
+            self.max_rss_mb * 1024 * 1024,
+            self.max_memory_mb,
+        )
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Kill a worker and start a fresh one in its place."""
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self._closed:
+                return worker
+            return self._spawn()
+
+    def _release(self, worker: _Worker) -> None:
+        """Return a worker to the idle queue."""
+        if self._closed:
+            worker.kill()
+            return
+        self._idle.put(worker)
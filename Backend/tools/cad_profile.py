@@ -0,0 +1,223 @@
+"""Step timings and sampled hot spots of CAD jobs.
+
+When a build is slow, the total time alone does not say whether the
+script's booleans and fillets or the exports were to blame. CadProfiler
+records wall time, CPU time and peak resident memory for each step of a
+job (script execution, BREP, every export format), and samples the call
+stack to rank the build123d operations and script lines the time
+went to.
+
+Sampling uses a SIGPROF CPU-time timer rather than a sampling thread: OCP
+holds the GIL while OCCT runs, so a thread could not take samples during
+a long boolean. The signal handler runs as soon as the OCCT call returns,
+in the frame that made the call, and each sample is weighted by the CPU
+time since the previous one, so long calls are charged in full to the
+operation and script line that made them.
+
+Steps are marked with profile_step(), which does nothing unless a
+profiler is active, so library code can mark its steps unconditionally.
+"""
+
+import contextvars
+import linecache
+import logging
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Dict, Iterator, Optional
+
+from tools.cad_pool import rss_bytes
+
+logger = logging.getLogger(__name__)
+
+# CPU seconds between stack samples
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Entries in each hot-spot ranking
+TOP_N = 10
+
+# Packages whose functions count as operations, e.g. build123d's fillet. OCP has
+# no Python frames; its calls are charged to the build123d function making them
+OPERATION_PACKAGES = ("build123d", "trimesh")
+
+# File name prefix of compiled scripts (see cad_tools._compile_script)
+SCRIPT_FILENAME_PREFIX = "<cad_script"
+
+# Frames inspected per sample
+MAX_STACK_DEPTH = 128
+
+_MB = 1024 * 1024
+
+_active_profiler: contextvars.ContextVar[Optional["CadProfiler"]] = contextvars.ContextVar(
+    "cad_profiler", default=None
+)
+
+
+def _operation_name(frame: FrameType) -> Optional[str]:
+    """The package-qualified function of a frame if it belongs to an operation package."""
+    module = frame.f_globals.get("__name__", "")
+    if module.split(".", 1)[0] not in OPERATION_PACKAGES:
+        return None
+    code = frame.f_code
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class CadProfiler:
+    """Collects step timings and stack samples of one CAD job.
+
+    Example:
+        with CadProfiler() as profiler:
+            with profile_step("exec"):
+                exec(code, namespace, namespace)
+        result["profile"] = profiler.report()
+
+    Attributes:
+        interval: CPU seconds between stack samples.
+        top_n: Entries in each hot-spot ranking.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS, top_n: int = TOP_N):
+        """Initialize the profiler. Profiling starts when the with block is entered."""
+        self.interval = interval
+        self.top_n = top_n
+        self._steps: Dict[str, Dict[str, float]] = {}
+        self._operations: Dict[str, float] = {}
+        self._script_lines: Dict[tuple, float] = {}
+        self._sampled_seconds = 0.0
+        self._samples = 0
+        self._peak_rss = 0
+        self._last_cpu = 0.0
+        self._started = 0.0
+        self._total: Optional[float] = None
+        self._sampling = False
+        self._in_sample = False
+        self._previous_handler: Any = None
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> "CadProfiler":
+        self._started = time.perf_counter()
+        self._last_cpu = time.process_time()
+        self._peak_rss = rss_bytes()
+        self._token = _active_profiler.set(self)
+        # Signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            self._sampling = True
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._sampling:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler)
+            self._sampling = False
+        _active_profiler.reset(self._token)
+        self._total = time.perf_counter() - self._started
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Record wall time, CPU time and peak resident memory of a step.
+
+        Args:
+            name: Step name. Repeated steps are added up.
+        """
+        start_rss = rss_bytes()
+        outer_peak, self._peak_rss = self._peak_rss, start_rss
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            end_rss = rss_bytes()
+            peak = max(self._peak_rss, end_rss)
+            self._peak_rss = max(outer_peak, peak)
+            step = self._steps.setdefault(
+                name, {"seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0, "rss_delta_mb": 0.0}
+            )
+            step["seconds"] += time.perf_counter() - start_wall
+            step["cpu_seconds"] += time.process_time() - start_cpu
+            step["peak_rss_mb"] = max(step["peak_rss_mb"], peak / _MB)
+            step["rss_delta_mb"] += (end_rss - start_rss) / _MB
+
+    def report(self) -> Dict[str, Any]:
+        """The profile as a JSON-serializable dict.
+
+        Returns:
+            dict: 'total_seconds', 'steps' (name to timings and memory),
+                'hot_operations' and 'hot_script_lines' (top_n by sampled CPU
+                seconds), and 'samples'.
+        """
+        total = self._total if self._total is not None else time.perf_counter() - self._started
+        sampled = self._sampled_seconds or 1.0
+        operations = sorted(self._operations.items(), key=lambda item: item[1], reverse=True)
+        script_lines = sorted(self._script_lines.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "total_seconds": round(total, 4),
+            "steps": {
+                name: {key: round(value, 4) for key, value in step.items()}
+                for name, step in self._steps.items()
+            },
+            "hot_operations": [
+                {"operation": operation, "cpu_seconds": round(seconds, 4), "share": round(seconds / sampled, 3)}
+                for operation, seconds in operations[:self.top_n]
+            ],
+            "hot_script_lines": [
+                {
+                    "line": lineno,
+                    "code": linecache.getline(filename, lineno).strip(),
+                    "cpu_seconds": round(seconds, 4),
+                    "share": round(seconds / sampled, 3),
+                }
+                for (filename, lineno), seconds in script_lines[:self.top_n]
+            ],
+            "samples": self._samples,
+        }
+
+    def _sample(self, signum: int, frame: Optional[FrameType]) -> None:
+        """SIGPROF handler charging the CPU time since the last sample to the current stack."""
+        if self._in_sample or frame is None:
+            return
+        self._in_sample = True
+        try:
+            cpu = time.process_time()
+            weight, self._last_cpu = cpu - self._last_cpu, cpu
+            self._samples += 1
+            self._sampled_seconds += weight
+            self._peak_rss = max(self._peak_rss, rss_bytes())
+
+            # The outermost operation frame is the call the script (or the
+            # exporter) made; the innermost script frame is the line making it
+            operation = None
+            script_line = None
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                name = _operation_name(frame)
+                if name is not None:
+                    operation = name
+                elif script_line is None and frame.f_code.co_filename.startswith(SCRIPT_FILENAME_PREFIX):
+                    script_line = (frame.f_code.co_filename, frame.f_lineno)
+                frame = frame.f_back
+                depth += 1
+            if operation is not None:
+                self._operations[operation] = self._operations.get(operation, 0.0) + weight
+            if script_line is not None:
+                self._script_lines[script_line] = self._script_lines.get(script_line, 0.0) + weight
+        finally:
+            self._in_sample = False
+
+
+@contextmanager
+def profile_step(name: str) -> Iterator[None]:
+    """Time a step with the active CadProfiler. Does nothing when none is active.
+
+    Args:
+        name: Step name, e.g. "exec" or "stl".
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.step(name):
+        yield
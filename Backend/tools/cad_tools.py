@@ -5,15 +5,36 @@ and render the resulting STL files to images.
 """
 
 import os
+import json
+import asyncio
 import uuid
+import hashlib
 import logging
+import linecache
+import threading
 import contextvars
 import multiprocessing
 import traceback
-import pyvista as pv
-import trimesh
+from collections import OrderedDict
+from types import CodeType
 from build123d import *
 from config import settings
+from models.generation_options import MODEL_SIZE_SPECS, ModelSize
+from tools.cad_cache import CadOutputCache, cad_cache_key
+from tools.cad_mesh import brick_instances, shape_matches_bricks, write_brick_exports, write_mesh_exports
+from tools.cad_pool import CadWorkerPool
+from tools.cad_profile import CadProfiler, profile_step
+from tools.job_scheduler import QueueFullError, ResourceClass, get_job_scheduler
+from tools.renderer import (
+    VIEWS,
+    get_render_cache,
+    get_render_pool,
+    png_cache_key,
+    record_render_backend,
+    render_cache_digest,
+    render_views,
+    resolved_render_backend,
+)
 from tools.security import validate_code
 
 # Configure logging
@@ -25,9 +46,42 @@ task_id_var = contextvars.ContextVar("task_id", default=None)
 # Context variable to track the current generation prompt (for colored OBJ)
 prompt_var = contextvars.ContextVar("generation_prompt", default="")
 
+# Formats create_cad_model can export. A BREP of the result is always kept so
+# formats left out of a request can be exported later without re-running the script
+EXPORT_FORMATS = ("step", "stl", "glb", "obj")
+
+# Context variable selecting the formats create_cad_model exports up front
+export_formats_var = contextvars.ContextVar("export_formats", default=EXPORT_FORMATS)
+
 OUTPUT_DIR = settings.OUTPUT_DIR
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Seconds a CAD script may run before its worker is killed. Tasks with a
+# model size get that size's (shorter) limit from MODEL_SIZE_SPECS
+CAD_TIMEOUT_SECONDS = settings.CAD_TIMEOUT_SECONDS
+
+# Context variable holding the task's ModelSize value, for the CAD wall clock
+model_size_var = contextvars.ContextVar("model_size", default=None)
+
+# build123d names available to scripts, built once per worker process
+_build123d_scope: dict | None = None
+
+# Compiled scripts per worker process, by script hash. Retries and cache
+# misses of the same script skip parsing and compiling it again
+SCRIPT_CODE_CACHE_SIZE = 64
+_script_code_cache: "OrderedDict[str, CodeType]" = OrderedDict()
+
+# Mesh arrays of recent builds, by STL path, so verification renders what
+# the CAD worker tessellated instead of reading the STL back
+CAD_MESH_CACHE_SIZE = 8
+_cad_meshes: "OrderedDict[str, tuple]" = OrderedDict()
+_cad_meshes_lock = threading.Lock()
+
+_cad_pool: CadWorkerPool | None = None
+_cad_pool_lock = threading.Lock()
+
+_cad_cache: CadOutputCache | None = None
+
 # Color mapping for prompt keywords (RGBA, 0-255)
 PROMPT_COLOR_MAP = {
     "tree": [34, 139, 34, 255],      # Forest Green
@@ -70,114 +124,445 @@ def _get_color_from_prompt(prompt: str) -> list:
     return DEFAULT_COLOR
 
 
-def _stl_to_colored_obj(stl_path: str, prompt: str, output_dir: str, base_name: str) -> str | None:
-    """Convert STL to colored OBJ file.
-    
+def _get_build123d_scope() -> dict:
+    """Get the public build123d names, building the mapping on first use.
+
+    Returns:
+        dict: Name to build123d object. Callers must copy it before executing into it.
+    """
+    global _build123d_scope
+    if _build123d_scope is None:
+        import build123d
+        _build123d_scope = {name: getattr(build123d, name) for name in dir(build123d) if not name.startswith("_")}
+        _build123d_scope["__name__"] = "cad_script"
+    return _build123d_scope
+
+
+def _compile_script(script_code: str) -> CodeType:
+    """Compile a script, reusing the code object of an earlier job with the same script.
+
+    The source is registered with linecache under the script's own file name,
+    so tracebacks of failing scripts show the offending lines.
+
     Args:
-        stl_path: Path to the source STL file.
-        prompt: The generation prompt (for color determination).
-        output_dir: Directory to save the OBJ file.
-        base_name: Base name for the output file.
-        
+        script_code (str): The build123d script.
+
+    Returns:
+        CodeType: The compiled module code.
+
+    Raises:
+        SyntaxError: If the script is not valid Python.
+    """
+    digest = hashlib.sha256(script_code.encode()).hexdigest()
+    code = _script_code_cache.get(digest)
+    if code is not None:
+        _script_code_cache.move_to_end(digest)
+        return code
+    filename = f"<cad_script {digest[:12]}>"
+    code = compile(script_code, filename, "exec")
+    linecache.cache[filename] = (len(script_code), None, script_code.splitlines(True), filename)
+    _script_code_cache[digest] = code
+    while len(_script_code_cache) > SCRIPT_CODE_CACHE_SIZE:
+        _, evicted = _script_code_cache.popitem(last=False)
+        linecache.cache.pop(evicted.co_filename, None)
+    return code
+
+
+def get_cad_pool() -> CadWorkerPool:
+    """Get the process-wide CAD worker pool, creating it on first use.
+
+    Workers build the build123d execution scope when they start, so jobs only
+    pay for executing and exporting the script.
+
+    Returns:
+        CadWorkerPool: The shared pool.
+    """
+    global _cad_pool
+    with _cad_pool_lock:
+        if _cad_pool is None:
+            _cad_pool = CadWorkerPool(
+                processes=settings.CAD_WORKERS,
+                max_jobs_per_worker=settings.CAD_WORKER_MAX_JOBS,
+                max_rss_mb=settings.CAD_WORKER_MAX_RSS_MB,
+                initializer=_get_build123d_scope,
+                max_memory_mb=settings.CAD_WORKER_MAX_MEMORY_MB,
+                max_cpu_seconds=settings.CAD_WORKER_MAX_CPU_SECONDS,
+            )
+        return _cad_pool
+
+
+def shutdown_cad_pool() -> None:
+    """Stop the CAD worker pool, if it was started."""
+    global _cad_pool
+    with _cad_pool_lock:
+        pool, _cad_pool = _cad_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def get_cad_cache() -> CadOutputCache:
+    """Get the process-wide CAD output cache, creating it on first use.
+
+    Returns:
+        CadOutputCache: The shared cache.
+    """
+    global _cad_cache
+    if _cad_cache is None:
+        _cad_cache = CadOutputCache(settings.CAD_CACHE_DIR, settings.CAD_CACHE_MAX_ENTRIES)
+    return _cad_cache
+
+
+def _cached_cad_model(job_args: tuple) -> tuple[str, bool]:
+    """Look up a previous build of the same script.
+
+    On a hit the cached files are placed under the job's base name.
+
+    Args:
+        job_args (tuple): The _execute_and_export arguments.
+
+    Returns:
+        tuple[str, bool]: The cache key, and whether it was a hit.
+    """
+    script_code, output_dir, base_name, prompt, _ = job_args
+    # The OBJ color comes from the prompt, so it is part of the key
+    color = _get_color_from_prompt(prompt)
+    variant = ",".join(map(str, color))
+    if settings.CAD_INSTANCED_BRICKS:
+        variant += ";instanced"
+    key = cad_cache_key(script_code, variant=variant)
+    if get_cad_cache().get(key, output_dir, base_name) is None:
+        return key, False
+    if not os.path.exists(_export_manifest_path(output_dir, base_name)):
+        # Entry cached without its manifest; per-brick colors are lost
+        _write_export_manifest(output_dir, base_name, color)
+    return key, True
+
+
+def _store_cad_model(key: str, result: dict, output_dir: str, base_name: str) -> None:
+    """Cache the files of a successful build, with its export manifest."""
+    if result.get("success"):
+        manifest_path = _export_manifest_path(output_dir, base_name)
+        files = dict(result["files"])
+        if os.path.exists(manifest_path):
+            files["export.json"] = manifest_path
+        get_cad_cache().put(key, files)
+
+
+def _keep_cad_mesh(result: dict) -> None:
+    """Move a worker result's mesh arrays into the per-process mesh cache.
+
+    The arrays are for rendering in this process; they are not part of the
+    result returned to tools and agents.
+    """
+    mesh = result.pop("mesh", None)
+    if mesh is None or not result.get("success"):
+        return
+    with _cad_meshes_lock:
+        _cad_meshes[os.path.normpath(result["files"]["stl"])] = mesh
+        while len(_cad_meshes) > CAD_MESH_CACHE_SIZE:
+            _cad_meshes.popitem(last=False)
+
+
+def take_cad_mesh(stl_path: str) -> tuple | None:
+    """Hand over the mesh arrays the CAD worker tessellated for an STL.
+
+    Each mesh is handed over once, so the memory goes with it.
+
+    Args:
+        stl_path (str): Path of the STL from create_cad_model's files.
+
+    Returns:
+        tuple | None: (vertices, faces) arrays, or None if the build was served
+            from the CAD cache or is no longer held.
+    """
+    with _cad_meshes_lock:
+        return _cad_meshes.pop(os.path.normpath(stl_path), None)
+
+
+def _export_manifest_path(output_dir: str, base_name: str) -> str:
+    """Path of the file recording how deferred formats of a build are exported."""
+    return os.path.join(output_dir, f"{base_name}.export.json")
+
+
+def _write_export_manifest(
+    output_dir: str, base_name: str, color: list, build_sequence=None, instanced: bool = False
+) -> None:
+    """Record the colors of a build for formats exported later.
+
+    Args:
+        output_dir (str): Directory holding the build's files.
+        base_name (str): Base name of the build.
+        color (list): RGBA color from the prompt.
+        build_sequence: The script's build_sequence, for per-brick colors.
+        instanced (bool): Whether the model was assembled from brick templates.
+    """
+    manifest = {"color": color}
+    if isinstance(build_sequence, list):
+        manifest["build_sequence"] = build_sequence
+        manifest["instanced"] = instanced
+    try:
+        payload = json.dumps(manifest)
+    except (TypeError, ValueError):
+        # Not plain data; deferred exports fall back to the single color
+        payload = json.dumps({"color": color})
+    with open(_export_manifest_path(output_dir, base_name), "w") as f:
+        f.write(payload)
+
+
+def _read_export_manifest(output_dir: str, base_name: str) -> tuple[list, list | None, bool]:
+    """Get the color and build_sequence recorded for a build.
+
     Returns:
-        Path to the generated OBJ file, or None if conversion failed.
+        tuple[list, list | None, bool]: The RGBA color (the default if unrecorded),
+            the build_sequence if one was recorded, and whether the model was
+            assembled from brick templates.
     """
     try:
-        # Get color based on prompt keywords
-        color = _get_color_from_prompt(prompt)
-        
-        # Load STL mesh
-        mesh = trimesh.load(stl_path)
-        
-        # Apply color to all faces
-        # trimesh uses RGBA with 0-255 values
-        mesh.visual.face_colors = color
-        
-        # Export to OBJ
-        obj_path = os.path.join(output_dir, f"{base_name}.obj")
-        mesh.export(obj_path, file_type='obj')
-        
-        logger.info(f"Converted STL to colored OBJ: {obj_path} with color {color}")
-        return obj_path
-    except Exception as e:
-        logger.error(f"Failed to convert STL to OBJ: {e}")
-        return None
+        with open(_export_manifest_path(output_dir, base_name)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return DEFAULT_COLOR, None, False
+    return manifest.get("color", DEFAULT_COLOR), manifest.get("build_sequence"), manifest.get("instanced", False)
+
+
+def _export_shape(
+    shape, output_dir: str, base_name: str, formats, color: list, build_sequence=None, instanced: bool = False
+) -> dict:
+    """Export a shape to the requested formats.
 
+    The mesh formats are written from a single tessellation of the shape,
+    or from the brick templates for models assembled from them.
 
-def _execute_and_export(script_code: str, output_dir: str, base_name: str, prompt: str = "") -> dict:
-    """Execute code and export files in a separate process.
+    Args:
+        shape: The build123d shape.
+        output_dir (str): Directory to save output files.
+        base_name (str): Base name for output files.
+        formats: Formats to write, from EXPORT_FORMATS.
+        color (list): RGBA color for the OBJ and GLB.
+        build_sequence: Brick placements giving each brick its own color.
+        instanced (bool): Whether shape was assembled from build_sequence's brick templates.
+
+    Returns:
+        tuple[dict, trimesh.Trimesh | None]: Format to path for each written file
+            (None for a failed OBJ), and the mesh the files were written from.
+    """
+    files = {}
+    if "step" in formats:
+        files["step"] = os.path.join(output_dir, f"{base_name}.step")
+        with profile_step("step"):
+            export_step(shape, files["step"])
+
+    mesh_paths = {
+        fmt: os.path.join(output_dir, f"{base_name}.{fmt}")
+        for fmt in ("stl", "obj", "glb") if fmt in formats
+    }
+    instances = brick_instances(build_sequence, color) if instanced else None
+    mesh = None
+    if mesh_paths and instances is not None:
+        mesh_files, mesh = write_brick_exports(instances, mesh_paths)
+        files.update(mesh_files)
+    elif mesh_paths:
+        mesh_files, mesh = write_mesh_exports(shape, mesh_paths, color, build_sequence)
+        files.update(mesh_files)
+    return files, mesh
+
+
+def _execute_and_export(
+    script_code: str,
+    output_dir: str,
+    base_name: str,
+    prompt: str = "",
+    formats=EXPORT_FORMATS,
+    profile: bool | None = None
+) -> dict:
+    """Execute code and export files in a CAD worker process.
 
     Args:
         script_code (str): The Python script to execute.
         output_dir (str): Directory to save output files.
         base_name (str): Base name for output files.
         prompt (str): The user's generation prompt (for color determination).
+        formats: Formats to export now, from EXPORT_FORMATS. The others can
+            be exported later with ensure_cad_exports.
+        profile (bool | None): Add a 'profile' report (CadProfiler.report) of
+            step timings, peak memory and hot operations. None follows settings.CAD_PROFILE.
 
     Returns:
-        dict: Result dictionary with success status and file paths.
+        dict: Result dictionary with success status and file paths, and the
+            STL's (vertices, faces) arrays as 'mesh' when one was written.
     """
+    if not (settings.CAD_PROFILE if profile is None else profile):
+        return _build_and_export(script_code, output_dir, base_name, prompt, formats)
+    with CadProfiler() as profiler:
+        result = _build_and_export(script_code, output_dir, base_name, prompt, formats)
+    result["profile"] = profiler.report()
+    steps = ", ".join(f"{name}: {step['seconds']:.2f}s" for name, step in result["profile"]["steps"].items())
+    logger.info(f"CAD profile of {base_name}: {steps}")
+    return result
+
+
+def _build_and_export(script_code: str, output_dir: str, base_name: str, prompt: str, formats) -> dict:
+    """Build a script's shape and export it. See _execute_and_export."""
     try:
         # Validate code before execution
-        validate_code(script_code)
+        with profile_step("validate"):
+            validate_code(script_code)
+        color = _get_color_from_prompt(prompt)
+
+        # Populate the execution scope with build123d symbols
+        # This avoids verbose explicit imports; the copy keeps each job's state separate
+        namespace = dict(_get_build123d_scope())
+
+        # Execute the script as a module: one namespace for globals and
+        # locals, so functions defined in the script see its top-level names
+        with profile_step("exec"):
+            exec(_compile_script(script_code), namespace, namespace)
 
-        # Dynamically populate the execution scope with build123d symbols
-        # This avoids verbose explicit imports while ensuring a clean state
-        import build123d
-        local_scope = {name: getattr(build123d, name) for name in dir(build123d) if not name.startswith("_")}
-        
-        # Execute the script
-        exec(script_code, {}, local_scope)
-        
         # Look for 'result' or 'part'
-        result_obj = local_scope.get("result") or local_scope.get("part")
-        
+        result_obj = namespace.get("result") or namespace.get("part")
+
         if not result_obj:
             return {
                 "success": False, 
                 "error": "No 'result' or 'part' variable defined."
             }
-
-        step_path = os.path.join(output_dir, f"{base_name}.step")
-        stl_path = os.path.join(output_dir, f"{base_name}.stl")
-        glb_path = os.path.join(output_dir, f"{base_name}.glb")
-
-        export_step(result_obj, step_path)
-        export_stl(result_obj, stl_path)
-        
-        # New: Export GLTF for web viewer
-        export_gltf(result_obj, glb_path)
-        
-        # Convert STL to colored OBJ (legacy support)
-        obj_path = _stl_to_colored_obj(stl_path, prompt, output_dir, base_name)
-        
-        return {
+        build_sequence = namespace.get("build_sequence")
+
+        # Meshes of a model that is exactly its build_sequence's bricks are
+        # written from the brick templates instead of tessellating the shape
+        instances = brick_instances(build_sequence, color) if settings.CAD_INSTANCED_BRICKS else None
+        if instances is not None:
+            with profile_step("match"):
+                if not shape_matches_bricks(result_obj, instances):
+                    instances = None
+
+        # Keep the exact shape for deferred exports
+        brep_path = os.path.join(output_dir, f"{base_name}.brep")
+        with profile_step("brep"):
+            export_brep(result_obj, brep_path)
+        instanced = instances is not None
+        _write_export_manifest(output_dir, base_name, color, build_sequence, instanced)
+
+        files, mesh = _export_shape(result_obj, output_dir, base_name, formats, color, build_sequence, instanced)
+        result = {
             "success": True,
-            "files": {
-                "step": step_path,
-                "stl": stl_path,
-                "glb": glb_path,
-                "obj": obj_path  # May be None if conversion failed
-            }
+            "files": {"brep": brep_path, **files}
         }
+        if mesh is not None and "stl" in files:
+            # Handed to the caller's process, see take_cad_mesh
+            result["mesh"] = (mesh.vertices, mesh.faces)
+        return result
     except Exception as e:
         return {
             "success": False, 
             "error": f"Execution failed: {str(e)}\n{traceback.format_exc()}"
         }
 
-def create_cad_model(script_code: str, prompt: str = "") -> dict:
-    """Executes build123d code and exports STEP/STL/OBJ.
 
-    Runs in a separate process with a timeout.
+def _export_from_brep(output_dir: str, base_name: str, formats) -> dict:
+    """Export deferred formats of a build from its BREP in a CAD worker process.
 
     Args:
-        script_code (str): The build123d script to execute.
-        prompt (str): The user's generation prompt (for color determination in OBJ).
-                     If not provided, uses prompt_var context variable.
+        output_dir (str): Directory holding the build's files.
+        base_name (str): Base name of the build.
+        formats: Formats to export, from EXPORT_FORMATS.
+
+    Returns:
+        dict: Result dictionary with success status and file paths.
+    """
+    try:
+        shape = import_brep(os.path.join(output_dir, f"{base_name}.brep"))
+        color, build_sequence, instanced = _read_export_manifest(output_dir, base_name)
+        files, _ = _export_shape(shape, output_dir, base_name, formats, color, build_sequence, instanced)
+        return {"success": True, "files": files}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Export failed: {str(e)}\n{traceback.format_exc()}"
+        }
+
+
+def _existing_exports(output_dir: str, base_name: str, formats) -> tuple[dict, list]:
+    """Split requested formats into files already on disk and formats still missing."""
+    files = {}
+    missing = []
+    for fmt in ("brep", *formats):
+        path = os.path.join(output_dir, f"{base_name}.{fmt}")
+        if os.path.exists(path):
+            files[fmt] = path
+        elif fmt != "brep":
+            missing.append(fmt)
+    return files, missing
+
+
+def _export_job(output_dir: str, base_name: str, formats) -> tuple[dict | None, tuple]:
+    """Work out what ensure_cad_exports has to do.
+
+    Returns:
+        tuple[dict | None, tuple]: The result if nothing needs exporting (None otherwise),
+            and the _export_from_brep arguments.
+    """
+    files, missing = _existing_exports(output_dir, base_name, formats)
+    if not missing:
+        return {"success": True, "files": files}, ()
+    if "brep" not in files:
+        return {"success": False, "error": f"No CAD build found for {base_name}"}, ()
+    return None, (output_dir, base_name, tuple(missing))
+
+
+def ensure_cad_exports(output_dir: str, base_name: str, formats=EXPORT_FORMATS) -> dict:
+    """Export formats that a build deferred, reusing files already written.
+
+    Args:
+        output_dir (str): Directory holding the build's files.
+        base_name (str): Base name of the build.
+        formats: Formats that must exist afterwards, from EXPORT_FORMATS.
 
     Returns:
         dict: A dictionary containing 'success', 'error', and 'files' (dict of paths).
     """
+    result, job_args = _export_job(output_dir, base_name, formats)
+    if result is not None:
+        return result
+    try:
+        with get_job_scheduler().slot(ResourceClass.CAD):
+            result = get_cad_pool().run(_export_from_brep, job_args, timeout=CAD_TIMEOUT_SECONDS)
+    except Exception as e:
+        return _cad_job_error(e)
+    return _merge_exports(output_dir, base_name, formats, result)
+
+
+async def ensure_cad_exports_async(output_dir: str, base_name: str, formats=EXPORT_FORMATS) -> dict:
+    """ensure_cad_exports without blocking the event loop."""
+    result, job_args = _export_job(output_dir, base_name, formats)
+    if result is not None:
+        return result
+    try:
+        async with get_job_scheduler().slot_async(ResourceClass.CAD):
+            result = await get_cad_pool().run_async(_export_from_brep, job_args, timeout=CAD_TIMEOUT_SECONDS)
+    except Exception as e:
+        return _cad_job_error(e)
+    return _merge_exports(output_dir, base_name, formats, result)
+
+
+def _merge_exports(output_dir: str, base_name: str, formats, result: dict) -> dict:
+    """Combine newly exported files with the ones that already existed."""
+    if not result.get("success"):
+        return result
+    files, _ = _existing_exports(output_dir, base_name, formats)
+    return {"success": True, "files": {**files, **result["files"]}}
+
+
+def _cad_job_args(script_code: str, prompt: str) -> tuple:
+    """Build the _execute_and_export arguments for the current task.
+
+    Args:
+        script_code (str): The build123d script to execute.
+        prompt (str): The generation prompt, or "" to use prompt_var.
+
+    Returns:
+        tuple: (script_code, output_dir, base_name, prompt, formats).
+    """
     # Use task ID if available, otherwise UUID
     task_id = task_id_var.get()
     if task_id:
@@ -187,78 +572,110 @@ def create_cad_model(script_code: str, prompt: str = "") -> dict:
     
     # Get prompt from context variable if not passed directly
     effective_prompt = prompt if prompt else prompt_var.get()
+    return (script_code, OUTPUT_DIR, base_name, effective_prompt, tuple(export_formats_var.get()))
 
-    # Run in a separate process to allow timeout and isolation
-    with multiprocessing.Pool(processes=1) as pool:
-        async_result = pool.apply_async(_execute_and_export, (script_code, OUTPUT_DIR, base_name, effective_prompt))
-        try:
-            # 10 minute timeout (600 seconds)
-            result = async_result.get(timeout=600)
-            return result
-        except multiprocessing.TimeoutError:
-            return {
-                "success": False, 
-                "error": "Execution timed out (10 min limit). The model might be too complex."
-            }
-        except Exception as e:
-            return {
-                "success": False, 
-                "error": f"Process error: {str(e)}"
-            }
 
-def _render_worker(stl_path: str, output_dir: str, base_name: str) -> dict:
-    """Render the STL in a separate process.
+def _cad_timeout() -> float:
+    """Wall-clock limit for a CAD script of the current task's model size."""
+    try:
+        spec = MODEL_SIZE_SPECS.get(ModelSize(model_size_var.get()))
+    except ValueError:
+        spec = None
+    if spec is None:
+        return CAD_TIMEOUT_SECONDS
+    return min(spec["cad_timeout_seconds"], CAD_TIMEOUT_SECONDS)
+
+
+def _cad_job_error(error: Exception, timeout: float = CAD_TIMEOUT_SECONDS) -> dict:
+    """Convert a worker pool error into a create_cad_model result."""
+    if isinstance(error, multiprocessing.TimeoutError):
+        return {
+            "success": False, 
+            "error": f"Execution timed out ({timeout:.0f}s limit). The model might be too complex."
+        }
+    if isinstance(error, QueueFullError):
+        return {"success": False, "error": str(error)}
+    return {
+        "success": False, 
+        "error": f"Process error: {str(error)}"
+    }
+
+
+def create_cad_model(script_code: str, prompt: str = "") -> dict:
+    """Executes build123d code and exports STEP/STL/OBJ.
+
+    Runs on a warm worker from the CAD worker pool with a timeout, once the
+    job scheduler grants a CAD slot. Scripts built before are served from
+    the CAD output cache. Only the formats in export_formats_var are
+    exported; ensure_cad_exports adds the others later. Blocks until the
+    model is built; use create_cad_model_async from async code.
 
     Args:
-        stl_path (str): Path to the STL file.
-        output_dir (str): Directory to save images.
-        base_name (str): Base name for output images.
+        script_code (str): The build123d script to execute.
+        prompt (str): The user's generation prompt (for color determination in OBJ).
+                     If not provided, uses prompt_var context variable.
 
     Returns:
-        dict: Result dictionary with success status and image paths.
+        dict: A dictionary containing 'success', 'error', and 'files' (dict of paths).
     """
-    try:
-        # Configure PyVista for headless rendering with EGL/OSMesa
-        pv.OFF_SCREEN = True
-        
-        # Force EGL or OSMesa if available (avoids X server requirement)
-        # Note: This requires libosmesa6-dev in Dockerfile
+    job_args = _cad_job_args(script_code, prompt)
+    _, output_dir, base_name, _, formats = job_args
+    key, hit = _cached_cad_model(job_args)
+    if hit:
+        # The cached build may lack formats this request exports up front
+        result = ensure_cad_exports(output_dir, base_name, formats)
+    else:
+        # Run in a worker process to allow timeout and isolation
+        timeout = _cad_timeout()
         try:
-            pv.start_xvfb() # No-op if not needed, but safe to remove if using pure EGL
-        except:
-            pass
-            
-        plotter = pv.Plotter(off_screen=True)
-        mesh = pv.read(stl_path)
-        plotter.add_mesh(mesh, color="lightblue", show_edges=True)
-        plotter.set_background("white")
-
-        # Views to generate
-        views = {
-            "iso": lambda p: p.view_isometric(),
-            "top": lambda p: p.view_xy(),
-            "front": lambda p: p.view_xz(), # Assuming Y-up or Z-up, adjust as needed
-            "right": lambda p: p.view_yz()
-        }
+            with get_job_scheduler().slot(ResourceClass.CAD):
+                result = get_cad_pool().run(_execute_and_export, job_args, timeout=timeout)
+        except Exception as e:
+            return _cad_job_error(e, timeout)
+        _keep_cad_mesh(result)
+    _store_cad_model(key, result, output_dir, base_name)
+    return result
 
-        image_paths = []
-        for name, view_func in views.items():
-            view_func(plotter)
-            plotter.camera.zoom(1.2)
-            out_path = os.path.join(output_dir, f"{base_name}_{name}.png")
-            plotter.screenshot(out_path)
-            image_paths.append(out_path)
-        
-        plotter.close()
-        return {"success": True, "images": image_paths}
 
-    except Exception as e:
-        return {"success": False, "error": f"Rendering failed: {str(e)}\n{traceback.format_exc()}"}
+async def create_cad_model_async(script_code: str, prompt: str = "") -> dict:
+    """Executes build123d code and exports STEP/STL/OBJ without blocking the event loop.
+
+    Same as create_cad_model, but awaits the worker pool so other tasks keep
+    running while the model is built, and does the CAD cache's file copies
+    in a thread.
+
+    Args:
+        script_code (str): The build123d script to execute.
+        prompt (str): The user's generation prompt (for color determination in OBJ).
+                     If not provided, uses prompt_var context variable.
+
+    Returns:
+        dict: A dictionary containing 'success', 'error', and 'files' (dict of paths).
+    """
+    job_args = _cad_job_args(script_code, prompt)
+    _, output_dir, base_name, _, formats = job_args
+    # Cache lookups and stores copy files; keep that disk I/O off the event loop
+    key, hit = await asyncio.to_thread(_cached_cad_model, job_args)
+    if hit:
+        result = await ensure_cad_exports_async(output_dir, base_name, formats)
+    else:
+        timeout = _cad_timeout()
+        try:
+            async with get_job_scheduler().slot_async(ResourceClass.CAD):
+                result = await get_cad_pool().run_async(_execute_and_export, job_args, timeout=timeout)
+        except Exception as e:
+            return _cad_job_error(e, timeout)
+        _keep_cad_mesh(result)
+    await asyncio.to_thread(_store_cad_model, key, result, output_dir, base_name)
+    return result
 
 def render_cad_model(stl_path: str) -> dict:
     """Renders an STL file to PNG screenshots (Iso, Top, Front, Right).
 
-    Runs in a separate process to ensure VTK/OpenGL isolation.
+    Runs on a warm render worker process (VTK/OpenGL isolation without a
+    process start per render), once the job scheduler grants a render slot.
+    Views rendered before from the same mesh are served from the render
+    cache, and only the others are rendered.
 
     Args:
         stl_path (str): Path to the STL file.
@@ -270,21 +687,43 @@ def render_cad_model(stl_path: str) -> dict:
         return {"success": False, "error": "STL file not found."}
 
     base_name = os.path.splitext(os.path.basename(stl_path))[0]
+    paths = {name: os.path.join(OUTPUT_DIR, f"{base_name}_{name}.png") for name in VIEWS}
+    cache = get_render_cache()
+    digest = render_cache_digest(stl_path) if cache.enabled else None
+    backend = resolved_render_backend()
+    keys = {}
+    if digest is not None and backend is not None:
+        keys = {name: png_cache_key(digest, (name,), backend) for name in VIEWS}
+    missing = [name for name in VIEWS if name not in keys or cache.get(keys[name], paths[name]) is None]
+    if not missing:
+        return {"success": True, "images": list(paths.values())}
+
+    # Render workers run under the same memory cap as CAD workers; a render
+    # past its timeout has its worker killed and replaced
+    timeout = settings.RENDER_TIMEOUT_SECONDS
+    try:
+        with get_job_scheduler().slot(ResourceClass.RENDER):
+            result = get_render_pool().run(render_views, (stl_path, OUTPUT_DIR, base_name, missing), timeout=timeout)
+    except QueueFullError as e:
+        return {"success": False, "error": str(e)}
+    except multiprocessing.TimeoutError:
+        return {
+            "success": False, 
+            "error": f"Rendering timed out ({timeout}s limit)."
+        }
+    except Exception as e:
+        return {
+            "success": False, 
+            "error": f"Render process error: {str(e)}"
+        }
+    if not result.get("success"):
+        return result
+    # Stored under the backend that drew the views, which "auto" only resolves in the worker
+    record_render_backend(result["backend"])
+    if digest is not None:
+        for name, path in zip(missing, result["images"]):
+            cache.put_file(png_cache_key(digest, (name,), result["backend"]), path)
+    if len(missing) < len(VIEWS):
+        result["images"] = list(paths.values())
+    return result
 
-    # Run in a separate process
-    with multiprocessing.Pool(processes=1) as pool:
-        async_result = pool.apply_async(_render_worker, (stl_path, OUTPUT_DIR, base_name))
-        try:
-            # 30 second timeout for rendering
-            result = async_result.get(timeout=30)
-            return result
-        except multiprocessing.TimeoutError:
-            return {
-                "success": False, 
-                "error": "Rendering timed out (30s limit)."
-            }
-        except Exception as e:
-            return {
-                "success": False, 
-                "error": f"Render process error: {str(e)}"
-            }
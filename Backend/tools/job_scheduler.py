@@ -0,0 +1,336 @@
+"""Admission control and bounded queues for expensive work.
+
+A burst of A2A requests would otherwise start as many agent runs, CAD
+builds and renders as there are requests, and the box thrashes. The
+JobScheduler gives each resource class (LLM agent runs, CAD jobs, renders)
+a fixed number of slots and a bounded priority queue in front of them.
+Jobs past the queue bound are rejected straight away with QueueFullError,
+which the API turns into a 429, instead of piling up.
+
+Lower priority values run first: modifications, then new generations from
+the smallest model size up. The priority of the current task is kept in
+job_priority_var, so CAD and render jobs started by a task queue with the
+task's priority.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from models.generation_options import ModelSize
+
+logger = logging.getLogger(__name__)
+
+# Sizes in the order their generations are scheduled
+_SIZE_ORDER = [size.value for size in ModelSize if size is not ModelSize.CUSTOM]
+
+# Priority of modification requests, ahead of every generation
+MODIFICATION_PRIORITY = 0
+
+
+class ResourceClass(str, Enum):
+    """Kinds of work the scheduler limits independently."""
+    LLM = "llm"        # Agent runs (designer/coder LLM calls)
+    CAD = "cad"        # build123d jobs on the CAD worker pool
+    RENDER = "render"  # STL renders
+
+
+class QueueFullError(RuntimeError):
+    """A job was rejected because its resource queue is full.
+
+    Attributes:
+        resource: The resource class that is at capacity.
+        retry_after: Seconds after which a retry is likely to be admitted.
+    """
+
+    def __init__(self, resource: ResourceClass, queued: int, retry_after: int):
+        super().__init__(f"The {resource.value} queue is full ({queued} jobs waiting). Try again later.")
+        self.resource = resource
+        self.retry_after = retry_after
+
+
+def task_priority(model_size: Optional[str] = None, modification: bool = False) -> int:
+    """Scheduling priority of a task. Lower values run first.
+
+    Args:
+        model_size: The task's ModelSize value. Custom and unknown sizes rank as small.
+        modification: Whether the task modifies an existing model.
+
+    Returns:
+        int: MODIFICATION_PRIORITY for modifications, else 1 + the size's rank.
+    """
+    if modification:
+        return MODIFICATION_PRIORITY
+    if model_size not in _SIZE_ORDER:
+        model_size = ModelSize.SMALL.value
+    return 1 + _SIZE_ORDER.index(model_size)
+
+
+# Context variable holding the current task's priority, inherited by its CAD and render jobs
+job_priority_var = contextvars.ContextVar("job_priority", default=task_priority())
+
+
+class JobTicket:
+    """A job's place in a resource queue, from admission until it releases its slot.
+
+    Use it as a (sync or async) context manager to wait for the slot and
+    release it afterwards, or call wait()/wait_async() and release().
+
+    Attributes:
+        resource: The resource class the ticket is for.
+        priority: The job's priority. Lower values are granted first.
+        enqueued_at: time.monotonic() at admission.
+        granted_at: time.monotonic() when the slot was granted, None while queued.
+    """
+
+    def __init__(self, queue: "_ResourceQueue", priority: int):
+        """Initialize a ticket. Tickets are created by JobScheduler.reserve()."""
+        self.resource = queue.resource
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.granted_at: Optional[float] = None
+        self._queue = queue
+        self._granted = threading.Event()
+        self._wakers: List[Callable[[], None]] = []
+        self._released = False
+
+    @property
+    def granted(self) -> bool:
+        """Whether the job holds its slot."""
+        return self._granted.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the slot is granted.
+
+        Args:
+            timeout: Seconds to wait. None waits forever.
+
+        Returns:
+            bool: True if the slot was granted.
+        """
+        return self._granted.wait(timeout)
+
+    async def wait_async(self) -> None:
+        """Wait for the slot without blocking the event loop.
+
+        A cancelled wait gives up the ticket's place in the queue.
+        """
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        if not self._queue._add_waker(self, wake):
+            return
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Free the slot, or leave the queue if it was not granted yet. Idempotent."""
+        self._queue._release(self)
+
+    def __enter__(self) -> "JobTicket":
+        self.wait()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "JobTicket":
+        await self.wait_async()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class _ResourceQueue:
+    """Slots and bounded priority queue of one resource class."""
+
+    def __init__(self, resource: ResourceClass, concurrency: int, max_queue: int):
+        self.resource = resource
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._waiting: List[Tuple[int, int, JobTicket]] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        # Metrics
+        self._admitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def reserve(self, priority: int) -> JobTicket:
+        """Admit a job, granting a slot straight away if one is free."""
+        with self._lock:
+            ticket = JobTicket(self, priority)
+            if self._running < self.concurrency and not self._waiting:
+                self._grant(ticket)
+            elif self.max_queue and len(self._waiting) >= self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(self.resource, len(self._waiting), self._retry_after())
+            else:
+                heapq.heappush(self._waiting, (priority, next(self._sequence), ticket))
+            self._admitted += 1
+        return ticket
+
+    def stats(self) -> dict:
+        """Current load and counters of this queue."""
+        now = time.monotonic()
+        with self._lock:
+            granted = self._admitted - len(self._waiting) - self._cancelled
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": len(self._waiting),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "avg_wait_seconds": self._wait_total / granted if granted else 0.0,
+                "max_wait_seconds": self._wait_max,
+                "oldest_wait_seconds": max((now - t.enqueued_at for _, _, t in self._waiting), default=0.0),
+                "avg_run_seconds": self._run_total / self._completed if self._completed else 0.0,
+            }
+
+    def _add_waker(self, ticket: JobTicket, wake: Callable[[], None]) -> bool:
+        """Register a callback for the grant. False if the ticket holds its slot already."""
+        with self._lock:
+            if ticket.granted:
+                return False
+            ticket._wakers.append(wake)
+            return True
+
+    def _grant(self, ticket: JobTicket) -> None:
+        """Hand a slot to a ticket. Called with the lock held."""
+        self._running += 1
+        ticket.granted_at = time.monotonic()
+        waited = ticket.granted_at - ticket.enqueued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        if waited >= 1.0:
+            logger.info(f"{self.resource.value} job (priority {ticket.priority}) waited {waited:.1f}s for a slot")
+        ticket._granted.set()
+        for wake in ticket._wakers:
+            wake()
+
+    def _release(self, ticket: JobTicket) -> None:
+        """Free a ticket's slot or queue place and grant waiting tickets."""
+        with self._lock:
+            if ticket._released:
+                return
+            ticket._released = True
+            if ticket.granted:
+                self._running -= 1
+                self._completed += 1
+                self._run_total += time.monotonic() - ticket.granted_at
+            else:
+                self._waiting = [entry for entry in self._waiting if entry[2] is not ticket]
+                heapq.heapify(self._waiting)
+                self._cancelled += 1
+            while self._waiting and self._running < self.concurrency:
+                _, _, waiting = heapq.heappop(self._waiting)
+                self._grant(waiting)
+
+    def _retry_after(self) -> int:
+        """Rough seconds until the queue drains by one slot's worth of jobs. Called with the lock held."""
+        avg_run = self._run_total / self._completed if self._completed else 1.0
+        return max(1, math.ceil(avg_run * len(self._waiting) / self.concurrency))
+
+
+class JobScheduler:
+    """Per-resource-class concurrency limits with bounded priority queues.
+
+    Example:
+        scheduler = JobScheduler({ResourceClass.CAD: (2, 32)})
+        async with scheduler.slot_async(ResourceClass.CAD):
+            result = await pool.run_async(_execute_and_export, job_args)
+    """
+
+    def __init__(self, limits: Dict[ResourceClass, Tuple[int, int]]):
+        """Initialize the scheduler.
+
+        Args:
+            limits: (concurrent jobs, max queued jobs) per resource class. A max
+                queue of 0 leaves the queue unbounded.
+        """
+        self._queues = {
+            resource: _ResourceQueue(resource, concurrency, max_queue)
+            for resource, (concurrency, max_queue) in limits.items()
+        }
+
+    def reserve(self, resource: ResourceClass, priority: Optional[int] = None) -> JobTicket:
+        """Admit a job to a resource queue without waiting for its slot.
+
+        Args:
+            resource: The resource class the job needs.
+            priority: The job's priority. Defaults to job_priority_var.
+
+        Returns:
+            JobTicket: The job's ticket. The caller must release it.
+
+        Raises:
+            QueueFullError: If the resource's queue is full.
+        """
+        if priority is None:
+            priority = job_priority_var.get()
+        return self._queues[resource].reserve(priority)
+
+    @contextmanager
+    def slot(self, resource: ResourceClass, priority: Optional[int] = None) -> Iterator[JobTicket]:
+        """Hold a slot of a resource class for the duration of the block, waiting for one if needed.
+
+        Raises:
+            QueueFullError: If the resource's queue is full.
+        """
+        with self.reserve(resource, priority) as ticket:
+            yield ticket
+
+    @asynccontextmanager
+    async def slot_async(self, resource: ResourceClass, priority: Optional[int] = None) -> AsyncIterator[JobTicket]:
+        """slot() without blocking the event loop while queued."""
+        async with self.reserve(resource, priority) as ticket:
+            yield ticket
+
+    def stats(self) -> Dict[str, dict]:
+        """Queue depth, wait-time and throughput metrics per resource class."""
+        return {resource.value: queue.stats() for resource, queue in self._queues.items()}
+
+
+_job_scheduler: Optional[JobScheduler] = None
+_job_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get the process-wide job scheduler, creating it from settings on first use.
+
+    Returns:
+        JobScheduler: The shared scheduler.
+    """
+    global _job_scheduler
+    with _job_scheduler_lock:
+        if _job_scheduler is None:
+            _job_scheduler = JobScheduler({
+                ResourceClass.LLM: (settings.SCHEDULER_LLM_CONCURRENCY, settings.SCHEDULER_LLM_QUEUE),
+                ResourceClass.CAD: (settings.SCHEDULER_CAD_CONCURRENCY, settings.SCHEDULER_CAD_QUEUE),
+                ResourceClass.RENDER: (settings.SCHEDULER_RENDER_CONCURRENCY, settings.SCHEDULER_RENDER_QUEUE),
+            })
+        return _job_scheduler
@@ -0,0 +1,224 @@
+"""Disk cache of rendered images keyed by mesh content and view parameters.
+
+The same geometry is rendered again and again: CAD cache hits export the
+same STL under a new name, retries often rebuild identical geometry, and
+modifications render the model they verify. RenderCache stores each
+rendered PNG under a hash of the mesh's bytes and of everything else that
+changes the image (views, size, zoom, backend), so a repeat is a file
+read instead of a render job.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default number of cached images kept on disk
+DEFAULT_MAX_ENTRIES = 2000
+
+# Bytes read at a time when hashing an STL file
+HASH_CHUNK_SIZE = 1 << 20
+
+# Bump when rendering changes, so older images are not served
+RENDER_CACHE_VERSION = "1"
+
+
+def mesh_digest(mesh: Union[str, Tuple[np.ndarray, np.ndarray]]) -> str:
+    """Hash a mesh's content.
+
+    Args:
+        mesh: STL path (its bytes are hashed, not its name), or (vertices, faces) arrays.
+
+    Returns:
+        Hex digest.
+
+    Raises:
+        OSError: If the STL cannot be read.
+    """
+    digest = hashlib.sha256()
+    if isinstance(mesh, str):
+        with open(mesh, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    for array in mesh:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode("utf-8"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def render_cache_key(digest: str, params: str) -> str:
+    """Key of one image of a mesh.
+
+    Args:
+        digest: mesh_digest of the mesh.
+        params: Everything else the image depends on, e.g. views and size.
+
+    Returns:
+        Hex digest, also used as the entry file name.
+    """
+    payload = "\0".join((RENDER_CACHE_VERSION, params, digest))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Disk cache of PNG images, keyed by render_cache_key.
+
+    Each entry is one PNG file. Entries are written to a temporary file and
+    renamed into place, so readers never see a partial image. Reading an
+    entry marks it as used; the least recently used entries are removed once
+    there are more than max_entries.
+
+    The use order is kept in memory, loaded from the files' modification
+    times on first use, so a store only touches the directory to remove
+    what it evicts. Entries that other processes add later are not counted.
+
+    Attributes:
+        cache_dir: Directory holding the entries.
+        max_entries: Maximum number of cached images. 0 disables the cache.
+        hits: Lookups served from the cache.
+        misses: Lookups that found no entry.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize the cache, creating the directory if needed."""
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Entry keys, least recently used first; None until loaded
+        self._entries: Optional["OrderedDict[str, None]"] = None
+        if max_entries > 0:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups and stores do anything."""
+        return self.max_entries > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key: str, output_path: Optional[str] = None) -> Optional[bytes]:
+        """Look up an image.
+
+        Args:
+            key: Cache key of the image.
+            output_path: Also write the image here.
+
+        Returns:
+            The PNG bytes, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            if output_path:
+                # A copy, not a link: output files may be overwritten in place
+                with open(output_path, "wb") as f:
+                    f.write(data)
+        except OSError as e:
+            if not isinstance(e, FileNotFoundError) or e.filename != path:
+                # Evicted while reading, or the output directory is unwritable
+                logger.warning(f"Render cache entry {key[:12]} unusable: {e}")
+            elif self._entries is not None:
+                with self._lock:
+                    self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._touch(key)
+        self.hits += 1
+        logger.info(f"Render cache hit {key[:12]}")
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an image.
+
+        Args:
+            key: Cache key of the image.
+            data: The PNG bytes.
+        """
+        if not self.enabled:
+            return
+        staging = None
+        try:
+            fd, staging = tempfile.mkstemp(prefix=".staging-", dir=self.cache_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(staging, self._path(key))
+        except OSError as e:
+            logger.debug(f"Not caching render {key[:12]}: {e}")
+            if staging and os.path.exists(staging):
+                os.remove(staging)
+            return
+        self._touch(key)
+        self._evict()
+
+    def put_file(self, key: str, path: str) -> None:
+        """Store an image already written to a file.
+
+        Args:
+            key: Cache key of the image.
+            path: The PNG file.
+        """
+        if not self.enabled:
+            return
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            logger.debug(f"Not caching render {key[:12]}: {e}")
+            return
+        self.put(key, data)
+
+    def _load_entries(self) -> "OrderedDict[str, None]":
+        """The in-memory use order, loaded from the directory on first use. Call with the lock held."""
+        if self._entries is None:
+            entries = []
+            try:
+                scan = list(os.scandir(self.cache_dir))
+            except OSError:
+                scan = []
+            for entry in scan:
+                if entry.name.startswith(".") or not entry.name.endswith(".png"):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime, entry.name[:-len(".png")]))
+                except OSError:
+                    # Removed since the scan
+                    continue
+            entries.sort()
+            self._entries = OrderedDict((key, None) for _, key in entries)
+        return self._entries
+
+    def _touch(self, key: str) -> None:
+        """Mark an entry as the most recently used."""
+        with self._lock:
+            entries = self._load_entries()
+            entries[key] = None
+            entries.move_to_end(key)
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries above max_entries."""
+        with self._lock:
+            entries = self._load_entries()
+            while len(entries) > self.max_entries:
+                key, _ = entries.popitem(last=False)
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.debug(f"Could not evict render {key[:12]}: {e}")
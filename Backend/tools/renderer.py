@@ -1,64 +1,534 @@
 """Renderer utility for STL files.
 
-This module provides a function to render STL files to PNG images using PyVista.
+This module renders STL files to PNG images using PyVista. Renders run on a
+persistent pool of render worker processes: each worker starts Xvfb (when
+there is no display) and creates its off-screen plotter once, then serves
+render jobs over a pipe. A render only pays for reading the mesh and
+drawing it, not for a process start and VTK/OpenGL set-up, and a VTK crash
+takes down a worker rather than the server.
+
+render_views draws several views from one read of the mesh. With
+contact_sheet it renders each view at tile size and tiles them, labelled,
+into one PNG, so all views cost about as many pixels as a single render.
+
+render_png returns the encoded PNG bytes, so an image sent to a model
+need not be read back from disk, and renders meshes given as vertex and
+face arrays as well as STL files. Saving the image is optional.
+
+RENDER_BACKEND picks what draws the images: VTK, the NumPy rasterizer in
+software_renderer (no display or OpenGL needed), or "auto", which uses
+VTK where it can render and the rasterizer otherwise. Without a display
+VTK's X render window aborts the process on its first render, so "auto"
+checks for one before VTK draws anything, and also falls back if a VTK
+render raises.
+
+Rendered images are kept in a RenderCache keyed by the mesh's content, the
+view parameters and the backend that drew them, and repeats are served
+from it without a render job. Under "auto" only the render workers know
+which backend they draw with (a worker may start Xvfb, or fall back after
+a VTK error), so each job reports it: images are stored under the backend
+that drew them and looked up under the one the workers last reported.
 """
 
 import asyncio
+import io
+import logging
+import multiprocessing
 import os
+import threading
+import numpy as np
 import pyvista as pv
-from typing import Optional
+import trimesh
+from PIL import Image, ImageDraw
+from typing import List, Optional, Sequence, Tuple, Union
 
-def render_stl(stl_path: str, output_path: Optional[str] = None) -> Optional[str]:
-    """Renders an STL file to a PNG image using PyVista.
+from config import settings
+from tools.cad_pool import CadWorkerPool
+from tools.job_scheduler import QueueFullError, ResourceClass, get_job_scheduler
+from tools.render_cache import RenderCache, mesh_digest, render_cache_key
+from tools.software_renderer import rasterize
 
-    Args:
-        stl_path (str): Path to the STL file.
-        output_path (Optional[str]): Path to save the image. If None, uses STL path with .png extension.
+logger = logging.getLogger(__name__)
 
-    Returns:
-        Optional[str]: The path to the generated image, or None if failed.
-    """
-    if not os.path.exists(stl_path):
-        print(f"Error: STL file not found at {stl_path}")
-        return None
+# Camera set-ups of the views render_views draws
+VIEWS = {
+    "iso": lambda p: p.view_isometric(),
+    "top": lambda p: p.view_xy(),
+    "front": lambda p: p.view_xz(),  # Assuming Y-up or Z-up, adjust as needed
+    "right": lambda p: p.view_yz(),
+}
 
-    if output_path is None:
-        output_path = stl_path.replace(".stl", ".png")
+# A mesh to render: an STL path, or (vertices, faces) arrays such as a trimesh's
+MeshSource = Union[str, Tuple[np.ndarray, np.ndarray]]
 
-    try:
+# Size (width, height) of single renders and of contact sheets
+RENDER_WINDOW_SIZE = (1024, 768)
+
+# Views per row of a contact sheet
+CONTACT_SHEET_COLUMNS = 2
+
+# Render backends, set with RENDER_BACKEND
+VTK_BACKEND = "vtk"
+NUMPY_BACKEND = "numpy"
+AUTO_BACKEND = "auto"
+
+# Camera zoom after fitting the model in view
+VIEW_ZOOM = 1.2
+
+# The render worker's plotter, created once per worker process
+_plotter: Optional[pv.Plotter] = None
+
+# Whether VTK can render in this process, once checked
+_vtk_usable: Optional[bool] = None
+
+# Backend the render workers last reported drawing with
+_worker_backend: Optional[str] = None
+
+_render_pool: Optional[CadWorkerPool] = None
+_render_pool_lock = threading.Lock()
+
+_render_cache: Optional[RenderCache] = None
+
+
+def _get_plotter() -> pv.Plotter:
+    """Get this process's off-screen plotter, setting up headless rendering on first use.
+
+    Returns:
+        pv.Plotter: The plotter, with no meshes in it.
+    """
+    global _plotter
+    if _plotter is None:
         # Start Xvfb if running on Linux and no display is set
         if os.name == 'posix' and "DISPLAY" not in os.environ:
             try:
                 pv.start_xvfb()
             except Exception as e:
-                print(f"Warning: Could not start Xvfb: {e}")
+                logger.warning(f"Could not start Xvfb: {e}")
 
         # Configure PyVista for headless rendering
         pv.OFF_SCREEN = True
+        _plotter = pv.Plotter(off_screen=True)
+        _plotter.set_background("white")
+    _plotter.clear_actors()
+    return _plotter
+
+
+def _vtk_can_render() -> bool:
+    """Whether VTK can render in this process: it has an off-screen build, or an X display (e.g. Xvfb).
+
+    Only creates the plotter; VTK aborts the process on the first render
+    if an X render window has no display to connect to.
+    """
+    global _vtk_usable
+    if _vtk_usable is None:
+        try:
+            window = _get_plotter().ren_win.GetClassName()
+            _vtk_usable = window != "vtkXOpenGLRenderWindow" or bool(os.environ.get("DISPLAY"))
+        except Exception as e:
+            logger.warning(f"Could not set up VTK: {e}")
+            _vtk_usable = False
+        if not _vtk_usable:
+            logger.warning("VTK cannot render without a display; using the NumPy rasterizer")
+    return _vtk_usable
+
+
+def _render_backend() -> str:
+    """The backend this process renders with, from RENDER_BACKEND."""
+    backend = settings.RENDER_BACKEND.lower()
+    if backend in (VTK_BACKEND, NUMPY_BACKEND):
+        return backend
+    return VTK_BACKEND if _vtk_can_render() else NUMPY_BACKEND
+
+
+def _start_render_worker() -> None:
+    """Render worker initializer: create the plotter and its OpenGL context before the first job.
+
+    Workers rendering with the NumPy rasterizer have nothing to set up.
+    """
+    if _render_backend() != VTK_BACKEND:
+        return
+    try:
+        plotter = _get_plotter()
+        plotter.add_mesh(pv.Cube())
+        plotter.screenshot(return_img=True)
+        plotter.clear_actors()
+    except Exception as e:
+        # The first job retries and reports the error
+        logger.warning(f"Render worker warm-up failed: {e}")
+
+
+def _load_mesh(mesh: MeshSource) -> pv.PolyData:
+    """A PyVista mesh from an STL path or from (vertices, faces) arrays."""
+    if isinstance(mesh, str):
+        return pv.read(mesh)
+    vertices, faces = mesh
+    faces = np.asarray(faces, dtype=np.int64)
+    cells = np.column_stack([np.full(len(faces), 3, dtype=np.int64), faces]).ravel()
+    return pv.PolyData(np.asarray(vertices, dtype=np.float64), cells)
+
+
+def _mesh_arrays(mesh: MeshSource) -> Tuple[np.ndarray, np.ndarray]:
+    """(vertices, faces) arrays of an STL path or of arrays."""
+    if isinstance(mesh, str):
+        loaded = trimesh.load(mesh, file_type="stl", force="mesh")
+        return loaded.vertices, loaded.faces
+    return mesh
+
+
+def tile_images(images: Sequence[np.ndarray], columns: int = CONTACT_SHEET_COLUMNS) -> np.ndarray:
+    """Tile equally sized RGB(A) images row by row, padding the last row with white.
+
+    Args:
+        images: The images, as (height, width, channels) uint8 arrays.
+        columns: Images per row.
+
+    Returns:
+        np.ndarray: The contact sheet.
+    """
+    columns = max(1, min(columns, len(images)))
+    blank = np.full_like(images[0], 255)
+    cells = list(images) + [blank] * (-len(images) % columns)
+    rows = [np.concatenate(cells[i:i + columns], axis=1) for i in range(0, len(cells), columns)]
+    return np.concatenate(rows, axis=0)
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """Encode an RGB(A) image array as PNG bytes."""
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _image_size(views: Sequence[str], tiled: bool) -> Tuple[int, int]:
+    """Size of each view's image: RENDER_WINDOW_SIZE, or a contact sheet tile of it."""
+    if not tiled:
+        return RENDER_WINDOW_SIZE
+    columns = min(CONTACT_SHEET_COLUMNS, len(views))
+    rows = -(-len(views) // columns)
+    return RENDER_WINDOW_SIZE[0] // columns, RENDER_WINDOW_SIZE[1] // rows
+
+
+def _render_images_vtk(mesh: MeshSource, views: Sequence[str], tiled: bool) -> List[np.ndarray]:
+    """Render views of a mesh with the worker's VTK plotter. See _render_images."""
+    plotter = _get_plotter()
+    plotter.add_mesh(_load_mesh(mesh), color="lightblue", show_edges=True)
+    plotter.window_size = _image_size(views, tiled)
+
+    images = []
+    try:
+        for name in views:
+            VIEWS[name](plotter)
+            plotter.camera.zoom(VIEW_ZOOM)
+            if tiled:
+                plotter.add_text(name, position="upper_left", font_size=10, color="black", name="view_label")
+            images.append(plotter.screenshot(return_img=True))
+    finally:
+        plotter.clear_actors()
+    return images
+
+
+def _render_images_numpy(mesh: MeshSource, views: Sequence[str], tiled: bool) -> List[np.ndarray]:
+    """Render views of a mesh with the NumPy rasterizer. See _render_images."""
+    vertices, faces = _mesh_arrays(mesh)
+    size = _image_size(views, tiled)
+    images = []
+    for name in views:
+        image = rasterize(vertices, faces, name, size, zoom=VIEW_ZOOM)
+        if tiled:
+            labelled = Image.fromarray(image)
+            ImageDraw.Draw(labelled).text((8, 6), name, fill="black")
+            image = np.asarray(labelled)
+        images.append(image)
+    return images
+
+
+def _render_images(mesh: MeshSource, views: Sequence[str], tiled: bool) -> List[np.ndarray]:
+    """Render views of a mesh in a render worker, loading it once.
+
+    Args:
+        mesh: STL path or (vertices, faces) arrays.
+        views: Names from VIEWS.
+        tiled: Render each view labelled and at contact sheet tile size
+            instead of at RENDER_WINDOW_SIZE.
+
+    Returns:
+        List[np.ndarray]: One RGB image per view.
+    """
+    global _vtk_usable
+    unknown = [name for name in views if name not in VIEWS]
+    if unknown:
+        raise ValueError(f"Unknown view(s): {', '.join(unknown)}")
+
+    if _render_backend() == VTK_BACKEND:
+        try:
+            return _render_images_vtk(mesh, views, tiled)
+        except Exception as e:
+            if settings.RENDER_BACKEND.lower() == VTK_BACKEND:
+                raise
+            logger.warning(f"VTK render failed, using the NumPy rasterizer from now on: {e}")
+            _vtk_usable = False
+    return _render_images_numpy(mesh, views, tiled)
+
+
+def _png_job(mesh: MeshSource, views: Sequence[str], output_path: Optional[str]) -> Tuple[bytes, str]:
+    """Render a mesh to PNG bytes in a render worker: one view, or a contact sheet of several.
+
+    The image is encoded in memory; it is only written to output_path if one is given.
+
+    Returns:
+        Tuple[bytes, str]: The PNG, and the backend that drew it.
+    """
+    images = _render_images(mesh, views, tiled=len(views) > 1)
+    data = encode_png(tile_images(images) if len(images) > 1 else images[0])
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(data)
+    # After a fallback _render_backend() already names the rasterizer
+    return data, _render_backend()
+
+
+def render_views(
+    stl_path: str,
+    output_dir: str,
+    base_name: str,
+    views: Optional[Sequence[str]] = None,
+    contact_sheet: Optional[str] = None
+) -> dict:
+    """Render views of an STL in a render worker, reading the mesh once.
+
+    Args:
+        stl_path (str): Path to the STL file.
+        output_dir (str): Directory to save images.
+        base_name (str): Base name for output images.
+        views (Optional[Sequence[str]]): Names from VIEWS to render. None renders all of them.
+        contact_sheet (Optional[str]): If given, path of one PNG with the views tiled and
+            labelled, rendered at tile size instead of one full-size PNG per view.
+
+    Returns:
+        dict: 'success', 'backend' (the one that drew the images), and 'images' (one
+            path per view) or 'contact_sheet' (its path); or 'error'.
+    """
+    try:
+        views = list(views or VIEWS)
+        images = _render_images(stl_path, views, tiled=bool(contact_sheet))
+        if contact_sheet:
+            Image.fromarray(tile_images(images)).save(contact_sheet)
+            return {"success": True, "contact_sheet": contact_sheet, "backend": _render_backend()}
+
+        image_paths = []
+        for name, image in zip(views, images):
+            out_path = os.path.join(output_dir, f"{base_name}_{name}.png")
+            Image.fromarray(image).save(out_path)
+            image_paths.append(out_path)
+        return {"success": True, "images": image_paths, "backend": _render_backend()}
+    except Exception as e:
+        return {"success": False, "error": f"Rendering failed: {str(e)}"}
+
+
+def get_render_pool() -> CadWorkerPool:
+    """Get the process-wide render worker pool, creating it on first use.
+
+    Returns:
+        CadWorkerPool: The shared pool of render workers.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = CadWorkerPool(
+                processes=settings.RENDER_WORKERS,
+                max_jobs_per_worker=settings.RENDER_WORKER_MAX_JOBS,
+                max_rss_mb=settings.CAD_WORKER_MAX_RSS_MB,
+                initializer=_start_render_worker,
+                max_memory_mb=settings.CAD_WORKER_MAX_MEMORY_MB,
+                name="render",
+            )
+        return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render workers, if they were started."""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def get_render_cache() -> RenderCache:
+    """Get the process-wide render cache, creating it on first use.
+
+    Returns:
+        RenderCache: The shared cache.
+    """
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(settings.RENDER_CACHE_DIR, settings.RENDER_CACHE_MAX_ENTRIES)
+    return _render_cache
+
 
-        # Read the STL file
-        mesh = pv.read(stl_path)
-
-        # Create a plotter
-        plotter = pv.Plotter(off_screen=True)
-        plotter.add_mesh(mesh, color="lightblue", show_edges=True)
-        plotter.set_background("white")
-        
-        # Set camera position (isometric view)
-        plotter.view_isometric()
-        
-        # Save screenshot
-        plotter.screenshot(output_path)
-        plotter.close()
-        
-        return output_path
+def resolved_render_backend() -> Optional[str]:
+    """The backend render workers draw with: RENDER_BACKEND, or under "auto" the one they last reported.
+
+    Returns:
+        Optional[str]: VTK_BACKEND or NUMPY_BACKEND; None under "auto" before any render finished.
+    """
+    backend = settings.RENDER_BACKEND.lower()
+    if backend in (VTK_BACKEND, NUMPY_BACKEND):
+        return backend
+    return _worker_backend
+
+
+def record_render_backend(backend: str) -> None:
+    """Note the backend a render worker reported drawing with."""
+    global _worker_backend
+    _worker_backend = backend
+
+
+def png_cache_key(digest: str, views: Sequence[str], backend: str) -> str:
+    """Render cache key of the image _png_job draws of a mesh.
+
+    Args:
+        digest: mesh_digest of the mesh.
+        views: The views in the image; several make a contact sheet.
+        backend: The backend that draws the image, VTK_BACKEND or NUMPY_BACKEND.
+
+    Returns:
+        str: The cache key.
+    """
+    params = ";".join((
+        backend,
+        "x".join(map(str, RENDER_WINDOW_SIZE)),
+        str(CONTACT_SHEET_COLUMNS),
+        str(VIEW_ZOOM),
+        ",".join(views),
+    ))
+    return render_cache_key(digest, params)
+
+
+def render_cache_digest(mesh: MeshSource) -> Optional[str]:
+    """mesh_digest of a mesh to cache its images under, or None if the mesh cannot be read."""
+    try:
+        return mesh_digest(mesh)
+    except OSError as e:
+        logger.warning(f"Not caching renders of {_mesh_name(mesh)}: {e}")
+        return None
+
+
+def _cache_digest(mesh: MeshSource) -> Optional[str]:
+    """render_cache_digest of a mesh, or None if the render cache is off."""
+    return render_cache_digest(mesh) if get_render_cache().enabled else None
+
+
+def _cached_png(digest: Optional[str], views: Tuple[str, ...], output_path: Optional[str]) -> Optional[bytes]:
+    """The cached image of a mesh drawn by the workers' backend, if there is one."""
+    backend = resolved_render_backend()
+    if digest is None or backend is None:
+        return None
+    return get_render_cache().get(png_cache_key(digest, views, backend), output_path)
+
+
+def _store_png(digest: Optional[str], views: Tuple[str, ...], result: Tuple[bytes, str]) -> None:
+    """Cache a _png_job result under the backend that drew it."""
+    data, backend = result
+    record_render_backend(backend)
+    if digest is not None:
+        get_render_cache().put(png_cache_key(digest, views, backend), data)
+
+
+def _render_png(mesh: MeshSource, views: Sequence[str], output_path: Optional[str]) -> Optional[bytes]:
+    """Run _png_job on a render worker unless the render cache has its image."""
+    views = tuple(views)
+    digest = _cache_digest(mesh)
+    data = _cached_png(digest, views, output_path)
+    if data is not None:
+        return data
+    result = _run_render(_png_job, (mesh, views, output_path), _mesh_name(mesh))
+    if result is None:
+        return None
+    _store_png(digest, views, result)
+    return result[0]
+
+
+async def _render_png_async(mesh: MeshSource, views: Sequence[str], output_path: Optional[str]) -> Optional[bytes]:
+    """_render_png without blocking the event loop, hashing the mesh on a thread."""
+    views = tuple(views)
+    digest = await asyncio.to_thread(_cache_digest, mesh)
+    data = await asyncio.to_thread(_cached_png, digest, views, output_path)
+    if data is not None:
+        return data
+    result = await _run_render_async(_png_job, (mesh, views, output_path), _mesh_name(mesh))
+    if result is None:
+        return None
+    await asyncio.to_thread(_store_png, digest, views, result)
+    return result[0]
+
+
+def _render_output_path(stl_path: str, output_path: Optional[str]) -> Optional[str]:
+    """Check the STL exists and pick the image path (the STL path with .png) if none is given."""
+    if not os.path.exists(stl_path):
+        logger.error(f"STL file not found at {stl_path}")
+        return None
+    return output_path or stl_path.replace(".stl", ".png")
+
+
+def _mesh_name(mesh: MeshSource) -> str:
+    """How a mesh is named in log messages."""
+    return mesh if isinstance(mesh, str) else f"mesh of {len(mesh[1])} faces"
+
+
+def _run_render(job, args: tuple, name: str):
+    """Run a render job on a render worker once the scheduler grants a render slot.
+
+    Failures are logged and returned as None.
+    """
+    try:
+        with get_job_scheduler().slot(ResourceClass.RENDER):
+            return get_render_pool().run(job, args, timeout=settings.RENDER_TIMEOUT_SECONDS)
+    except QueueFullError as e:
+        logger.error(f"Error rendering STL: {e}")
+    except multiprocessing.TimeoutError:
+        logger.error(f"Rendering {name} timed out ({settings.RENDER_TIMEOUT_SECONDS}s limit)")
+    except Exception as e:
+        logger.error(f"Error rendering STL: {e}")
+    return None
+
+
+async def _run_render_async(job, args: tuple, name: str):
+    """_run_render without blocking the event loop, waiting for a scheduler render slot first."""
+    try:
+        async with get_job_scheduler().slot_async(ResourceClass.RENDER):
+            return await get_render_pool().run_async(job, args, timeout=settings.RENDER_TIMEOUT_SECONDS)
+    except QueueFullError as e:
+        logger.error(f"Error rendering STL: {e}")
+    except multiprocessing.TimeoutError:
+        logger.error(f"Rendering {name} timed out ({settings.RENDER_TIMEOUT_SECONDS}s limit)")
     except Exception as e:
-        print(f"Error rendering STL: {e}")
+        logger.error(f"Error rendering STL: {e}")
+    return None
+
+
+def render_stl(stl_path: str, output_path: Optional[str] = None) -> Optional[str]:
+    """Renders an STL file to a PNG image on a render worker.
+
+    Args:
+        stl_path (str): Path to the STL file.
+        output_path (Optional[str]): Path to save the image. If None, uses STL path with .png extension.
+
+    Returns:
+        Optional[str]: The path to the generated image, or None if failed.
+    """
+    output_path = _render_output_path(stl_path, output_path)
+    if output_path is None:
         return None
+    data = _render_png(stl_path, ("iso",), output_path)
+    return output_path if data is not None else None
 
 
 async def render_stl_async(stl_path: str, output_path: Optional[str] = None) -> Optional[str]:
-    """Async wrapper for render_stl that runs in a thread pool.
+    """render_stl without blocking the event loop.
+
+    Waits for a render slot from the job scheduler first, so a burst of
+    tasks does not run more renders at once than configured.
 
     Args:
         stl_path (str): Path to the STL file.
@@ -67,4 +537,100 @@ async def render_stl_async(stl_path: str, output_path: Optional[str] = None) ->
     Returns:
         Optional[str]: The path to the generated image, or None if failed.
     """
-    return await asyncio.to_thread(render_stl, stl_path, output_path)
+    output_path = _render_output_path(stl_path, output_path)
+    if output_path is None:
+        return None
+    data = await _render_png_async(stl_path, ("iso",), output_path)
+    return output_path if data is not None else None
+
+
+def render_png(
+    mesh: MeshSource,
+    views: Sequence[str] = ("iso",),
+    output_path: Optional[str] = None
+) -> Optional[bytes]:
+    """Renders a mesh to PNG bytes on a render worker, without reading the image back from disk.
+
+    Several views are tiled, labelled, into one contact sheet.
+
+    Args:
+        mesh (MeshSource): Path to an STL file, or (vertices, faces) arrays with
+            faces as (N, 3) vertex indices.
+        views (Sequence[str]): Names from VIEWS to render, in sheet order.
+        output_path (Optional[str]): Also save the image here, e.g. as a downloadable artifact.
+
+    Returns:
+        Optional[bytes]: The encoded PNG, or None if failed.
+    """
+    if isinstance(mesh, str) and _render_output_path(mesh, output_path) is None:
+        return None
+    return _render_png(mesh, views, output_path)
+
+
+async def render_png_async(
+    mesh: MeshSource,
+    views: Sequence[str] = ("iso",),
+    output_path: Optional[str] = None
+) -> Optional[bytes]:
+    """render_png without blocking the event loop, after waiting for a render slot.
+
+    Args:
+        mesh (MeshSource): Path to an STL file, or (vertices, faces) arrays.
+        views (Sequence[str]): Names from VIEWS to render, in sheet order.
+        output_path (Optional[str]): Also save the image here.
+
+    Returns:
+        Optional[bytes]: The encoded PNG, or None if failed.
+    """
+    if isinstance(mesh, str) and _render_output_path(mesh, output_path) is None:
+        return None
+    return await _render_png_async(mesh, views, output_path)
+
+
+def _contact_sheet_path(stl_path: str, output_path: Optional[str]) -> Optional[str]:
+    """Check the STL exists and pick the contact sheet path (the STL path with _views.png) if none is given."""
+    return _render_output_path(stl_path, output_path or stl_path.replace(".stl", "_views.png"))
+
+
+def render_contact_sheet(
+    stl_path: str,
+    output_path: Optional[str] = None,
+    views: Sequence[str] = tuple(VIEWS)
+) -> Optional[str]:
+    """Renders labelled views of an STL file tiled into one PNG image, on a render worker.
+
+    Args:
+        stl_path (str): Path to the STL file.
+        output_path (Optional[str]): Path to save the image. If None, uses STL path with _views.png.
+        views (Sequence[str]): Names from VIEWS to render, in sheet order.
+
+    Returns:
+        Optional[str]: The path to the contact sheet, or None if failed.
+    """
+    output_path = _contact_sheet_path(stl_path, output_path)
+    if output_path is None:
+        return None
+    data = _render_png(stl_path, views, output_path)
+    return output_path if data is not None else None
+
+
+async def render_contact_sheet_async(
+    stl_path: str,
+    output_path: Optional[str] = None,
+    views: Sequence[str] = tuple(VIEWS)
+) -> Optional[str]:
+    """render_contact_sheet without blocking the event loop, after waiting for a render slot.
+
+    Args:
+        stl_path (str): Path to the STL file.
+        output_path (Optional[str]): Path to save the image.
+        views (Sequence[str]): Names from VIEWS to render, in sheet order.
+
+    Returns:
+        Optional[str]: The path to the contact sheet, or None if failed.
+    """
+    output_path = _contact_sheet_path(stl_path, output_path)
+    if output_path is None:
+        return None
+    data = await _render_png_async(stl_path, views, output_path)
+    return output_path if data is not None else None
@@ -0,0 +1,199 @@
+"""NumPy software rasterizer for verification renders.
+
+VTK needs an OpenGL context, which on a headless node means Xvfb or an
+OSMesa/EGL build, and without one a render aborts its process. This
+module draws a triangle mesh with a z-buffer and flat shading in NumPy
+alone, from the same fixed orthographic cameras as renderer.VIEWS. It has
+no display or GPU dependency and nothing to start up, and is good enough
+to check a model's shape against its specification.
+
+Triangles are rasterized in batches: every pixel of each triangle's
+bounding box becomes a candidate fragment, fragments outside the triangle
+are dropped by their barycentric coordinates, and the nearest fragment of
+each pixel wins. Batches are sized by fragment count to bound memory.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Camera (direction from the model towards the camera, view up) of each view,
+# matching PyVista's view_isometric, view_xy, view_xz and view_yz
+CAMERAS: Dict[str, Tuple[Tuple[float, float, float], Tuple[float, float, float]]] = {
+    "iso": ((1.0, 1.0, 1.0), (0.0, 0.0, 1.0)),
+    "top": ((0.0, 0.0, 1.0), (0.0, 1.0, 0.0)),
+    "front": ((0.0, -1.0, 0.0), (0.0, 0.0, 1.0)),
+    "right": ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0)),
+}
+
+# Share of the image the model's projection fills along its tighter axis at zoom 1
+FILL = 0.7
+
+# Mesh and background colors (RGB), as in the VTK renders
+MESH_COLOR = np.array([173, 216, 230], dtype=np.float64)  # lightblue
+BACKGROUND = 255
+
+# Shading: ambient share, and the light's direction in camera (right, up, back)
+# coordinates: from behind the camera, above and to the left
+AMBIENT = 0.3
+LIGHT_DIRECTION = np.array([-0.3, 0.6, 1.0])
+
+# Candidate fragments per batch, bounding the size of the fragment arrays
+MAX_FRAGMENTS = 1 << 20
+
+
+def _camera_basis(view: str) -> np.ndarray:
+    """Rows right, up and towards-camera of a view's orthographic camera."""
+    if view not in CAMERAS:
+        raise ValueError(f"Unknown view: {view}")
+    direction, view_up = (np.asarray(v, dtype=np.float64) for v in CAMERAS[view])
+    back = direction / np.linalg.norm(direction)
+    right = np.cross(view_up, back)
+    right /= np.linalg.norm(right)
+    up = np.cross(back, right)
+    return np.stack([right, up, back])
+
+
+def _face_shades(triangles: np.ndarray, basis: np.ndarray) -> np.ndarray:
+    """Flat-shaded RGB of each triangle, lit from near the camera on both sides."""
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    light = LIGHT_DIRECTION @ basis
+    light /= np.linalg.norm(light)
+    diffuse = np.abs(normals @ light)
+    intensity = AMBIENT + (1.0 - AMBIENT) * diffuse
+    return np.clip(intensity[:, None] * MESH_COLOR, 0, 255).astype(np.uint8)
+
+
+def _rasterize_batch(
+    screen: np.ndarray,
+    depth: np.ndarray,
+    face_ids: np.ndarray,
+    width: int,
+    zbuffer: np.ndarray,
+    face_buffer: np.ndarray,
+) -> None:
+    """Write the nearest fragments of a batch of triangles into the z-buffer.
+
+    Args:
+        screen: (M, 3, 2) pixel coordinates of the triangles' corners.
+        depth: (M, 3) depth of the corners, larger nearer the camera.
+        face_ids: (M,) index of each triangle in the mesh.
+        width: Image width.
+        zbuffer: Flat depth buffer, updated in place.
+        face_buffer: Flat buffer of the face drawn at each pixel, updated in place.
+    """
+    height = zbuffer.size // width
+    x0 = np.clip(np.ceil(screen[:, :, 0].min(axis=1) - 0.5), 0, width).astype(np.int64)
+    x1 = np.clip(np.floor(screen[:, :, 0].max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    y0 = np.clip(np.ceil(screen[:, :, 1].min(axis=1) - 0.5), 0, height).astype(np.int64)
+    y1 = np.clip(np.floor(screen[:, :, 1].max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    box_width = np.maximum(x1 - x0 + 1, 0)
+    counts = box_width * np.maximum(y1 - y0 + 1, 0)
+
+    # Per triangle, the barycentric coordinates and depth as linear functions
+    # of the pixel position: value = coeff[..., 0] * x + coeff[..., 1] * y + coeff[..., 2]
+    a, b, c = screen[:, 0], screen[:, 1], screen[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    counts[area == 0] = 0
+    area[area == 0] = 1.0
+    coeff = np.empty((len(area), 3, 3))
+    for row, (p, q) in enumerate(((b, c), (c, a))):
+        coeff[:, row, 0] = (p[:, 1] - q[:, 1]) / area
+        coeff[:, row, 1] = (q[:, 0] - p[:, 0]) / area
+        coeff[:, row, 2] = (p[:, 0] * q[:, 1] - q[:, 0] * p[:, 1]) / area
+    # z = d0 * l0 + d1 * l1 + d2 * (1 - l0 - l1)
+    coeff[:, 2] = (depth[:, 0] - depth[:, 2])[:, None] * coeff[:, 0] + (depth[:, 1] - depth[:, 2])[:, None] * coeff[:, 1]
+    coeff[:, 2, 2] += depth[:, 2]
+
+    total = int(counts.sum())
+    if total == 0:
+        return
+
+    # One candidate fragment per pixel centre of each bounding box
+    tri = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    px = x0[tri] + local % box_width[tri]
+    py = y0[tri] + local // box_width[tri]
+    cx = px + 0.5
+    cy = py + 0.5
+    l0 = coeff[tri, 0, 0] * cx + coeff[tri, 0, 1] * cy + coeff[tri, 0, 2]
+    l1 = coeff[tri, 1, 0] * cx + coeff[tri, 1, 1] * cy + coeff[tri, 1, 2]
+    inside = (l0 >= -1e-9) & (l1 >= -1e-9) & (l0 + l1 <= 1.0 + 1e-9)
+
+    tri, pixels, cx, cy = tri[inside], (py * width + px)[inside], cx[inside], cy[inside]
+    z = coeff[tri, 2, 0] * cx + coeff[tri, 2, 1] * cy + coeff[tri, 2, 2]
+
+    # Keep the nearest fragment per pixel, then those nearer than what is drawn
+    order = np.lexsort((-z, pixels))
+    pixels, z, tri = pixels[order], z[order], tri[order]
+    first = np.ones(len(pixels), dtype=bool)
+    first[1:] = pixels[1:] != pixels[:-1]
+    pixels, z, tri = pixels[first], z[first], tri[first]
+    nearer = z > zbuffer[pixels]
+    zbuffer[pixels[nearer]] = z[nearer]
+    face_buffer[pixels[nearer]] = face_ids[tri[nearer]]
+
+
+def rasterize(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    view: str = "iso",
+    size: Tuple[int, int] = (1024, 768),
+    zoom: float = 1.2,
+) -> np.ndarray:
+    """Render a triangle mesh with flat shading from one of the fixed cameras.
+
+    Args:
+        vertices: (N, 3) vertex positions.
+        faces: (M, 3) vertex indices of the triangles.
+        view: Camera, a key of CAMERAS.
+        size: Image (width, height).
+        zoom: Magnification relative to fitting the model's projection in the image.
+
+    Returns:
+        np.ndarray: (height, width, 3) uint8 RGB image on a white background.
+    """
+    width, height = size
+    image = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if len(faces) == 0:
+        return image
+
+    basis = _camera_basis(view)
+    camera = vertices @ basis.T
+    lo = camera[:, :2].min(axis=0)
+    hi = camera[:, :2].max(axis=0)
+    extent = np.maximum(hi - lo, 1e-9)
+    scale = FILL * zoom * min(width / extent[0], height / extent[1])
+    centre = (lo + hi) / 2
+
+    # Pixel coordinates, y growing downwards
+    screen = np.empty((len(vertices), 2))
+    screen[:, 0] = (camera[:, 0] - centre[0]) * scale + width / 2
+    screen[:, 1] = height / 2 - (camera[:, 1] - centre[1]) * scale
+
+    shades = _face_shades(vertices[faces], basis)
+    zbuffer = np.full(width * height, -np.inf)
+    face_buffer = np.full(width * height, -1, dtype=np.int64)
+
+    # Batches of triangles with a bounded number of candidate fragments
+    tri_screen = screen[faces]
+    tri_depth = camera[faces, 2]
+    box = np.ceil(tri_screen.max(axis=1) - tri_screen.min(axis=1)) + 1
+    fragments = np.cumsum(np.clip(box[:, 0], 0, width) * np.clip(box[:, 1], 0, height))
+    start = 0
+    while start < len(faces):
+        offset = fragments[start - 1] if start else 0
+        end = max(int(np.searchsorted(fragments, offset + MAX_FRAGMENTS, side="right")), start + 1)
+        _rasterize_batch(
+            tri_screen[start:end], tri_depth[start:end], np.arange(start, end), width, zbuffer, face_buffer
+        )
+        start = end
+
+    drawn = face_buffer >= 0
+    image.reshape(-1, 3)[drawn] = shades[face_buffer[drawn]]
+    return image
+
@@ -4,15 +4,28 @@ from validation.buildability import (
     validate_buildability,
     BuildabilityResult,
     BrickPlacement,
+    BuildSequence,
+    BrickGrid,
     STANDARD_BRICK_SIZES,
     LEGO_GRID_SIZE,
     LEGO_BRICK_HEIGHT,
 )
+from validation.incremental import IncrementalBuildabilityValidator
+from validation.cache import BuildabilityCache, get_buildability_cache, validate_buildability_cached
+from validation.streaming import StreamingBuildabilityCheck, StreamingBuildSequenceParser
 
 __all__ = [
     "validate_buildability",
+    "validate_buildability_cached",
+    "get_buildability_cache",
+    "BuildabilityCache",
     "BuildabilityResult",
     "BrickPlacement",
+    "BuildSequence",
+    "BrickGrid",
+    "IncrementalBuildabilityValidator",
+    "StreamingBuildabilityCheck",
+    "StreamingBuildSequenceParser",
     "STANDARD_BRICK_SIZES",
     "LEGO_GRID_SIZE",
     "LEGO_BRICK_HEIGHT",
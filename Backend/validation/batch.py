@@ -0,0 +1,316 @@
+"""Batch buildability validation for offline re-scoring.
+
+Streams build_sequence records (one JSON object per line), validates them on
+a process pool with the same checks as validate_buildability, and writes the
+results as JSONL or Parquet.
+
+Usage:
+    python -m validation.batch models.jsonl -o scores.jsonl --workers 8
+    python -m validation.batch models.jsonl -o scores.parquet --format parquet \\
+        --set COM_OFFSET_THRESHOLD=0.35
+
+Each input line is either a model metadata object with a "build_sequence"
+key (other keys such as "id" are kept) or a bare build_sequence list.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from validation import buildability
+from validation.buildability import validate_buildability
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional, only needed for Parquet output
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Module-level thresholds that may be overridden for a batch run
+TUNABLE_THRESHOLDS = (
+    "STABILITY_TOP_HEAVY_RATIO",
+    "STABILITY_TOP_HEAVY_AREA_RATIO",
+    "COM_OFFSET_THRESHOLD",
+    "OVERHANG_SUPPORT_RATIO",
+)
+
+# Records sent to a worker at a time
+DEFAULT_CHUNK_SIZE = 32
+
+# Rows buffered per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 4096
+
+RESULT_FIELDS = (
+    "id",
+    "valid",
+    "score",
+    "layer_count",
+    "brick_count",
+    "issues",
+    "recommendations",
+    "estimated_build_time_minutes",
+    "error",
+)
+
+
+@dataclass
+class InvalidRecord:
+    """Placeholder for an input line that could not be parsed."""
+    message: str
+
+
+def _check_thresholds(thresholds: Dict[str, float]) -> None:
+    """Reject threshold names that are not tunable."""
+    for name in thresholds:
+        if name not in TUNABLE_THRESHOLDS:
+            raise ValueError(f"Unknown threshold '{name}'. Allowed: {', '.join(TUNABLE_THRESHOLDS)}")
+
+
+def _apply_thresholds(thresholds: Dict[str, float]) -> Dict[str, float]:
+    """Set threshold overrides on the buildability module.
+
+    Returns:
+        The previous values, for restoring.
+    """
+    previous = {}
+    for name, value in thresholds.items():
+        previous[name] = getattr(buildability, name)
+        setattr(buildability, name, value)
+    return previous
+
+
+def _validate_record(index: int, record: Any) -> Dict[str, Any]:
+    """Validate one input record and flatten the result into an output row."""
+    if isinstance(record, InvalidRecord):
+        return {"id": index, "error": record.message}
+    if isinstance(record, list):
+        record = {"build_sequence": record}
+    if not isinstance(record, dict):
+        return {"id": index, "error": f"Expected an object or list, got {type(record).__name__}"}
+
+    record_id = record.get("id", index)
+    try:
+        result = validate_buildability(record)
+    except Exception as e:
+        return {"id": record_id, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "id": record_id,
+        "valid": result.valid,
+        "score": result.score,
+        "layer_count": result.layer_count,
+        "brick_count": len(result.build_sequence),
+        "issues": result.issues,
+        "recommendations": result.recommendations,
+        "estimated_build_time_minutes": result.estimated_build_time_minutes,
+    }
+
+
+def _validate_chunk(chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+    """Validate a chunk of (index, record) pairs in a worker process."""
+    return [_validate_record(index, record) for index, record in chunk]
+
+
+def _chunks(records: Iterable[Any], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    """Group records into numbered chunks without reading ahead."""
+    chunk: List[Tuple[int, Any]] = []
+    for index, record in enumerate(records):
+        chunk.append((index, record))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_buildability_batch(
+    records: Iterable[Any],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    thresholds: Optional[Dict[str, float]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Validate many build sequences, streaming results in input order.
+
+    Only a bounded number of chunks is in flight at once, so arbitrarily
+    large inputs can be streamed.
+
+    Args:
+        records: Model metadata dicts (with "build_sequence") or bare
+            build_sequence lists.
+        workers: Worker processes. Defaults to the CPU count; 0 or 1
+            validates in the calling process.
+        chunk_size: Records sent to a worker at a time.
+        thresholds: Overrides for TUNABLE_THRESHOLDS, applied for this batch.
+
+    Yields:
+        One result row per record with id, valid, score, layer_count,
+        brick_count, issues, recommendations and estimated_build_time_minutes,
+        or id and error when the record could not be validated.
+
+    Raises:
+        ValueError: If a threshold name is not tunable.
+    """
+    thresholds = thresholds or {}
+    _check_thresholds(thresholds)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        previous = _apply_thresholds(thresholds)
+        try:
+            for chunk in _chunks(records, chunk_size):
+                yield from _validate_chunk(chunk)
+        finally:
+            _apply_thresholds(previous)
+        return
+
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_apply_thresholds, initargs=(thresholds,)) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in _chunks(records, chunk_size):
+            pending.append(pool.submit(_validate_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Any]:
+    """Read JSON records line by line, skipping blank lines.
+
+    Lines that are not valid JSON are yielded as InvalidRecord so the output
+    keeps one row per input record.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid JSON on line {line_number}: {e}")
+            yield InvalidRecord(f"Invalid JSON on line {line_number}: {e}")
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], stream: TextIO) -> int:
+    """Write result rows as JSON lines.
+
+    Returns:
+        Number of rows written.
+    """
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def _parquet_schema() -> "pa.Schema":
+    return pa.schema([
+        ("id", pa.string()),
+        ("valid", pa.bool_()),
+        ("score", pa.int32()),
+        ("layer_count", pa.int32()),
+        ("brick_count", pa.int32()),
+        ("issues", pa.list_(pa.string())),
+        ("recommendations", pa.list_(pa.string())),
+        ("estimated_build_time_minutes", pa.int32()),
+        ("error", pa.string()),
+    ])
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], path: str, row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> int:
+    """Write result rows as a columnar Parquet file, one row group at a time.
+
+    Returns:
+        Number of rows written.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+    schema = _parquet_schema()
+    columns: Dict[str, List[Any]] = {name: [] for name in RESULT_FIELDS}
+    count = 0
+
+    def flush(writer: "pq.ParquetWriter") -> None:
+        writer.write_table(pa.table(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in rows:
+            for name in RESULT_FIELDS:
+                value = row.get(name)
+                columns[name].append(str(value) if name == "id" and value is not None else value)
+            count += 1
+            if len(columns["id"]) >= row_group_size:
+                flush(writer)
+        if columns["id"] or not count:
+            flush(writer)
+    return count
+
+
+def _parse_threshold(text: str) -> Tuple[str, float]:
+    """Parse a NAME=VALUE threshold override."""
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{text}'")
+    try:
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Threshold value must be a number, got '{value}'")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score build sequences with the buildability validator.")
+    parser.add_argument("input", help="JSONL file of build_sequence records ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output path ('-' for stdout, JSONL only)")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl", help="Output format")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per worker task")
+    parser.add_argument(
+        "--set", dest="thresholds", type=_parse_threshold, action="append", default=[], metavar="NAME=VALUE",
+        help=f"Override a threshold ({', '.join(TUNABLE_THRESHOLDS)})",
+    )
+    args = parser.parse_args(argv)
+
+    if args.format == "parquet" and args.output == "-":
+        parser.error("Parquet output needs an output path")
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        rows = validate_buildability_batch(
+            read_jsonl(input_stream),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            thresholds=dict(args.thresholds),
+        )
+        if args.format == "parquet":
+            count = write_parquet(rows, args.output)
+        elif args.output == "-":
+            count = write_jsonl(rows, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8") as output_stream:
+                count = write_jsonl(rows, output_stream)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+
+    print(f"Validated {count} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,20 @@ with standard LEGO bricks, checking grid alignment, connectivity,
 structural stability, and assembly order.
 """
 
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Set, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Set, Tuple, Optional, Union
 import logging
 import math
 
+from validation.connectivity import StudContacts, build_cell_index, find_floating_components, get_ground_layer
+from validation.stability import SubassemblyLoad, analyze_grid_loads, analyze_load_paths
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with trimesh/pyvista
+    np = None
+
 logger = logging.getLogger(__name__)
 
 # LEGO dimensions in mm
@@ -25,6 +34,15 @@ STANDARD_BRICK_SIZES = {"1x2", "1x4", "1x6", "2x2", "2x4", "2x6"}
 STABILITY_TOP_HEAVY_RATIO = 1.5  # Top footprint > base * this ratio triggers recommendation
 STABILITY_TOP_HEAVY_AREA_RATIO = 1.3  # Top area > base area * this ratio triggers penalty
 COM_OFFSET_THRESHOLD = 0.4  # Center of mass offset relative to base dimension
+OVERHANG_SUPPORT_RATIO = 0.5  # Bricks resting on fewer of their studs than this are overhangs
+
+# Maximum number of steps listed in a floating-island issue
+FLOATING_STEPS_LISTED = 8
+
+# Models with at least this many bricks use the vectorized NumPy checks;
+# below it packing the arrays costs more than it saves (see
+# benchmarks/bench_buildability.py --crossover)
+VECTORIZE_MIN_BRICKS = 256
 
 # Brick dimensions in studs for each brick type
 BRICK_DIMENSIONS = {
@@ -36,6 +54,12 @@ BRICK_DIMENSIONS = {
     "2x6": (2, 6),
 }
 
+# (dx, dy) stud offsets covered by each brick type
+FOOTPRINT_OFFSETS = {
+    brick_type: tuple((dx, dy) for dx in range(width) for dy in range(length))
+    for brick_type, (width, length) in BRICK_DIMENSIONS.items()
+}
+
 
 @dataclass
 class BrickPlacement:
@@ -55,6 +79,187 @@ class BrickPlacement:
         }
 
 
+class BuildSequence:
+    """Columnar storage for an ordered list of brick placements.
+
+    Steps, brick types, colors and X/Y/Z positions are kept in flat typed
+    arrays; brick types and colors are interned into small lookup tables.
+    Indexing or iterating returns BrickPlacement views that are built on
+    demand, so a stored sequence costs a few bytes per brick instead of a
+    dataclass and a position dict.
+
+    Attributes:
+        steps: Build step of each brick.
+        brick_codes: Index into brick_types for each brick.
+        color_codes: Index into colors for each brick.
+        xs, ys, zs: Brick position columns in mm.
+        brick_types: Distinct brick type strings.
+        colors: Distinct color strings.
+    """
+
+    __slots__ = (
+        "steps", "brick_codes", "color_codes", "xs", "ys", "zs", "int_axes",
+        "brick_types", "colors", "_brick_index", "_color_index",
+    )
+
+    def __init__(self, bricks: Iterable[BrickPlacement] = ()):
+        """Create a sequence, optionally filled from brick placements."""
+        self.steps = array('q')
+        self.brick_codes = array('H')
+        self.color_codes = array('H')
+        self.xs = array('d')
+        self.ys = array('d')
+        self.zs = array('d')
+        # Bit per axis set when the coordinate was given as an int, so views
+        # round-trip the original JSON numbers
+        self.int_axes = array('B')
+        self.brick_types: List[str] = []
+        self.colors: List[str] = []
+        self._brick_index: Dict[str, int] = {}
+        self._color_index: Dict[str, int] = {}
+        for brick in bricks:
+            self.append(brick.step, brick.brick, brick.color, brick.position)
+
+    @staticmethod
+    def _intern(index: Dict[str, int], table: List[str], value: str) -> int:
+        """Get the lookup-table code of a string, adding it if new."""
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+
+    def append(self, step: int, brick: str, color: str, position: Dict[str, float]) -> None:
+        """Append a brick placement.
+
+        Raises:
+            KeyError: If the position is missing an axis.
+            TypeError, ValueError, OverflowError: If a value cannot be stored.
+        """
+        x, y, z = position["x"], position["y"], position["z"]
+        count = len(self.steps)
+        try:
+            self.steps.append(int(step))
+            brick_code = self._brick_index.get(brick)
+            if brick_code is None:
+                brick_code = self._intern(self._brick_index, self.brick_types, brick)
+            self.brick_codes.append(brick_code)
+            color_code = self._color_index.get(color)
+            if color_code is None:
+                color_code = self._intern(self._color_index, self.colors, color)
+            self.color_codes.append(color_code)
+            self.xs.append(float(x))
+            self.ys.append(float(y))
+            self.zs.append(float(z))
+            self.int_axes.append(isinstance(x, int) | isinstance(y, int) << 1 | isinstance(z, int) << 2)
+        except Exception:
+            # Keep the columns aligned when an entry cannot be stored
+            for column in self._columns():
+                del column[count:]
+            raise
+
+    def _columns(self) -> Tuple[array, ...]:
+        """All per-brick columns."""
+        return (self.steps, self.brick_codes, self.color_codes, self.xs, self.ys, self.zs, self.int_axes)
+
+    def splice(self, start: int, stop: int, bricks: Iterable[BrickPlacement]) -> None:
+        """Replace the bricks at positions start to stop with new placements.
+
+        Raises:
+            Same as append; the sequence is left unchanged.
+        """
+        count = len(self.steps)
+        try:
+            for brick in bricks:
+                self.append(brick.step, brick.brick, brick.color, brick.position)
+        except Exception:
+            for column in self._columns():
+                del column[count:]
+            raise
+        for column in self._columns():
+            added = column[count:]
+            del column[count:]
+            column[start:stop] = added
+
+    def copy(self) -> "BuildSequence":
+        """Copy the columns and lookup tables into an independent sequence."""
+        duplicate = BuildSequence()
+        for column, source in zip(duplicate._columns(), self._columns()):
+            column.extend(source)
+        duplicate.brick_types = list(self.brick_types)
+        duplicate.colors = list(self.colors)
+        duplicate._brick_index = dict(self._brick_index)
+        duplicate._color_index = dict(self._color_index)
+        return duplicate
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __bool__(self) -> bool:
+        return len(self.steps) > 0
+
+    def _position(self, index: int) -> Dict[str, float]:
+        """Build the position dict of one brick."""
+        int_axes = self.int_axes[index]
+        x, y, z = self.xs[index], self.ys[index], self.zs[index]
+        return {
+            "x": int(x) if int_axes & 1 else x,
+            "y": int(y) if int_axes & 2 else y,
+            "z": int(z) if int_axes & 4 else z,
+        }
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[BrickPlacement, List[BrickPlacement]]:
+        """Get a BrickPlacement view (or a list of views for a slice)."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("BuildSequence index out of range")
+        return BrickPlacement(
+            step=self.steps[index],
+            brick=self.brick_types[self.brick_codes[index]],
+            color=self.colors[self.color_codes[index]],
+            position=self._position(index),
+        )
+
+    def __iter__(self) -> Iterator[BrickPlacement]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, BuildSequence):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BuildSequence({len(self)} bricks)"
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert every brick to its JSON dictionary in one pass."""
+        brick_types = self.brick_types
+        colors = self.colors
+        return [
+            {"step": step, "brick": brick_types[brick_code], "color": colors[color_code], "position": self._position(i)}
+            for i, (step, brick_code, color_code) in enumerate(zip(self.steps, self.brick_codes, self.color_codes))
+        ]
+
+    def position_array(self) -> Any:
+        """Get an (N, 3) float array of brick positions (requires NumPy)."""
+        count = len(self)
+        positions = np.empty((count, 3), dtype=float)
+        positions[:, 0] = np.frombuffer(self.xs, dtype=float, count=count)
+        positions[:, 1] = np.frombuffer(self.ys, dtype=float, count=count)
+        positions[:, 2] = np.frombuffer(self.zs, dtype=float, count=count)
+        return positions
+
+    def type_codes(self) -> Any:
+        """Get the brick type code column as an integer array (requires NumPy)."""
+        return np.frombuffer(self.brick_codes, dtype=np.uint16, count=len(self))
+
+
 @dataclass
 class BuildabilityResult:
     """Result of buildability validation."""
@@ -63,9 +268,14 @@ class BuildabilityResult:
     layer_count: int
     issues: List[str] = field(default_factory=list)
     recommendations: List[str] = field(default_factory=list)
-    build_sequence: List[BrickPlacement] = field(default_factory=list)
+    build_sequence: BuildSequence = field(default_factory=BuildSequence)
     estimated_build_time_minutes: int = 0
 
+    def __post_init__(self):
+        # Store bricks columnar; results are kept for the life of a task
+        if not isinstance(self.build_sequence, BuildSequence):
+            self.build_sequence = BuildSequence(self.build_sequence)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -74,7 +284,7 @@ class BuildabilityResult:
             "layer_count": self.layer_count,
             "issues": self.issues,
             "recommendations": self.recommendations,
-            "build_sequence": [b.to_dict() for b in self.build_sequence],
+            "build_sequence": self.build_sequence.to_dicts(),
             "estimated_build_time_minutes": self.estimated_build_time_minutes
         }
 
@@ -90,19 +300,18 @@ def _get_brick_footprint(brick: BrickPlacement) -> Set[Tuple[int, int]]:
 
     Returns a set of (grid_x, grid_y) tuples that the brick covers.
     """
-    brick_type = brick.brick
-    if brick_type not in BRICK_DIMENSIONS:
-        return set()
+    return _footprint_cells(brick.brick, brick.position["x"], brick.position["y"])
 
-    width, length = BRICK_DIMENSIONS[brick_type]
-    base_x = int(round(brick.position["x"] / LEGO_GRID_SIZE))
-    base_y = int(round(brick.position["y"] / LEGO_GRID_SIZE))
 
-    footprint = set()
-    for dx in range(width):
-        for dy in range(length):
-            footprint.add((base_x + dx, base_y + dy))
-    return footprint
+def _footprint_cells(brick_type: str, x: float, y: float) -> Set[Tuple[int, int]]:
+    """Get the grid cells covered by a brick type placed at (x, y) mm."""
+    offsets = FOOTPRINT_OFFSETS.get(brick_type)
+    if offsets is None:
+        return set()
+
+    base_x = int(round(x / LEGO_GRID_SIZE))
+    base_y = int(round(y / LEGO_GRID_SIZE))
+    return {(base_x + dx, base_y + dy) for dx, dy in offsets}
 
 
 def _get_layer_index(z: float) -> int:
@@ -110,7 +319,223 @@ def _get_layer_index(z: float) -> int:
     return int(round(z / LEGO_BRICK_HEIGHT))
 
 
-def _check_grid_alignment(bricks: List[BrickPlacement]) -> Tuple[List[str], int]:
+LayerBounds = Tuple[float, float, float, float]
+Edge = Tuple[float, float, float, float]  # (x1, y1, x2, y2) in mm
+
+
+@dataclass
+class BrickGrid:
+    """Layer-indexed occupancy map shared by all buildability checks.
+
+    Built once per validate_buildability call so the individual checks read
+    precomputed layers, footprints, edges and bounds instead of regrouping
+    the bricks themselves.
+
+    Attributes:
+        bricks: The brick placements in build order.
+        brick_types: Brick type of each brick (parallel to bricks).
+        brick_positions: (x, y, z) of each brick in mm (parallel to bricks).
+        brick_layers: Layer index of each brick (parallel to bricks).
+        brick_footprints: XY grid cells covered by each brick (parallel to bricks).
+        layers: Layer index -> indices into bricks, in build order.
+        layer_footprints: Layer index -> union of the footprints in that layer.
+        layer_edges: Layer index -> set of (x1, y1, x2, y2) brick edges in mm.
+        layer_bounds: Layer index -> (min_x, max_x, min_y, max_y) in mm.
+        sorted_layers: Layer indices in ascending order.
+        positions: (N, 3) array of brick x/y/z in mm, or None on the scalar path.
+        dimensions: (N, 2) array of brick width/length in studs (0 for unknown types).
+        known: (N,) mask of bricks whose type is in BRICK_DIMENSIONS.
+        layer_array: (N,) array of brick layers, or None on the scalar path.
+        cell_index: (layer, grid_x, grid_y) -> brick indices, built on first use.
+        stud_contacts: Studs resting on the layer below, built on first use
+            on the vectorized path.
+    """
+    bricks: Union[BuildSequence, List[BrickPlacement]]
+    brick_types: List[str] = field(default_factory=list)
+    brick_positions: List[Tuple[float, float, float]] = field(default_factory=list)
+    brick_layers: List[int] = field(default_factory=list)
+    brick_footprints: List[Set[Tuple[int, int]]] = field(default_factory=list)
+    layers: Dict[int, List[int]] = field(default_factory=dict)
+    layer_footprints: Dict[int, Set[Tuple[int, int]]] = field(default_factory=dict)
+    layer_edges: Dict[int, Set[Edge]] = field(default_factory=dict)
+    layer_bounds: Dict[int, LayerBounds] = field(default_factory=dict)
+    sorted_layers: List[int] = field(default_factory=list)
+    positions: Optional[Any] = None
+    dimensions: Optional[Any] = None
+    known: Optional[Any] = None
+    layer_array: Optional[Any] = None
+    cell_index: Optional[Dict[Tuple[int, int, int], List[int]]] = None
+    stud_contacts: Optional[StudContacts] = None
+
+    @classmethod
+    def from_bricks(
+        cls,
+        bricks: Union[BuildSequence, List[BrickPlacement]],
+        vectorize: Optional[bool] = None
+    ) -> "BrickGrid":
+        """Index the bricks in a single pass.
+
+        A BuildSequence is indexed straight from its columns without
+        creating BrickPlacement views.
+
+        Args:
+            bricks: Brick placements in build order.
+            vectorize: Pack positions into NumPy arrays for the vectorized
+                checks. Defaults to True when NumPy is installed and the model
+                has at least VECTORIZE_MIN_BRICKS bricks.
+
+        Returns:
+            The populated BrickGrid.
+        """
+        if vectorize is None:
+            vectorize = np is not None and len(bricks) >= VECTORIZE_MIN_BRICKS
+
+        grid = cls(bricks=bricks)
+        if isinstance(bricks, BuildSequence):
+            grid.brick_types = [bricks.brick_types[code] for code in bricks.brick_codes]
+            grid.brick_positions = list(zip(bricks.xs, bricks.ys, bricks.zs))
+        else:
+            grid.brick_types = [brick.brick for brick in bricks]
+            grid.brick_positions = [
+                (brick.position["x"], brick.position["y"], brick.position["z"]) for brick in bricks
+            ]
+        vectorize = vectorize and len(bricks) > 0
+        if vectorize:
+            grid._pack_arrays()
+        else:
+            grid.brick_layers = [_get_layer_index(z) for _, _, z in grid.brick_positions]
+        inf = float('inf')
+
+        for index, (brick_type, (x, y, _), layer) in enumerate(
+                zip(grid.brick_types, grid.brick_positions, grid.brick_layers)):
+            footprint = _footprint_cells(brick_type, x, y)
+            grid.brick_footprints.append(footprint)
+
+            if layer not in grid.layers:
+                grid.layers[layer] = []
+                grid.layer_footprints[layer] = set()
+                grid.layer_edges[layer] = set()
+                grid.layer_bounds[layer] = (inf, -inf, inf, -inf)
+            grid.layers[layer].append(index)
+            grid.layer_footprints[layer].update(footprint)
+
+            if brick_type not in BRICK_DIMENSIONS:
+                continue
+
+            width, length = BRICK_DIMENSIONS[brick_type]
+            x2 = x + width * LEGO_GRID_SIZE
+            y2 = y + length * LEGO_GRID_SIZE
+
+            edges = grid.layer_edges[layer]
+            edges.add((x, y, x2, y))  # Bottom
+            edges.add((x, y, x, y2))  # Left
+            edges.add((x2, y, x2, y2))  # Right
+            edges.add((x, y2, x2, y2))  # Top
+
+            if not vectorize:
+                min_x, max_x, min_y, max_y = grid.layer_bounds[layer]
+                grid.layer_bounds[layer] = (min(min_x, x), max(max_x, x2), min(min_y, y), max(max_y, y2))
+
+        grid.sorted_layers = sorted(grid.layers)
+        if vectorize:
+            grid._pack_layer_bounds()
+        return grid
+
+    def _pack_arrays(self) -> None:
+        """Pack positions and dimensions into arrays and compute brick layers."""
+        count = len(self.bricks)
+        if isinstance(self.bricks, BuildSequence):
+            # Read the columns directly and expand per-type lookups by code
+            table = self.bricks.brick_types
+            codes = self.bricks.type_codes()
+            self.positions = self.bricks.position_array()
+            self.dimensions = np.array(
+                [BRICK_DIMENSIONS.get(brick_type, (0, 0)) for brick_type in table], dtype=float
+            ).reshape(len(table), 2)[codes]
+            self.known = np.array([brick_type in BRICK_DIMENSIONS for brick_type in table], dtype=bool)[codes]
+        else:
+            self.positions = np.array(self.brick_positions, dtype=float).reshape(count, 3)
+            self.dimensions = np.array(
+                [BRICK_DIMENSIONS.get(brick_type, (0, 0)) for brick_type in self.brick_types], dtype=float
+            ).reshape(count, 2)
+            self.known = np.fromiter(
+                (brick_type in BRICK_DIMENSIONS for brick_type in self.brick_types), dtype=bool, count=count
+            )
+        # np.rint rounds half to even like round() in _get_layer_index
+        self.layer_array = np.rint(self.positions[:, 2] / LEGO_BRICK_HEIGHT).astype(np.int64)
+        self.brick_layers = self.layer_array.tolist()
+
+    def _pack_layer_bounds(self) -> None:
+        """Compute the per-layer bounds of the known bricks from the arrays."""
+        known = self.known
+        # Group the known bricks by layer, then reduce each run of a layer
+        order = np.argsort(self.layer_array[known], kind="stable")
+        layers = self.layer_array[known][order]
+        if not layers.size:
+            return
+        x = self.positions[known, 0][order]
+        y = self.positions[known, 1][order]
+        x2 = x + self.dimensions[known, 0][order] * LEGO_GRID_SIZE
+        y2 = y + self.dimensions[known, 1][order] * LEGO_GRID_SIZE
+        starts = np.flatnonzero(np.r_[True, layers[1:] != layers[:-1]])
+
+        bounds = zip(
+            layers[starts].tolist(),
+            np.minimum.reduceat(x, starts).tolist(),
+            np.maximum.reduceat(x2, starts).tolist(),
+            np.minimum.reduceat(y, starts).tolist(),
+            np.maximum.reduceat(y2, starts).tolist(),
+        )
+        for layer, min_x, max_x, min_y, max_y in bounds:
+            self.layer_bounds[layer] = (min_x, max_x, min_y, max_y)
+
+    @property
+    def layer_count(self) -> int:
+        """Number of distinct layers in the model."""
+        return len(self.layers)
+
+    def layer_bricks(self, layer: int) -> List[BrickPlacement]:
+        """Get the bricks placed in a layer, in build order."""
+        return [self.bricks[i] for i in self.layers.get(layer, [])]
+
+
+def _misalignment_mask(values: Any, grid_size: float, tolerance: float = 0.1) -> Any:
+    """Vectorized inverse of _is_grid_aligned over an array of values."""
+    with np.errstate(invalid='ignore'):
+        remainder = np.abs(np.mod(values, grid_size))
+    return ~((remainder < tolerance) | ((grid_size - remainder) < tolerance))
+
+
+def _alignment_mask(brick: BrickPlacement) -> Tuple[bool, bool, bool]:
+    """Get which of a brick's X/Y/Z coordinates are off the LEGO grid."""
+    pos = brick.position
+    return _coordinate_mask(pos["x"], pos["y"], pos["z"])
+
+
+def _coordinate_mask(x: float, y: float, z: float) -> Tuple[bool, bool, bool]:
+    """Get which of the X/Y/Z coordinates are off the LEGO grid."""
+    return (
+        not _is_grid_aligned(x, LEGO_GRID_SIZE),
+        not _is_grid_aligned(y, LEGO_GRID_SIZE),
+        not _is_grid_aligned(z, LEGO_BRICK_HEIGHT),
+    )
+
+
+def _alignment_issues(brick: BrickPlacement, mask: Tuple[bool, bool, bool]) -> List[str]:
+    """Format the grid alignment issues for one brick (5 penalty points each)."""
+    issues = []
+    pos = brick.position
+    x_misaligned, y_misaligned, z_misaligned = mask
+    if x_misaligned:
+        issues.append(f"Brick at step {brick.step} has X position {pos['x']}mm not aligned to 8mm grid")
+    if y_misaligned:
+        issues.append(f"Brick at step {brick.step} has Y position {pos['y']}mm not aligned to 8mm grid")
+    if z_misaligned:
+        issues.append(f"Brick at step {brick.step} has Z position {pos['z']}mm not aligned to 9.6mm layers")
+    return issues
+
+
+def _check_grid_alignment(grid: BrickGrid) -> Tuple[List[str], int]:
     """Check if all bricks are aligned to the LEGO grid.
 
     Returns:
@@ -119,26 +544,35 @@ def _check_grid_alignment(bricks: List[BrickPlacement]) -> Tuple[List[str], int]
     issues = []
     penalty = 0
 
-    for brick in bricks:
-        pos = brick.position
-        x_aligned = _is_grid_aligned(pos["x"], LEGO_GRID_SIZE)
-        y_aligned = _is_grid_aligned(pos["y"], LEGO_GRID_SIZE)
-        z_aligned = _is_grid_aligned(pos["z"], LEGO_BRICK_HEIGHT)
-
-        if not x_aligned:
-            issues.append(f"Brick at step {brick.step} has X position {pos['x']}mm not aligned to 8mm grid")
-            penalty += 5
-        if not y_aligned:
-            issues.append(f"Brick at step {brick.step} has Y position {pos['y']}mm not aligned to 8mm grid")
-            penalty += 5
-        if not z_aligned:
-            issues.append(f"Brick at step {brick.step} has Z position {pos['z']}mm not aligned to 9.6mm layers")
-            penalty += 5
+    if grid.positions is not None:
+        misaligned = np.column_stack((
+            _misalignment_mask(grid.positions[:, 0], LEGO_GRID_SIZE),
+            _misalignment_mask(grid.positions[:, 1], LEGO_GRID_SIZE),
+            _misalignment_mask(grid.positions[:, 2], LEGO_BRICK_HEIGHT),
+        ))
+        flagged = [(int(i), misaligned[i]) for i in np.flatnonzero(misaligned.any(axis=1))]
+    else:
+        flagged = []
+        for index, (x, y, z) in enumerate(grid.brick_positions):
+            mask = _coordinate_mask(x, y, z)
+            if any(mask):
+                flagged.append((index, mask))
+
+    for index, mask in flagged:
+        brick_issues = _alignment_issues(grid.bricks[index], mask)
+        issues.extend(brick_issues)
+        penalty += 5 * len(brick_issues)
 
     return issues, penalty
 
 
-def _check_brick_sizes(bricks: List[BrickPlacement]) -> Tuple[List[str], int]:
+def _size_issue(brick: BrickPlacement) -> str:
+    """Format the issue for a non-standard brick size."""
+    return (f"Non-standard brick size '{brick.brick}' at step {brick.step}. "
+            f"Allowed: {', '.join(sorted(STANDARD_BRICK_SIZES))}")
+
+
+def _check_brick_sizes(grid: BrickGrid) -> Tuple[List[str], int]:
     """Check if all bricks are standard sizes.
 
     Returns:
@@ -147,153 +581,217 @@ def _check_brick_sizes(bricks: List[BrickPlacement]) -> Tuple[List[str], int]:
     issues = []
     penalty = 0
 
-    for brick in bricks:
-        if brick.brick not in STANDARD_BRICK_SIZES:
-            issues.append(f"Non-standard brick size '{brick.brick}' at step {brick.step}. "
-                         f"Allowed: {', '.join(sorted(STANDARD_BRICK_SIZES))}")
+    for index, brick_type in enumerate(grid.brick_types):
+        if brick_type not in STANDARD_BRICK_SIZES:
+            issues.append(_size_issue(grid.bricks[index]))
             penalty += 10
 
     return issues, penalty
 
 
-def _check_connectivity(bricks: List[BrickPlacement]) -> Tuple[List[str], int, List[str]]:
-    """Check if all bricks are connected to the structure.
+def _floating_issues(
+    components: List[List[int]],
+    bricks: Union[List[BrickPlacement], Dict[int, BrickPlacement]],
+    brick_layers: Union[List[int], Dict[int, int]],
+    rank: Optional[Dict[int, int]] = None
+) -> List[str]:
+    """Format one "Floating brick" issue per ungrounded component.
 
-    Bricks can connect either below (resting on) or above (supporting).
-    The first layer bricks are always valid (they rest on the ground).
+    Args:
+        components: Brick ids of each floating component, in build order.
+        bricks: Lookup from brick id to placement.
+        brick_layers: Lookup from brick id to layer index.
+        rank: Brick id -> sort key in build order. Defaults to the id
+            itself, for ids that are build positions.
 
     Returns:
-        Tuple of (issues list, penalty points, recommendations list)
+        Issues ordered by the layer and build position of each island's
+        lowest brick (15 penalty points each).
     """
+    floating = []
+    for component in components:
+        # Report each island by its lowest brick, the one missing support;
+        # min keeps the earliest of several in build order
+        lowest = min(component, key=brick_layers.__getitem__)
+        floating.append((brick_layers[lowest], lowest if rank is None else rank[lowest], lowest, component))
+
     issues = []
+    for layer, _, lowest, component in sorted(floating, key=lambda item: item[:2]):
+        brick = bricks[lowest]
+        if len(component) == 1:
+            issues.append(f"Floating brick at step {brick.step} (layer {layer}) - "
+                        f"no connection above or below")
+        else:
+            steps = ", ".join(str(bricks[index].step) for index in component[:FLOATING_STEPS_LISTED])
+            if len(component) > FLOATING_STEPS_LISTED:
+                steps += ", ..."
+            issues.append(f"Floating brick at step {brick.step} (layer {layer}) - "
+                        f"group of {len(component)} bricks (steps {steps}) is not connected to the ground")
+    return issues
+
+
+def _footprint_recommendations(base_size: int, top_size: int) -> List[str]:
+    """Recommend a wider base when the top layer covers far more studs than layer 0."""
+    if base_size and top_size and top_size > base_size * STABILITY_TOP_HEAVY_RATIO:
+        return ["Consider widening the base for better stability"]
+    return []
+
+
+def _check_connectivity(grid: BrickGrid) -> Tuple[List[str], int, List[str]]:
+    """Check if all bricks are connected to the ground through the structure.
+
+    Bricks connect through stud overlap with bricks directly above or below
+    them. Connected components are found with union-find; every component
+    that does not reach the ground layer is reported as floating, including
+    multi-brick islands that are only attached to each other.
+
+    Returns:
+        Tuple of (issues list, penalty points, recommendations list)
+    """
     recommendations = []
-    penalty = 0
 
-    if not bricks:
-        return issues, penalty, recommendations
+    if not grid.bricks:
+        return [], 0, recommendations
 
-    # Group bricks by layer
-    layers: Dict[int, List[BrickPlacement]] = {}
-    for brick in bricks:
-        layer = _get_layer_index(brick.position["z"])
-        if layer not in layers:
-            layers[layer] = []
-        layers[layer].append(brick)
-
-    # Get footprints for each layer
-    layer_footprints: Dict[int, Set[Tuple[int, int]]] = {}
-    for layer, layer_bricks in layers.items():
-        footprint = set()
-        for brick in layer_bricks:
-            footprint.update(_get_brick_footprint(brick))
-        layer_footprints[layer] = footprint
-
-    # Check each brick (except ground layer) for connections
-    sorted_layers = sorted(layers.keys())
-
-    for layer in sorted_layers:
-        if layer == 0:
-            continue  # Ground layer is always valid
-
-        for brick in layers[layer]:
-            brick_footprint = _get_brick_footprint(brick)
-            if not brick_footprint:
-                continue
+    issues = _floating_issues(find_floating_components(grid), grid.bricks, grid.brick_layers)
+    penalty = 15 * len(issues)
 
-            # Check connection to layer below
-            has_connection_below = False
-            if layer - 1 in layer_footprints:
-                overlap_below = brick_footprint & layer_footprints[layer - 1]
-                has_connection_below = len(overlap_below) > 0
+    # Check if structure is reasonably stable
+    sorted_layers = grid.sorted_layers
+    if len(sorted_layers) > 1:
+        recommendations.extend(_footprint_recommendations(
+            len(grid.layer_footprints.get(0, ())),
+            len(grid.layer_footprints[sorted_layers[-1]]),
+        ))
 
-            # Check connection to layer above (brick supports something above)
-            has_connection_above = False
-            if layer + 1 in layer_footprints:
-                overlap_above = brick_footprint & layer_footprints[layer + 1]
-                has_connection_above = len(overlap_above) > 0
+    return issues, penalty, recommendations
 
-            if not has_connection_below and not has_connection_above:
-                issues.append(f"Floating brick at step {brick.step} (layer {layer}) - "
-                            f"no connection above or below")
-                penalty += 15
 
-    # Check if structure is reasonably stable
-    if len(sorted_layers) > 1:
-        base_footprint = layer_footprints.get(0, set())
-        top_layer = sorted_layers[-1]
-        top_footprint = layer_footprints.get(top_layer, set())
+def _find_seams(layer_edges: Iterable[Tuple[int, Iterable[Edge]]]) -> Tuple[List[str], int]:
+    """Find vertical seams with a single run-length pass over the layers.
 
-        if base_footprint and top_footprint:
-            base_size = len(base_footprint)
-            top_size = len(top_footprint)
-            if top_size > base_size * STABILITY_TOP_HEAVY_RATIO:
-                recommendations.append("Consider widening the base for better stability")
+    Each edge carries a counter of how many consecutive layers it has
+    appeared in. Every three-layer window that shares a seam costs 2 points
+    and is reported when more than 3 seams line up. Seams that run through
+    more than 3 layers are reported once per run.
 
-    return issues, penalty, recommendations
+    Args:
+        layer_edges: (layer index, brick edges) pairs in ascending layer order.
 
+    Returns:
+        Tuple of (issues list, penalty points)
+    """
+    windows: List[Tuple[int, int, int]] = []
+    long_runs: Dict[Tuple[int, int], int] = {}
+    runs: Dict[Edge, Tuple[int, int]] = {}  # edge -> (first layer, run length)
+    layers: List[int] = []
+
+    for layer, edges in layer_edges:
+        layers.append(layer)
+        next_runs, continuous_seams = _extend_seam_runs(runs, layer, edges)
+        windows.append((layers[max(len(layers) - 3, 0)], layer, continuous_seams))
+        if len(layers) > 1:
+            _collect_long_runs(runs, next_runs, layers[-2], long_runs)
+        runs = next_runs
+
+    if layers:
+        _collect_long_runs(runs, {}, layers[-1], long_runs)
+    return _seam_report(windows, long_runs)
+
+
+def _extend_seam_runs(
+    runs: Dict[Edge, Tuple[int, int]],
+    layer: int,
+    edges: Iterable[Edge]
+) -> Tuple[Dict[Edge, Tuple[int, int]], int]:
+    """Continue the seam runs through a layer.
 
-def _check_staggered_joints(bricks: List[BrickPlacement]) -> Tuple[List[str], int]:
-    """Check for vertical seams running through >2 consecutive layers.
+    Args:
+        runs: Edge -> (first layer, run length) up to the layer below.
+        layer: Layer index.
+        edges: The layer's brick edges.
+
+    Returns:
+        Tuple of (runs including this layer, seams running through 3 or more layers)
+    """
+    next_runs = {}
+    continuous_seams = 0
+    for edge in edges:
+        first_layer, length = runs.get(edge, (layer, 0))
+        next_runs[edge] = (first_layer, length + 1)
+        if length + 1 >= 3:
+            continuous_seams += 1
+    return next_runs, continuous_seams
+
+
+def _seam_report(
+    windows: Iterable[Tuple[int, int, int]],
+    long_runs: Dict[Tuple[int, int], int]
+) -> Tuple[List[str], int]:
+    """Issues and penalty of the seam windows and long runs.
+
+    Args:
+        windows: (first layer, last layer, continuous seams) of each layer's
+            three-layer window, in ascending layer order.
+        long_runs: (first layer, last layer) -> number of seams running
+            through more than 3 layers.
 
     Returns:
         Tuple of (issues list, penalty points)
     """
     issues = []
     penalty = 0
-
-    if len(bricks) < 3:
-        return issues, penalty
-
-    # Group bricks by layer
-    layers: Dict[int, List[BrickPlacement]] = {}
-    for brick in bricks:
-        layer = _get_layer_index(brick.position["z"])
-        if layer not in layers:
-            layers[layer] = []
-        layers[layer].append(brick)
-
-    sorted_layers = sorted(layers.keys())
-
-    # For each pair of adjacent layers, find joint locations
-    # A joint is the edge between two bricks at the same layer
-    for i in range(len(sorted_layers) - 2):
-        layer1 = sorted_layers[i]
-        layer2 = sorted_layers[i + 1]
-        layer3 = sorted_layers[i + 2]
-
-        # Get brick edges for each layer
-        def get_brick_edges(layer_bricks: List[BrickPlacement]) -> Set[Tuple[float, float, float, float]]:
-            """Get edges (x1, y1, x2, y2) of bricks in a layer."""
-            edges = set()
-            for brick in layer_bricks:
-                if brick.brick not in BRICK_DIMENSIONS:
-                    continue
-                width, length = BRICK_DIMENSIONS[brick.brick]
-                x = brick.position["x"]
-                y = brick.position["y"]
-                # Add all 4 edges
-                edges.add((x, y, x + width * LEGO_GRID_SIZE, y))  # Bottom
-                edges.add((x, y, x, y + length * LEGO_GRID_SIZE))  # Left
-                edges.add((x + width * LEGO_GRID_SIZE, y, x + width * LEGO_GRID_SIZE, y + length * LEGO_GRID_SIZE))  # Right
-                edges.add((x, y + length * LEGO_GRID_SIZE, x + width * LEGO_GRID_SIZE, y + length * LEGO_GRID_SIZE))  # Top
-            return edges
-
-        edges1 = get_brick_edges(layers.get(layer1, []))
-        edges2 = get_brick_edges(layers.get(layer2, []))
-        edges3 = get_brick_edges(layers.get(layer3, []))
-
-        # Find edges that appear in all 3 consecutive layers
-        continuous_seams = edges1 & edges2 & edges3
+    for first_layer, layer, continuous_seams in windows:
+        # This is a warning, not a hard failure
         if continuous_seams:
-            # This is a warning, not a hard failure
             penalty += 2
-            if len(continuous_seams) > 3:
-                issues.append(f"Multiple vertical seams detected through layers {layer1}-{layer3}")
+            if continuous_seams > 3:
+                issues.append(f"Multiple vertical seams detected through layers {first_layer}-{layer}")
+
+    for (first_layer, last_layer), count in sorted(long_runs.items()):
+        seams = "seam runs" if count == 1 else "seams run"
+        issues.append(f"{count} vertical {seams} through layers {first_layer}-{last_layer} "
+                      f"without staggering")
 
     return issues, penalty
 
 
-def _check_assembly_order(bricks: List[BrickPlacement]) -> Tuple[List[str], int]:
+def _collect_long_runs(
+    runs: Dict[Edge, Tuple[int, int]],
+    next_runs: Dict[Edge, Tuple[int, int]],
+    last_layer: int,
+    long_runs: Dict[Tuple[int, int], int]
+) -> None:
+    """Count the seams longer than 3 layers that end at last_layer."""
+    for edge, (first_layer, length) in runs.items():
+        if length > 3 and edge not in next_runs:
+            key = (first_layer, last_layer)
+            long_runs[key] = long_runs.get(key, 0) + 1
+
+
+def _check_staggered_joints(grid: BrickGrid) -> Tuple[List[str], int]:
+    """Check for vertical seams running through >2 consecutive layers.
+
+    A joint is the edge between two bricks at the same layer. Each layer's
+    edge set is built once by BrickGrid and the seams are traced in a
+    single pass, so runs of any length are found.
+
+    Returns:
+        Tuple of (issues list, penalty points)
+    """
+    if len(grid.bricks) < 3:
+        return [], 0
+
+    return _find_seams((layer, grid.layer_edges[layer]) for layer in grid.sorted_layers)
+
+
+def _order_issue(brick: BrickPlacement, layer: int) -> str:
+    """Format the issue for a brick placed before the layers below it."""
+    return (f"Build sequence jumps too far ahead at step {brick.step} - "
+            f"layer {layer} placed before lower layers complete")
+
+
+def _check_assembly_order(grid: BrickGrid) -> Tuple[List[str], int]:
     """Check if the build sequence is physically possible.
 
     Validates that:
@@ -306,19 +804,15 @@ def _check_assembly_order(bricks: List[BrickPlacement]) -> Tuple[List[str], int]
     issues = []
     penalty = 0
 
-    if not bricks:
+    if not grid.bricks:
         return issues, penalty
 
     # Check that build sequence goes layer by layer (generally)
     prev_max_z = -1.0
-    for brick in bricks:
-        z = brick.position["z"]
-        layer = _get_layer_index(z)
-
+    for index, (_, _, z) in enumerate(grid.brick_positions):
         # Allow building within same layer or one layer above previous max
         if z > prev_max_z + LEGO_BRICK_HEIGHT * 1.5:
-            issues.append(f"Build sequence jumps too far ahead at step {brick.step} - "
-                         f"layer {layer} placed before lower layers complete")
+            issues.append(_order_issue(grid.bricks[index], grid.brick_layers[index]))
             penalty += 5
 
         prev_max_z = max(prev_max_z, z)
@@ -326,55 +820,64 @@ def _check_assembly_order(bricks: List[BrickPlacement]) -> Tuple[List[str], int]
     return issues, penalty
 
 
-def _check_structural_stability(bricks: List[BrickPlacement]) -> Tuple[List[str], int, List[str]]:
-    """Check structural stability of the model.
+def _center_of_mass(grid: BrickGrid) -> Tuple[float, float, float]:
+    """Calculate the mass-weighted XY sums of the model.
 
-    Validates:
-    1. Base width >= top width (pyramidal stability)
-    2. Center of mass is over the base
+    Mass is approximated by stud count; bricks of unknown type are ignored.
 
     Returns:
-        Tuple of (issues list, penalty points, recommendations list)
+        Tuple of (sum of center_x * mass, sum of center_y * mass, total mass)
     """
-    issues = []
-    recommendations = []
-    penalty = 0
-
-    if not bricks:
-        return issues, penalty, recommendations
+    if grid.positions is not None:
+        known = grid.known
+        width = grid.dimensions[known, 0]
+        length = grid.dimensions[known, 1]
+        mass = width * length
+        if not mass.size:
+            return 0.0, 0.0, 0
+        center_x = grid.positions[known, 0] + (width * LEGO_GRID_SIZE) / 2
+        center_y = grid.positions[known, 1] + (length * LEGO_GRID_SIZE) / 2
+        # cumsum adds left to right, matching the scalar loop bit for bit
+        return (float(np.cumsum(center_x * mass)[-1]),
+                float(np.cumsum(center_y * mass)[-1]),
+                float(mass.sum()))
 
-    # Calculate bounding box per layer
-    layers: Dict[int, List[BrickPlacement]] = {}
-    for brick in bricks:
-        layer = _get_layer_index(brick.position["z"])
-        if layer not in layers:
-            layers[layer] = []
-        layers[layer].append(brick)
+    total_mass = 0
+    com_x = com_y = 0.0
+    for brick_type, (x, y, _) in zip(grid.brick_types, grid.brick_positions):
+        if brick_type not in BRICK_DIMENSIONS:
+            continue
+        width, length = BRICK_DIMENSIONS[brick_type]
+        mass = width * length  # Approximate mass by stud count
+        center_x = x + (width * LEGO_GRID_SIZE) / 2
+        center_y = y + (length * LEGO_GRID_SIZE) / 2
+        com_x += center_x * mass
+        com_y += center_y * mass
+        total_mass += mass
+    return com_x, com_y, total_mass
 
-    if len(layers) < 2:
-        return issues, penalty, recommendations
 
-    sorted_layers = sorted(layers.keys())
-    base_layer = sorted_layers[0]
-    top_layer = sorted_layers[-1]
+def _stability_from_bounds(
+    base_bounds: LayerBounds,
+    top_bounds: LayerBounds,
+    com_x: float,
+    com_y: float,
+    total_mass: float
+) -> Tuple[int, List[str]]:
+    """Score stability from the base/top layer bounds and mass-weighted sums.
 
-    def get_layer_bounds(layer_bricks: List[BrickPlacement]) -> Tuple[float, float, float, float]:
-        """Get (min_x, max_x, min_y, max_y) for a layer."""
-        min_x = min_y = float('inf')
-        max_x = max_y = float('-inf')
-        for brick in layer_bricks:
-            if brick.brick not in BRICK_DIMENSIONS:
-                continue
-            width, length = BRICK_DIMENSIONS[brick.brick]
-            x, y = brick.position["x"], brick.position["y"]
-            min_x = min(min_x, x)
-            min_y = min(min_y, y)
-            max_x = max(max_x, x + width * LEGO_GRID_SIZE)
-            max_y = max(max_y, y + length * LEGO_GRID_SIZE)
-        return min_x, max_x, min_y, max_y
+    Args:
+        base_bounds: (min_x, max_x, min_y, max_y) of the lowest layer.
+        top_bounds: (min_x, max_x, min_y, max_y) of the highest layer.
+        com_x: Sum of brick center X times mass.
+        com_y: Sum of brick center Y times mass.
+        total_mass: Sum of brick masses (stud counts).
 
-    base_bounds = get_layer_bounds(layers[base_layer])
-    top_bounds = get_layer_bounds(layers[top_layer])
+    Returns:
+        Tuple of (penalty points, recommendations list)
+    """
+    recommendations = []
+    penalty = 0
 
     base_width = base_bounds[1] - base_bounds[0]
     base_depth = base_bounds[3] - base_bounds[2]
@@ -388,20 +891,6 @@ def _check_structural_stability(bricks: List[BrickPlacement]) -> Tuple[List[str]
         recommendations.append("Model is top-heavy - consider widening the base for stability")
         penalty += 5
 
-    # Calculate approximate center of mass
-    total_mass = 0
-    com_x = com_y = 0.0
-    for brick in bricks:
-        if brick.brick not in BRICK_DIMENSIONS:
-            continue
-        width, length = BRICK_DIMENSIONS[brick.brick]
-        mass = width * length  # Approximate mass by stud count
-        center_x = brick.position["x"] + (width * LEGO_GRID_SIZE) / 2
-        center_y = brick.position["y"] + (length * LEGO_GRID_SIZE) / 2
-        com_x += center_x * mass
-        com_y += center_y * mass
-        total_mass += mass
-
     if total_mass > 0:
         com_x /= total_mass
         com_y /= total_mass
@@ -417,6 +906,92 @@ def _check_structural_stability(bricks: List[BrickPlacement]) -> Tuple[List[str]
             recommendations.append("Center of mass is off-center - model may tip over")
             penalty += 3
 
+    return penalty, recommendations
+
+
+def _load_path_findings(
+    loads: Iterable[SubassemblyLoad],
+    bricks: Union[BuildSequence, List[BrickPlacement], Dict[int, BrickPlacement]],
+    rank: Dict[int, int]
+) -> List[str]:
+    """Recommend support for sub-assemblies that tip over or overhang.
+
+    The load split behind these findings is a heuristic, so they are
+    recommendations and do not affect the score.
+
+    Args:
+        loads: Per-brick loads from analyze_load_paths.
+        bricks: Lookup from brick id to placement.
+        rank: Brick id -> build position, for ordering the findings.
+
+    Returns:
+        Recommendations list
+    """
+    recommendations = []
+    tipping = []
+    overhangs = []
+    for load in loads:
+        if load.support is None:
+            continue
+        if load.tips:
+            tipping.append(load)
+        elif load.supported_studs < load.studs * OVERHANG_SUPPORT_RATIO:
+            overhangs.append(load)
+
+    if tipping:
+        tipping.sort(key=lambda load: (load.layer, rank[load.brick]))
+        steps = ", ".join(str(bricks[load.brick].step) for load in tipping[:FLOATING_STEPS_LISTED])
+        if len(tipping) > FLOATING_STEPS_LISTED:
+            steps += ", ..."
+        noun = "sub-assembly" if len(tipping) == 1 else "sub-assemblies"
+        recommendations.append(f"{len(tipping)} {noun} may tip with the load center outside the studs "
+                               f"supporting it (steps {steps}) - move the load over its support")
+
+    if overhangs:
+        overhangs.sort(key=lambda load: rank[load.brick])
+        steps = ", ".join(str(bricks[load.brick].step) for load in overhangs[:FLOATING_STEPS_LISTED])
+        if len(overhangs) > FLOATING_STEPS_LISTED:
+            steps += ", ..."
+        recommendations.append(f"{len(overhangs)} bricks overhang with less than half of their studs "
+                               f"supported (steps {steps}) - add support underneath")
+
+    return recommendations
+
+
+def _check_structural_stability(grid: BrickGrid) -> Tuple[List[str], int, List[str]]:
+    """Check structural stability of the model.
+
+    Validates:
+    1. Base width >= top width (pyramidal stability)
+    2. Center of mass is over the base
+    3. Every sub-assembly's load center is over the studs it rests on
+       (recommendations only)
+
+    Returns:
+        Tuple of (issues list, penalty points, recommendations list)
+    """
+    issues = []
+    recommendations = []
+    penalty = 0
+
+    if not grid.bricks or grid.layer_count < 2:
+        return issues, penalty, recommendations
+
+    base_bounds = grid.layer_bounds[grid.sorted_layers[0]]
+    top_bounds = grid.layer_bounds[grid.sorted_layers[-1]]
+    com_x, com_y, total_mass = _center_of_mass(grid)
+
+    penalty, recommendations = _stability_from_bounds(base_bounds, top_bounds, com_x, com_y, total_mass)
+
+    ground_layer = get_ground_layer(grid)
+    loads = analyze_grid_loads(grid, ground_layer, flagged_only=True)
+    if loads is None:
+        loads = analyze_load_paths(
+            range(len(grid.bricks)), grid.brick_layers, grid.brick_footprints,
+            build_cell_index(grid), ground_layer,
+        )
+    rank = {index: index for index in loads}
+    recommendations.extend(_load_path_findings(loads.values(), grid.bricks, rank))
     return issues, penalty, recommendations
 
 
@@ -432,12 +1007,151 @@ def _estimate_build_time(brick_count: int, layer_count: int) -> int:
     return int(math.ceil(brick_time + layer_time))
 
 
+# Position of entries without one; only read, never stored
+DEFAULT_POSITION = {"x": 0, "y": 0, "z": 0}
+
+
+def _parse_build_sequence(
+    raw_sequence: List[Dict[str, Any]],
+    start: int = 0
+) -> Tuple[BuildSequence, List[str], int]:
+    """Convert raw build_sequence entries to a columnar BuildSequence.
+
+    Entries are decoded into plain lists and the typed columns are built in
+    one go. Any entry that cannot be decoded or stored (including a step
+    beyond int64 or too many distinct brick types) sends the sequence
+    through BuildSequence.append entry by entry, which reports it.
+
+    Args:
+        raw_sequence: Raw build_sequence entries.
+        start: Index of the first entry in the full build_sequence, used for
+            default steps and issue messages when parsing part of it.
+
+    Returns:
+        Tuple of (bricks sequence, issues list, penalty points)
+    """
+    steps: List[int] = []
+    brick_codes: List[int] = []
+    color_codes: List[int] = []
+    xs: List[float] = []
+    ys: List[float] = []
+    zs: List[float] = []
+    int_axes: List[int] = []
+    brick_index: Dict[str, int] = {}
+    color_index: Dict[str, int] = {}
+    for i, item in enumerate(raw_sequence, start):
+        try:
+            position = item.get("position", DEFAULT_POSITION)
+            x, y, z = position["x"], position["y"], position["z"]
+            step = int(item.get("step", i + 1))
+            brick_code = brick_index.setdefault(item.get("brick", "unknown"), len(brick_index))
+            color_code = color_index.setdefault(item.get("color", "unknown"), len(color_index))
+            coords = (float(x), float(y), float(z))
+        except Exception:
+            return _parse_entries(raw_sequence, start)
+        steps.append(step)
+        brick_codes.append(brick_code)
+        color_codes.append(color_code)
+        xs.append(coords[0])
+        ys.append(coords[1])
+        zs.append(coords[2])
+        int_axes.append(isinstance(x, int) | isinstance(y, int) << 1 | isinstance(z, int) << 2)
+
+    bricks = BuildSequence()
+    try:
+        bricks.steps = array('q', steps)
+        bricks.brick_codes = array('H', brick_codes)
+        bricks.color_codes = array('H', color_codes)
+    except OverflowError:
+        return _parse_entries(raw_sequence, start)
+    bricks.xs = array('d', xs)
+    bricks.ys = array('d', ys)
+    bricks.zs = array('d', zs)
+    bricks.int_axes = array('B', int_axes)
+    bricks.brick_types = list(brick_index)
+    bricks.colors = list(color_index)
+    bricks._brick_index = brick_index
+    bricks._color_index = color_index
+    return bricks, [], 0
+
+
+def _parse_entries(raw_sequence: List[Dict[str, Any]], start: int = 0) -> Tuple[BuildSequence, List[str], int]:
+    """Parse entry by entry, reporting every entry its columns cannot store."""
+    bricks = BuildSequence()
+    issues: List[str] = []
+    penalty = 0
+    for i, item in enumerate(raw_sequence, start):
+        try:
+            bricks.append(
+                step=item.get("step", i + 1),
+                brick=item.get("brick", "unknown"),
+                color=item.get("color", "unknown"),
+                position=item.get("position", DEFAULT_POSITION)
+            )
+        except Exception as e:
+            issues.append(f"Invalid brick data at index {i}: {e}")
+            penalty += 5
+    return bricks, issues, penalty
+
+
+def _empty_result(has_raw_sequence: bool) -> BuildabilityResult:
+    """Build the result for a sequence with no usable bricks."""
+    if not has_raw_sequence:
+        return BuildabilityResult(
+            valid=False,
+            score=0,
+            layer_count=0,
+            issues=["No build_sequence data provided"],
+            recommendations=["Ensure the model includes build_sequence metadata"],
+            build_sequence=[],
+            estimated_build_time_minutes=0
+        )
+    return BuildabilityResult(
+        valid=False,
+        score=0,
+        layer_count=0,
+        issues=["No valid bricks found in build_sequence"],
+        recommendations=["Check build_sequence format"],
+        build_sequence=[],
+        estimated_build_time_minutes=0
+    )
+
+
+def _finalize_result(
+    bricks: Union[BuildSequence, List[BrickPlacement]],
+    issues: List[str],
+    recommendations: List[str],
+    total_penalty: int,
+    layer_count: int
+) -> BuildabilityResult:
+    """Score the collected issues and build the BuildabilityResult."""
+    # Calculate score (100 - penalty, minimum 0)
+    score = max(0, 100 - total_penalty)
+    valid = score >= 70 and len([i for i in issues if "Floating brick" in i or "Non-standard" in i]) == 0
+
+    # Estimate build time
+    build_time = _estimate_build_time(len(bricks), layer_count)
+
+    logger.info(f"Buildability validation: score={score}, valid={valid}, "
+                f"bricks={len(bricks)}, layers={layer_count}, issues={len(issues)}")
+
+    return BuildabilityResult(
+        valid=valid,
+        score=score,
+        layer_count=layer_count,
+        issues=issues,
+        recommendations=recommendations,
+        build_sequence=bricks,
+        estimated_build_time_minutes=build_time
+    )
+
+
 def validate_buildability(model_data: Dict[str, Any]) -> BuildabilityResult:
     """Validate that a LEGO model can be physically built.
 
     Validates:
     1. Grid alignment - all bricks on 8mm X/Y grid, correct Z increments
-    2. Connectivity - no floating bricks, each connects to structure below OR above
+    2. Connectivity - no floating bricks or islands, every brick connects to the ground
     3. Staggered joints - no vertical seams running through >2 consecutive layers
     4. Assembly order - build sequence is physically possible (no trapped spaces)
     5. Structural stability - base width >= top width, center of mass over base
@@ -452,99 +1166,46 @@ def validate_buildability(model_data: Dict[str, Any]) -> BuildabilityResult:
     Returns:
         BuildabilityResult with validation results
     """
-    issues: List[str] = []
     recommendations: List[str] = []
-    total_penalty = 0
 
     # Extract build sequence
     raw_sequence = model_data.get("build_sequence", [])
     if not raw_sequence:
-        return BuildabilityResult(
-            valid=False,
-            score=0,
-            layer_count=0,
-            issues=["No build_sequence data provided"],
-            recommendations=["Ensure the model includes build_sequence metadata"],
-            build_sequence=[],
-            estimated_build_time_minutes=0
-        )
+        return _empty_result(has_raw_sequence=False)
 
     # Convert raw data to BrickPlacement objects
-    bricks: List[BrickPlacement] = []
-    for i, item in enumerate(raw_sequence):
-        try:
-            brick = BrickPlacement(
-                step=item.get("step", i + 1),
-                brick=item.get("brick", "unknown"),
-                color=item.get("color", "unknown"),
-                position=item.get("position", {"x": 0, "y": 0, "z": 0})
-            )
-            bricks.append(brick)
-        except Exception as e:
-            issues.append(f"Invalid brick data at index {i}: {e}")
-            total_penalty += 5
-
+    bricks, issues, total_penalty = _parse_build_sequence(raw_sequence)
     if not bricks:
-        return BuildabilityResult(
-            valid=False,
-            score=0,
-            layer_count=0,
-            issues=["No valid bricks found in build_sequence"],
-            recommendations=["Check build_sequence format"],
-            build_sequence=[],
-            estimated_build_time_minutes=0
-        )
+        return _empty_result(has_raw_sequence=True)
+
+    # Index bricks once; every check reads from the shared grid
+    grid = BrickGrid.from_bricks(bricks)
 
     # Run all validation checks
-    grid_issues, grid_penalty = _check_grid_alignment(bricks)
+    grid_issues, grid_penalty = _check_grid_alignment(grid)
     issues.extend(grid_issues)
     total_penalty += grid_penalty
 
-    size_issues, size_penalty = _check_brick_sizes(bricks)
+    size_issues, size_penalty = _check_brick_sizes(grid)
     issues.extend(size_issues)
     total_penalty += size_penalty
 
-    conn_issues, conn_penalty, conn_recs = _check_connectivity(bricks)
+    conn_issues, conn_penalty, conn_recs = _check_connectivity(grid)
     issues.extend(conn_issues)
     total_penalty += conn_penalty
     recommendations.extend(conn_recs)
 
-    joint_issues, joint_penalty = _check_staggered_joints(bricks)
+    joint_issues, joint_penalty = _check_staggered_joints(grid)
     issues.extend(joint_issues)
     total_penalty += joint_penalty
 
-    order_issues, order_penalty = _check_assembly_order(bricks)
+    order_issues, order_penalty = _check_assembly_order(grid)
     issues.extend(order_issues)
     total_penalty += order_penalty
 
-    stability_issues, stability_penalty, stability_recs = _check_structural_stability(bricks)
+    stability_issues, stability_penalty, stability_recs = _check_structural_stability(grid)
     issues.extend(stability_issues)
     total_penalty += stability_penalty
     recommendations.extend(stability_recs)
 
-    # Calculate layer count
-    unique_layers = set()
-    for brick in bricks:
-        layer = _get_layer_index(brick.position["z"])
-        unique_layers.add(layer)
-    layer_count = len(unique_layers)
-
-    # Calculate score (100 - penalty, minimum 0)
-    score = max(0, 100 - total_penalty)
-    valid = score >= 70 and len([i for i in issues if "Floating brick" in i or "Non-standard" in i]) == 0
-
-    # Estimate build time
-    build_time = _estimate_build_time(len(bricks), layer_count)
-
-    logger.info(f"Buildability validation: score={score}, valid={valid}, "
-                f"bricks={len(bricks)}, layers={layer_count}, issues={len(issues)}")
-
-    return BuildabilityResult(
-        valid=valid,
-        score=score,
-        layer_count=layer_count,
-        issues=issues,
-        recommendations=recommendations,
-        build_sequence=bricks,
-        estimated_build_time_minutes=build_time
-    )
+    return _finalize_result(bricks, issues, recommendations, total_penalty, grid.layer_count)
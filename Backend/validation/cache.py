@@ -0,0 +1,170 @@
+"""Content-addressed cache for buildability results.
+
+Coder retries often produce the same build_sequence again, and modification
+requests resubmit the same base model. validate_buildability_cached keys
+results by a canonical hash of the sequence so repeat validations are a
+dictionary lookup.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from validation import buildability
+from validation.buildability import BuildabilityResult, validate_buildability
+
+logger = logging.getLogger(__name__)
+
+# Default cache bounds
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL_SECONDS = 3600.0
+
+# Thresholds read by the checks; part of the key so overrides never hit stale results
+_KEY_THRESHOLDS = (
+    "STABILITY_TOP_HEAVY_RATIO",
+    "STABILITY_TOP_HEAVY_AREA_RATIO",
+    "COM_OFFSET_THRESHOLD",
+    "OVERHANG_SUPPORT_RATIO",
+)
+
+
+def canonical_sequence_key(raw_sequence: List[Dict[str, Any]]) -> Optional[str]:
+    """Hash a build_sequence independently of dict key order and whitespace.
+
+    Bricks stay in build order and coordinates are hashed exactly, since
+    both show up in the result (assembly-order issues, step numbers and
+    misaligned positions in messages).
+
+    Returns:
+        Hex digest, or None if the sequence is not JSON-serializable.
+    """
+    thresholds = [getattr(buildability, name) for name in _KEY_THRESHOLDS]
+    try:
+        payload = json.dumps([thresholds, raw_sequence], sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildabilityCache:
+    """Thread-safe LRU cache of BuildabilityResults with a TTL.
+
+    Attributes:
+        max_size: Maximum number of cached results.
+        ttl_seconds: Seconds a result stays valid.
+        hits: Lookups answered from the cache.
+        misses: Lookups that ran the validator.
+        evictions: Entries dropped for size or age.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS):
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, BuildabilityResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[BuildabilityResult]:
+        """Look up a result, refreshing its LRU position.
+
+        Returns:
+            The cached result, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, result: BuildabilityResult) -> None:
+        """Store a result, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_default_cache = BuildabilityCache()
+
+
+def get_buildability_cache() -> BuildabilityCache:
+    """Get the process-wide buildability cache."""
+    return _default_cache
+
+
+def _copy_result(result: BuildabilityResult) -> BuildabilityResult:
+    """Copy a result so callers cannot mutate the cached lists or build sequence."""
+    return replace(
+        result,
+        issues=list(result.issues),
+        recommendations=list(result.recommendations),
+        build_sequence=result.build_sequence.copy(),
+    )
+
+
+def validate_buildability_cached(
+    model_data: Dict[str, Any],
+    cache: Optional[BuildabilityCache] = None
+) -> BuildabilityResult:
+    """validate_buildability with results memoized by build_sequence content.
+
+    Args:
+        model_data: Same as validate_buildability.
+        cache: Cache to use. Defaults to the process-wide cache.
+
+    Returns:
+        BuildabilityResult for the model, from the cache when possible.
+    """
+    if cache is None:
+        cache = _default_cache
+    raw_sequence = model_data.get("build_sequence", [])
+    key = canonical_sequence_key(raw_sequence) if raw_sequence else None
+    if key is None:
+        return validate_buildability(model_data)
+
+    result = cache.get(key)
+    if result is None:
+        result = validate_buildability(model_data)
+        cache.put(key, result)
+    else:
+        logger.debug(f"Buildability cache hit ({cache.hits} hits, {cache.misses} misses)")
+    return _copy_result(result)
@@ -0,0 +1,265 @@
+"""Ground-connectivity analysis for LEGO build sequences.
+
+Bricks are joined into connected components with a disjoint-set (union-find)
+forest over stud-overlap adjacency: two bricks are connected when they sit in
+adjacent layers and their XY footprints share at least one grid cell. A
+spatial hash of (layer, x, y) cells makes finding those neighbours a lookup
+per covered cell, so the whole analysis is near-linear in the number of
+studs. On the vectorized path the studs are joined with the cells below
+them in one sorted-array pass instead, and only the distinct brick pairs
+reach the union-find.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with trimesh/pyvista
+    np = None
+
+if TYPE_CHECKING:
+    from validation.buildability import BrickGrid
+
+Cell = Tuple[int, int, int]  # (layer, grid_x, grid_y)
+
+# Matches LEGO_GRID_SIZE in validation.buildability
+STUD_PITCH = 8.0
+
+# Packed cell keys must stay below this to fit in int64 with room for the
+# layer-below offset; larger coordinate ranges use the scalar cell index
+MAX_CELL_KEY = 2 ** 62
+
+
+@dataclass
+class StudContacts:
+    """Studs of each brick resting on a stud of a brick in the layer below.
+
+    Built in one pass from the BrickGrid arrays. Each row is one
+    (upper brick stud, lower brick) contact, grouped by upper brick in
+    build order.
+
+    Attributes:
+        upper: Index of the brick on top.
+        lower: Index of the brick underneath.
+        stud: Index of the upper brick's stud, unique per (brick, cell).
+        grid_x: Grid X of the shared stud.
+        grid_y: Grid Y of the shared stud.
+    """
+    upper: Any
+    lower: Any
+    stud: Any
+    grid_x: Any
+    grid_y: Any
+
+
+class DisjointSet:
+    """Union-find forest with path halving and union by rank."""
+
+    def __init__(self, size: int = 0):
+        """Create a forest of `size` singleton sets."""
+        self.parent: List[int] = list(range(size))
+        self.rank: List[int] = [0] * size
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(self) -> int:
+        """Add a new singleton set and return its element index."""
+        index = len(self.parent)
+        self.parent.append(index)
+        self.rank.append(0)
+        return index
+
+    def find(self, item: int) -> int:
+        """Return the representative of the set containing `item`."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets containing `a` and `b`.
+
+        Returns:
+            True if two distinct sets were merged, False if already joined.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+        return True
+
+
+def get_ground_layer(grid: "BrickGrid") -> int:
+    """Get the layer bricks must be connected to.
+
+    This is layer 0, or the lowest layer when the model does not start at z=0.
+    """
+    if 0 in grid.layers or not grid.sorted_layers:
+        return 0
+    return grid.sorted_layers[0]
+
+
+def build_cell_index(grid: "BrickGrid") -> Dict[Cell, List[int]]:
+    """Build a spatial hash from (layer, x, y) cells to the bricks covering them.
+
+    The index is cached on the grid so the connectivity and stability checks
+    share it.
+    """
+    if grid.cell_index is not None:
+        return grid.cell_index
+    cells: Dict[Cell, List[int]] = {}
+    for index, (layer, footprint) in enumerate(zip(grid.brick_layers, grid.brick_footprints)):
+        for grid_x, grid_y in footprint:
+            cells.setdefault((layer, grid_x, grid_y), []).append(index)
+    grid.cell_index = cells
+    return cells
+
+
+def stud_contacts(grid: "BrickGrid") -> Optional[StudContacts]:
+    """Join every stud with the bricks covering the cell below it.
+
+    The studs of all known bricks are expanded from the position and
+    dimension arrays, packed into integer cell keys and sorted once; the
+    cell below each stud is then found with a binary search. The result is
+    cached on the grid so the connectivity and stability checks share it.
+
+    Args:
+        grid: The indexed build sequence.
+
+    Returns:
+        The contacts, or None on the scalar path (no position arrays) or when
+        the coordinates are too far apart to pack into int64 keys.
+    """
+    if grid.stud_contacts is not None or grid.positions is None:
+        return grid.stud_contacts
+
+    known = np.flatnonzero(grid.known)
+    dimensions = grid.dimensions[known].astype(np.int64)
+    counts = dimensions[:, 0] * dimensions[:, 1]
+    total = int(counts.sum())
+    if not total:
+        return None
+
+    # Stud k of a brick sits at (k // length, k % length) from its corner,
+    # matching the footprint sets
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    offset = np.arange(total) - first
+    length = np.repeat(dimensions[:, 1], counts)
+    # np.rint rounds half to even like round() in the footprint sets
+    base = np.rint(grid.positions[known, :2] / STUD_PITCH).astype(np.int64)
+    bricks = np.repeat(known, counts)
+    grid_x = np.repeat(base[:, 0], counts) + offset // length
+    grid_y = np.repeat(base[:, 1], counts) + offset % length
+    layers = grid.layer_array[bricks]
+
+    # Pack (layer, x, y) into one key; the layer below is one layer stride down
+    low_x, low_y, low_layer = int(grid_x.min()), int(grid_y.min()), int(layers.min())
+    span_x = int(grid_x.max()) - low_x + 1
+    span_y = int(grid_y.max()) - low_y + 1
+    span_layer = int(layers.max()) - low_layer + 1
+    if span_layer * span_x * span_y >= MAX_CELL_KEY:
+        return None
+    layer_stride = span_x * span_y
+    keys = (layers - low_layer) * layer_stride + (grid_x - low_x) * span_y + (grid_y - low_y)
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    below = keys - layer_stride
+    start = np.searchsorted(sorted_keys, below, side="left")
+    hits = np.searchsorted(sorted_keys, below, side="right") - start
+
+    # Expand each stud into one row per brick covering the cell below it
+    stud = np.repeat(np.arange(total), hits)
+    rows = int(hits.sum())
+    match = np.repeat(start, hits) + np.arange(rows) - np.repeat(np.cumsum(hits) - hits, hits)
+    grid.stud_contacts = StudContacts(
+        upper=bricks[stud],
+        lower=bricks[order[match]],
+        stud=stud,
+        grid_x=grid_x[stud],
+        grid_y=grid_y[stud],
+    )
+    return grid.stud_contacts
+
+
+def brick_contacts(grid: "BrickGrid") -> Iterable[Tuple[int, int]]:
+    """Get each distinct (upper, lower) pair of bricks joined by studs.
+
+    Args:
+        grid: The indexed build sequence.
+
+    Returns:
+        (upper brick index, lower brick index) pairs in adjacent layers.
+    """
+    contacts = stud_contacts(grid)
+    if contacts is not None:
+        pairs = np.unique(contacts.upper * len(grid.bricks) + contacts.lower)
+        upper, lower = np.divmod(pairs, len(grid.bricks))
+        return zip(upper.tolist(), lower.tolist())
+
+    cells = build_cell_index(grid)
+    pairs: List[Tuple[int, int]] = []
+    for index, (layer, footprint) in enumerate(zip(grid.brick_layers, grid.brick_footprints)):
+        below = set()
+        for grid_x, grid_y in footprint:
+            below.update(cells.get((layer - 1, grid_x, grid_y), ()))
+        pairs.extend((index, other) for other in below)
+    return pairs
+
+
+def connect_bricks(grid: "BrickGrid") -> DisjointSet:
+    """Union every pair of bricks joined by studs in adjacent layers.
+
+    Args:
+        grid: The indexed build sequence.
+
+    Returns:
+        A DisjointSet over brick indices.
+    """
+    components = DisjointSet(len(grid.bricks))
+    # Adjacency is symmetric, so looking only at the layer below is enough
+    for upper, lower in brick_contacts(grid):
+        components.union(upper, lower)
+    return components
+
+
+def find_floating_components(grid: "BrickGrid") -> List[List[int]]:
+    """Find groups of bricks that are not connected to the ground layer.
+
+    Bricks without a footprint (unknown brick types) are ignored.
+
+    Args:
+        grid: The indexed build sequence.
+
+    Returns:
+        One list of brick indices (in build order) per floating component,
+        ordered by the first brick of each component.
+    """
+    if not grid.bricks:
+        return []
+
+    components = connect_bricks(grid)
+    ground_layer = get_ground_layer(grid)
+
+    grounded = set()
+    for index in grid.layers.get(ground_layer, []):
+        if grid.brick_footprints[index]:
+            grounded.add(components.find(index))
+
+    floating: Dict[int, List[int]] = {}
+    for index, footprint in enumerate(grid.brick_footprints):
+        if not footprint:
+            continue
+        root = components.find(index)
+        if root not in grounded:
+            floating.setdefault(root, []).append(index)
+
+    return list(floating.values())
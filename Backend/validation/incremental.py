@@ -0,0 +1,851 @@
+"""Incremental buildability validation for modification workflows.
+
+Modification requests ("make it taller", "add wings") usually change a small
+part of a model. IncrementalBuildabilityValidator keeps the per-layer
+footprints and edges, the connectivity components, the layer bounds, the
+mass sums, the seam runs and the load paths between validations, and
+updates them from brick deltas instead of re-indexing the whole
+build_sequence. A new build_sequence is compared with the previous one and
+only the entries between their common start and end are parsed and
+matched.
+
+Seam runs continue upwards and loads flow downwards, so the seam runs are
+kept per layer and redone from the lowest edited layer up, and the loads
+are kept per layer and redone from just above the highest edited layer
+down. Edits near the top of a model, the usual "make it taller" case,
+leave most of the seam runs alone; edits near its base leave most of the
+loads alone.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import islice
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from validation.buildability import (
+    BRICK_DIMENSIONS,
+    LEGO_BRICK_HEIGHT,
+    LEGO_GRID_SIZE,
+    STANDARD_BRICK_SIZES,
+    BrickPlacement,
+    BuildabilityResult,
+    BuildSequence,
+    Edge,
+    LayerBounds,
+    _alignment_issues,
+    _alignment_mask,
+    _collect_long_runs,
+    _empty_result,
+    _extend_seam_runs,
+    _finalize_result,
+    _floating_issues,
+    _footprint_recommendations,
+    _get_brick_footprint,
+    _get_layer_index,
+    _order_issue,
+    _parse_build_sequence,
+    _seam_report,
+    _size_issue,
+    _load_path_findings,
+    _stability_from_bounds,
+)
+from validation.connectivity import Cell
+from validation.stability import SubassemblyLoad, sweep_layer
+
+# Spacing of the build-order ranks; bricks inserted between two others take
+# ranks inside the gap, and all ranks are respaced once a gap runs out
+RANK_GAP = 1 << 32
+
+
+def _common_prefix(old: List[Any], new: List[Any]) -> int:
+    """Number of leading entries two sequences share."""
+    for index, (a, b) in enumerate(zip(old, new)):
+        if a is not b and a != b:
+            return index
+    return min(len(old), len(new))
+
+
+def _common_suffix(old: List[Any], new: List[Any], limit: int) -> int:
+    """Number of trailing entries two sequences share, at most limit."""
+    for count in range(limit):
+        a = old[-1 - count]
+        b = new[-1 - count]
+        if a is not b and a != b:
+            return count
+    return limit
+
+
+def _brick_key(brick: BrickPlacement) -> Tuple[Any, ...]:
+    """Geometry key used to match bricks between two sequences."""
+    position = brick.position
+    return (brick.brick, position.get("x"), position.get("y"), position.get("z"))
+
+
+def _brick_edges(brick: BrickPlacement) -> List[Edge]:
+    """Get the four (x1, y1, x2, y2) edges of a brick in mm."""
+    width, length = BRICK_DIMENSIONS[brick.brick]
+    x = brick.position["x"]
+    y = brick.position["y"]
+    x2 = x + width * LEGO_GRID_SIZE
+    y2 = y + length * LEGO_GRID_SIZE
+    return [(x, y, x2, y), (x, y, x, y2), (x2, y, x2, y2), (x, y2, x2, y2)]
+
+
+class IncrementalBuildabilityValidator:
+    """Buildability validator that keeps its indexes between edits.
+
+    Produces the same issues, recommendations and score as
+    validate_buildability for the current set of bricks. Adding bricks
+    updates the indexes in time proportional to the bricks added, merging
+    the smaller connected component into the larger. Removing a brick
+    searches from its neighbours in lockstep and relabels only the pieces
+    that came loose, so the work is proportional to those pieces.
+
+    The score then redoes the seam runs from the lowest edited layer up and
+    the load paths from just above the highest edited layer down, and looks
+    only at the sub-assemblies that tip or overhang. result() sorts only the
+    flagged bricks, by ranks kept in build order, and copies the build
+    sequence it keeps in step with the edits.
+
+    Mass sums are kept as running totals, so models with off-grid positions
+    may differ from a full validation by floating-point rounding.
+
+    Example:
+        validator = IncrementalBuildabilityValidator.from_sequence(base_sequence)
+        result = validator.apply_sequence(modified_sequence)
+    """
+
+    def __init__(self):
+        """Initialize an empty validator."""
+        self._bricks: Dict[int, BrickPlacement] = {}
+        self._order: List[int] = []
+        self._sequence = BuildSequence()
+        self._next_id = 0
+        # Brick id -> sort key in build order
+        self._rank: Dict[int, int] = {}
+
+        # Raw entries of the last applied build_sequence (None after direct
+        # brick edits), with the (index, issue) of every entry that could
+        # not be parsed and the indices of entries that default their step
+        self._entries: Optional[List[Any]] = []
+        self._has_raw_sequence = False
+        self._parse_issues: List[Tuple[int, str]] = []
+        self._stepless: List[int] = []
+
+        # Per-brick indexes
+        self._layer_of: Dict[int, int] = {}
+        self._footprint: Dict[int, Set[Tuple[int, int]]] = {}
+        self._misaligned: Dict[int, Tuple[bool, bool, bool]] = {}
+        self._nonstandard: Set[int] = set()
+
+        # Per-layer indexes
+        self._layer_members: Dict[int, Set[int]] = {}
+        self._layer_cells: Dict[int, Counter] = {}
+        self._layer_edges: Dict[int, Counter] = {}
+        self._sorted_layers: List[int] = []
+        self._bounds_cache: Dict[int, LayerBounds] = {}
+        self._cell_owners: Dict[Cell, Set[int]] = {}
+
+        # Seam runs per layer from the bottom: (layer, runs up to and
+        # including it, seams through 3+ layers, long runs ending below it)
+        self._seam_steps: List[Tuple[int, Dict[Edge, Tuple[int, int]], int, Dict[Tuple[int, int], int]]] = []
+        self._seams_dirty_from: Optional[int] = None
+        self._seam_result: Optional[Tuple[List[str], int]] = None
+
+        # Load paths per layer: what each layer passes to the one below, and
+        # its loads that tip or are not fully supported
+        self._passed_down: Dict[int, Dict[int, List[float]]] = {}
+        self._flagged_loads: Dict[int, List[SubassemblyLoad]] = {}
+        self._loads_dirty_to: Optional[float] = None
+        self._loads_ground: Optional[int] = None
+
+        # Connectivity components, keyed by label, with the number of
+        # ground-layer bricks of each grounded component
+        self._component_of: Dict[int, int] = {}
+        self._members: Dict[int, Set[int]] = {}
+        self._grounded: Dict[int, int] = {}
+        self._ground_layer = 0
+        self._connectivity_dirty = False
+
+        # Center of mass sums
+        self._mass_x = 0.0
+        self._mass_y = 0.0
+        self._total_mass = 0
+
+        # Assembly order: running max Z per build position and flagged bricks
+        self._prefix_max_z: List[float] = []
+        self._order_flags: Set[int] = set()
+        self._order_dirty_from: Optional[int] = None
+
+    @classmethod
+    def from_sequence(cls, raw_sequence: List[Dict[str, Any]]) -> "IncrementalBuildabilityValidator":
+        """Create a validator indexed with a full build_sequence.
+
+        Args:
+            raw_sequence: Raw build_sequence entries.
+
+        Returns:
+            The populated validator.
+        """
+        validator = cls()
+        validator.apply_sequence(raw_sequence)
+        return validator
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def bricks(self) -> List[BrickPlacement]:
+        """The current bricks in build order."""
+        return [self._bricks[brick_id] for brick_id in self._order]
+
+    def add_brick(self, brick: BrickPlacement, index: Optional[int] = None) -> int:
+        """Add a brick to the model.
+
+        Args:
+            brick: The brick placement to add.
+            index: Build-order position to insert at. Defaults to the end.
+
+        Returns:
+            The brick id, used to remove it later.
+        """
+        if index is None or index >= len(self._order):
+            index = len(self._order)
+        brick_id = self._new_id()
+        self._sequence.splice(index, index, [brick])
+        self._order.insert(index, brick_id)
+        self._rank_span(index, index + 1)
+        self._mark_order_dirty(index)
+        self._index_brick(brick_id, brick)
+        self._entries = None
+        return brick_id
+
+    def remove_brick(self, brick_id: int) -> None:
+        """Remove a brick from the model.
+
+        Args:
+            brick_id: Id returned by add_brick.
+
+        Raises:
+            KeyError: If the brick id is unknown.
+        """
+        if brick_id not in self._bricks:
+            raise KeyError(brick_id)
+        index = self._order.index(brick_id)
+        del self._order[index]
+        self._sequence.splice(index, index + 1, [])
+        self._mark_order_dirty(index)
+        self._unindex_brick(brick_id)
+        self._entries = None
+
+    def apply_sequence(self, raw_sequence: List[Dict[str, Any]]) -> BuildabilityResult:
+        """Move the model to a new build_sequence and validate it.
+
+        The new entries are compared with the previous build_sequence, and
+        only the entries between their common start and end are parsed.
+        Those bricks are matched to the ones they replace by type and
+        position; only unmatched bricks are added or removed. Matched bricks
+        take the step and color from the new sequence. After add_brick or
+        remove_brick the whole sequence is matched this way.
+
+        Entries are compared by value, so change a build_sequence by
+        replacing its entries rather than mutating ones already applied.
+
+        Args:
+            raw_sequence: Raw build_sequence entries of the modified model.
+
+        Returns:
+            BuildabilityResult for the new sequence.
+        """
+        raw_sequence = raw_sequence or []
+        self._has_raw_sequence = bool(raw_sequence)
+        previous = self._entries
+
+        if previous is None:
+            start, old_stop, new_stop = 0, 0, len(raw_sequence)
+            order_start, order_stop = 0, len(self._order)
+            self._parse_issues = []
+            self._stepless = []
+        else:
+            start = _common_prefix(previous, raw_sequence)
+            common_end = _common_suffix(previous, raw_sequence, min(len(previous), len(raw_sequence)) - start)
+            if len(raw_sequence) != len(previous):
+                # Entries whose step or issue depends on their index are
+                # reparsed when the index shifts
+                dependent = max(
+                    self._parse_issues[-1][0] if self._parse_issues else -1,
+                    self._stepless[-1] if self._stepless else -1,
+                )
+                common_end = min(common_end, len(previous) - dependent - 1)
+            old_stop = len(previous) - common_end
+            new_stop = len(raw_sequence) - common_end
+            if start == old_stop == new_stop:
+                return self.result()
+            order_start = start - self._invalid_before(start)
+            order_stop = old_stop - self._invalid_before(old_stop)
+
+        window = raw_sequence[start:new_stop]
+        parse_issues, stepless = self._replace_bricks(order_start, order_stop, window, start)
+
+        # Nothing index-dependent is left after the window when its length changes
+        self._parse_issues[bisect_left(self._parse_issues, (start,)):] = (
+            parse_issues + self._parse_issues[bisect_left(self._parse_issues, (old_stop,)):]
+        )
+        self._stepless[bisect_left(self._stepless, start):] = (
+            stepless + self._stepless[bisect_left(self._stepless, old_stop):]
+        )
+        if previous is None:
+            self._entries = list(raw_sequence)
+        else:
+            previous[start:old_stop] = window
+
+        return self.result()
+
+    def _replace_bricks(
+        self,
+        order_start: int,
+        order_stop: int,
+        window: List[Any],
+        entry_start: int
+    ) -> Tuple[List[Tuple[int, str]], List[int]]:
+        """Replace the bricks at build positions order_start to order_stop.
+
+        Args:
+            order_start: First build position replaced.
+            order_stop: Build position after the last one replaced.
+            window: Raw entries replacing them.
+            entry_start: Index of the first window entry in the build_sequence.
+
+        Returns:
+            Tuple of ((index, issue) per unparseable entry, indices of the
+            entries without a step)
+        """
+        bricks, issues, _ = _parse_build_sequence(window, entry_start)
+        parse_issues: List[Tuple[int, str]] = []
+        if issues:
+            # Parse entry by entry to find the ones that failed
+            parsed = []
+            for offset, item in enumerate(window):
+                entry_bricks, entry_issues, _ = _parse_build_sequence([item], entry_start + offset)
+                if entry_issues:
+                    parse_issues.append((entry_start + offset, entry_issues[0]))
+                else:
+                    parsed.append((offset, entry_bricks[0]))
+        else:
+            parsed = list(enumerate(bricks))
+        stepless = [entry_start + offset for offset, _ in parsed if "step" not in window[offset]]
+
+        replaced = self._order[order_start:order_stop]
+        available: Dict[Tuple[Any, ...], List[int]] = {}
+        for brick_id in reversed(replaced):
+            available.setdefault(_brick_key(self._bricks[brick_id]), []).append(brick_id)
+
+        new_ids = []
+        added = []
+        for _, brick in parsed:
+            matches = available.get(_brick_key(brick))
+            if matches:
+                brick_id = matches.pop()
+                self._bricks[brick_id] = brick
+            else:
+                brick_id = self._new_id()
+                added.append((brick_id, brick))
+            new_ids.append(brick_id)
+
+        for matches in available.values():
+            for brick_id in matches:
+                self._unindex_brick(brick_id)
+        for brick_id, brick in added:
+            self._index_brick(brick_id, brick)
+
+        first_change = _common_prefix(replaced, new_ids)
+        self._order[order_start:order_stop] = new_ids
+        self._sequence.splice(order_start, order_stop, [brick for _, brick in parsed])
+        self._rank_span(order_start, order_start + len(new_ids))
+        self._mark_order_dirty(order_start + first_change)
+        return parse_issues, stepless
+
+    def _invalid_before(self, index: int) -> int:
+        """Number of unparseable entries before an entry index."""
+        return bisect_left(self._parse_issues, (index,))
+
+    def _new_id(self) -> int:
+        """Allocate a brick id or component label."""
+        brick_id = self._next_id
+        self._next_id += 1
+        return brick_id
+
+    def _rank_span(self, start: int, stop: int) -> None:
+        """Rank the bricks at build positions start to stop between their neighbours."""
+        order = self._order
+        rank = self._rank
+        count = stop - start
+        low = rank[order[start - 1]] if start > 0 else None
+        high = rank[order[stop]] if stop < len(order) else None
+        if low is None:
+            low = (0 if high is None else high) - (count + 1) * RANK_GAP
+        if high is None:
+            high = low + (count + 1) * RANK_GAP
+        gap = (high - low) // (count + 1)
+        if gap == 0:
+            for position, brick_id in enumerate(order):
+                rank[brick_id] = position * RANK_GAP
+            return
+        for offset, brick_id in enumerate(islice(order, start, stop), 1):
+            rank[brick_id] = low + offset * gap
+
+    @property
+    def score(self) -> int:
+        """Current buildability score (0-100), without formatting issues."""
+        return max(0, 100 - self._penalty())
+
+    def committed_penalty(self) -> int:
+        """Penalty that bricks appended later in the build order cannot remove.
+
+        Counts misaligned and non-standard bricks and assembly-order jumps,
+        which stay flagged whatever follows them. Floating components are
+        counted once the model has grown more than one layer past their top,
+        assuming the remaining bricks are laid bottom-up. Used to give up on
+        a build_sequence while it is still being generated.
+
+        Returns:
+            Penalty points (0 for an empty model).
+        """
+        if not self._order:
+            return 0
+        self._refresh()
+        penalty = 5 * sum(sum(mask) for mask in self._misaligned.values())
+        penalty += 10 * len(self._nonstandard)
+        penalty += 5 * len(self._order_flags)
+        settled_below = self._sorted_layers[-1] - 1
+        for label, members in self._members.items():
+            if label not in self._grounded and max(self._layer_of[m] for m in members) < settled_below:
+                penalty += 15
+        return penalty
+
+    def result(self) -> BuildabilityResult:
+        """Validate the current model.
+
+        Returns:
+            BuildabilityResult matching validate_buildability on the same bricks.
+        """
+        if not self._order:
+            return _empty_result(self._has_raw_sequence)
+
+        self._refresh()
+        rank = self._rank
+
+        issues = [issue for _, issue in self._parse_issues]
+        recommendations: List[str] = []
+        penalty = 5 * len(self._parse_issues)
+
+        for brick_id in sorted(self._misaligned, key=rank.__getitem__):
+            brick_issues = _alignment_issues(self._bricks[brick_id], self._misaligned[brick_id])
+            issues.extend(brick_issues)
+            penalty += 5 * len(brick_issues)
+
+        for brick_id in sorted(self._nonstandard, key=rank.__getitem__):
+            issues.append(_size_issue(self._bricks[brick_id]))
+            penalty += 10
+
+        components = [
+            sorted(members, key=rank.__getitem__)
+            for label, members in self._members.items()
+            if label not in self._grounded
+        ]
+        floating_issues = _floating_issues(components, self._bricks, self._layer_of, rank)
+        issues.extend(floating_issues)
+        penalty += 15 * len(floating_issues)
+        recommendations.extend(self._footprint_recommendations())
+
+        joint_issues, joint_penalty = self._seams()
+        issues.extend(joint_issues)
+        penalty += joint_penalty
+
+        for brick_id in sorted(self._order_flags, key=rank.__getitem__):
+            issues.append(_order_issue(self._bricks[brick_id], self._layer_of[brick_id]))
+            penalty += 5
+
+        stability_issues, stability_penalty, stability_recs = self._stability()
+        issues.extend(stability_issues)
+        penalty += stability_penalty
+        recommendations.extend(stability_recs)
+
+        return _finalize_result(self._sequence.copy(), issues, recommendations, penalty, len(self._sorted_layers))
+
+    def _penalty(self) -> int:
+        """Total penalty of the current model."""
+        if not self._order:
+            return 100
+        self._refresh()
+        penalty = 5 * len(self._parse_issues)
+        penalty += 5 * sum(sum(mask) for mask in self._misaligned.values())
+        penalty += 10 * len(self._nonstandard)
+        penalty += 15 * sum(1 for label in self._members if label not in self._grounded)
+        penalty += self._seams()[1]
+        penalty += 5 * len(self._order_flags)
+        penalty += self._stability()[1]
+        return penalty
+
+    def _index_brick(self, brick_id: int, brick: BrickPlacement) -> None:
+        """Add a brick to every index."""
+        self._bricks[brick_id] = brick
+        layer = _get_layer_index(brick.position["z"])
+        footprint = _get_brick_footprint(brick)
+        self._layer_of[brick_id] = layer
+        self._footprint[brick_id] = footprint
+
+        mask = _alignment_mask(brick)
+        if any(mask):
+            self._misaligned[brick_id] = mask
+        if brick.brick not in STANDARD_BRICK_SIZES:
+            self._nonstandard.add(brick_id)
+
+        if layer not in self._layer_members:
+            self._layer_members[layer] = set()
+            self._layer_cells[layer] = Counter()
+            self._layer_edges[layer] = Counter()
+            self._insert_layer(layer)
+        self._layer_members[layer].add(brick_id)
+        self._layer_cells[layer].update(footprint)
+        self._touch_layer(layer)
+        for grid_x, grid_y in footprint:
+            self._cell_owners.setdefault((layer, grid_x, grid_y), set()).add(brick_id)
+
+        if brick.brick in BRICK_DIMENSIONS:
+            self._layer_edges[layer].update(_brick_edges(brick))
+            width, length = BRICK_DIMENSIONS[brick.brick]
+            mass = width * length
+            self._mass_x += (brick.position["x"] + (width * LEGO_GRID_SIZE) / 2) * mass
+            self._mass_y += (brick.position["y"] + (length * LEGO_GRID_SIZE) / 2) * mass
+            self._total_mass += mass
+
+        if self._connectivity_dirty or self._current_ground_layer() != self._ground_layer:
+            self._connectivity_dirty = True
+        elif footprint:
+            self._add_component(brick_id)
+            for other in self._neighbours(layer, footprint):
+                self._join(brick_id, other)
+
+    def _unindex_brick(self, brick_id: int) -> None:
+        """Remove a brick from every index."""
+        brick = self._bricks.pop(brick_id)
+        layer = self._layer_of.pop(brick_id)
+        footprint = self._footprint.pop(brick_id)
+        self._misaligned.pop(brick_id, None)
+        self._nonstandard.discard(brick_id)
+        self._order_flags.discard(brick_id)
+        self._rank.pop(brick_id, None)
+
+        self._layer_members[layer].discard(brick_id)
+        self._layer_cells[layer].subtract(footprint)
+        self._layer_cells[layer] = +self._layer_cells[layer]
+        for grid_x, grid_y in footprint:
+            owners = self._cell_owners[(layer, grid_x, grid_y)]
+            owners.discard(brick_id)
+            if not owners:
+                del self._cell_owners[(layer, grid_x, grid_y)]
+
+        if brick.brick in BRICK_DIMENSIONS:
+            self._layer_edges[layer].subtract(_brick_edges(brick))
+            self._layer_edges[layer] = +self._layer_edges[layer]
+            width, length = BRICK_DIMENSIONS[brick.brick]
+            mass = width * length
+            self._mass_x -= (brick.position["x"] + (width * LEGO_GRID_SIZE) / 2) * mass
+            self._mass_y -= (brick.position["y"] + (length * LEGO_GRID_SIZE) / 2) * mass
+            self._total_mass -= mass
+
+        self._touch_layer(layer)
+        if not self._layer_members[layer]:
+            del self._layer_members[layer]
+            del self._layer_cells[layer]
+            del self._layer_edges[layer]
+            self._sorted_layers.remove(layer)
+
+        if self._current_ground_layer() != self._ground_layer:
+            self._connectivity_dirty = True
+        elif footprint and not self._connectivity_dirty:
+            self._detach(brick_id, layer, footprint)
+
+    def _insert_layer(self, layer: int) -> None:
+        """Insert a new layer index into the sorted layer list."""
+        layers = self._sorted_layers
+        index = len(layers)
+        while index > 0 and layers[index - 1] > layer:
+            index -= 1
+        layers.insert(index, layer)
+
+    def _touch_layer(self, layer: int) -> None:
+        """Invalidate the cached bounds of a layer and the seam runs and loads it affects."""
+        self._bounds_cache.pop(layer, None)
+        self._seam_result = None
+        if self._seams_dirty_from is None or layer < self._seams_dirty_from:
+            self._seams_dirty_from = layer
+        # The layer above rests on this one, and the layers below carry it
+        if self._loads_dirty_to is None or layer + 1 > self._loads_dirty_to:
+            self._loads_dirty_to = layer + 1
+
+    def _current_ground_layer(self) -> int:
+        """Layer 0, or the lowest layer when the model does not start at z=0."""
+        if 0 in self._layer_members or not self._sorted_layers:
+            return 0
+        return self._sorted_layers[0]
+
+    def _neighbours(self, layer: int, footprint: Set[Tuple[int, int]]) -> Set[int]:
+        """Bricks sharing studs with a footprint from the layers above or below."""
+        found: Set[int] = set()
+        for grid_x, grid_y in footprint:
+            for neighbour_layer in (layer - 1, layer + 1):
+                found.update(self._cell_owners.get((neighbour_layer, grid_x, grid_y), ()))
+        return found
+
+    def _add_component(self, brick_id: int) -> None:
+        """Start a one-brick component."""
+        self._component_of[brick_id] = brick_id
+        self._members[brick_id] = {brick_id}
+        if self._layer_of[brick_id] == self._ground_layer:
+            self._grounded[brick_id] = 1
+
+    def _join(self, a: int, b: int) -> None:
+        """Merge the components of two bricks, relabelling the smaller one."""
+        label_a = self._component_of[a]
+        label_b = self._component_of[b]
+        if label_a == label_b:
+            return
+        if len(self._members[label_a]) < len(self._members[label_b]):
+            label_a, label_b = label_b, label_a
+        moved = self._members.pop(label_b)
+        for brick_id in moved:
+            self._component_of[brick_id] = label_a
+        self._members[label_a] |= moved
+        ground_bricks = self._grounded.pop(label_b, 0)
+        if ground_bricks:
+            self._grounded[label_a] = self._grounded.get(label_a, 0) + ground_bricks
+
+    def _detach(self, brick_id: int, layer: int, footprint: Set[Tuple[int, int]]) -> None:
+        """Take a removed brick out of its component and split off the pieces it held on.
+
+        Searches from each neighbour of the brick in lockstep, merging
+        searches that meet, until at most one is still running. Every
+        finished search has covered a whole piece that is no longer attached
+        to the others, so only those pieces get new labels and the work is
+        proportional to their size; the piece still being searched keeps
+        the label.
+        """
+        label = self._component_of.pop(brick_id)
+        members = self._members[label]
+        members.discard(brick_id)
+        if layer == self._ground_layer:
+            self._drop_ground_bricks(label, 1)
+        if not members:
+            del self._members[label]
+            return
+
+        starts = list(self._neighbours(layer, footprint))
+        if len(starts) < 2:
+            return
+        owner = {start: search for search, start in enumerate(starts)}
+        merged_into = list(range(len(starts)))
+        frontiers = [[start] for start in starts]
+
+        def find(search: int) -> int:
+            while merged_into[search] != search:
+                search = merged_into[search]
+            return search
+
+        running = list(range(len(starts)))
+        while len(running) > 1:
+            for search in running:
+                frontier = frontiers[search]
+                if merged_into[search] != search or not frontier:
+                    continue
+                node = frontier.pop()
+                for other in self._neighbours(self._layer_of[node], self._footprint[node]):
+                    seen = owner.get(other)
+                    if seen is None:
+                        owner[other] = search
+                        frontier.append(other)
+                        continue
+                    other_search = find(seen)
+                    if other_search != search:
+                        merged_into[other_search] = search
+                        frontier.extend(frontiers[other_search])
+                        frontiers[other_search] = []
+            running = [search for search in running if merged_into[search] == search and frontiers[search]]
+
+        pieces: Dict[int, List[int]] = {}
+        for node, search in owner.items():
+            pieces.setdefault(find(search), []).append(node)
+        if len(pieces) < 2:
+            return
+        # The unfinished search, or else the largest piece, keeps the label
+        kept = running[0] if running else max(pieces, key=lambda search: len(pieces[search]))
+        for search, piece in pieces.items():
+            if search == kept:
+                continue
+            # A fresh label, as the old one may be the id of a brick in this piece
+            new_label = self._new_id()
+            moved = set(piece)
+            members -= moved
+            self._members[new_label] = moved
+            ground_bricks = 0
+            for node in piece:
+                self._component_of[node] = new_label
+                if self._layer_of[node] == self._ground_layer:
+                    ground_bricks += 1
+            if ground_bricks:
+                self._grounded[new_label] = ground_bricks
+                self._drop_ground_bricks(label, ground_bricks)
+
+    def _drop_ground_bricks(self, label: int, count: int) -> None:
+        """Lower the ground-layer brick count of a component."""
+        remaining = self._grounded[label] - count
+        if remaining:
+            self._grounded[label] = remaining
+        else:
+            del self._grounded[label]
+
+    def _refresh(self) -> None:
+        """Bring connectivity and assembly-order state up to date."""
+        if self._connectivity_dirty:
+            self._ground_layer = self._current_ground_layer()
+            self._component_of = {}
+            self._members = {}
+            self._grounded = {}
+            for brick_id, footprint in self._footprint.items():
+                if footprint:
+                    self._add_component(brick_id)
+            for brick_id, footprint in self._footprint.items():
+                layer = self._layer_of[brick_id]
+                for grid_x, grid_y in footprint:
+                    for other in self._cell_owners.get((layer - 1, grid_x, grid_y), ()):
+                        self._join(brick_id, other)
+            self._connectivity_dirty = False
+
+        if self._order_dirty_from is not None:
+            start = self._order_dirty_from
+            del self._prefix_max_z[start:]
+            prev_max_z = self._prefix_max_z[-1] if self._prefix_max_z else -1.0
+            for brick_id in self._order[start:]:
+                z = self._bricks[brick_id].position["z"]
+                # Allow building within same layer or one layer above previous max
+                if z > prev_max_z + LEGO_BRICK_HEIGHT * 1.5:
+                    self._order_flags.add(brick_id)
+                else:
+                    self._order_flags.discard(brick_id)
+                prev_max_z = max(prev_max_z, z)
+                self._prefix_max_z.append(prev_max_z)
+            self._order_dirty_from = None
+
+    def _mark_order_dirty(self, index: int) -> None:
+        """Recheck assembly order from a build position onwards."""
+        if self._order_dirty_from is None or index < self._order_dirty_from:
+            self._order_dirty_from = index
+
+    def _footprint_recommendations(self) -> List[str]:
+        """Base-width recommendation from the layer footprint sizes."""
+        if len(self._sorted_layers) < 2:
+            return []
+        base_cells = self._layer_cells.get(0, ())
+        top_cells = self._layer_cells[self._sorted_layers[-1]]
+        return _footprint_recommendations(len(base_cells), len(top_cells))
+
+    def _seams(self) -> Tuple[List[str], int]:
+        """Staggered-joint issues, from the seam runs kept per layer."""
+        if len(self._order) < 3:
+            return [], 0
+        if self._seam_result is None:
+            self._update_seam_steps()
+            steps = self._seam_steps
+            windows = []
+            long_runs: Dict[Tuple[int, int], int] = {}
+            for index, (layer, _, continuous_seams, ended) in enumerate(steps):
+                windows.append((steps[max(index - 2, 0)][0], layer, continuous_seams))
+                for key, count in ended.items():
+                    long_runs[key] = long_runs.get(key, 0) + count
+            if steps:
+                _collect_long_runs(steps[-1][1], {}, steps[-1][0], long_runs)
+            self._seam_result = _seam_report(windows, long_runs)
+        return self._seam_result
+
+    def _update_seam_steps(self) -> None:
+        """Redo the seam runs from the lowest edited layer up."""
+        if self._seams_dirty_from is None:
+            return
+        steps = self._seam_steps
+        start = bisect_left(self._sorted_layers, self._seams_dirty_from)
+        kept = 0
+        while kept < len(steps) and steps[kept][0] < self._seams_dirty_from:
+            kept += 1
+        del steps[kept:]
+        runs = steps[-1][1] if steps else {}
+        for layer in self._sorted_layers[start:]:
+            next_runs, continuous_seams = _extend_seam_runs(runs, layer, self._layer_edges[layer].keys())
+            ended: Dict[Tuple[int, int], int] = {}
+            if steps:
+                _collect_long_runs(runs, next_runs, steps[-1][0], ended)
+            steps.append((layer, next_runs, continuous_seams, ended))
+            runs = next_runs
+        self._seams_dirty_from = None
+
+    def _layer_bounds(self, layer: int) -> LayerBounds:
+        """(min_x, max_x, min_y, max_y) of a layer, cached until it changes."""
+        if layer not in self._bounds_cache:
+            min_x = min_y = float('inf')
+            max_x = max_y = float('-inf')
+            for brick_id in self._layer_members[layer]:
+                brick = self._bricks[brick_id]
+                if brick.brick not in BRICK_DIMENSIONS:
+                    continue
+                width, length = BRICK_DIMENSIONS[brick.brick]
+                x, y = brick.position["x"], brick.position["y"]
+                min_x = min(min_x, x)
+                min_y = min(min_y, y)
+                max_x = max(max_x, x + width * LEGO_GRID_SIZE)
+                max_y = max(max_y, y + length * LEGO_GRID_SIZE)
+            self._bounds_cache[layer] = (min_x, max_x, min_y, max_y)
+        return self._bounds_cache[layer]
+
+    def _stability(self) -> Tuple[List[str], int, List[str]]:
+        """Stability issues, penalty and recommendations.
+
+        Uses the cached layer bounds and mass sums for the whole-model check
+        and the loads kept per layer for the per-sub-assembly check.
+        """
+        if len(self._sorted_layers) < 2:
+            return [], 0, []
+        penalty, recommendations = _stability_from_bounds(
+            self._layer_bounds(self._sorted_layers[0]),
+            self._layer_bounds(self._sorted_layers[-1]),
+            self._mass_x,
+            self._mass_y,
+            self._total_mass,
+        )
+        self._update_loads()
+        flagged = [load for loads in self._flagged_loads.values() for load in loads]
+        return [], penalty, recommendations + _load_path_findings(flagged, self._bricks, self._rank)
+
+    def _update_loads(self) -> None:
+        """Redo the load paths from just above the highest edited layer down."""
+        ground = self._current_ground_layer()
+        if ground != self._loads_ground:
+            self._loads_ground = ground
+            self._loads_dirty_to = float('inf')
+        if self._loads_dirty_to is None:
+            return
+        top = self._loads_dirty_to
+        for cache in (self._passed_down, self._flagged_loads):
+            for layer in [layer for layer in cache if layer <= top]:
+                del cache[layer]
+
+        # What the first untouched layer above passes down is still valid
+        passed = self._passed_down.get(top + 1, {})
+        for layer in reversed(self._sorted_layers[:bisect_right(self._sorted_layers, top)]):
+            members = [brick_id for brick_id in self._layer_members[layer] if self._footprint[brick_id]]
+            loads, passed = sweep_layer(layer, members, self._footprint, self._cell_owners, ground, passed)
+            self._passed_down[layer] = passed
+            self._flagged_loads[layer] = [
+                load for load in loads.values()
+                if load.support is not None and (load.tips or load.supported_studs < load.studs)
+            ]
+        self._loads_dirty_to = None
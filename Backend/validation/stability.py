@@ -0,0 +1,435 @@
+"""Load-path stability analysis over the stud support graph.
+
+Every brick rests on the bricks in the layer below whose footprints share
+studs with it. Loads only flow downward through those contacts, so the
+support graph is acyclic and the load carried by each brick (the brick plus
+everything stacked on it) is found in a single sweep from the top layer
+down. A brick passes its load to its supporters in proportion to the
+studs it shares with each of them, and each supporter takes its share at
+the centroid of those shared studs: that is where the load enters it, so
+a load spread over several supporters (an arch, a bridge) does not look
+off-centre on each of them.
+
+The stud-share split is a heuristic. How a load really divides between
+several supporters is statically indeterminate and would take a sparse
+solve of the contact forces; the split used here is exact for a single
+supporter and for symmetric supports, and keeps the sweep linear.
+
+Each sub-assembly's load center is then checked against its support
+polygon (the convex hull of the studs it rests on), which finds tipping
+and overhanging parts anywhere in the model rather than only for the model
+as a whole.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union, TYPE_CHECKING
+
+from validation.connectivity import STUD_PITCH, Cell, stud_contacts
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with trimesh/pyvista
+    np = None
+
+if TYPE_CHECKING:
+    from validation.buildability import BrickGrid
+
+# Load centers this close to the support edge (mm) still count as supported
+SUPPORT_TOLERANCE = 1e-6
+
+SupportPolygon = Tuple[Tuple[float, float], ...]  # Convex hull corners (x, y) in mm, counter-clockwise
+
+
+@dataclass
+class SubassemblyLoad:
+    """Load carried by one brick: the brick plus everything it supports.
+
+    Attributes:
+        brick: Brick id (index or key used by the caller).
+        layer: Layer index of the brick.
+        mass: Carried mass in studs.
+        center: (x, y) load center in mm.
+        studs: Studs in the brick's footprint.
+        supported_studs: Studs resting on a brick in the layer below.
+        support: Convex hull of the supported studs, or None if nothing is below.
+    """
+    brick: int
+    layer: int
+    mass: float
+    center: Tuple[float, float]
+    studs: int
+    supported_studs: int
+    support: Optional[SupportPolygon]
+
+    @property
+    def tips(self) -> bool:
+        """Whether the load center lies outside the support polygon."""
+        if self.support is None:
+            return False
+        x, y = self.center
+        corners = self.support
+        if len(corners) == 4 and corners[0][1] == corners[1][1] and corners[1][0] == corners[2][0]:
+            # Axis-aligned rectangle, the usual support
+            (min_x, min_y), _, (max_x, max_y), _ = corners
+            return (x < min_x - SUPPORT_TOLERANCE or x > max_x + SUPPORT_TOLERANCE or
+                    y < min_y - SUPPORT_TOLERANCE or y > max_y + SUPPORT_TOLERANCE)
+        for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1]):
+            # Counter-clockwise, so inside is to the left of every edge
+            cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+            if cross < -SUPPORT_TOLERANCE * ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5:
+                return True
+        return False
+
+
+def support_polygon(cells: Sequence[Tuple[int, int]]) -> SupportPolygon:
+    """Get the convex hull of a set of stud cells.
+
+    Supports that fill their bounding rectangle (the common case) return
+    its four corners without running the hull.
+
+    Args:
+        cells: Distinct (grid_x, grid_y) cells, at least one.
+
+    Returns:
+        Hull corners in mm, counter-clockwise from the lowest-left one.
+    """
+    min_x = min(x for x, _ in cells)
+    max_x = max(x for x, _ in cells) + 1
+    min_y = min(y for _, y in cells)
+    max_y = max(y for _, y in cells) + 1
+    if len(cells) == (max_x - min_x) * (max_y - min_y):
+        corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+    else:
+        corners = _convex_hull({
+            (x + dx, y + dy) for x, y in cells for dx in (0, 1) for dy in (0, 1)
+        })
+    return tuple((x * STUD_PITCH, y * STUD_PITCH) for x, y in corners)
+
+
+def _convex_hull(points: Set[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Monotone-chain convex hull of integer points, counter-clockwise."""
+    ordered = sorted(points)
+
+    def chain(points_in_order: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        hull: List[Tuple[int, int]] = []
+        for point in points_in_order:
+            while len(hull) >= 2:
+                (x1, y1), (x2, y2) = hull[-2], hull[-1]
+                if (x2 - x1) * (point[1] - y1) - (y2 - y1) * (point[0] - x1) > 0:
+                    break
+                hull.pop()
+            hull.append(point)
+        return hull
+
+    lower = chain(ordered)
+    upper = chain(reversed(ordered))
+    return lower[:-1] + upper[:-1]
+
+
+def analyze_load_paths(
+    brick_ids: Iterable[int],
+    layer_of: Union[Sequence[int], Mapping[int, int]],
+    footprint_of: Union[Sequence[Set[Tuple[int, int]]], Mapping[int, Set[Tuple[int, int]]]],
+    cell_owners: Mapping[Cell, Iterable[int]],
+    ground_layer: int
+) -> Dict[int, SubassemblyLoad]:
+    """Sweep the support graph from the top layer down and accumulate loads.
+
+    Bricks without a footprint are ignored. Ground-layer bricks and bricks
+    with nothing below them (floating or hanging) keep their load; they
+    get no support polygon.
+
+    Args:
+        brick_ids: Brick ids to analyze.
+        layer_of: Brick id -> layer index.
+        footprint_of: Brick id -> (grid_x, grid_y) cells covered.
+        cell_owners: (layer, grid_x, grid_y) -> ids of the bricks covering it.
+        ground_layer: Layer that rests on the baseplate.
+
+    Returns:
+        Brick id -> SubassemblyLoad for every brick with a footprint.
+    """
+    layers: Dict[int, List[int]] = {}
+    for brick_id in brick_ids:
+        if footprint_of[brick_id]:
+            layers.setdefault(layer_of[brick_id], []).append(brick_id)
+
+    loads: Dict[int, SubassemblyLoad] = {}
+    passed: Dict[int, List[float]] = {}
+    for layer in sorted(layers, reverse=True):
+        layer_loads, passed = sweep_layer(layer, layers[layer], footprint_of, cell_owners, ground_layer, passed)
+        loads.update(layer_loads)
+    return loads
+
+
+def sweep_layer(
+    layer: int,
+    brick_ids: Iterable[int],
+    footprint_of: Union[Sequence[Set[Tuple[int, int]]], Mapping[int, Set[Tuple[int, int]]]],
+    cell_owners: Mapping[Cell, Iterable[int]],
+    ground_layer: int,
+    carried: Mapping[int, Sequence[float]]
+) -> Tuple[Dict[int, SubassemblyLoad], Dict[int, List[float]]]:
+    """Find the loads of one layer's bricks and pass them to the layer below.
+
+    A layer's loads depend only on the layers above it, through what they
+    pass down, so a sweep can resume at any layer from what the layer above
+    passed to it.
+
+    Args:
+        layer: Layer index.
+        brick_ids: Ids of the layer's bricks with a footprint.
+        footprint_of: Brick id -> (grid_x, grid_y) cells covered.
+        cell_owners: (layer, grid_x, grid_y) -> ids of the bricks covering it.
+        ground_layer: Layer that rests on the baseplate.
+        carried: Brick id -> (mass, mass * x, mass * y) passed down by the layer above.
+
+    Returns:
+        Tuple of (brick id -> SubassemblyLoad for the layer, supporter id ->
+        (mass, mass * x, mass * y) passed to the layer below).
+    """
+    check_support = layer != ground_layer
+    below = layer - 1
+    loads: Dict[int, SubassemblyLoad] = {}
+    passed: Dict[int, List[float]] = {}
+    for brick_id in brick_ids:
+        footprint = footprint_of[brick_id]
+        sum_x = sum_y = 0
+        supported_cells: List[Tuple[int, int]] = []
+        # Supporter -> [shared studs, sum of their grid x, sum of their grid y]
+        contacts: Dict[int, List[int]] = {}
+        for grid_x, grid_y in footprint:
+            sum_x += grid_x
+            sum_y += grid_y
+            if not check_support:
+                continue
+            supporters = cell_owners.get((below, grid_x, grid_y))
+            if not supporters:
+                continue
+            supported_cells.append((grid_x, grid_y))
+            for supporter in supporters:
+                contact = contacts.setdefault(supporter, [0, 0, 0])
+                contact[0] += 1
+                contact[1] += grid_x
+                contact[2] += grid_y
+
+        # Own stud mass at the stud centers, plus what the bricks above passed down
+        studs = len(footprint)
+        above = carried.get(brick_id, (0.0, 0.0, 0.0))
+        mass = above[0] + studs
+        moment_x = above[1] + (sum_x + 0.5 * studs) * STUD_PITCH
+        moment_y = above[2] + (sum_y + 0.5 * studs) * STUD_PITCH
+
+        loads[brick_id] = SubassemblyLoad(
+            brick=brick_id,
+            layer=layer,
+            mass=mass,
+            center=(moment_x / mass, moment_y / mass),
+            studs=studs,
+            supported_studs=len(supported_cells),
+            support=support_polygon(supported_cells) if supported_cells else None,
+        )
+
+        # Split the load between supporters by shared stud count, each
+        # share acting at the centroid of the studs it is carried on
+        total_contacts = sum(contact[0] for contact in contacts.values())
+        for supporter, (count, contact_x, contact_y) in contacts.items():
+            share = mass * count / total_contacts
+            supporter_load = passed.setdefault(supporter, [0.0, 0.0, 0.0])
+            supporter_load[0] += share
+            supporter_load[1] += share * (contact_x / count + 0.5) * STUD_PITCH
+            supporter_load[2] += share * (contact_y / count + 0.5) * STUD_PITCH
+
+    return loads, passed
+
+
+def analyze_grid_loads(
+    grid: "BrickGrid",
+    ground_layer: int,
+    flagged_only: bool = False
+) -> Optional[Dict[int, SubassemblyLoad]]:
+    """Vectorized analyze_load_paths over the stud contacts of a BrickGrid.
+
+    Shared studs, contact centroids and supports come from the stud join in
+    one pass; the sweep then moves a whole layer's loads down at a time.
+    Loads are accumulated in the same order as sweep_layer, so both give
+    the same results.
+
+    Args:
+        grid: The indexed build sequence.
+        ground_layer: Layer that rests on the baseplate.
+        flagged_only: Only return the loads that tip or are not fully
+            supported, the ones a finding can come from.
+
+    Returns:
+        Brick index -> SubassemblyLoad for every brick with a footprint, or
+        None when the grid has no stud contacts to work from (scalar path).
+    """
+    contacts = stud_contacts(grid)
+    if contacts is None:
+        return None
+
+    count = len(grid.bricks)
+    known = np.flatnonzero(grid.known)
+    layers = grid.layer_array
+
+    # Sweep order: top layer down, within a layer in build order like
+    # sweep_layer, so each layer is a slice that passes its loads to the next
+    order = known[np.lexsort((known, -layers[known]))]
+    position = np.empty(count, dtype=np.int64)
+    position[order] = np.arange(len(order))
+    order_layers = layers[order]
+    starts = np.flatnonzero(np.r_[True, order_layers[1:] != order_layers[:-1]]).tolist() + [len(order)]
+
+    # Own stud mass at the stud centers, with the footprint's grid x/y sums in closed form
+    width = grid.dimensions[order, 0]
+    length = grid.dimensions[order, 1]
+    studs = width * length
+    base_x = np.rint(grid.positions[order, 0] / STUD_PITCH)
+    base_y = np.rint(grid.positions[order, 1] / STUD_PITCH)
+    own_x = (studs * base_x + length * width * (width - 1) / 2 + 0.5 * studs) * STUD_PITCH
+    own_y = (studs * base_y + width * length * (length - 1) / 2 + 0.5 * studs) * STUD_PITCH
+
+    # Ground-layer bricks keep their load, as in sweep_layer
+    rows = layers[contacts.upper] != ground_layer
+    upper = contacts.upper[rows]
+    stud = contacts.stud[rows]
+    grid_x = contacts.grid_x[rows]
+    grid_y = contacts.grid_y[rows]
+
+    # Shared studs and their centroid per (upper, lower) pair, in sweep order
+    # of the upper brick and then by lower brick
+    pair_keys, inverse = np.unique(position[upper] * count + contacts.lower[rows], return_inverse=True)
+    pair_up, pair_lower = np.divmod(pair_keys, count)
+    pair_down = position[pair_lower]
+    shared = np.bincount(inverse)
+    contact_x = np.bincount(inverse, weights=grid_x) / shared + 0.5
+    contact_y = np.bincount(inverse, weights=grid_y) / shared + 0.5
+    pair_total = np.bincount(pair_up, weights=shared, minlength=len(order))[pair_up]
+    pair_starts = np.searchsorted(pair_up, starts).tolist()
+
+    mass = np.zeros(len(order))
+    moment_x = np.zeros(len(order))
+    moment_y = np.zeros(len(order))
+    for index in range(len(starts) - 1):
+        start, end = starts[index], starts[index + 1]
+        # What the layer above passed down, plus the bricks' own studs
+        mass[start:end] += studs[start:end]
+        moment_x[start:end] += own_x[start:end]
+        moment_y[start:end] += own_y[start:end]
+
+        # Split the load between supporters by shared stud count, each
+        # share acting at the centroid of the studs it is carried on
+        first_pair, last_pair = pair_starts[index], pair_starts[index + 1]
+        if first_pair == last_pair:
+            continue
+        pairs = slice(first_pair, last_pair)
+        share = mass[pair_up[pairs]] * shared[pairs] / pair_total[pairs]
+        # Supporters are all in the layer below, the next slice
+        below = pair_down[pairs] - end
+        size = starts[index + 2] - end
+        mass[end:end + size] += np.bincount(below, weights=share, minlength=size)
+        moment_x[end:end + size] += np.bincount(below, weights=share * contact_x[pairs] * STUD_PITCH, minlength=size)
+        moment_y[end:end + size] += np.bincount(below, weights=share * contact_y[pairs] * STUD_PITCH, minlength=size)
+    center_x = moment_x / mass
+    center_y = moment_y / mass
+
+    # Supported studs per brick, one row per stud (rows are grouped by stud)
+    first = np.r_[True, stud[1:] != stud[:-1]] if stud.size else np.zeros(0, dtype=bool)
+    support_brick = upper[first]
+    support_x = grid_x[first]
+    support_y = grid_y[first]
+    supported = np.bincount(position[support_brick], minlength=len(order))
+
+    supports: Dict[int, SupportPolygon] = {}
+    selected = np.arange(len(order)) if not flagged_only else order[:0]
+    if support_brick.size:
+        supports, selected = _grid_supports(
+            support_brick, support_x, support_y, position, center_x, center_y,
+            supported < studs if flagged_only else None,
+        )
+
+    loads: Dict[int, SubassemblyLoad] = {}
+    values = zip(
+        order[selected].tolist(), order_layers[selected].tolist(), mass[selected].tolist(),
+        center_x[selected].tolist(), center_y[selected].tolist(),
+        studs[selected].astype(np.int64).tolist(), supported[selected].tolist(),
+    )
+    for brick, layer, brick_mass, brick_x, brick_y, brick_studs, supported_studs in values:
+        load = SubassemblyLoad(
+            brick=brick,
+            layer=layer,
+            mass=brick_mass,
+            center=(brick_x, brick_y),
+            studs=brick_studs,
+            supported_studs=supported_studs,
+            support=supports.get(brick),
+        )
+        if not flagged_only or load.tips or supported_studs < brick_studs:
+            loads[brick] = load
+    return loads
+
+
+def _grid_supports(
+    bricks: "np.ndarray",
+    grid_x: "np.ndarray",
+    grid_y: "np.ndarray",
+    position: "np.ndarray",
+    center_x: "np.ndarray",
+    center_y: "np.ndarray",
+    partial: Optional["np.ndarray"]
+) -> Tuple[Dict[int, SupportPolygon], "np.ndarray"]:
+    """Get the support polygons of the bricks from their supported studs.
+
+    Supports that fill their bounding rectangle are tested against the load
+    centers as one, so only the rest need their hull.
+
+    Args:
+        bricks: Brick of each supported stud, grouped by brick.
+        grid_x: Grid X of each supported stud.
+        grid_y: Grid Y of each supported stud.
+        position: Brick index -> sweep position.
+        center_x: Load center X per sweep position.
+        center_y: Load center Y per sweep position.
+        partial: Whether each sweep position is not fully supported, to keep
+            only the bricks that may be flagged; None keeps every brick.
+
+    Returns:
+        Tuple of (brick index -> support polygon, sorted sweep positions of
+        the bricks to report).
+    """
+    starts = np.flatnonzero(np.r_[True, bricks[1:] != bricks[:-1]])
+    ends = np.r_[starts[1:], len(bricks)]
+    min_x = np.minimum.reduceat(grid_x, starts)
+    max_x = np.maximum.reduceat(grid_x, starts) + 1
+    min_y = np.minimum.reduceat(grid_y, starts)
+    max_y = np.maximum.reduceat(grid_y, starts) + 1
+    filled = (ends - starts) == (max_x - min_x) * (max_y - min_y)
+    left, right = min_x * STUD_PITCH, max_x * STUD_PITCH
+    bottom, top = min_y * STUD_PITCH, max_y * STUD_PITCH
+
+    at = position[bricks[starts]]
+    if partial is None:
+        keep = np.ones(len(starts), dtype=bool)
+        selected = np.arange(len(center_x))
+    else:
+        # Same comparisons as SubassemblyLoad.tips on a rectangle
+        outside = (
+            (center_x[at] < left - SUPPORT_TOLERANCE) | (center_x[at] > right + SUPPORT_TOLERANCE) |
+            (center_y[at] < bottom - SUPPORT_TOLERANCE) | (center_y[at] > top + SUPPORT_TOLERANCE)
+        )
+        keep = ~filled | outside | partial[at]
+        selected = np.sort(at[keep])
+
+    supports: Dict[int, SupportPolygon] = {}
+    rects = zip(
+        bricks[starts[keep]].tolist(), filled[keep].tolist(),
+        left[keep].tolist(), right[keep].tolist(), bottom[keep].tolist(), top[keep].tolist(),
+        starts[keep].tolist(), ends[keep].tolist(),
+    )
+    for brick, is_filled, x1, x2, y1, y2, start, end in rects:
+        if is_filled:
+            supports[brick] = ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
+        else:
+            supports[brick] = support_polygon(list(zip(grid_x[start:end].tolist(), grid_y[start:end].tolist())))
+    return supports, selected
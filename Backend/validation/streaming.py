@@ -0,0 +1,204 @@
+"""Buildability checks on a build_sequence while the coder is still writing it.
+
+The coder emits its build_sequence as Python or JSON text, brick by brick.
+StreamingBuildSequenceParser pulls complete brick entries out of the text as
+chunks arrive, and StreamingBuildabilityCheck feeds them to an
+IncrementalBuildabilityValidator. Once the penalty that later bricks cannot
+remove pushes the score below the threshold, the layout is hopeless and the
+caller can ask for a correction without waiting for CAD execution.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from validation.buildability import BuildabilityResult, _parse_build_sequence
+from validation.incremental import IncrementalBuildabilityValidator
+
+logger = logging.getLogger(__name__)
+
+# Start of the list in `build_sequence = [` (Python) or `"build_sequence": [` (JSON)
+_START_PATTERN = re.compile(r'build_sequence["\']?\s*[=:]\s*\[')
+
+# Text kept between chunks while looking for the start of the list
+_START_LOOKBEHIND = 64
+
+
+def _parse_entry(text: str) -> Optional[Dict[str, Any]]:
+    """Parse one `{...}` brick entry, accepting Python literal syntax.
+
+    Uses the same Python-to-JSON conversion as the control flow agent's
+    metadata extraction, so both see the same bricks.
+    """
+    json_str = text.replace("'", '"').replace("True", "true").replace("False", "false")
+    try:
+        entry = json.loads(json_str)
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.debug(f"Skipping unparsable build_sequence entry: {e}")
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+class StreamingBuildSequenceParser:
+    """Incremental parser for the first build_sequence list in a text stream.
+
+    Chunks may split the text anywhere, including inside the
+    `build_sequence = [` marker or a string. Only the current entry is
+    buffered, so memory stays bounded however long the stream is.
+
+    Attributes:
+        started: Whether the start of the list has been seen.
+        done: Whether the closing bracket of the list has been seen.
+    """
+
+    def __init__(self):
+        """Initialize a parser waiting for the start of the list."""
+        self.started = False
+        self.done = False
+        self._pending = ""
+        self._entry: List[str] = []
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._escaped = False
+        self._comment = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text.
+
+        Args:
+            chunk: Next piece of the coder output.
+
+        Returns:
+            Brick entries completed by this chunk, in order.
+        """
+        if self.done or not chunk:
+            return []
+        if not self.started:
+            text = self._pending + chunk
+            match = _START_PATTERN.search(text)
+            if match is None:
+                self._pending = text[-_START_LOOKBEHIND:]
+                return []
+            self.started = True
+            self._pending = ""
+            chunk = text[match.end():]
+        return self._scan(chunk)
+
+    def _scan(self, chunk: str) -> List[Dict[str, Any]]:
+        """Scan list text, tracking braces outside of strings and comments."""
+        entries = []
+        for char in chunk:
+            if self._comment:
+                self._comment = char != "\n"
+                continue
+            if self._depth:
+                self._entry.append(char)
+            if self._quote:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif char in "\"'":
+                self._quote = char
+            elif char == "#":
+                self._comment = True
+                if self._depth:
+                    self._entry.pop()
+            elif char == "{":
+                if not self._depth:
+                    self._entry = [char]
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    entry = _parse_entry("".join(self._entry))
+                    self._entry = []
+                    if entry is not None:
+                        entries.append(entry)
+            elif char == "]" and not self._depth:
+                self.done = True
+                break
+        return entries
+
+
+class StreamingBuildabilityCheck:
+    """Validate a build_sequence brick by brick as the coder streams it.
+
+    Example:
+        check = StreamingBuildabilityCheck(threshold=70)
+        for chunk in coder_chunks:
+            if check.feed(chunk):
+                correction = build_correction_prompt(check.result())
+                break
+
+    Attributes:
+        threshold: Score below which the layout is considered hopeless.
+        entries: Raw build_sequence entries parsed so far.
+    """
+
+    def __init__(self, threshold: int):
+        """Initialize an empty check.
+
+        Args:
+            threshold: Score below which the layout is considered hopeless.
+        """
+        self.threshold = threshold
+        self.entries: List[Dict[str, Any]] = []
+        self._parser = StreamingBuildSequenceParser()
+        self._validator = IncrementalBuildabilityValidator()
+        self._parse_penalty = 0
+        self._hopeless = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole build_sequence has been read."""
+        return self._parser.done
+
+    @property
+    def hopeless(self) -> bool:
+        """Whether the score can no longer reach the threshold."""
+        return self._hopeless
+
+    @property
+    def best_score(self) -> int:
+        """Highest score the sequence can still reach."""
+        return max(0, 100 - self._parse_penalty - self._validator.committed_penalty())
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of coder text and validate any completed bricks.
+
+        Args:
+            chunk: Next piece of the coder output.
+
+        Returns:
+            True once the layout is hopeless.
+        """
+        if self._hopeless:
+            return True
+        new_entries = self._parser.feed(chunk)
+        if not new_entries:
+            return False
+
+        for entry in new_entries:
+            bricks, _, penalty = _parse_build_sequence([entry])
+            self.entries.append(entry)
+            self._parse_penalty += penalty
+            for brick in bricks:
+                self._validator.add_brick(brick)
+
+        if self.best_score < self.threshold:
+            self._hopeless = True
+            logger.info(f"Streaming buildability: score can reach at most {self.best_score} "
+                        f"after {len(self.entries)} bricks, below {self.threshold}")
+        return self._hopeless
+
+    def result(self) -> BuildabilityResult:
+        """Validate the bricks read so far.
+
+        Returns:
+            BuildabilityResult for the partial build_sequence.
+        """
+        return self._validator.apply_sequence(self.entries)